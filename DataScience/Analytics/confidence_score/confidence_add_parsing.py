@@ -22,12 +22,28 @@ file_ext_out = '_ML_features_5_parse.csv'
 retval = os.getcwd()
 os.chdir( "H:\\My Documents\\python\\address-index-data\\DataScience" )
 import ProbabilisticParser.parser as parser
+from Analytics.linking.addressNormaliser import AddressNormaliser
+normaliser = AddressNormaliser.from_files(os.path.join(os.getcwd(), 'data'))
 os.chdir( retval )
 def get_parseprob (address):
     return parser.parse_with_probabilities(address)['sequence_probability']
 
-def add_parsing_score(data):
-    data['parsing_score'] = data['ADDRESS'].apply(get_parseprob)
+def add_parsing_score(data, workers=1):
+    # the linking with the parsingScore setting has already scored the parse the components come from
+    # the addresses are scored serially unless more worker processes are given
+    if 'parsing_score' not in data.columns:
+        # score the string that the NLP linker parses, the upper-cased ADDRESS_norm, normalising the ADDRESS
+        # with the same rules when the data do not have it
+        if 'ADDRESS_norm' in data.columns:
+            addresses = data['ADDRESS_norm'].tolist()
+        else:
+            addresses, _ = normaliser.normalise_many(data['ADDRESS'])
+        addresses = pd.Series(addresses, index=data.index)
+        # the missing addresses are not parsed and have no score, as in the linking
+        present = addresses.map(lambda address: isinstance(address, str)).astype(bool)
+        data['parsing_score'] = float('nan')
+        data.loc[present, 'parsing_score'] = parser.parse_arrays(addresses[present].str.upper().tolist(),
+                                                                 workers=workers).sequence_probabilities
     return data
 
 
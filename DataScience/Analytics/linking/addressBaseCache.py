@@ -0,0 +1,392 @@
+"""
+ONS Address Index - AddressBase Cache
+=====================================
+
+This file contains functions to read and process the modified AddressBase CSV file, and an AddressBase Cache
+class that stores the processed AddressBase in a binary columnar format. Reading the CSV file and repeating
+the processing, i.e. removing the former addresses, padding the missing PAO and SAO numbers and adding the N/A
+dummies, takes a long time, so the linker builds the cache once and load it on later runs.
+
+Each column is stored in its own numpy file in the cache directory, so that only the columns needed are read:
+
+    1. numbers, including the index of the processed AddressBase, as arrays of their own type
+    2. strings dictionary encoded, as 32 bit codes with -1 for the missing values, and the distinct strings
+       as UTF-8 bytes separated by a null character
+
+A manifest, written last, describes the columns and the source file, including a checksum of its content.
+The cache is rebuilt when the source file changes. The files are first written under a temporary name and then
+renamed, so that a cache is never left half written.
+
+
+Requirements
+------------
+
+:requires: numpy (tested with 1.11.3)
+:requires: pandas (tested with 0.19.2)
+
+
+Version
+-------
+
+:version: 0.4
+:date: 17-Oct-2026
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# column types of the modified AddressBase, cast UPRN as float as int64 does not support missing values
+ADDRESSBASE_TYPES = {'UPRN': np.float64, 'ORGANISATION_NAME': str, 'DEPARTMENT_NAME': str,
+                     'SUB_BUILDING_NAME': str, 'BUILDING_NAME': str, 'BUILDING_NUMBER': str, 'THROUGHFARE': str,
+                     'POST_TOWN': str, 'POSTCODE': str, 'PAO_TEXT': str, 'PAO_START_NUMBER': str,
+                     'PAO_START_SUFFIX': str, 'PAO_END_SUFFIX': str, 'PAO_END_NUMBER': str,
+                     'SAO_START_SUFFIX': str, 'SAO_TEXT': str, 'SAO_START_NUMBER': np.float64, 'LOCALITY': str,
+                     'STREET_DESCRIPTOR': str, 'postcode_in': str, 'postcode_out': str, 'SAO_END_SUFFIX': str,
+                     'SAO_END_NUMBER': np.float64}
+
+# numbers padded with a dummy value and stored as 32 bit integers
+NUMBER_COLUMNS = ['PAO_START_NUMBER', 'PAO_END_NUMBER', 'SAO_START_NUMBER', 'SAO_END_NUMBER']
+
+# text fields where the missing values are replaced with a dummy
+DUMMY_COLUMNS = ['PAO_START_SUFFIX', 'PAO_END_SUFFIX', 'SAO_START_SUFFIX', 'SAO_END_SUFFIX', 'SAO_TEXT']
+
+INDEX_NAME = 'AddressBase_Index'
+MANIFEST_FILE = 'manifest.json'
+CACHE_VERSION = 1
+
+
+def read_addressbase(filename):
+    """
+    Read the modified AddressBase CSV file.
+
+    :param filename: name of the CSV file
+    :type filename: str
+
+    :return: AddressBase as in the file
+    :rtype: pandas.DataFrame
+    """
+    return pd.read_csv(filename, dtype=ADDRESSBASE_TYPES)
+
+
+def process_addressbase(data):
+    """
+    Prepare the modified AddressBase for linking. Removes the addresses with FORMER in the SAO text, pads the
+    missing PAO and SAO numbers with -12345 and stores them as 32 bit integers, and replaces the missing suffixes
+    and SAO texts with N/A. The index of the remaining addresses is kept.
+
+    :param data: AddressBase as in the file
+    :type data: pandas.DataFrame
+
+    :return: processed AddressBase
+    :rtype: pandas.DataFrame
+    """
+    # remove those with former in the sao_text
+    msk = data['SAO_TEXT'].str.contains('FORMER', na=False, case=False)
+    data = data.loc[~msk].copy()
+
+    for number_column in NUMBER_COLUMNS:
+        data[number_column] = data[number_column].fillna('-12345').astype(np.int32)
+
+    for dummies_column in DUMMY_COLUMNS:
+        # if field is empty add dummy - helps when comparing against None
+        data[dummies_column] = data[dummies_column].fillna('N/A')
+
+    # set index name - needed later for merging / duplicate removal
+    data.index.name = INDEX_NAME
+
+    return data
+
+
+def file_checksum(filename, blocksize=2 ** 20):
+    """
+    SHA-1 checksum of the content of a file, read in blocks.
+
+    :param filename: name of the file
+    :type filename: str
+    :param blocksize: number of bytes read at a time
+    :type blocksize: int
+
+    :return: hexadecimal checksum
+    :rtype: str
+    """
+    checksum = hashlib.sha1()
+
+    with open(filename, 'rb') as f:
+        for block in iter(lambda: f.read(blocksize), b''):
+            checksum.update(block)
+
+    return checksum.hexdigest()
+
+
+def describe_source(source):
+    """
+    Describe a source file by its name, size, modification time and checksum, so that what has been built from
+    it can be rebuilt when it changes.
+
+    :param source: name of the source file
+    :type source: str
+
+    :return: description of the source
+    :rtype: dict
+    """
+    stat = os.stat(source)
+
+    return dict(source=os.path.abspath(source), size=stat.st_size, modified=stat.st_mtime,
+                checksum=file_checksum(source))
+
+
+def same_source(description, source):
+    """
+    Check whether a source file still has the described content. The checksum is computed only if the size or
+    the modification time of the file have changed.
+
+    :param description: description of the source, see describe_source
+    :type description: dict
+    :param source: name of the source file
+    :type source: str
+
+    :return: whether the content is the same
+    :rtype: bool
+    """
+    stat = os.stat(source)
+    if description['size'] != stat.st_size:
+        return False
+    if description['modified'] == stat.st_mtime:
+        return True
+
+    return description['checksum'] == file_checksum(source)
+
+
+def save_array(filename, array):
+    """
+    Save an array without pickling, first under a temporary name and then renamed.
+
+    :param filename: name of the file
+    :type filename: str
+    :param array: array to save
+    :type array: numpy.ndarray
+
+    :return: None
+    """
+    with open(filename + '.tmp', 'wb') as f:
+        np.save(f, array, allow_pickle=False)
+    os.replace(filename + '.tmp', filename)
+
+
+def pack_strings(strings):
+    """
+    Pack strings to null separated UTF-8 bytes.
+
+    :param strings: strings without null characters
+    :type strings: iterable
+
+    :return: the bytes
+    :rtype: numpy.ndarray
+    """
+    return np.frombuffer('\0'.join(strings).encode('utf-8'), dtype=np.uint8)
+
+
+def unpack_strings(blob, count):
+    """
+    Unpack strings packed with pack_strings.
+
+    :param blob: null separated UTF-8 bytes
+    :type blob: numpy.ndarray
+    :param count: number of strings, needed as no strings and a single empty string are packed the same
+    :type count: int
+
+    :return: the strings
+    :rtype: numpy.ndarray
+    """
+    strings = blob.tobytes().decode('utf-8').split('\0') if count > 0 else []
+
+    return np.array(strings, dtype=object)
+
+
+def encode_strings(values):
+    """
+    Dictionary encode strings.
+
+    :param values: strings, missing values allowed
+    :type values: pandas.Series
+
+    :return: 32 bit codes with -1 for the missing values, distinct strings as null separated UTF-8 bytes
+    :rtype: tuple(numpy.ndarray, numpy.ndarray)
+    """
+    codes, categories = pd.factorize(values)
+
+    return codes.astype(np.int32), pack_strings(categories)
+
+
+def decode_strings(codes, blob, categorical=False):
+    """
+    Decode dictionary encoded strings.
+
+    :param codes: 32 bit codes with -1 for the missing values
+    :type codes: numpy.ndarray
+    :param blob: distinct strings as null separated UTF-8 bytes
+    :type blob: numpy.ndarray
+    :param categorical: whether to return a categorical rather than strings
+    :type categorical: bool
+
+    :return: the strings, None or NaN for the missing values
+    :rtype: pandas.Categorical or numpy.ndarray
+    """
+    categories = unpack_strings(blob, codes.max() + 1 if len(codes) > 0 else 0)
+
+    if categorical:
+        return pd.Categorical.from_codes(codes, categories=categories)
+
+    strings = categories.take(codes, mode='clip') if len(categories) > 0 else np.empty(len(codes), dtype=object)
+    strings[codes < 0] = np.nan
+
+    return strings
+
+
+class AddressBaseCache:
+    """
+    Stores the processed AddressBase in a binary columnar format and loads it back.
+    """
+
+    def __init__(self, directory):
+        """
+        Class constructor.
+
+        :param directory: cache directory, created when the cache is built
+        :type directory: str
+        """
+        self.directory = directory
+        self.manifest_file = os.path.join(directory, MANIFEST_FILE)
+
+    def _column_file(self, column, part):
+        """
+        Name of the file holding a part of a column.
+
+        :param column: name of the column
+        :type column: str
+        :param part: values, codes or strings
+        :type part: str
+
+        :return: name of the file
+        :rtype: str
+        """
+        return os.path.join(self.directory, '{}.{}.npy'.format(column, part))
+
+    def manifest(self):
+        """
+        Read the manifest of the cache.
+
+        :return: description of the source and the columns, or None if the cache has not been built
+        :rtype: dict or None
+        """
+        if not os.path.isfile(self.manifest_file):
+            return None
+
+        with open(self.manifest_file) as f:
+            return json.load(f)
+
+    def is_current(self, source):
+        """
+        Check whether the cache has been built from the current content of the source file. The checksum is
+        computed only if the size or the modification time of the source file have changed.
+
+        :param source: name of the source file
+        :type source: str
+
+        :return: whether the cache can be loaded
+        :rtype: bool
+        """
+        manifest = self.manifest()
+        if manifest is None or manifest.get('version') != CACHE_VERSION:
+            return False
+
+        return same_source(manifest, source)
+
+    def build(self, source, data):
+        """
+        Store the processed AddressBase and describe the source file it was built from.
+
+        :param source: name of the source file
+        :type source: str
+        :param data: processed AddressBase
+        :type data: pandas.DataFrame
+
+        :return: the manifest of the cache
+        :rtype: dict
+        """
+        os.makedirs(self.directory, exist_ok=True)
+
+        # the old cache is invalid until the new manifest has been written
+        if os.path.isfile(self.manifest_file):
+            os.remove(self.manifest_file)
+
+        manifest = describe_source(source)
+        manifest.update(version=CACHE_VERSION, rows=len(data.index), index=data.index.name, columns={})
+
+        columns = [(INDEX_NAME, data.index.to_series())] + [(column, data[column]) for column in data.columns]
+        for column, values in columns:
+            # the numbers of a numpy type, other types e.g. categoricals are stored as strings
+            if isinstance(values.dtype, np.dtype) and pd.api.types.is_numeric_dtype(values):
+                save_array(self._column_file(column, 'values'), values.values)
+                manifest['columns'][column] = 'number'
+            else:
+                codes, blob = encode_strings(values)
+                save_array(self._column_file(column, 'codes'), codes)
+                save_array(self._column_file(column, 'strings'), blob)
+                manifest['columns'][column] = 'string'
+
+        with open(self.manifest_file + '.tmp', 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(self.manifest_file + '.tmp', self.manifest_file)
+
+        return manifest
+
+    def load(self, columns=None, categorical=False):
+        """
+        Load the processed AddressBase.
+
+        :param columns: names of the columns to load, if None all the columns; those not in the cache are skipped
+        :type columns: iterable or None
+        :param categorical: whether to load the strings as categoricals
+        :type categorical: bool
+
+        :return: processed AddressBase with the index it was stored with
+        :rtype: pandas.DataFrame
+        """
+        manifest = self.manifest()
+        if manifest is None:
+            raise ValueError('No AddressBase cache in {}'.format(self.directory))
+
+        stored = [column for column in manifest['columns'] if column != INDEX_NAME]
+        columns = stored if columns is None else [column for column in columns if column in manifest['columns']]
+
+        data = {column: self._load_column(column, manifest['columns'][column], categorical)
+                for column in columns}
+        index = pd.Index(self._load_column(INDEX_NAME, 'number'), name=manifest['index'])
+
+        return pd.DataFrame(data, index=index, columns=columns)
+
+    def _load_column(self, column, kind, categorical=False):
+        """
+        Load a column of the cache.
+
+        :param column: name of the column
+        :type column: str
+        :param kind: number or string
+        :type kind: str
+        :param categorical: whether to load strings as a categorical
+        :type categorical: bool
+
+        :return: values of the column
+        :rtype: numpy.ndarray or pandas.Categorical
+        """
+        if kind == 'number':
+            return np.load(self._column_file(column, 'values'), allow_pickle=False)
+
+        codes = np.load(self._column_file(column, 'codes'), allow_pickle=False)
+        blob = np.load(self._column_file(column, 'strings'), allow_pickle=False)
+
+        return decode_strings(codes, blob, categorical=categorical)
@@ -41,8 +41,8 @@ Author
 Version
 -------
 
-:version: 0.92
-:date: 2-Mar-2017
+:version: 0.93
+:date: 17-Oct-2026
 """
 import datetime
 import os
@@ -57,6 +57,11 @@ import pandas.util.testing as pdt
 import recordlinkage as rl
 from Analytics.linking import addressParser
 from Analytics.linking import logger
+from Analytics.linking.addressBaseCache import AddressBaseCache, process_addressbase, read_addressbase
+from Analytics.linking.blockingIndex import BlockingIndexStore
+from Analytics.linking.comparisonCache import CachedComparison, ComparisonCache
+from Analytics.linking.comparisonEngine import ComparisonEngine
+from Analytics.linking.compactTypes import fill_dummy_numbers
 from tqdm import tqdm
 
 matplotlib.use('Agg')  # to prevent Tkinter crashing on cdhut-d03
@@ -67,6 +72,23 @@ pd.options.mode.chained_assignment = None
 
 __version__ = '0.92'
 
+# blocking modes: the columns of the addresses to be linked and of AddressBase that must match
+BLOCKING_MODES = {1: (['OrganisationName', 'Postcode'], ['ORGANISATION_NAME', 'POSTCODE']),
+                  2: (['OrganisationName', 'TownName', 'BuildingNumber'],
+                      ['ORGANISATION_NAME', 'POST_TOWN', 'BUILDING_NUMBER']),
+                  3: (['OrganisationName', 'TownName'], ['ORGANISATION_NAME', 'POST_TOWN']),
+                  4: (['Postcode', 'BuildingName'], ['POSTCODE', 'BUILDING_NAME']),
+                  5: (['Postcode', 'BuildingNumber'], ['POSTCODE', 'BUILDING_NUMBER']),
+                  6: (['Postcode', 'StreetName'], ['POSTCODE', 'THROUGHFARE']),
+                  7: (['Postcode', 'TownName'], ['POSTCODE', 'POST_TOWN']),
+                  8: (['Postcode'], ['POSTCODE']),
+                  9: (['BuildingName', 'StreetName'], ['BUILDING_NAME', 'THROUGHFARE']),
+                  10: (['BuildingNumber', 'StreetName'], ['BUILDING_NUMBER', 'THROUGHFARE']),
+                  11: (['StreetName', 'TownName'], ['THROUGHFARE', 'POST_TOWN'])}
+
+# blocking used for the other modes
+DEFAULT_BLOCKING = (['BuildingNumber', 'TownName'], ['BUILDING_NUMBER', 'POST_TOWN'])
+
 
 class AddressLinker:
     """
@@ -121,6 +143,30 @@ class AddressLinker:
             * :type store: bool
             * :param verbose: whether or not output information
             * :type verbose: bool
+            * :param compactTypes: whether to store the parsed addresses with compact column types
+            * :type compactTypes: bool
+            * :param ABcache: whether to load AddressBase from a binary columnar cache, built when missing or when
+                              the AddressBase file has changed
+            * :type ABcache: bool
+            * :param ABcachePath: location of the AddressBase cache, if None next to the AddressBase file
+            * :type ABcachePath: str or None
+            * :param ABcolumns: names of the AddressBase columns to load from the cache, if None all the columns
+            * :type ABcolumns: list or None
+            * :param blockingIndex: whether to find the pairs to compare with blocking indexes stored on disk, built
+                                    when first needed and when the AddressBase file has changed
+            * :type blockingIndex: bool
+            * :param blockingIndexPath: location of the blocking indexes, if None next to the AddressBase file
+            * :type blockingIndexPath: str or None
+            * :param comparisonEngine: experimental, whether to compare the pairs with the ComparisonEngine, which
+                                       computes each string similarity once, rather than with recordlinkage. It has
+                                       not been benchmarked on a real blocking pass, so it is off by default until
+                                       benchmarkLinking.py shows the same matches on the supported stack
+            * :type comparisonEngine: bool
+            * :param comparisonCache: whether to keep the comparison vectors of the pairs over the blocking modes,
+                                      so that a pair is compared again only for the comparisons a mode adds,
+                                      if None only when comparing with recordlinkage, as the ComparisonEngine
+                                      computes a comparison faster than the cache can look it up
+            * :type comparisonCache: bool or None
         """
         # set up and update settings - controls the flow
         self.settings = dict(inputPath='/Users/saminiemi/Projects/ONS/AddressIndex/data/',
@@ -136,7 +182,15 @@ class AddressLinker:
                              expandPostcode=True,
                              test=False,
                              store=True,
-                             verbose=False)
+                             verbose=False,
+                             compactTypes=False,
+                             ABcache=True,
+                             ABcachePath=None,
+                             ABcolumns=None,
+                             blockingIndex=True,
+                             blockingIndexPath=None,
+                             comparisonEngine=False,
+                             comparisonCache=None)
         self.settings.update(kwargs)
 
         # relative path when referring to data files
@@ -147,6 +201,8 @@ class AddressLinker:
         self.toLinkAddressData = pd.DataFrame()
         self.matches = pd.DataFrame()
         self.addressBase = pd.DataFrame()
+        self.blockingIndexes = None
+        self.comparisonCache = None
         self.matching_results = pd.DataFrame()
         self.matched_results = pd.DataFrame()
 
@@ -255,6 +311,9 @@ class AddressLinker:
         .. Note: this method assumes that all modifications have already been carried out. This method
                  allows the prototype to be run on the ONS utility node as the memory requirements are
                  reduced.
+
+        The processed AddressBase is stored in a binary columnar cache on the first run, and later runs load
+        only the columns needed for linking from the cache until the AddressBase file changes.
         """
         self.log.info('Reading in Modified Address Base Data...')
 
@@ -262,43 +321,25 @@ class AddressLinker:
             self.log.warning('Using Test Data...')
             self.settings['ABfilename'] = 'ABtest.csv'
 
-        # for comparison purposes cast the UPRN as float as int64 does not support missing values
-        self.addressBase = pd.read_csv(self.settings['ABpath'] + self.settings['ABfilename'],
-                                       dtype={'UPRN': np.float64, 'ORGANISATION_NAME': str,
-                                              'DEPARTMENT_NAME': str, 'SUB_BUILDING_NAME': str, 'BUILDING_NAME': str,
-                                              'BUILDING_NUMBER': str, 'THROUGHFARE': str,
-                                              'POST_TOWN': str, 'POSTCODE': str, 'PAO_TEXT': str,
-                                              'PAO_START_NUMBER': str, 'PAO_START_SUFFIX': str,
-                                              'PAO_END_SUFFIX': str, 'PAO_END_NUMBER': str, 'SAO_START_SUFFIX': str,
-                                              'SAO_TEXT': str, 'SAO_START_NUMBER': np.float64, 'LOCALITY': str,
-                                              'STREET_DESCRIPTOR': str, 'postcode_in': str, 'postcode_out': str,
-                                              'SAO_END_SUFFIX': str, 'SAO_END_NUMBER': np.float64})
-
-        # remove those with former in the sao_text
-        msk = self.addressBase['SAO_TEXT'].str.contains('FORMER', na=False, case=False)
-        self.addressBase = self.addressBase.loc[~msk]
+        source = self.settings['ABpath'] + self.settings['ABfilename']
 
-        self.addressBase['PAO_START_NUMBER'] = self.addressBase['PAO_START_NUMBER'].fillna('-12345')
-        self.addressBase['PAO_START_NUMBER'] = self.addressBase['PAO_START_NUMBER'].astype(np.int32)
+        if self.settings['ABcache']:
+            cache_directory = self.settings['ABcachePath'] or os.path.splitext(source)[0] + '_cache'
+            cache = AddressBaseCache(cache_directory)
 
-        self.addressBase['PAO_END_NUMBER'] = self.addressBase['PAO_END_NUMBER'].fillna('-12345')
-        self.addressBase['PAO_END_NUMBER'] = self.addressBase['PAO_END_NUMBER'].astype(np.int32)
+            if not cache.is_current(source):
+                self.log.info('Building AddressBase cache in {}...'.format(cache_directory))
+                cache.build(source, process_addressbase(read_addressbase(source)))
 
-        self.addressBase['SAO_START_NUMBER'] = self.addressBase['SAO_START_NUMBER'].fillna('-12345')
-        self.addressBase['SAO_START_NUMBER'] = self.addressBase['SAO_START_NUMBER'].astype(np.int32)
-
-        self.addressBase['SAO_END_NUMBER'] = self.addressBase['SAO_END_NUMBER'].fillna('-12345')
-        self.addressBase['SAO_END_NUMBER'] = self.addressBase['SAO_END_NUMBER'].astype(np.int32)
-
-        for dummies_columns in ('PAO_START_SUFFIX', 'PAO_END_SUFFIX', 'SAO_START_SUFFIX', 'SAO_END_SUFFIX', 'SAO_TEXT'):
-            # if field is empty add dummy - helps when comparing against None
-            msk = self.addressBase[dummies_columns].isnull()
-            self.addressBase.loc[msk, dummies_columns] = 'N/A'
+            self.addressBase = cache.load(columns=self.settings['ABcolumns'])
+        else:
+            self.addressBase = process_addressbase(read_addressbase(source))
 
         self.log.info('Using {} addresses from AddressBase for matching...'.format(len(self.addressBase.index)))
 
-        # set index name - needed later for merging / duplicate removal
-        self.addressBase.index.name = 'AddressBase_Index'
+        if self.settings['blockingIndex']:
+            self.blockingIndexes = BlockingIndexStore(
+                self.settings['blockingIndexPath'] or os.path.splitext(source)[0] + '_blocking', source)
 
     def link_all_addresses(self, blocking_modes=(1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11)):
         """
@@ -310,9 +351,19 @@ class AddressLinker:
         """
         self.log.info('Linking addresses against Address Base data...')
 
+        # compact nullable numbers are compared with the dummy value like the 32 bit integers
+        if self.settings['compactTypes']:
+            fill_dummy_numbers(self.toLinkAddressData, addressParser.NUMBER_COLUMNS)
+
         still_missing = self.toLinkAddressData
         all_new_matches = []
 
+        # the comparisons of the pairs are kept for the later blocking modes of this run
+        use_cache = self.settings['comparisonCache']
+        if use_cache is None:
+            use_cache = not self.settings['comparisonEngine']
+        self.comparisonCache = ComparisonCache() if use_cache else None
+
         # loop over the different blocking modes to find all matches
         for blocking_mode in tqdm(blocking_modes):
             if len(still_missing.index) > 0:
@@ -321,6 +372,12 @@ class AddressLinker:
             else:
                 continue  # using continue here because break does not allow tqdm to finish
 
+        if self.comparisonCache is not None:
+            self.log.info('The comparison cache saved {reused} of {total} comparisons...'.format(
+                total=self.comparisonCache.counts['reused'] + self.comparisonCache.counts['computed'],
+                **self.comparisonCache.counts))
+            self.comparisonCache = None
+
         # concatenate all the new matches to a single dataframe
         self.matches = pd.concat(all_new_matches)
 
@@ -342,55 +399,28 @@ class AddressLinker:
         :return: dataframe of matches, dataframe of non-matched addresses
         :rtype: list(pandas.DataFrame, pandas.DataFrame)
         """
-        # create pairs
-        pcl = rl.Pairs(addresses_to_be_linked, self.addressBase)
-
         # set blocking - no need to check all pairs, so speeds things up (albeit risks missing if not correctly spelled)
         # block on both postcode and house number, street name can have typos and therefore is not great for blocking
         self.log.info('Start matching with blocking mode {}'.format(blocking))
-        if blocking == 1:
-            pairs = pcl.block(left_on=['OrganisationName', 'Postcode'],
-                              right_on=['ORGANISATION_NAME', 'POSTCODE'])
-        elif blocking == 2:
-            pairs = pcl.block(left_on=['OrganisationName', 'TownName', 'BuildingNumber'],
-                              right_on=['ORGANISATION_NAME', 'POST_TOWN', 'BUILDING_NUMBER'])
-        elif blocking == 3:
-            pairs = pcl.block(left_on=['OrganisationName', 'TownName'],
-                              right_on=['ORGANISATION_NAME', 'POST_TOWN'])
-        elif blocking == 4:
-            pairs = pcl.block(left_on=['Postcode', 'BuildingName'],
-                              right_on=['POSTCODE', 'BUILDING_NAME'])
-        elif blocking == 5:
-            pairs = pcl.block(left_on=['Postcode', 'BuildingNumber'],
-                              right_on=['POSTCODE', 'BUILDING_NUMBER'])
-        elif blocking == 6:
-            pairs = pcl.block(left_on=['Postcode', 'StreetName'],
-                              right_on=['POSTCODE', 'THROUGHFARE'])
-        elif blocking == 7:
-            pairs = pcl.block(left_on=['Postcode', 'TownName'],
-                              right_on=['POSTCODE', 'POST_TOWN'])
-        elif blocking == 8:
-            pairs = pcl.block(left_on=['Postcode'],
-                              right_on=['POSTCODE'])
-        elif blocking == 9:
-            pairs = pcl.block(left_on=['BuildingName', 'StreetName'],
-                              right_on=['BUILDING_NAME', 'THROUGHFARE'])
-        elif blocking == 10:
-            pairs = pcl.block(left_on=['BuildingNumber', 'StreetName'],
-                              right_on=['BUILDING_NUMBER', 'THROUGHFARE'])
-        elif blocking == 11:
-            pairs = pcl.block(left_on=['StreetName', 'TownName'],
-                              right_on=['THROUGHFARE', 'POST_TOWN'])
+        left_on, right_on = BLOCKING_MODES.get(blocking, DEFAULT_BLOCKING)
+
+        # create pairs
+        if self.blockingIndexes is not None:
+            pairs = self.blockingIndexes.pairs(addresses_to_be_linked, left_on, self.addressBase, right_on)
         else:
-            pairs = pcl.block(left_on=['BuildingNumber', 'TownName'],
-                              right_on=['BUILDING_NUMBER', 'POST_TOWN'])
+            pairs = rl.Pairs(addresses_to_be_linked, self.addressBase).block(left_on=left_on, right_on=right_on)
 
         self.log.info(
             'Need to test {0} pairs for {1} addresses...'.format(len(pairs), len(addresses_to_be_linked.index)))
 
         # compare the two data sets
         # the idea is to build evidence to support linking, hence some fields are compared multiple times
-        compare = rl.Compare(pairs, self.addressBase, addresses_to_be_linked, batch=True)
+        compare_class = ComparisonEngine if self.settings['comparisonEngine'] else rl.Compare
+        if self.comparisonCache is not None:
+            compare = CachedComparison(self.comparisonCache, compare_class, pairs, self.addressBase,
+                                       addresses_to_be_linked)
+        else:
+            compare = compare_class(pairs, self.addressBase, addresses_to_be_linked, batch=True)
 
         # set rules for standard residential addresses
         compare.string('SAO_TEXT', 'SAOText', method='jarowinkler', name='flat_dl',
@@ -450,6 +480,12 @@ class AddressLinker:
 
         # execute the comparison model
         compare.run()
+        if self.settings['comparisonEngine']:
+            self.log.info('Computed {compared} distinct string similarities for {pairs} pairs...'.format(
+                **compare.counts))
+        if self.comparisonCache is not None:
+            self.log.info('Reused {reused} comparisons of the earlier blocking modes, computed {computed}...'.format(
+                **compare.counts))
 
         # remove those matches that are not close enough - requires e.g. street name to be close enough
         if blocking in (2, 3):
@@ -42,12 +42,11 @@ Author
 Version
 -------
 
-:version: 0.1
-:date: 24-Jan-2017
+:version: 0.2
+:date: 17-Oct-2026
 """
 import datetime
 import os
-import re
 import sqlite3
 import time
 import warnings
@@ -56,6 +55,12 @@ import pandas as pd
 import pandas.util.testing as pdt
 import recordlinkage as rl
 from Analytics.linking import logger
+from Analytics.linking.blockingIndex import BlockingIndexStore
+from Analytics.linking.comparisonCache import CachedComparison, ComparisonCache
+from Analytics.linking.comparisonEngine import ComparisonEngine
+from Analytics.linking.compactTypes import compact_types, fill_dummy_numbers, memory_footprint
+from Analytics.linking.londonLocalities import LondonLocalities
+from Analytics.linking.postcodes import PostcodeExtractor, format_postcodes, split_postcodes
 from ProbabilisticParser import parser
 from tqdm import tqdm
 import matplotlib
@@ -67,6 +72,23 @@ pd.options.mode.chained_assignment = None
 
 __version__ = '0.1'
 
+# low-cardinality components and the numbers padded with dummies, stored with compact types if compactTypes is set
+CATEGORICAL_COLUMNS = ['TownName', 'Locality', 'County', 'Postcode', 'postcode_in', 'postcode_out', 'BuildingSuffix']
+NUMBER_COLUMNS = ['FlatNumber', 'BuildingStartNumber']
+
+# blocking modes: the columns of the addresses to be linked and of the NLP index that must match
+BLOCKING_MODES = {1: (['Postcode', 'BuildingName'], ['POSTCODE_LOCATOR', 'PAO_TEXT']),
+                  2: (['Postcode', 'BuildingNumber'], ['POSTCODE_LOCATOR', 'PAO_NUMBER']),
+                  3: (['Postcode', 'StreetName'], ['POSTCODE_LOCATOR', 'STREET_DESCRIPTOR']),
+                  4: (['Postcode', 'TownName'], ['POSTCODE_LOCATOR', 'TOWN_NAME']),
+                  5: (['Postcode'], ['POSTCODE_LOCATOR']),
+                  6: (['BuildingName', 'StreetName'], ['PAO_TEXT', 'STREET_DESCRIPTOR']),
+                  7: (['BuildingNumber', 'StreetName'], ['PAO_START_NUMBER', 'STREET_DESCRIPTOR']),
+                  8: (['StreetName', 'TownName'], ['STREET_DESCRIPTOR', 'TOWN_NAME'])}
+
+# blocking used for the other modes
+DEFAULT_BLOCKING = (['BuildingNumber', 'TownName'], ['PAO_START_NUMBER', 'TOWN_NAME'])
+
 
 class AddressLinkerNLPindex:
     """
@@ -113,12 +135,41 @@ class AddressLinkerNLPindex:
             * :type expandSynonyms: bool
             * :param expandPostcode: whether to expand a postcode to in and out codes or not
             * :type expandPostcode: bool
+            * :param validatePostcodes: whether to use only those postcodes found with a regular expression
+                                        that have a known outcode
+            * :type validatePostcodes: bool
+            * :param validateAddressBasePostcodes: whether to also require that the postcodes found with a regular
+                                                   expression are in the NLP index
+            * :type validateAddressBasePostcodes: bool
             * :param test: whether or not to use test data
             * :type test: bool
             * :param store: whether or not to store the results to a database table
             * :type store: bool
             * :param verbose: whether or not output information
             * :type verbose: bool
+            * :param parserWorkers: number of processes used to parse the addresses, defaults to 1, if None the
+                                    number of CPUs
+            * :type parserWorkers: int or None
+            * :param parsingScore: whether to add the sequence probability of each parse as parsing_score, from the
+                                   same tagging pass as the components
+            * :type parsingScore: bool
+            * :param compactTypes: whether to store the parsed addresses with compact column types
+            * :type compactTypes: bool
+            * :param blockingIndex: whether to find the pairs to compare with blocking indexes stored on disk, built
+                                    when first needed and when the NLP index file has changed
+            * :type blockingIndex: bool
+            * :param blockingIndexPath: location of the blocking indexes, if None next to the NLP index file
+            * :type blockingIndexPath: str or None
+            * :param comparisonEngine: experimental, whether to compare the pairs with the ComparisonEngine, which
+                                       computes each string similarity once, rather than with recordlinkage. It has
+                                       not been benchmarked on a real blocking pass, so it is off by default until
+                                       benchmarkLinking.py shows the same matches on the supported stack
+            * :type comparisonEngine: bool
+            * :param comparisonCache: whether to keep the comparison vectors of the pairs over the blocking modes,
+                                      so that a pair is compared again only for the comparisons a mode adds,
+                                      if None only when comparing with recordlinkage, as the ComparisonEngine
+                                      computes a comparison faster than the cache can look it up
+            * :type comparisonCache: bool or None
         """
         # set up and update settings - controls the flow
         self.settings = dict(inputPath='/Users/saminiemi/Projects/ONS/AddressIndex/data/',
@@ -132,19 +183,33 @@ class AddressLinkerNLPindex:
                              dropColumns=True,
                              expandSynonyms=True,
                              expandPostcode=True,
+                             validatePostcodes=True,
+                             validateAddressBasePostcodes=False,
                              test=False,
                              store=True,
-                             verbose=False)
+                             verbose=False,
+                             parserWorkers=1,
+                             parsingScore=False,
+                             compactTypes=False,
+                             blockingIndex=True,
+                             blockingIndexPath=None,
+                             comparisonEngine=False,
+                             comparisonCache=None)
         self.settings.update(kwargs)
 
         # relative path when referring to data files
         self.currentDirectory = os.path.dirname(__file__)  # for relative path definitions
 
+        # London localities that are moved from the street name to the locality
+        self.londonLocalities = LondonLocalities.from_file(os.path.join(self.currentDirectory, '../../data/'))
+
         # define data containers within the object, should be instantiated in __init__
         self.nExistingUPRN = 0
         self.toLinkAddressData = pd.DataFrame()
         self.matches = pd.DataFrame()
         self.addressBase = pd.DataFrame()
+        self.blockingIndexes = None
+        self.comparisonCache = None
         self.matching_results = pd.DataFrame()
         self.matched_results = pd.DataFrame()
 
@@ -295,44 +360,16 @@ class AddressLinkerNLPindex:
         # set index name - needed later for merging / duplicate removal
         self.addressBase.index.name = 'AddressBase_Index'
 
+        if self.settings['blockingIndex']:
+            source = self.settings['ABpath'] + self.settings['ABfilename']
+            self.blockingIndexes = BlockingIndexStore(
+                self.settings['blockingIndexPath'] or os.path.splitext(source)[0] + '_blocking', source)
+
         if self.settings['verbose']:
             print('AddressBase:')
             print(self.addressBase.info(verbose=True, memory_usage=True, null_counts=True))
             self.addressBase.to_csv(self.settings['ABpath'] + 'NLP_processed.csv')
 
-    @staticmethod
-    def _extract_postcode(string):
-        """
-        A static private method to extract a postcode from address string.
-
-        Uses a rather loose regular expression, so  may get some strings that are not completely valid postcodes.
-        Should not be used to validate whether a postcode conforms to the UK postcode standards.
-
-        The regular expression was taken from:
-        http://stackoverflow.com/questions/164979/uk-postcode-regex-comprehensive
-
-        :param string: string to be parsed
-        :type string: str
-
-        :return: postcode
-        :rtype: str
-        """
-        regx = r'(([gG][iI][rR] {0,}0[aA]{2})|((([a-pr-uwyzA-PR-UWYZ][a-hk-yA-HK-Y]?[0-9][0-9]?)|(([a-pr-uwyzA-PR-UWYZ][0-9][a-hjkstuwA-HJKSTUW])|([a-pr-uwyzA-PR-UWYZ][a-hk-yA-HK-Y][0-9][abehmnprv-yABEHMNPRV-Y]))) {0,}[0-9][abd-hjlnp-uw-zABD-HJLNP-UW-Z]{2}))'
-        try:
-            potential_postcode = re.findall(regx, string)[0][0]
-            potential_postcode = potential_postcode.lower().strip()
-        except IndexError:
-            potential_postcode = None
-
-        # above regex gives also those without space between, add if needed
-        if potential_postcode is not None:
-            if ' ' not in potential_postcode:
-                inc = potential_postcode[-3:]
-                out = potential_postcode.replace(inc, '')
-                potential_postcode = out + ' ' + inc
-
-        return potential_postcode
-
     def _normalize_input_data(self):
         """
         A private method to normalize address information.
@@ -395,33 +432,20 @@ class AddressLinkerNLPindex:
                                                                                                         addRegex, '',
                                                                                                         case=False)
 
-    @staticmethod
-    def _fix_london_boroughs(parsed, directory, datafile='localities.csv'):
+    def _fix_london_boroughs(self, parsed):
         """
-        A static private method to address incorrectly parsed London boroughs.
+        A private method to address incorrectly parsed London boroughs.
 
         If the street name contains London borough then move it to locality and remove from the street name.
+        The London localities are read from a file with a column locality when the instance is created.
 
         :param parsed: a dictionary containing the address tokens that have been parsed
         :type parsed: dict
-        :param directory: location of the data file
-        :type directory: str
-        :param datafile: name of the data file containing a column locality
-        :type datafile: str
 
         :return: a dictionary containing the address tokens with updated information
         :rtype: dict
         """
-        london_localities = pd.read_csv(directory + datafile)['locality']
-
-        for LondonLocality in london_localities:
-            if parsed['StreetName'].strip().endswith(LondonLocality):
-                parsed['Locality'] = LondonLocality
-                # take the last part out, so that e.g. CHINGFORD AVENUE CHINGFORD is correctly processed
-                # need to be careful with e.g.  WESTERN GATEWAY ROYAL VICTORIA DOCK (3 parts to remove)
-                parsed['StreetName'] = parsed['StreetName'].strip()[:-len(LondonLocality)].strip()
-
-        return parsed
+        return self.londonLocalities.fix(parsed)
 
     def parse_input_addresses_to_tokens(self):
         """
@@ -435,9 +459,10 @@ class AddressLinkerNLPindex:
         # normalise data so that the parser has the best possible chance of getting things right
         self._normalize_input_data()
 
-        # get addresses and store separately as an vector
-        addresses = self.toLinkAddressData['ADDRESS_norm'].values
-        self.log.info('{} addresses to parse...'.format(len(addresses)))
+        # the same address often appears many times e.g. care homes, parse each normalised address only once
+        codes, addresses = pd.factorize(self.toLinkAddressData['ADDRESS_norm'])
+        self.log.info('{} addresses to parse, {} unique, deduplication ratio {:.2f}...'
+                      .format(len(codes), len(addresses), len(codes) / max(len(addresses), 1)))
 
         # temp data storage lists
         organisation = []
@@ -454,37 +479,36 @@ class AddressLinkerNLPindex:
         town = []
         postcode = []
 
-        # loop over addresses - quite inefficient, should avoid a loop
-        for address in tqdm(addresses):
-            parsed = parser.tag(address.upper())  # probabilistic parser
-            possible_postcode = self._extract_postcode(address)  # regular expression extraction
-
-            # if both parsers found postcode then check that they are the same
-            if parsed.get('Postcode', None) is not None and possible_postcode is not None:
-                if parsed['Postcode'] != possible_postcode:
-                    # not the same, use possible_postcode
-                    parsed['Postcode'] = possible_postcode
-
-            # if the probabilistic parser did not find postcode but regular expression did, then use that
-            if parsed.get('Postcode', None) is None and possible_postcode is not None:
-                parsed['Postcode'] = possible_postcode
-
-            if parsed.get('Postcode', None) is not None:
-                # check that there is space, if not then add if the parsed postcode is long enough to contain a complete
-                # postcode. Some users have partial postcodes to which one should not add a space.
-                if ' ' not in parsed['Postcode'] and len(parsed['Postcode']) > 4:
-                    in_code = parsed['Postcode'][-3:]
-                    out_code = parsed['Postcode'].replace(in_code, '')
-                    parsed['Postcode'] = out_code + ' ' + in_code
-
-                # change to all capitals
-                parsed['Postcode'] = parsed['Postcode'].upper()
+        # probabilistic parser, in parallel over all the worker processes
+        parsing_scores = None
+        if self.settings['parsingScore']:
+            # the components and the probabilities from a single tagging pass, e.g. for the confidence features
+            parsed_batch = parser.parse_arrays([address.upper() for address in addresses],
+                                               workers=self.settings['parserWorkers'])
+            parsed_addresses = [parsed_batch.tag(i) for i in range(len(parsed_batch))]
+            parsing_scores = parsed_batch.sequence_probabilities
+        else:
+            parsed_addresses = parser.tag_batch([address.upper() for address in addresses],
+                                                workers=self.settings['parserWorkers'])
+
+        # regular expression extraction of the postcodes, validated against the known outcodes and optionally
+        # against the postcodes of the NLP index
+        if self.settings['validatePostcodes']:
+            postcodes = None
+            if self.settings['validateAddressBasePostcodes']:
+                postcodes = self.addressBase['POSTCODE_LOCATOR'].dropna().unique()
+            postcode_extractor = PostcodeExtractor.from_lookups(postcodes=postcodes)
+        else:
+            postcode_extractor = PostcodeExtractor()
+        possible_postcodes = postcode_extractor.extract(pd.Series(addresses))
 
+        # loop over addresses - quite inefficient, should avoid a loop
+        for parsed in tqdm(parsed_addresses):
             # if Hackney etc. in StreetName then remove and move to locality if town name contains London
             # Probabilistic parser should see more cases with london localities, parsed incorrectly at the mo
             if parsed.get('StreetName', None) is not None and parsed.get('TownName', None) is not None:
                 if 'LONDON' in parsed['TownName']:
-                    parsed = self._fix_london_boroughs(parsed, os.path.join(self.currentDirectory, '../../data/'))
+                    parsed = self._fix_london_boroughs(parsed)
 
             # if delivery point address is e.g. "5 BEST HOUSE", then the "5" refers likely to FLAT 5
             if parsed.get('BuildingNumber', None) is None and parsed.get('BuildingName', None) is not None:
@@ -550,27 +574,36 @@ class AddressLinkerNLPindex:
             pao_end_number.append(parsed.get('pao_end_number', None))
             flat_number.append(parsed.get('FlatNumber', None))
 
+        # if the regular expression found a postcode then use that, otherwise use the one found by the probabilistic
+        # parser, if any, in capitals and with a space between the in and out codes
+        postcode = possible_postcodes['Postcode'].fillna(format_postcodes(pd.Series(postcode))).values
+
+        def broadcast(values):
+            # map the parsed unique addresses back to the rows, a missing address has the code -1 i.e. the None
+            return np.append(np.asarray(values, dtype=object), None).take(codes)
+
         # add the parsed information to the dataframe
-        self.toLinkAddressData['OrganisationName'] = organisation
-        self.toLinkAddressData['DepartmentName'] = department
-        self.toLinkAddressData['SubBuildingName'] = sub_building
-        self.toLinkAddressData['BuildingName'] = building_name
-        self.toLinkAddressData['BuildingNumber'] = building_number
-        self.toLinkAddressData['StreetName'] = street
-        self.toLinkAddressData['Locality'] = locality
-        self.toLinkAddressData['TownName'] = town
-        self.toLinkAddressData['Postcode'] = postcode
-        self.toLinkAddressData['BuildingSuffix'] = building_suffix
-        self.toLinkAddressData['BuildingStartNumber'] = pao_start_number
-        self.toLinkAddressData['BuildingEndNumber'] = pao_end_number
-        self.toLinkAddressData['FlatNumber'] = flat_number
+        self.toLinkAddressData['OrganisationName'] = broadcast(organisation)
+        self.toLinkAddressData['DepartmentName'] = broadcast(department)
+        self.toLinkAddressData['SubBuildingName'] = broadcast(sub_building)
+        self.toLinkAddressData['BuildingName'] = broadcast(building_name)
+        self.toLinkAddressData['BuildingNumber'] = broadcast(building_number)
+        self.toLinkAddressData['StreetName'] = broadcast(street)
+        self.toLinkAddressData['Locality'] = broadcast(locality)
+        self.toLinkAddressData['TownName'] = broadcast(town)
+        self.toLinkAddressData['Postcode'] = broadcast(postcode)
+        self.toLinkAddressData['BuildingSuffix'] = broadcast(building_suffix)
+        self.toLinkAddressData['BuildingStartNumber'] = broadcast(pao_start_number)
+        self.toLinkAddressData['BuildingEndNumber'] = broadcast(pao_end_number)
+        self.toLinkAddressData['FlatNumber'] = broadcast(flat_number)
+        if parsing_scores is not None:
+            self.toLinkAddressData['parsing_score'] = np.append(parsing_scores, np.nan).take(codes)
 
         if self.settings['expandPostcode']:
             # if valid postcode information found then split between in and outcode
             if self.toLinkAddressData['Postcode'].count() > 0:
-                postcodes = self.toLinkAddressData['Postcode'].str.split(' ', expand=True)
-                postcodes.rename(columns={0: 'postcode_in', 1: 'postcode_out'}, inplace=True)
-                self.toLinkAddressData = pd.concat([self.toLinkAddressData, postcodes], axis=1)
+                self.toLinkAddressData = pd.concat([self.toLinkAddressData,
+                                                    split_postcodes(self.toLinkAddressData['Postcode'])], axis=1)
             else:
                 self.toLinkAddressData['postcode_in'] = None
                 self.toLinkAddressData['postcode_out'] = None
@@ -674,6 +707,14 @@ class AddressLinkerNLPindex:
         # drop the temp info
         self.toLinkAddressData.drop(['ADDRESS_norm', ], axis=1, inplace=True)
 
+        if self.settings['compactTypes']:
+            before = memory_footprint(self.toLinkAddressData)
+            self.toLinkAddressData = compact_types(self.toLinkAddressData, categorical_columns=CATEGORICAL_COLUMNS,
+                                                   number_columns=NUMBER_COLUMNS)
+            self.log.info('Memory footprint of {} parsed addresses reduced from {:.1f} MB to {:.1f} MB'.format(
+                len(self.toLinkAddressData.index), before / 1024. ** 2,
+                memory_footprint(self.toLinkAddressData) / 1024. ** 2))
+
         if self.settings['verbose']:
             print('Parsed:')
             print(self.toLinkAddressData.info(verbose=True, memory_usage=True, null_counts=True))
@@ -688,9 +729,19 @@ class AddressLinkerNLPindex:
         """
         self.log.info('Linking addresses against Address Base data...')
 
+        # compact nullable numbers are compared with the dummy value like the 32 bit integers
+        if self.settings['compactTypes']:
+            fill_dummy_numbers(self.toLinkAddressData, NUMBER_COLUMNS)
+
         still_missing = self.toLinkAddressData
         all_new_matches = []
 
+        # the comparisons of the pairs are kept for the later blocking modes of this run
+        use_cache = self.settings['comparisonCache']
+        if use_cache is None:
+            use_cache = not self.settings['comparisonEngine']
+        self.comparisonCache = ComparisonCache() if use_cache else None
+
         # loop over the different blocking modes to find all matches
         for blocking_mode in tqdm(blocking_modes):
             if len(still_missing.index) > 0:
@@ -699,6 +750,12 @@ class AddressLinkerNLPindex:
             else:
                 continue  # using continue here because break does not allow tqdm to finish
 
+        if self.comparisonCache is not None:
+            self.log.info('The comparison cache saved {reused} of {total} comparisons...'.format(
+                total=self.comparisonCache.counts['reused'] + self.comparisonCache.counts['computed'],
+                **self.comparisonCache.counts))
+            self.comparisonCache = None
+
         # concatenate all the new matches to a single dataframe
         self.matches = pd.concat(all_new_matches)
 
@@ -720,46 +777,28 @@ class AddressLinkerNLPindex:
         :return: dataframe of matches, dataframe of non-matched addresses
         :rtype: list(pandas.DataFrame, pandas.DataFrame)
         """
-        # create pairs
-        pcl = rl.Pairs(addresses_to_be_linked, self.addressBase)
-
         # set blocking - no need to check all pairs, so speeds things up (albeit risks missing if not correctly spelled)
         # block on both postcode and house number, street name can have typos and therefore is not great for blocking
         self.log.info('Start matching with blocking mode {}'.format(blocking))
-        if blocking == 1:
-            pairs = pcl.block(left_on=['Postcode', 'BuildingName'],
-                              right_on=['POSTCODE_LOCATOR', 'PAO_TEXT'])
-        elif blocking == 2:
-            pairs = pcl.block(left_on=['Postcode', 'BuildingNumber'],
-                              right_on=['POSTCODE_LOCATOR', 'PAO_NUMBER'])
-        elif blocking == 3:
-            pairs = pcl.block(left_on=['Postcode', 'StreetName'],
-                              right_on=['POSTCODE_LOCATOR', 'STREET_DESCRIPTOR'])
-        elif blocking == 4:
-            pairs = pcl.block(left_on=['Postcode', 'TownName'],
-                              right_on=['POSTCODE_LOCATOR', 'TOWN_NAME'])
-        elif blocking == 5:
-            pairs = pcl.block(left_on=['Postcode'],
-                              right_on=['POSTCODE_LOCATOR'])
-        elif blocking == 6:
-            pairs = pcl.block(left_on=['BuildingName', 'StreetName'],
-                              right_on=['PAO_TEXT', 'STREET_DESCRIPTOR'])
-        elif blocking == 7:
-            pairs = pcl.block(left_on=['BuildingNumber', 'StreetName'],
-                              right_on=['PAO_START_NUMBER', 'STREET_DESCRIPTOR'])
-        elif blocking == 8:
-            pairs = pcl.block(left_on=['StreetName', 'TownName'],
-                              right_on=['STREET_DESCRIPTOR', 'TOWN_NAME'])
+        left_on, right_on = BLOCKING_MODES.get(blocking, DEFAULT_BLOCKING)
+
+        # create pairs
+        if self.blockingIndexes is not None:
+            pairs = self.blockingIndexes.pairs(addresses_to_be_linked, left_on, self.addressBase, right_on)
         else:
-            pairs = pcl.block(left_on=['BuildingNumber', 'TownName'],
-                              right_on=['PAO_START_NUMBER', 'TOWN_NAME'])
+            pairs = rl.Pairs(addresses_to_be_linked, self.addressBase).block(left_on=left_on, right_on=right_on)
 
         self.log.info(
             'Need to test {0} pairs for {1} addresses...'.format(len(pairs), len(addresses_to_be_linked.index)))
 
         # compare the two data sets
         # the idea is to build evidence to support linking, hence some fields are compared multiple times
-        compare = rl.Compare(pairs, self.addressBase, addresses_to_be_linked, batch=True)
+        compare_class = ComparisonEngine if self.settings['comparisonEngine'] else rl.Compare
+        if self.comparisonCache is not None:
+            compare = CachedComparison(self.comparisonCache, compare_class, pairs, self.addressBase,
+                                       addresses_to_be_linked)
+        else:
+            compare = compare_class(pairs, self.addressBase, addresses_to_be_linked, batch=True)
 
         # set rules for standard residential addresses
         compare.string('SAO_TEXT', 'SubBuildingName', method='jarowinkler', name='flatw_dl',
@@ -794,6 +833,12 @@ class AddressLinkerNLPindex:
 
         # execute the comparison model
         compare.run()
+        if self.settings['comparisonEngine']:
+            self.log.info('Computed {compared} distinct string similarities for {pairs} pairs...'.format(
+                **compare.counts))
+        if self.comparisonCache is not None:
+            self.log.info('Reused {reused} comparisons of the earlier blocking modes, computed {computed}...'.format(
+                **compare.counts))
 
         # remove those matches that are not close enough - requires e.g. street name to be close enough
         if blocking in (1, 2, 4):
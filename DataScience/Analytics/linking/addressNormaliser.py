@@ -0,0 +1,280 @@
+"""
+ONS Address Index - Address Normaliser
+======================================
+
+This file contains an Address Normaliser class that normalises address strings before they are parsed:
+removes commas and backslashes and whitespaces around numerical ranges, expands synonyms, and removes
+counties while recording the county that was found.
+
+The rules are read from the data files and compiled once when the normaliser is created, and applied to
+one string at a time. The output is exactly the same as applying each rule in turn to the whole address
+column with pandas string methods, as the original implementation in _normalise_reference does. In
+particular the synonyms are expanded in the order of the data file, so that a later synonym can match the
+expansion of an earlier one, and each county is removed in the order of the data file, the last county
+found being recorded.
+
+Most addresses do not contain a county, hence a single pattern of all the counties, nested as a trie, is first used
+to find the addresses that contain any county. Only for those are the counties removed one by one, and
+only the counties whose name appears in the address are tried.
+
+
+Requirements
+------------
+
+:requires: pandas (tested with 0.19.2, only for reading the data files)
+:requires: ProbabilisticParser
+
+
+Version
+-------
+
+:version: 0.2
+:date: 17-Oct-2026
+"""
+import os
+import re
+
+from ProbabilisticParser.common.counties import trie_pattern
+
+# use this for the counties so that e.g. ESSEX ROAD does not become just ROAD...
+# todo: the regex is getting ridiculous, maybe do other way around i.e. country must be followed by postcode or
+#       be the last component.
+COUNTY_SUFFIX = r'(?:\s|$)(?!ROAD|LANE|STREET|CLOSE|DRIVE|AVENUE|SQUARE|COURT|PARK|CRESCENT|WAY|WALK|HEOL|FFORDD|' \
+                r'HILL|GARDENS|GATE|GROVE|HOUSE|VIEW|BUILDING|VILLAS|LODGE|PLACE|ROW|WHARF|RISE|TERRACE|CROSS|' \
+                r'ENTERPRISE|HATCH|&)'
+
+
+def _is_literal(pattern):
+    """
+    Check whether a regular expression only matches the pattern string itself.
+
+    :param pattern: regular expression
+    :type pattern: str
+
+    :return: True if the pattern does not contain any special characters
+    :rtype: bool
+    """
+    return re.search(r'[.^$*+?{}\[\]\\|()]', pattern) is None
+
+
+class AddressNormaliser:
+    """
+    Normalises address strings using rules that are compiled once.
+    """
+
+    def __init__(self, synonyms, counties):
+        """
+        Class constructor.
+
+        :param synonyms: (from, to) pairs, the from strings are replaced anywhere in the address in this order
+        :type synonyms: list
+        :param counties: counties to remove in this order
+        :type counties: list
+        """
+        self.synonyms = [(fro, to) for fro, to in synonyms]
+        self.counties = list(counties)
+
+        # remove spaces around hyphens as this causes ranges to be interpreted incorrectly
+        # e.g. FLAT 15 191 - 193 NEWPORT ROAD CARDIFF CF24 1AJ is parsed incorrectly if there
+        # is space around the hyphen; number TO number and number/number are ranges as well
+        self._hyphen_range = re.compile(r'(\d+)(\s*-\s*)(\d+)', re.IGNORECASE)
+        self._to_range = re.compile(r'(\d+)(\s*TO\s*)(\d+)', re.IGNORECASE)
+        self._slash_range = re.compile(r'(\d+)(\s*/\s*)(\d+)', re.IGNORECASE)
+        self._suffix_range = re.compile(r'(\d+[a-z])(\s*-\s*)(\d+[a-z])', re.IGNORECASE)
+
+        # the synonyms were replaced as regular expressions, this is only the same as replacing the strings
+        # if they do not contain any special characters
+        self._literal_synonyms = all(_is_literal(fro) and '\\' not in to for fro, to in self.synonyms)
+        self._synonym_patterns = [(re.compile(fro), to) for fro, to in self.synonyms]
+
+        # the county is recorded with a case sensitive match but removed with a case insensitive one
+        self._county_records = [re.compile(county + COUNTY_SUFFIX) for county in self.counties]
+        self._county_removals = [re.compile(county + COUNTY_SUFFIX, re.IGNORECASE) for county in self.counties]
+        # all the counties in a single regular expression, nested as a trie if they are plain strings
+        if all(_is_literal(county) for county in self.counties):
+            any_county = '(?:' + trie_pattern(self.counties) + ')'
+        else:
+            any_county = '(?:' + '|'.join(self.counties) + ')'
+        self._any_county = re.compile(any_county + COUNTY_SUFFIX, re.IGNORECASE) if self.counties else None
+
+        # the name of a county is the text it matches, unless the name contains special characters
+        self._county_names = [county.upper() if _is_literal(county) else None for county in self.counties]
+
+    @classmethod
+    def from_files(cls, directory, synonyms_file='synonyms.csv', counties_file='counties.csv'):
+        """
+        Create a normaliser from the synonyms and the counties data files.
+
+        :param directory: location of the data files
+        :type directory: str
+        :param synonyms_file: name of the data file with columns from and to
+        :type synonyms_file: str
+        :param counties_file: name of the data file with a column county
+        :type counties_file: str
+
+        :return: the normaliser
+        :rtype: AddressNormaliser
+        """
+        import pandas as pd
+
+        synonyms = pd.read_csv(os.path.join(directory, synonyms_file)).values
+        counties = pd.read_csv(os.path.join(directory, counties_file))['county']
+
+        return cls(synonyms, counties)
+
+    def _normalise_ranges(self, address):
+        """
+        Remove the whitespaces and other separators in numerical ranges. Each regular expression is only
+        run if the address contains its separator.
+
+        :param address: stripped address without commas
+        :type address: str
+
+        :return: address with normalised ranges
+        :rtype: str
+        """
+        if '-' in address:
+            address = self._hyphen_range.sub(r'\1-\3', address)
+        if 'TO' in address.upper():
+            address = self._to_range.sub(r'\1-\3', address)
+        if '/' in address:
+            address = self._slash_range.sub(r'\1-\3', address)
+        if '-' in address:
+            address = self._suffix_range.sub(r'\1-\3', address)
+
+        return address
+
+    def _expand_synonyms(self, address):
+        """
+        Replace the synonyms in the order they were given.
+
+        :param address: address string
+        :type address: str
+
+        :return: address with the synonyms expanded
+        :rtype: str
+        """
+        if self._literal_synonyms:
+            for fro, to in self.synonyms:
+                if fro in address:
+                    address = address.replace(fro, to)
+        else:
+            for pattern, to in self._synonym_patterns:
+                address = pattern.sub(to, address)
+
+        return address
+
+    def _remove_counties(self, address):
+        """
+        Remove the counties in the order they were given and record the last county found.
+
+        :param address: address string
+        :type address: str
+
+        :return: address without counties and the county or None
+        :rtype: tuple
+        """
+        if self._any_county is None or self._any_county.search(address) is None:
+            return address, None
+
+        # for ASCII strings a county can only match if its name appears in the upper case address, a string is
+        # ASCII if its UTF-8 encoding has a byte per character (str.isascii needs Python 3.7)
+        ascii_only = len(address.encode('utf-8')) == len(address)
+        upper = address.upper()
+        found = None
+        for name, record, removal, county in zip(self._county_names, self._county_records, self._county_removals,
+                                                 self.counties):
+            if ascii_only and name is not None and name not in upper:
+                continue
+            if removal.search(address) is None:
+                continue
+
+            if record.search(address) is not None:
+                found = county
+            address = removal.sub('', address)
+            upper = address.upper()
+
+        return address, found
+
+    def normalise(self, address, expand_synonyms=True):
+        """
+        Normalise a single address.
+
+        :param address: address string, any other value gives NaN as with the pandas string methods
+        :type address: str
+        :param expand_synonyms: whether to expand the synonyms
+        :type expand_synonyms: bool
+
+        :return: normalised address and the county that was removed or None
+        :rtype: tuple
+        """
+        if not isinstance(address, str):
+            return float('nan'), None
+
+        # remove white spaces from the end and beginning, commas, and backslashes
+        address = address.strip().replace(', ', ' ').replace(',', ' ').replace('\\', ' ')
+
+        address = self._normalise_ranges(address)
+
+        if expand_synonyms:
+            address = self._expand_synonyms(address)
+
+        return self._remove_counties(address)
+
+    def normalise_many(self, addresses, expand_synonyms=True):
+        """
+        Normalise a batch of addresses.
+
+        :param addresses: address strings
+        :type addresses: iterable
+        :param expand_synonyms: whether to expand the synonyms
+        :type expand_synonyms: bool
+
+        :return: normalised addresses and the counties, in the input order
+        :rtype: tuple
+        """
+        normalised = []
+        counties = []
+        for address in addresses:
+            address, county = self.normalise(address, expand_synonyms=expand_synonyms)
+            normalised.append(address)
+            counties.append(county)
+
+        return normalised, counties
+
+    def _normalise_reference(self, address, expand_synonyms=True):
+        """
+        The original implementation, which applied every rule to the whole address column in turn, written
+        for a single address. Used to test and benchmark the normaliser.
+
+        :param address: address string
+        :type address: str
+        :param expand_synonyms: whether to expand the synonyms
+        :type expand_synonyms: bool
+
+        :return: normalised address and the county that was removed or None
+        :rtype: tuple
+        """
+        if not isinstance(address, str):
+            return float('nan'), None
+
+        address = address.strip()
+        address = re.sub(', ', ' ', address)
+        address = address.replace(',', ' ')
+        address = address.replace('\\', ' ')
+        address = re.sub(r'(\d+)(\s*-\s*)(\d+)', r'\1-\3', address, flags=re.IGNORECASE)
+        address = re.sub(r'(\d+)(\s*TO\s*)(\d+)', r'\1-\3', address, flags=re.IGNORECASE)
+        address = re.sub(r'(\d+)(\s*/\s*)(\d+)', r'\1-\3', address, flags=re.IGNORECASE)
+        address = re.sub(r'(\d+[a-z])(\s*-\s*)(\d+[a-z])', r'\1-\3', address, flags=re.IGNORECASE)
+
+        if expand_synonyms:
+            for fro, to in self.synonyms:
+                address = re.sub(fro, to, address)
+
+        found = None
+        for county in self.counties:
+            if re.search(county + COUNTY_SUFFIX, address):
+                found = county
+            address = re.sub(county + COUNTY_SUFFIX, '', address, flags=re.IGNORECASE)
+
+        return address, found
@@ -23,17 +23,22 @@ Author
 Version
 -------
 
-:version: 0.1
-:date: 28-Feb-2017
+:version: 0.2
+:date: 17-Oct-2026
 """
 import logging
 import os
-import re
 import sys
 import warnings
 
 import numpy as np
 import pandas as pd
+from Analytics.linking.addressNormaliser import AddressNormaliser
+from Analytics.linking.chunkStore import ChunkStore
+from Analytics.linking.compactTypes import compact_types, memory_footprint
+from Analytics.linking.londonLocalities import LondonLocalities
+from Analytics.linking.postcodes import PostcodeExtractor, format_postcodes, split_postcodes
+from Analytics.linking.postprocessingRules import OUTPUT_COLUMNS, RuleEngine
 from ProbabilisticParser import parser
 from tqdm import tqdm
 
@@ -41,6 +46,11 @@ from tqdm import tqdm
 warnings.simplefilter(action="ignore", category=FutureWarning)
 warnings.simplefilter(action="ignore", category=UserWarning)
 
+# low-cardinality components and the numbers padded with dummies, stored with compact types if compactTypes is set
+CATEGORICAL_COLUMNS = ['TownName', 'Locality', 'County', 'Postcode', 'postcode_in', 'postcode_out',
+                       'PAOstartSuffix', 'PAOendSuffix', 'SAOStartSuffix', 'SAOEndSuffix']
+NUMBER_COLUMNS = ['PAOstartNumber', 'PAOendNumber', 'SAOStartNumber', 'SAOEndNumber']
+
 
 class AddressParser:
     """
@@ -50,83 +60,68 @@ class AddressParser:
     def __init__(self, log=None, **kwargs):
         if log is None:
             log = logging.getLogger()
-            log.addHandler(logging.StreamHandler(sys.stdout).setLevel(logging.DEBUG))
+            handler = logging.StreamHandler(sys.stdout)
+            handler.setLevel(logging.DEBUG)
+            log.addHandler(handler)
 
         self.log = log
 
         # relative path when referring to data files
         self.currentDirectory = os.path.dirname(__file__)  # for relative path definitions
-        self.settings = dict(expandSynonyms=True)
+
+        # parserWorkers is the number of processes used to parse, defaults to 1, if None the number of CPUs
+        # parseCache caches the parsed addresses, parseCacheFile is an optional SQLite file to keep them between runs
+        # progressBar shows the progress of post-processing the parsed addresses
+        # validatePostcodes checks the outcodes of the postcodes extracted with a regular expression
+        # compactTypes stores the output of convert_to_numeric_and_add_dummies with compact column types
+        # parsingScore adds the sequence probability of each parse as parsing_score, from the same tagging pass as
+        # the components, the parse cache is then not used
+        self.settings = dict(expandSynonyms=True, parserWorkers=1, parserChunksize=1000,
+                             parseCache=False, parseCacheFile=None, progressBar=True, validatePostcodes=True,
+                             compactTypes=False, parsingScore=False)
         self.settings.update(kwargs)
 
-    @staticmethod
-    def _extract_postcode(string):
-        """
-        A static private method to extract a postcode from address string.
+        # synonyms and counties are read from files with formats (from, to) and (county)
+        self.normaliser = AddressNormaliser.from_files(os.path.join(self.currentDirectory, '../../data/'))
+        self.londonLocalities = LondonLocalities.from_file(os.path.join(self.currentDirectory, '../../data/'))
 
-        Uses a rather loose regular expression, so  may get some strings that are not completely valid postcodes.
-        Should not be used to validate whether a postcode conforms to the UK postcode standards.
+        # the rules deriving the PAO and SAO numbers and suffixes, see postprocessingRules.RULES
+        self.postprocessingRules = RuleEngine()
 
-        The regular expression was taken from:
-        http://stackoverflow.com/questions/164979/uk-postcode-regex-comprehensive
+        # postcodes found with a regular expression are only used if their outcode is known, to also validate the
+        # complete postcodes e.g. against AddressBase use PostcodeExtractor.from_lookups(postcodes=...) instead
+        if self.settings['validatePostcodes']:
+            self.postcodeExtractor = PostcodeExtractor.from_lookups()
+        else:
+            self.postcodeExtractor = PostcodeExtractor()
 
-        :param string: string to be parsed
-        :type string: str
+        self.model = parser.AddressParserModel()
+        # the labels and probabilities of the last parsed unique addresses, if parsingScore is set
+        self.parsedBatch = None
+        if self.settings['parseCache'] or self.settings['parseCacheFile'] is not None:
+            self.model.enable_cache(filename=self.settings['parseCacheFile'])
 
-        :return: postcode
-        :rtype: str
+    def _fix_london_boroughs(self, parsed):
         """
-        regx = r'(([gG][iI][rR] {0,}0[aA]{2})|((([a-pr-uwyzA-PR-UWYZ][a-hk-yA-HK-Y]?[0-9][0-9]?)|' + \
-               '(([a-pr-uwyzA-PR-UWYZ][0-9][a-hjkstuwA-HJKSTUW])|([a-pr-uwyzA-PR-UWYZ][a-hk-yA-HK-Y][0-9]' + \
-               '[abehmnprv-yABEHMNPRV-Y]))) {0,}[0-9][abd-hjlnp-uw-zABD-HJLNP-UW-Z]{2}))'
-        try:
-            potential_postcode = re.findall(regx, string)[0][0]
-            potential_postcode = potential_postcode.lower().strip()
-        except IndexError:
-            potential_postcode = None
-
-        # above regex gives also those without space between, add if needed
-        if potential_postcode is not None:
-            if ' ' not in potential_postcode:
-                inc = potential_postcode[-3:]
-                out = potential_postcode.replace(inc, '')
-                potential_postcode = out + ' ' + inc
-
-        return potential_postcode
-
-    @staticmethod
-    def _fix_london_boroughs(parsed, directory, datafile='localities.csv'):
-        """
-        A static private method to address incorrectly parsed London boroughs.
+        A private method to address incorrectly parsed London boroughs.
 
         If the street name contains London borough then move it to locality and remove from the street name.
+        The London localities are read from a file with a column locality when the instance is created.
 
         :param parsed: a dictionary containing the address tokens that have been parsed
         :type parsed: dict
-        :param directory: location of the data file
-        :type directory: str
-        :param datafile: name of the data file containing a column locality
-        :type datafile: str
 
         :return: a dictionary containing the address tokens with updated information
         :rtype: dict
         """
-        london_localities = pd.read_csv(directory + datafile)['locality']
-
-        for LondonLocality in london_localities:
-            if parsed['StreetName'].strip().endswith(LondonLocality):
-                parsed['Locality'] = LondonLocality
-                # take the last part out, so that e.g. CHINGFORD AVENUE CHINGFORD is correctly processed
-                # need to be careful with e.g.  WESTERN GATEWAY ROYAL VICTORIA DOCK (3 parts to remove)
-                parsed['StreetName'] = parsed['StreetName'].strip()[:-len(LondonLocality)].strip()
-
-        return parsed
+        return self.londonLocalities.fix(parsed)
 
     def _normalize_input_data(self, data, normalised_field_name='ADDRESS_norm'):
         """
         Normalise input address information.
 
-        This includes removal of commas and backslashes and whitespaces around numerical ranges.
+        This includes removal of commas and backslashes and whitespaces around numerical ranges, expansion of
+        synonyms, and removal of counties. The rules are compiled once by the normaliser of the instance.
 
         :param data: address data containing a column 'ADDRESS' to normalise
         :type data: pandas.DataFrame
@@ -136,61 +131,14 @@ class AddressParser:
         :return: normalised data containing a new column names as given by normalised_field_name
         :rtype: pandas.DataFrame
         """
-        # make a copy of the actual address field and run the parsing against it
-        data[normalised_field_name] = data['ADDRESS'].copy()
-
-        # remove white spaces from the end and beginning if present
-        data[normalised_field_name] = data[normalised_field_name].str.strip()
-
-        # remove commas if present as not useful for matching
-        data[normalised_field_name] = data[normalised_field_name].str.replace(', ', ' ')
-        data[normalised_field_name] = data[normalised_field_name].str.replace(',', ' ')
-
-        # remove backslash if present and replace with space
-        data[normalised_field_name] = data[normalised_field_name].str.replace('\\', ' ')
-
-        # remove spaces around hyphens as this causes ranges to be interpreted incorrectly
-        # e.g. FLAT 15 191 - 193 NEWPORT ROAD CARDIFF CF24 1AJ is parsed incorrectly if there
-        # is space around the hyphen
-        data[normalised_field_name] = \
-            data[normalised_field_name].str.replace(r'(\d+)(\s*-\s*)(\d+)', r'\1-\3', case=False)
-
-        # some addresses have number TO number, while this should be with hyphen, replace TO with - in those cases
-        # note: using \1 for group 1 and \3 for group 3 as I couldn't make non-capturing groups work
-        data[normalised_field_name] = \
-            data[normalised_field_name].str.replace(r'(\d+)(\s*TO\s*)(\d+)', r'\1-\3', case=False)
-
-        # some addresses have number/number rather than - as the range separator
-        data[normalised_field_name] = \
-            data[normalised_field_name].str.replace(r'(\d+)(\s*/\s*)(\d+)', r'\1-\3', case=False)
-
-        # some addresses have number+suffix - number+suffix, remove the potential whitespaces around the hyphen
-        data[normalised_field_name] = \
-            data[normalised_field_name].str.replace(r'(\d+[a-z])(\s*-\s*)(\d+[a-z])', r'\1-\3', case=False)
-
-        # synonyms to expand - read from a file with format (from, to)
-        synonyms = pd.read_csv(os.path.join(self.currentDirectory, '../../data/') + 'synonyms.csv').values
-
         # expand common synonyms to help with parsing
         if self.settings['expandSynonyms']:
             self.log.info('Expanding synonyms as a part of normalisation...')
-            for fro, to in synonyms:
-                data['ADDRESS_norm'] = data['ADDRESS_norm'].str.replace(fro, to)
-
-        # parsing gets really confused if region or county is in the line - get known counties from a file
-        counties = pd.read_csv(os.path.join(self.currentDirectory, '../../data/') + 'counties.csv')['county']
 
-        # use this for the counties so that e.g. ESSEX ROAD does not become just ROAD...
-        # todo: the regex is getting ridiculous, maybe do other way around i.e. country must be followed by postcode or
-        #       be the last component.
-        addRegex = r'(?:\s|$)(?!ROAD|LANE|STREET|CLOSE|DRIVE|AVENUE|SQUARE|COURT|PARK|CRESCENT|WAY|WALK|HEOL|FFORDD|HILL|GARDENS|GATE|GROVE|HOUSE|VIEW|BUILDING|VILLAS|LODGE|PLACE|ROW|WHARF|RISE|TERRACE|CROSS|ENTERPRISE|HATCH|&)'
-
-        # remove county from address but add a column for it
-        data['County'] = None
-        for county in counties:
-            msk = data[normalised_field_name].str.contains(county + addRegex, regex=True, na=False)
-            data.loc[msk, 'County'] = county
-            data[normalised_field_name] = data[normalised_field_name].str.replace(county + addRegex, '', case=False)
+        # parsing gets really confused if region or county is in the line - remove the counties from the address
+        # but add a column for the county that was found
+        data[normalised_field_name], data['County'] = \
+            self.normaliser.normalise_many(data['ADDRESS'], expand_synonyms=self.settings['expandSynonyms'])
 
         return data
 
@@ -212,8 +160,36 @@ class AddressParser:
 
         data = self._normalize_input_data(data, normalised_field_name=normalised_field_name)
 
+        # the same address often appears many times e.g. care homes, parse each normalised address only once
+        codes, unique_addresses = pd.factorize(data[normalised_field_name])
+        self.log.info('{} addresses to parse, {} unique, deduplication ratio {:.2f}...'
+                      .format(len(codes), len(unique_addresses), len(codes) / max(len(unique_addresses), 1)))
+
+        parsed = self._parse_normalised(pd.DataFrame({normalised_field_name: unique_addresses}),
+                                        normalised_field_name=normalised_field_name)
+
+        # map the results back to the rows, a missing address has the code -1 and gets an empty last row
+        parsed = parsed.drop(normalised_field_name, axis=1)
+        if (codes < 0).any():
+            parsed = parsed.reindex(range(len(unique_addresses) + 1))
+        for column in parsed.columns:
+            data[column] = parsed[column].values.take(codes)
+
+        return data
+
+    def _parse_normalised(self, data, normalised_field_name='ADDRESS_norm'):
+        """
+        Parse and post-process normalised addresses.
+
+        :param data: address data containing the normalised addresses
+        :type data: pandas.DataFrame
+        :param normalised_field_name: name of the field containing the normalised address data
+        :type normalised_field_name: str
+
+        :return: parsed address data
+        :rtype: pandas.DataFrame
+        """
         addresses = data[normalised_field_name].values
-        self.log.info('{} addresses to parse...'.format(len(addresses)))
 
         # temp data storage lists
         organisation = []
@@ -226,37 +202,34 @@ class AddressParser:
         town = []
         postcode = []
 
-        # loop over addresses and use the probabilistic parser to tag the address components - should avoid a loop
-        for address in tqdm(addresses):
-            parsed = parser.tag(address.upper())
-            possible_postcode = self._extract_postcode(address)  # regular expression extraction
-
-            # if both parsers found postcode then check that they are the same
-            if parsed.get('Postcode', None) is not None and possible_postcode is not None:
-                if parsed['Postcode'] != possible_postcode:
-                    # not the same, use possible_postcode
-                    parsed['Postcode'] = possible_postcode
-
-            # if the probabilistic parser did not find postcode but regular expression did, then use that
-            if parsed.get('Postcode', None) is None and possible_postcode is not None:
-                parsed['Postcode'] = possible_postcode
+        # use the probabilistic parser to tag the address components, in parallel over all the worker processes
+        parsing_scores = None
+        if self.settings['parsingScore']:
+            # the components and the probabilities from a single tagging pass, e.g. for the confidence features
+            self.parsedBatch = self.model.parse_arrays([address.upper() for address in addresses],
+                                                       workers=self.settings['parserWorkers'],
+                                                       chunksize=self.settings['parserChunksize'])
+            parsed_addresses = [self.parsedBatch.tag(i) for i in range(len(self.parsedBatch))]
+            parsing_scores = self.parsedBatch.sequence_probabilities
+        else:
+            parsed_addresses = self.model.tag_batch([address.upper() for address in addresses],
+                                                    workers=self.settings['parserWorkers'],
+                                                    chunksize=self.settings['parserChunksize'])
 
-            if parsed.get('Postcode', None) is not None:
-                # check that there is space, if not then add if the parsed postcode is long enough to contain a complete
-                # postcode. Some users have partial postcodes to which one should not add a space.
-                if ' ' not in parsed['Postcode'] and len(parsed['Postcode']) > 4:
-                    in_code = parsed['Postcode'][-3:]
-                    out_code = parsed['Postcode'].replace(in_code, '')
-                    parsed['Postcode'] = out_code + ' ' + in_code
+        if self.model.cache is not None:
+            self.log.info('Parse cache: {memory_hits} memory hits, {disk_hits} disk hits, {misses} misses, '
+                          'hit rate {hit_rate:.3f}'.format(**self.model.cache.stats()))
 
-                # change to all capitals
-                parsed['Postcode'] = parsed['Postcode'].upper()
+        # regular expression extraction of the postcodes, validated against the known outcodes
+        possible_postcodes = self.postcodeExtractor.extract(data[normalised_field_name])
 
+        # loop over addresses and the parsed components - should avoid a loop
+        for parsed in tqdm(parsed_addresses, disable=not self.settings['progressBar']):
             # if Hackney etc. in StreetName then remove and move to locality if town name contains London
             # Probabilistic parser should see more cases with london localities, parsed incorrectly at the mo
             if parsed.get('StreetName', None) is not None and parsed.get('TownName', None) is not None:
                 if 'LONDON' in parsed['TownName']:
-                    parsed = self._fix_london_boroughs(parsed, os.path.join(self.currentDirectory, '../../data/'))
+                    parsed = self._fix_london_boroughs(parsed)
 
             # sometimes building number gets placed at building name, take it and add to building name
             if parsed.get('BuildingNumber', None) is None and parsed.get('BuildingName', None) is not None:
@@ -300,20 +273,73 @@ class AddressParser:
         data['StreetName'] = street
         data['Locality'] = locality
         data['TownName'] = town
-        data['Postcode'] = postcode
+        # if the regular expression found a postcode then use that, otherwise use the one found by the probabilistic
+        # parser, if any, in capitals and with a space between the in and out codes
+        data['Postcode'] = possible_postcodes['Postcode'].fillna(format_postcodes(pd.Series(postcode,
+                                                                                            index=data.index)))
         data['PAOText'] = data['BuildingName'].copy()
         data['SAOText'] = data['SubBuildingName'].copy()
 
         data = self._parser_postprocessing(data)
+        if parsing_scores is not None:
+            data['parsing_score'] = parsing_scores
 
         return data
 
-    @staticmethod
-    def _parser_postprocessing(data):
+    def parse_file(self, input_file, output_directory, chunksize=100000, resume=True, output_format='feather',
+                   normalised_field_name='ADDRESS_norm', **read_csv_kwargs):
+        """
+        Parse the address information of a CSV file that may be larger than memory.
+
+        The file is read in chunks, and each chunk is parsed, post-processed, and written to its own file in
+        the output directory, so that the peak memory depends on the chunk size rather than the size of the
+        input. A progress marker in the output directory is updated after each chunk, and a failed job
+        continues from the first chunk that was not completed when run again.
+
+        :param input_file: name of the CSV file with a column 'ADDRESS'
+        :type input_file: str
+        :param output_directory: location of the parsed chunks and the progress marker
+        :type output_directory: str
+        :param chunksize: number of addresses in a chunk
+        :type chunksize: int
+        :param resume: whether to continue from the last completed chunk or to start from the beginning
+        :type resume: bool
+        :param output_format: format of the chunk files, feather (columnar, the default) or csv
+        :type output_format: str
+        :param normalised_field_name: name of the new field to contain normalised address data
+        :type normalised_field_name: str
+        :param read_csv_kwargs: other arguments passed to pandas.read_csv e.g. usecols or dtype
+        :type read_csv_kwargs: dict
+
+        :return: the chunk store, whose read method returns the parsed data
+        :rtype: ChunkStore
+        """
+        store = ChunkStore(output_directory, output_format=output_format)
+        progress = store.start(input_file, chunksize, resume=resume)
+
+        if progress['chunks'] > 0:
+            self.log.info('Resuming from chunk {} after {} parsed addresses...'.format(progress['chunks'],
+                                                                                       progress['rows']))
+
+        for number, data in enumerate(pd.read_csv(input_file, chunksize=chunksize, **read_csv_kwargs)):
+            # completed chunks are read but not parsed again
+            if number < progress['chunks']:
+                continue
+
+            self.log.info('Parsing chunk {} of {} addresses...'.format(number, len(data.index)))
+            store.write(progress, self.parse(data, normalised_field_name=normalised_field_name))
+
+        self.log.info('{} addresses parsed in {} chunks to {}'.format(progress['rows'], progress['chunks'],
+                                                                     output_directory))
+
+        return store
+
+    def _parser_postprocessing(self, data):
         """
         Parser post-processing steps.
 
-        Extracts e.g. PAO_START, END, SAO_START, and END information from the parser tokens.
+        Extracts e.g. PAO_START, END, SAO_START, and END information from the parser tokens. The rules are
+        listed in postprocessingRules.RULES, and each distinct value of a component is searched only once.
 
         :param data: parsed address data ready for post-processing
         :type data: pandas.DataFrame
@@ -323,221 +349,32 @@ class AddressParser:
         """
         # if valid postcode information found then split between in and outcode
         if data['Postcode'].count() > 0:
-            postcodes = data['Postcode'].str.split(' ', expand=True)
-            postcodes.rename(columns={0: 'postcode_in', 1: 'postcode_out'}, inplace=True)
-            data = pd.concat([data, postcodes], axis=1)
+            data = pd.concat([data, split_postcodes(data['Postcode'])], axis=1)
         else:
             data['postcode_in'] = None
             data['postcode_out'] = None
 
-        # data containers for those components not parsed, but derived during post-processing
-        data['PAOstartNumber'] = None
-        data['PAOendNumber'] = None
-        data['PAOstartSuffix'] = None
-        data['PAOendSuffix'] = None
-        data['SAOStartNumber'] = None
-        data['SAOEndNumber'] = None
-        data['SAOStartSuffix'] = None
-        data['SAOEndSuffix'] = None
-
-        # if building number is present, then copy it to start number
-        data['PAOstartNumber'] = data['BuildingNumber'].copy()
-
-        # in some other cases / is in the BuildingName field - now this separates the building and flat
-        # the first part refers to the building number and the second to the flat
-        tmp = r'(\d+)\/(\d+)'
-        msk = data['BuildingName'].str.contains(tmp, na=False, case=False)
-        extracted_components = data.loc[msk, 'BuildingName'].str.extract(tmp)
-        data.loc[msk & data['PAOstartNumber'].isnull(), 'PAOstartNumber'] = extracted_components[0]
-        data.loc[msk & data['SAOStartNumber'].isnull(), 'SAOStartNumber'] = extracted_components[1]
-
-        # some cases the SAO components end up in the organisation name field, need to be separated
-        tmp = r'(\d+)([A-Z])-(\d+)([A-Z])'
-        msk = data['OrganisationName'].str.contains(tmp, na=False, case=False)
-        extracted_components = data.loc[msk, 'OrganisationName'].str.extract(tmp)
-        data.loc[msk & data['SAOStartNumber'].isnull(), 'SAOStartNumber'] = extracted_components[0]
-        data.loc[msk & data['SAOStartSuffix'].isnull(), 'SAOStartSuffix'] = extracted_components[1]
-        data.loc[msk & data['SAOEndNumber'].isnull(), 'SAOEndNumber'] = extracted_components[2]
-        data.loc[msk & data['SAOEndSuffix'].isnull(), 'SAOEndSuffix'] = extracted_components[3]
-
-        # some cases the SAO components end up in the organisation name field, need to be separated
-        tmp = r'(\d+)-(\d+)([A-Z])'
-        msk = data['OrganisationName'].str.contains(tmp, na=False, case=False)
-        extracted_components = data.loc[msk, 'OrganisationName'].str.extract(tmp)
-        data.loc[msk & data['SAOStartNumber'].isnull(), 'SAOStartNumber'] = extracted_components[0]
-        data.loc[msk & data['SAOEndNumber'].isnull(), 'SAOEndNumber'] = extracted_components[1]
-        data.loc[msk & data['SAOEndSuffix'].isnull(), 'SAOEndSuffix'] = extracted_components[2]
-
-        # sometimes both PAO and SAO range is in the BuildingName e.g. "35A-35D 35A-35F"
-        tmp = r'(\d+)([A-Z])-(\d+)([A-Z]).*?(\d+)([A-Z])-(\d+)([A-Z])'
-        msk = data['BuildingNumber'].isnull() & data['BuildingName'].str.contains(tmp, na=False, case=False)
-        extracted_components = data.loc[msk, 'BuildingName'].str.extract(tmp)
-        data.loc[msk & data['SAOStartNumber'].isnull(), 'SAOStartNumber'] = extracted_components[0]
-        data.loc[msk & data['SAOStartSuffix'].isnull(), 'SAOStartSuffix'] = extracted_components[1]
-        data.loc[msk & data['SAOEndNumber'].isnull(), 'SAOEndNumber'] = extracted_components[2]
-        data.loc[msk & data['SAOEndSuffix'].isnull(), 'SAOEndSuffix'] = extracted_components[3]
-        data.loc[msk & data['PAOstartNumber'].isnull(), 'PAOstartNumber'] = extracted_components[4]
-        data.loc[msk & data['PAOstartSuffix'].isnull(), 'PAOstartSuffix'] = extracted_components[5]
-        data.loc[msk & data['PAOendNumber'].isnull(), 'PAOendNumber'] = extracted_components[6]
-        data.loc[msk & data['PAOendSuffix'].isnull(), 'PAOendSuffix'] = extracted_components[7]
-
-        # sometimes both PAO and SAO range is in the BuildingName e.g. "28A-28F PICCADILLY COURT 457-463"
-        tmp = r'(\d+)([A-Z])-(\d+)([A-Z]).*?(\d+)-(\d+)'
-        msk = data['BuildingNumber'].isnull() & data['BuildingName'].str.contains(tmp, na=False, case=False)
-        extracted_components = data.loc[msk, 'BuildingName'].str.extract(tmp)
-        data.loc[msk & data['SAOStartNumber'].isnull(), 'SAOStartNumber'] = extracted_components[0]
-        data.loc[msk & data['SAOStartSuffix'].isnull(), 'SAOStartSuffix'] = extracted_components[1]
-        data.loc[msk & data['SAOEndNumber'].isnull(), 'SAOEndNumber'] = extracted_components[2]
-        data.loc[msk & data['SAOEndSuffix'].isnull(), 'SAOEndSuffix'] = extracted_components[3]
-        data.loc[msk & data['PAOstartNumber'].isnull(), 'PAOstartNumber'] = extracted_components[4]
-        data.loc[msk & data['PAOendNumber'].isnull(), 'PAOendNumber'] = extracted_components[5]
-
-        # sometimes both PAO and SAO range is in the BuildingName e.g. "3-3A CHURCHILL COURT 112-144"
-        tmp = r'(\d+)-(\d+)([A-Z]).*?(\d+)-(\d+)'
-        msk = data['BuildingNumber'].isnull() & data['BuildingName'].str.contains(tmp, na=False, case=False)
-        extracted_components = data.loc[msk, 'BuildingName'].str.extract(tmp)
-        data.loc[msk & data['SAOStartNumber'].isnull(), 'SAOStartNumber'] = extracted_components[0]
-        data.loc[msk & data['SAOEndNumber'].isnull(), 'SAOEndNumber'] = extracted_components[1]
-        data.loc[msk & data['SAOEndSuffix'].isnull(), 'SAOEndSuffix'] = extracted_components[2]
-        data.loc[msk & data['PAOstartNumber'].isnull(), 'PAOstartNumber'] = extracted_components[3]
-        data.loc[msk & data['PAOendNumber'].isnull(), 'PAOendNumber'] = extracted_components[4]
-
-        # sometimes both building number and flat range are stored in BuildingName (e.g. 9B-9C 65A), separate these
-        tmp = r'(\d+)([A-Z])-(\d+)([A-Z])\s.*?(\d+)([A-Z])'
-        msk = data['BuildingNumber'].isnull() & data['BuildingName'].str.contains(tmp, na=False, case=False)
-        extracted_components = data.loc[msk, 'BuildingName'].str.extract(tmp)
-        data.loc[msk & data['SAOStartNumber'].isnull(), 'SAOStartNumber'] = extracted_components[0]
-        data.loc[msk & data['SAOStartSuffix'].isnull(), 'SAOStartSuffix'] = extracted_components[1]
-        data.loc[msk & data['SAOEndNumber'].isnull(), 'SAOEndNumber'] = extracted_components[2]
-        data.loc[msk & data['SAOEndSuffix'].isnull(), 'SAOEndSuffix'] = extracted_components[3]
-        data.loc[msk & data['PAOstartNumber'].isnull(), 'PAOstartNumber'] = extracted_components[4]
-        data.loc[msk & data['PAOstartSuffix'].isnull(), 'PAOstartSuffix'] = extracted_components[5]
-
-        # if building number is not present, try to extract from building name if appropriate type
-        # deal with cases where buildingName contains a suffix range: 24D-24E
-        tmp = r'(\d+)([A-Z])-(\d+)([A-Z])'
-        msk = data['PAOstartNumber'].isnull() & data['BuildingName'].str.contains(tmp, na=False, case=False)
-        extracted_components = data.loc[msk, 'BuildingName'].str.extract(tmp)
-        data.loc[msk & data['PAOstartNumber'].isnull(), 'PAOstartNumber'] = extracted_components[0]
-        data.loc[msk & data['PAOstartSuffix'].isnull(), 'PAOstartSuffix'] = extracted_components[1]
-        data.loc[msk & data['PAOendNumber'].isnull(), 'PAOendNumber'] = extracted_components[2]
-        data.loc[msk & data['PAOendSuffix'].isnull(), 'PAOendSuffix'] = extracted_components[3]
-        # deal with cases where buildingName contains a suffix range: 24-24E
-        tmp = r'(\d+)-(\d+)([A-Z])'
-        msk = data['PAOstartNumber'].isnull() & data['BuildingName'].str.contains(tmp, na=False, case=False)
-        extracted_components = data.loc[msk, 'BuildingName'].str.extract(tmp)
-        data.loc[msk & data['PAOstartNumber'].isnull(), 'PAOstartNumber'] = extracted_components[0]
-        data.loc[msk & data['PAOendNumber'].isnull(), 'PAOendNumber'] = extracted_components[1]
-        data.loc[msk & data['PAOendSuffix'].isnull(), 'PAOendSuffix'] = extracted_components[2]
-        # deal with cases where buildingName is a range: 120-122
-        tmp = r'(\d+)-(\d+)'
-        msk = data['PAOstartNumber'].isnull() & data['BuildingName'].str.contains(tmp, na=False, case=False)
-        extracted_components = data.loc[msk, 'BuildingName'].str.extract(tmp)
-        data.loc[msk & data['PAOstartNumber'].isnull(), 'PAOstartNumber'] = extracted_components[0]
-        data.loc[msk & data['PAOendNumber'].isnull(), 'PAOendNumber'] = extracted_components[1]
-        # deal with cases where buildingName is 54A or 65B but not part of a range e.g. 65A-65B
-        tmp = r'(?<!-|\d)(\d+)([A-Z])(?!-)'
-        msk = data['PAOstartNumber'].isnull() & data['BuildingName'].str.contains(tmp, na=False, case=False)
-        extracted_components = data.loc[msk, 'BuildingName'].str.extract(tmp)
-        data.loc[msk & data['PAOstartNumber'].isnull(), 'PAOstartNumber'] = extracted_components[0]
-        data.loc[msk & data['PAOstartSuffix'].isnull(), 'PAOstartSuffix'] = extracted_components[1]
-
-        # if building start number is present, then add to SAO
-        # sometimes subBuildingName contains the flat range e.g. 14E-14E extract the components
-        tmp = r'(\d+)([A-Z])-(\d+)([A-Z])'
-        msk = data['SubBuildingName'].str.contains(tmp, na=False, case=False)
-        extracted_components = data.loc[msk, 'SubBuildingName'].str.extract(tmp)
-        data.loc[msk & data['SAOStartNumber'].isnull(), 'SAOStartNumber'] = extracted_components[0]
-        data.loc[msk & data['SAOStartSuffix'].isnull(), 'SAOStartSuffix'] = extracted_components[1]
-        data.loc[msk & data['SAOEndNumber'].isnull(), 'SAOEndNumber'] = extracted_components[2]
-        data.loc[msk & data['SAOEndSuffix'].isnull(), 'SAOEndSuffix'] = extracted_components[3]
-
-        # sometimes subBuildingName contains the flat range e.g. 14-14E extract the components
-        tmp = r'(\d+)-(\d+)([A-Z])'
-        msk = data['SubBuildingName'].str.contains(tmp, na=False, case=False)
-        extracted_components = data.loc[msk, 'SubBuildingName'].str.extract(tmp)
-        data.loc[msk & data['SAOStartNumber'].isnull(), 'SAOStartNumber'] = extracted_components[0]
-        data.loc[msk & data['SAOEndNumber'].isnull(), 'SAOEndNumber'] = extracted_components[1]
-        data.loc[msk & data['SAOEndSuffix'].isnull(), 'SAOEndSuffix'] = extracted_components[2]
-
-        # sometimes subBuildingName is e.g. C2 where to number refers to the flat number
-        tmp = r'([A-Z])(\d+)'
-        msk = data['SubBuildingName'].str.contains(tmp, na=False, case=False)
-        extracted_components = data.loc[msk, 'SubBuildingName'].str.extract(tmp)
-        data.loc[msk & data['SAOStartNumber'].isnull(), 'SAOStartNumber'] = extracted_components[1]
-        data.loc[msk & data['SAOStartSuffix'].isnull(), 'SAOStartSuffix'] = extracted_components[0]
-
-        # deal with cases where buildingName contains a suffix range: 24D-24E
-        tmp = r'(\d+)([A-Z])-(\d+)([A-Z])'
-        msk = data['PAOstartNumber'].notnull() & data['BuildingName'].str.contains(tmp, na=False, case=False)
-        extracted_components = data.loc[msk, 'BuildingName'].str.extract(tmp)
-        data.loc[msk & data['SAOStartNumber'].isnull(), 'SAOStartNumber'] = extracted_components[0]
-        data.loc[msk & data['SAOStartSuffix'].isnull(), 'SAOStartSuffix'] = extracted_components[1]
-        data.loc[msk & data['SAOEndNumber'].isnull(), 'SAOEndNumber'] = extracted_components[2]
-        data.loc[msk & data['SAOEndSuffix'].isnull(), 'SAOEndSuffix'] = extracted_components[3]
-
-        # deal with cases where buildingName contains a suffix range: 24-24E
-        tmp = r'(\d+)-(\d+)([A-Z])'
-        msk = data['PAOstartNumber'].notnull() & data['BuildingName'].str.contains(tmp, na=False, case=False)
-        extracted_components = data.loc[msk, 'BuildingName'].str.extract(tmp)
-        data.loc[msk & data['SAOStartNumber'].isnull(), 'SAOStartNumber'] = extracted_components[0]
-        data.loc[msk & data['SAOEndNumber'].isnull(), 'SAOEndNumber'] = extracted_components[1]
-        data.loc[msk & data['SAOEndSuffix'].isnull(), 'SAOEndSuffix'] = extracted_components[2]
-
-        # some addresses have / as the separator for buildings and flats, when matching against NLP, needs "FLAT"
-        msk = data['SubBuildingName'].str.contains('\d+\/\d+', na=False, case=False)
-        data.loc[msk, 'SubBuildingName'] = 'FLAT ' + data.loc[msk, 'SubBuildingName']
-
-        # if SubBuildingName is empty, but BuildingName contains Block [A-Z], place this string to SubBuildingName
-        tmp = r'(BLOCK [A-Z])'
-        msk = data['SubBuildingName'].isnull() & data['BuildingName'].str.contains(tmp, na=False, case=False)
-        extracted_components = data.loc[msk, 'BuildingName'].str.extract(tmp)
-        if len(extracted_components.index) > 0:
-            data.loc[msk, 'SubBuildingName'] = extracted_components.values
-
-        # deal with addresses that are of type 5/7 4 whatever road, the format assumed start/end_sao_numb pao_start_numb
-        tmp = r'(\d+)\/(\d+)'
-        msk = data['SubBuildingName'].str.contains(tmp, na=False, case=False) & \
-              data['SAOStartNumber'].isnull() & data['BuildingNumber'].notnull()
-        extracted_components = data.loc[msk, 'SubBuildingName'].str.extract(tmp)
-        data.loc[msk & data['SAOStartNumber'].isnull(), 'SubBuildingName'] = extracted_components[0]
-        data.loc[msk & data['SAOEndNumber'].isnull(), 'SubBuildingName'] = extracted_components[1]
-
-        # if SubBuildingName contains only numbers, then place also to the sao start number field as likely to be flat
-        msk = data['SubBuildingName'].str.isnumeric() & data['SAOStartNumber'].isnull()
-        msk[msk.isnull()] = False
-        data.loc[msk, 'SAOStartNumber'] = data.loc[msk, 'SubBuildingName']
-
-        # if street name contains a number and buildingnumber is empty, then place it there and pao_start_number
-        tmp = r'(\d+)'
-        msk = data['BuildingNumber'].isnull() & data['StreetName'].str.contains(tmp, na=False, case=False)
-        extracted_components = data.loc[msk, 'StreetName'].str.extract(tmp)
-        if len(extracted_components.index) > 0:
-            data.loc[msk, 'BuildingNumber'] = extracted_components.values
-            data.loc[msk, 'PAOstartNumber'] = extracted_components.values
-
-        # split flat or apartment number as separate for numerical comparison - compare e.g. SAO number
-        # todo: rewrite
-        msk = data['SubBuildingName'].str.contains('flat|apartment|unit', na=False, case=False)
-        data.loc[msk, 'SAOStartNumber'] = data.loc[msk, 'SubBuildingName']
-        data.loc[msk, 'SAOStartNumber'] = \
-            data.loc[msk].apply(lambda x: x['SAOStartNumber'].strip().
-                                replace('FLAT', '').replace('APARTMENT', '').replace('UNIT', ''),
-                                axis=1)
+        components = self.postprocessingRules.apply(data)
+        for column in OUTPUT_COLUMNS:
+            data[column] = components[column].values
 
         return data
 
-    @staticmethod
-    def convert_to_numeric_and_add_dummies(data):
+    def convert_to_numeric_and_add_dummies(self, data):
         """
+        Convert the PAO and SAO numbers to integers and add dummies to the empty fields, that are compared by
+        the linkers. If compactTypes is set, the data are then stored with compact column types.
 
-        :param data:
-        :return:
+        :param data: parsed address data
+        :type data: pandas.DataFrame
+
+        :return: parsed address data with numbers and dummies
+        :rtype: pandas.DataFrame
         """
-        for numeric_columns in ('PAOstartNumber', 'PAOendNumber', 'SAOStartNumber', 'SAOEndNumber'):
+        for numeric_columns in NUMBER_COLUMNS:
             # convert to numeric, if NA then set to dummy
             data[numeric_columns] = pd.to_numeric(data[numeric_columns], errors='coerce')
-            data[numeric_columns].fillna(-12345, inplace=True)
+            data[numeric_columns] = data[numeric_columns].fillna(-12345)
             data[numeric_columns] = data[numeric_columns].astype(np.int32)
 
         for dummies_columns in ('PAOstartSuffix', 'PAOendSuffix', 'SAOStartSuffix', 'SAOEndSuffix', 'SAOText'):
@@ -555,4 +392,28 @@ class AddressParser:
         columns_to_add_empty_strings = ['OrganisationName', 'DepartmentName', 'SubBuildingName']
         data[columns_to_add_empty_strings].fillna('', inplace=True)
 
+        if self.settings['compactTypes']:
+            data = self.compact_types(data)
+
+        return data
+
+    def compact_types(self, data):
+        """
+        Store the parsed address data with compact column types and log the memory footprint before and after.
+        The low-cardinality components are stored as categoricals, the PAO and SAO numbers as the smallest
+        integer type that holds them, and the other strings as Arrow-backed strings if available.
+
+        :param data: parsed address data after convert_to_numeric_and_add_dummies
+        :type data: pandas.DataFrame
+
+        :return: parsed address data with compact column types
+        :rtype: pandas.DataFrame
+        """
+        before = memory_footprint(data)
+        data = compact_types(data, categorical_columns=CATEGORICAL_COLUMNS, number_columns=NUMBER_COLUMNS)
+        after = memory_footprint(data)
+
+        self.log.info('Memory footprint of {} parsed addresses reduced from {:.1f} MB to {:.1f} MB'.format(
+            len(data.index), before / 1024. ** 2, after / 1024. ** 2))
+
         return data
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+"""
+ONS Address Index - Benchmark Address Linking
+=============================================
+
+A script to time a blocking pass of each blocking mode of the address linker with the pairs compared by
+recordlinkage against the comparison engine, which computes each distinct string similarity once.
+
+The linker is run in the test mode, so the test data and the test AddressBase are used, and the input is
+parsed once before the timing. The matches of the comparison engine are checked to be the same as those of
+recordlinkage, and the best time of the repeated runs is reported.
+
+
+Running
+-------
+
+After all requirements are satisfied, the script can be invoked using CPython interpreter::
+
+    python benchmarkLinking.py
+
+
+Requirements
+------------
+
+:requires: AddressLinker and its requirements
+
+
+Version
+-------
+
+:version: 0.3
+:date: 17-Oct-2026
+"""
+import argparse
+import time
+
+import numpy as np
+from Analytics.linking import addressParser
+from Analytics.linking.addressLinking import AddressLinker
+
+
+def _prepared_linker(**kwargs):
+    """
+    Set up a linker in the test mode with the input parsed and AddressBase loaded.
+
+    :param kwargs: settings of the linker
+    :type kwargs: dict
+
+    :return: the linker, ready to link the addresses
+    :rtype: AddressLinker
+    """
+    linker = AddressLinker(test=True, store=False, **kwargs)
+    linker.load_data()
+    linker.check_loaded_data()
+    linker.load_addressbase()
+
+    address_parser = addressParser.AddressParser(log=linker.log, **linker.settings)
+    linker.toLinkAddressData = address_parser.parse(linker.toLinkAddressData)
+    linker.toLinkAddressData = address_parser.convert_to_numeric_and_add_dummies(linker.toLinkAddressData)
+
+    return linker
+
+
+def time_blocking_pass(linker, blocking_mode, comparison_engine, repeat=3):
+    """
+    Time finding the matches of all the addresses with one blocking mode.
+
+    :param linker: a prepared linker
+    :type linker: AddressLinker
+    :param blocking_mode: the blocking mode
+    :type blocking_mode: int
+    :param comparison_engine: whether to compare the pairs with the comparison engine rather than recordlinkage
+    :type comparison_engine: bool
+    :param repeat: number of runs, the best time is reported
+    :type repeat: int
+
+    :return: best time in seconds and the matches
+    :rtype: tuple(float, pandas.DataFrame)
+    """
+    linker.settings['comparisonEngine'] = comparison_engine
+
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        matches, _ = linker._find_likeliest_address(linker.toLinkAddressData, blocking=blocking_mode)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best, matches
+
+
+def run_comparison_benchmark(blocking_modes=(1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11), repeat=3):
+    """
+    Time a blocking pass of each blocking mode with recordlinkage and with the comparison engine.
+
+    :param blocking_modes: the blocking modes
+    :type blocking_modes: tuple
+    :param repeat: number of runs, the best time is reported
+    :type repeat: int
+
+    :return: best times in seconds with recordlinkage and with the comparison engine for each blocking mode
+    :rtype: dict
+    """
+    linker = _prepared_linker()
+
+    print('Comparing the pairs of {} addresses'.format(len(linker.toLinkAddressData.index)))
+
+    results = dict()
+    for blocking_mode in blocking_modes:
+        old, old_matches = time_blocking_pass(linker, blocking_mode, False, repeat)
+        new, new_matches = time_blocking_pass(linker, blocking_mode, True, repeat)
+
+        columns = ['TestData_Index', 'AddressBase_Index']
+        if not (new_matches[columns].values.tolist() == old_matches[columns].values.tolist() and
+                np.allclose(new_matches['similarity_sum'], old_matches['similarity_sum'])):
+            raise ValueError('The matches of blocking mode {} differ from recordlinkage'.format(blocking_mode))
+
+        results[blocking_mode] = (old, new)
+        print('{:>8} mode: {:8.2f} s recordlinkage, {:8.2f} s engine, speed-up {:.1f}x'.format(
+            blocking_mode, old, new, old / new))
+
+    return results
+
+
+if __name__ == "__main__":
+    arguments = argparse.ArgumentParser(description='Time the comparisons of the address linking')
+    arguments.add_argument('--repeat', type=int, default=3)
+    arguments = arguments.parse_args()
+
+    run_comparison_benchmark(repeat=arguments.repeat)
@@ -0,0 +1,283 @@
+#!/usr/bin/env python
+"""
+ONS Address Index - Benchmark Address Parser Pre- and Post-Processing
+=====================================================================
+
+A script to time the rule based steps of the address parser against their original implementations:
+
+    1. normalisation - the compiled address normaliser against applying every rule in turn
+    2. London localities - the suffix set against reading the localities file and comparing the street
+       name to every locality, for each address with LONDON in the town name
+    3. postcodes - the postcode extractor on the whole address column against running the regular
+       expression for one address at a time
+    4. post-processing - the rule engine against running each rule in turn over whole columns with the
+       pandas string methods
+
+The London localities are timed on a London heavy sample, in which every street name ends with one or
+more localities or other words. The outputs of the new and the original implementations are checked to be
+the same, and the best time of the repeated runs is reported. The post-processing is timed on parsed
+components where most building and sub-building names are either missing or contain no numbers.
+
+
+Running
+-------
+
+After all requirements are satisfied, the script can be invoked using CPython interpreter::
+
+    python benchmarkPreprocessing.py --size 10000
+
+
+Requirements
+------------
+
+:requires: pandas (tested with 0.19.2)
+:requires: ProbabilisticParser (only for the synthetic addresses)
+
+
+Version
+-------
+
+:version: 0.3
+:date: 17-Oct-2026
+"""
+import argparse
+import os
+import random
+import time
+
+import pandas as pd
+from Analytics.linking.addressNormaliser import AddressNormaliser
+from Analytics.linking.londonLocalities import LondonLocalities
+from Analytics.linking.postcodes import PostcodeExtractor, _extract_postcode_reference
+from Analytics.linking.postprocessingRules import INPUT_COLUMNS, OUTPUT_COLUMNS, RuleEngine, \
+    _postprocessing_reference
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../data/')
+
+
+def london_street_names(localities, size, seed=42):
+    """
+    Generate reproducible street names that end with London localities or other words.
+
+    :param localities: London localities
+    :type localities: list
+    :param size: number of street names
+    :type size: int
+    :param seed: seed of the random number generator
+    :type seed: int
+
+    :return: street names
+    :rtype: list
+    """
+    rng = random.Random(seed)
+    words = ['HIGH STREET', 'MILL LANE', 'CHURCH ROAD', 'STATION ROAD', 'THE AVENUE', 'NEW', 'WEST']
+
+    street_names = []
+    for _ in range(size):
+        street_name = [rng.choice(words)] + [rng.choice(localities) for _ in range(rng.randint(0, 2))]
+        if rng.random() < 0.2:
+            street_name.append(rng.choice(words))
+        street_names.append(' '.join(street_name))
+
+    return street_names
+
+
+def parsed_components(size, seed=42):
+    """
+    Generate reproducible address components as found by the probabilistic parser.
+
+    :param size: number of addresses
+    :type size: int
+    :param seed: seed of the random number generator
+    :type seed: int
+
+    :return: the components used by the post-processing rules
+    :rtype: pandas.DataFrame
+    """
+    rng = random.Random(seed)
+    words = ['ROSE', 'MILL', 'OAK', 'CHURCH', 'STATION', 'PARK', 'GREEN', 'VICTORIA']
+
+    def building_name():
+        return rng.choice(['{} HOUSE'.format(rng.choice(words)), '{} COURT'.format(rng.choice(words)),
+                           '{}{}'.format(rng.randint(1, 99), rng.choice('AB')),
+                           '{}-{}'.format(rng.randint(1, 9), rng.randint(10, 20))])
+
+    def sub_building_name():
+        return rng.choice(['FLAT {}'.format(rng.randint(1, 40)),
+                           'FLAT {}{}'.format(rng.randint(1, 9), rng.choice('AB')),
+                           'BASEMENT FLAT', str(rng.randint(1, 9))])
+
+    components = []
+    for _ in range(size):
+        components.append([str(rng.randint(1, 300)) if rng.random() < 0.7 else None,
+                           building_name() if rng.random() < 0.25 else None,
+                           '{} LTD'.format(rng.choice(words)) if rng.random() < 0.1 else None,
+                           sub_building_name() if rng.random() < 0.15 else None,
+                           '{} {} ROAD'.format(rng.choice(words), ''.join(rng.choice('ABCDEFGH') for _ in range(6)))])
+
+    return pd.DataFrame(components, columns=INPUT_COLUMNS, dtype=object)
+
+
+def _best_time(function, items, repeat):
+    """
+    Apply the function to each item and report the best time of the repeated runs.
+
+    :param function: function to apply
+    :type function: callable
+    :param items: inputs of the function
+    :type items: list
+    :param repeat: number of runs
+    :type repeat: int
+
+    :return: best time in seconds and the outputs of the last run
+    :rtype: tuple
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        outputs = [function(item) for item in items]
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best, outputs
+
+
+def _report(name, size, old, new):
+    """
+    Print the time per item of the original and the new implementation.
+    """
+    print('{:>20}: {:10.2f} -> {:8.2f} us per address, speed-up {:.1f}'.format(name, 1e6 * old / size,
+                                                                            1e6 * new / size, old / new))
+
+
+def time_normalisation(addresses, repeat=3):
+    """
+    Time the address normaliser against the original implementation.
+
+    :param addresses: address strings
+    :type addresses: list
+    :param repeat: number of runs
+    :type repeat: int
+
+    :return: best times in seconds of the original and the new implementation
+    :rtype: tuple
+    """
+    normaliser = AddressNormaliser.from_files(DATA_PATH)
+
+    old, reference = _best_time(normaliser._normalise_reference, addresses, repeat)
+    new, normalised = _best_time(normaliser.normalise, addresses, repeat)
+    assert normalised == reference, 'the normalised addresses differ from the original implementation'
+
+    return old, new
+
+
+def time_london_localities(street_names, repeat=3):
+    """
+    Time the London localities suffix set against the original implementation, which read the data file
+    for each address.
+
+    :param street_names: street names of addresses in London
+    :type street_names: list
+    :param repeat: number of runs
+    :type repeat: int
+
+    :return: best times in seconds of the original and the new implementation
+    :rtype: tuple
+    """
+    london_localities = LondonLocalities.from_file(DATA_PATH)
+
+    def original(street_name):
+        return LondonLocalities.from_file(DATA_PATH)._fix_reference(dict(StreetName=street_name))
+
+    old, reference = _best_time(original, street_names, repeat)
+    new, fixed = _best_time(lambda street_name: london_localities.fix(dict(StreetName=street_name)),
+                            street_names, repeat)
+    assert fixed == reference, 'the fixed street names differ from the original implementation'
+
+    return old, new
+
+
+def time_postcodes(addresses, repeat=3):
+    """
+    Time the postcode extractor, without validation, against the original implementation.
+
+    :param addresses: address strings
+    :type addresses: list
+    :param repeat: number of runs
+    :type repeat: int
+
+    :return: best times in seconds of the original and the new implementation
+    :rtype: tuple
+    """
+    extractor = PostcodeExtractor()
+    addresses = pd.Series(addresses)
+
+    old, reference = _best_time(_extract_postcode_reference, addresses, repeat)
+    new, extracted = _best_time(extractor.extract, [addresses], repeat)
+    reference = [None if postcode is None else postcode.upper() for postcode in reference]
+    extracted = [None if pd.isnull(postcode) else postcode for postcode in extracted[0]['Postcode']]
+    assert extracted == reference, 'the extracted postcodes differ from the original implementation'
+
+    return old, new
+
+
+def time_postprocessing(data, repeat=3):
+    """
+    Time the rule engine against the original implementation.
+
+    :param data: parsed address components
+    :type data: pandas.DataFrame
+    :param repeat: number of runs
+    :type repeat: int
+
+    :return: best times in seconds of the original and the new implementation
+    :rtype: tuple
+    """
+    engine = RuleEngine()
+
+    old, reference = _best_time(lambda components: _postprocessing_reference(components.copy()), [data], repeat)
+    new, processed = _best_time(engine.apply, [data], repeat)
+    for column in OUTPUT_COLUMNS:
+        assert all(a == b or (pd.isnull(a) and pd.isnull(b)) for a, b in zip(processed[0][column],
+                                                                          reference[0][column])), \
+            'the post-processed {} differs from the original implementation'.format(column)
+
+    return old, new
+
+
+def run_benchmark(size=10000, repeat=3):
+    """
+    Time the steps on samples of the given size.
+
+    :param size: number of addresses
+    :type size: int
+    :param repeat: number of runs, the best time is reported
+    :type repeat: int
+
+    :return: best times in seconds of the original and the new implementation of each step
+    :rtype: dict
+    """
+    from ProbabilisticParser.benchmarks import corpus
+
+    results = dict()
+    results['normalisation'] = time_normalisation(corpus.synthetic_addresses(size), repeat)
+
+    localities = list(pd.read_csv(os.path.join(DATA_PATH, 'localities.csv'))['locality'])
+    results['London localities'] = time_london_localities(london_street_names(localities, size), repeat)
+    results['postcodes'] = time_postcodes(corpus.synthetic_addresses(size), repeat)
+    results['post-processing'] = time_postprocessing(parsed_components(size), repeat)
+
+    print('Sample of {} addresses'.format(size))
+    for name, (old, new) in results.items():
+        _report(name, size, old, new)
+
+    return results
+
+
+if __name__ == "__main__":
+    arguments = argparse.ArgumentParser(description='Time the pre- and post-processing of the address parser')
+    arguments.add_argument('--size', type=int, default=10000)
+    arguments.add_argument('--repeat', type=int, default=3)
+    arguments = arguments.parse_args()
+
+    run_benchmark(arguments.size, arguments.repeat)
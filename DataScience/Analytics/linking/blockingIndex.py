@@ -0,0 +1,339 @@
+"""
+ONS Address Index - Blocking Index
+==================================
+
+This file contains a Blocking Index class that maps the keys of a combination of AddressBase columns to the
+positions of the AddressBase rows with that key, and a Blocking Index Store class that keeps the indexes on disk.
+
+The linkers block the potential matches on combinations of columns, e.g. postcode and building number. Joining
+the input addresses with the whole AddressBase for each blocking mode is slow, so instead the AddressBase side
+is indexed once: the keys are factorised, and the row positions are sorted by key so that the rows of a key are
+a contiguous slice. Finding the candidate pairs is then a lookup of the input keys and a gather of the slices.
+
+The pairs are the same as those of blocking with recordlinkage, i.e. a join of the rows on the values of the
+columns. A key joins the values of the columns with a unit separator, each value tagged with its kind, so that
+a string never matches a number, e.g. '12' and 12, while numbers of different types match if they are equal,
+e.g. 12 and 12.0, as in the join. A row with a missing value has no key and is not blocked with any address,
+as recordlinkage drops these rows before joining. The dummy numbers, e.g. -12345, are values like any other.
+
+The indexes are stored as numpy files, the positions memory-mapped on load, in a directory per column
+combination. They are built when first needed and shared by all the later runs until the AddressBase source
+file changes, when the store is emptied.
+
+
+Requirements
+------------
+
+:requires: numpy (tested with 1.11.3)
+:requires: pandas (tested with 0.19.2)
+
+
+Version
+-------
+
+:version: 0.2
+:date: 17-Oct-2026
+"""
+import hashlib
+import json
+import numbers
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+from Analytics.linking.addressBaseCache import describe_source, pack_strings, same_source, save_array, \
+    unpack_strings
+
+# separates the values of the columns in a key
+KEY_SEPARATOR = '\x1f'
+
+MANIFEST_FILE = 'manifest.json'
+INDEX_VERSION = 2
+
+
+def key_part(value):
+    """
+    Write a value as a part of a blocking key, tagged with its kind. Equal numbers give the same part whatever
+    their type, as they are equal in a join.
+
+    :param value: value of a column
+    :type value: object
+
+    :return: the part, None for a missing value
+    :rtype: str or None
+    """
+    if isinstance(value, str):
+        return 's' + value
+    if pd.isnull(value):
+        return None
+    if isinstance(value, numbers.Integral):
+        return 'n{:d}'.format(int(value))
+    if isinstance(value, numbers.Real):
+        value = float(value)
+        return 'n{:d}'.format(int(value)) if value.is_integer() else 'n' + repr(value)
+
+    return 'o' + repr(value)
+
+
+def normalise_keys(data, columns):
+    """
+    Form the blocking keys of the rows of a data frame.
+
+    :param data: data frame holding the columns
+    :type data: pandas.DataFrame
+    :param columns: names of the columns forming the key
+    :type columns: list
+
+    :return: the keys, None for the rows with a missing value
+    :rtype: numpy.ndarray
+    """
+    parts = [[key_part(value) for value in np.asarray(data[column], dtype=object)] for column in columns]
+
+    keys = np.empty(len(data.index), dtype=object)
+    keys[:] = [None if None in values else KEY_SEPARATOR.join(values) for values in zip(*parts)]
+
+    return keys
+
+
+def labels_checksum(index):
+    """
+    SHA-1 checksum of the row labels of a data frame, which tells whether an index built for some rows can be
+    used for others.
+
+    :param index: the row labels
+    :type index: pandas.Index
+
+    :return: hexadecimal checksum
+    :rtype: str
+    """
+    checksum = hashlib.sha1(str(index.dtype).encode('utf-8'))
+    if isinstance(index.dtype, np.dtype) and index.dtype.kind in 'iuf':
+        checksum.update(np.ascontiguousarray(index.values).tobytes())
+    else:
+        checksum.update('\0'.join(str(label) for label in index).encode('utf-8'))
+
+    return checksum.hexdigest()
+
+
+def index_name(columns):
+    """
+    Name of the index of a combination of columns.
+
+    :param columns: names of the columns forming the key
+    :type columns: list
+
+    :return: the name, also the name of the directory of the index
+    :rtype: str
+    """
+    return '+'.join(columns)
+
+
+class BlockingIndex:
+    """
+    Maps the keys of a combination of columns to the sorted positions of the rows with the key.
+    """
+
+    def __init__(self, keys, offsets, positions):
+        """
+        Class constructor.
+
+        :param keys: the distinct keys
+        :type keys: numpy.ndarray
+        :param offsets: start of the positions of each key, followed by the number of positions
+        :type offsets: numpy.ndarray
+        :param positions: row positions grouped by key, in order within a key
+        :type positions: numpy.ndarray
+        """
+        self.keys = pd.Index(keys, dtype=object)
+        self.offsets = offsets
+        self.positions = positions
+
+    @classmethod
+    def build(cls, data, columns):
+        """
+        Index the rows of a data frame.
+
+        :param data: data frame holding the columns
+        :type data: pandas.DataFrame
+        :param columns: names of the columns forming the key
+        :type columns: list
+
+        :return: the index
+        :rtype: BlockingIndex
+        """
+        keys = normalise_keys(data, columns)
+        rows = np.flatnonzero(pd.notnull(keys))
+
+        codes, distinct = pd.factorize(keys[rows])
+        position_type = np.int32 if len(keys) <= np.iinfo(np.int32).max else np.int64
+        positions = rows[np.argsort(codes, kind='mergesort')].astype(position_type)
+        # NumPy 1.11 needs a positive minimum length
+        counts = np.bincount(codes, minlength=max(len(distinct), 1))[:len(distinct)]
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+        return cls(np.asarray(distinct, dtype=object), offsets, positions)
+
+    @classmethod
+    def load(cls, directory):
+        """
+        Load an index saved with save, the positions memory-mapped.
+
+        :param directory: directory of the index
+        :type directory: str
+
+        :return: the index
+        :rtype: BlockingIndex
+        """
+        offsets = np.load(os.path.join(directory, 'offsets.npy'), allow_pickle=False)
+        positions = np.load(os.path.join(directory, 'positions.npy'), mmap_mode='r', allow_pickle=False)
+        keys = unpack_strings(np.load(os.path.join(directory, 'keys.npy'), allow_pickle=False), len(offsets) - 1)
+
+        return cls(keys, offsets, positions)
+
+    def save(self, directory):
+        """
+        Save the index to a directory.
+
+        :param directory: directory of the index, created if it does not exist
+        :type directory: str
+
+        :return: None
+        """
+        os.makedirs(directory, exist_ok=True)
+
+        save_array(os.path.join(directory, 'keys.npy'), pack_strings(self.keys))
+        save_array(os.path.join(directory, 'offsets.npy'), self.offsets)
+        save_array(os.path.join(directory, 'positions.npy'), np.asarray(self.positions))
+
+    def lookup(self, keys):
+        """
+        Find the rows with the given keys.
+
+        :param keys: keys to look up, None for no key
+        :type keys: numpy.ndarray
+
+        :return: positions of the keys and positions of the rows with the key, pair by pair
+        :rtype: tuple(numpy.ndarray, numpy.ndarray)
+        """
+        found = self.keys.get_indexer(keys)
+        queries = np.flatnonzero(found >= 0)
+        found = found[queries]
+
+        starts = self.offsets[found]
+        counts = self.offsets[found + 1] - starts
+
+        # positions of the rows of each key, slice by slice
+        total = int(counts.sum())
+        shifts = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        rows = np.asarray(self.positions[np.arange(total) + shifts])
+
+        return np.repeat(queries, counts), rows
+
+
+class BlockingIndexStore:
+    """
+    Keeps the blocking indexes of an AddressBase on disk, and empties them when the AddressBase source changes.
+    """
+
+    def __init__(self, directory, source):
+        """
+        Class constructor.
+
+        :param directory: directory of the indexes, created when the first index is built
+        :type directory: str
+        :param source: name of the AddressBase file that the indexed data have been read from
+        :type source: str
+        """
+        self.directory = directory
+        self.source = source
+        self.manifest_file = os.path.join(directory, MANIFEST_FILE)
+        self.manifest = None
+        self.indexes = {}
+
+    def _write_manifest(self):
+        """
+        Replace the manifest of the store.
+
+        :return: None
+        """
+        with open(self.manifest_file + '.tmp', 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(self.manifest_file + '.tmp', self.manifest_file)
+
+    def _open(self):
+        """
+        Read the manifest, or empty the store if it has been built from a different source.
+
+        :return: None
+        """
+        if os.path.isfile(self.manifest_file):
+            with open(self.manifest_file) as f:
+                manifest = json.load(f)
+
+            if manifest.get('version') == INDEX_VERSION and same_source(manifest, self.source):
+                self.manifest = manifest
+                return
+
+        if os.path.isdir(self.directory):
+            shutil.rmtree(self.directory)
+        os.makedirs(self.directory)
+
+        self.manifest = describe_source(self.source)
+        self.manifest.update(version=INDEX_VERSION, indexes={})
+        self._write_manifest()
+
+    def index(self, data, columns):
+        """
+        Get the index of a combination of columns, loaded from the store or built and stored.
+
+        :param data: the AddressBase the index refers to
+        :type data: pandas.DataFrame
+        :param columns: names of the columns forming the key
+        :type columns: list
+
+        :return: the index
+        :rtype: BlockingIndex
+        """
+        name = index_name(columns)
+        if name in self.indexes:
+            return self.indexes[name]
+
+        if self.manifest is None:
+            self._open()
+
+        # the positions of a stored index refer to the rows it was built for
+        directory = os.path.join(self.directory, name)
+        rows = dict(rows=len(data.index), labels=labels_checksum(data.index))
+        if self.manifest['indexes'].get(name) == rows:
+            index = BlockingIndex.load(directory)
+        else:
+            index = BlockingIndex.build(data, columns)
+            index.save(directory)
+            self.manifest['indexes'][name] = rows
+            self._write_manifest()
+
+        self.indexes[name] = index
+
+        return index
+
+    def pairs(self, left, left_on, right, right_on):
+        """
+        Find the pairs of the rows of two data frames with the same key, as blocking with recordlinkage.
+
+        :param left: addresses to be linked
+        :type left: pandas.DataFrame
+        :param left_on: names of the columns forming the key of the addresses to be linked
+        :type left_on: list
+        :param right: the indexed AddressBase
+        :type right: pandas.DataFrame
+        :param right_on: names of the AddressBase columns forming the key
+        :type right_on: list
+
+        :return: pairs of the index labels of the addresses and the AddressBase
+        :rtype: pandas.MultiIndex
+        """
+        left_positions, right_positions = self.index(right, right_on).lookup(normalise_keys(left, left_on))
+
+        return pd.MultiIndex.from_arrays([left.index[left_positions], right.index[right_positions]],
+                                         names=[left.index.name, right.index.name])
@@ -0,0 +1,201 @@
+"""
+ONS Address Index - Chunk Store
+===============================
+
+This file contains a Chunk Store class that stores the results of processing a large input file in
+chunks. Each chunk is written to its own file in the output directory, by default in the columnar feather
+format or else in CSV, and a progress marker is updated after each completed chunk. If a job fails, it can be
+restarted and continues from the first chunk that was not completed.
+
+The files are first written under a temporary name and then renamed, so that a chunk file or the marker
+is never left half written. The marker records the input file, its size and modification time, and the
+chunk size, and resuming with a different input or chunk size raises a ValueError.
+
+
+Requirements
+------------
+
+:requires: pandas (tested with 0.19.2)
+:requires: feather-format (tested with 0.3.1, only for the feather output format)
+
+
+Version
+-------
+
+:version: 0.3
+:date: 17-Oct-2026
+"""
+import glob
+import json
+import os
+
+import pandas as pd
+
+MARKER_FILE = 'progress.json'
+OUTPUT_FORMATS = ('feather', 'csv')
+
+
+class ChunkStore:
+    """
+    Stores the processed chunks of an input file and keeps track of the completed chunks.
+    """
+
+    def __init__(self, directory, output_format='feather'):
+        """
+        Class constructor.
+
+        :param directory: output directory, created if it does not exist
+        :type directory: str
+        :param output_format: format of the chunk files, either feather (the default) or csv
+        :type output_format: str
+        """
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError('Unknown output format {}, use one of {}'.format(output_format, OUTPUT_FORMATS))
+
+        self.directory = directory
+        self.output_format = output_format
+        self.marker_file = os.path.join(directory, MARKER_FILE)
+
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def _describe_input(input_file, chunksize):
+        """
+        Describe the input file and the chunk size, so that a job is only resumed with the same input.
+
+        :param input_file: name of the input file
+        :type input_file: str
+        :param chunksize: number of rows in a chunk
+        :type chunksize: int
+
+        :return: description of the input
+        :rtype: dict
+        """
+        stat = os.stat(input_file)
+
+        return dict(input=os.path.abspath(input_file), size=stat.st_size, modified=stat.st_mtime,
+                    chunksize=chunksize)
+
+    def _write_marker(self, progress):
+        """
+        Replace the progress marker.
+
+        :param progress: description of the input, the number of completed chunks and rows
+        :type progress: dict
+
+        :return: None
+        """
+        with open(self.marker_file + '.tmp', 'w') as f:
+            json.dump(progress, f, indent=2)
+        os.replace(self.marker_file + '.tmp', self.marker_file)
+
+    def start(self, input_file, chunksize, resume=True):
+        """
+        Start or resume storing the chunks of the given input file.
+
+        :param input_file: name of the input file
+        :type input_file: str
+        :param chunksize: number of rows in a chunk
+        :type chunksize: int
+        :param resume: whether to continue from the completed chunks or to start from the beginning
+        :type resume: bool
+
+        :return: progress i.e. the description of the input, the number of completed chunks and rows
+        :rtype: dict
+        """
+        progress = self._describe_input(input_file, chunksize)
+        progress.update(output_format=self.output_format, chunks=0, rows=0)
+
+        if resume and os.path.isfile(self.marker_file):
+            with open(self.marker_file) as f:
+                previous = json.load(f)
+
+            for key in ('input', 'size', 'modified', 'chunksize', 'output_format'):
+                if previous.get(key) != progress[key]:
+                    raise ValueError('Cannot resume, the {} of the job in {} was {}, not {}'
+                                     .format(key, self.directory, previous.get(key), progress[key]))
+            progress = previous
+        else:
+            for filename in self.chunk_files():
+                os.remove(filename)
+
+        self._write_marker(progress)
+
+        return progress
+
+    def chunk_file(self, number):
+        """
+        Name of the file of the given chunk.
+
+        :param number: number of the chunk, starting from zero
+        :type number: int
+
+        :return: name of the chunk file
+        :rtype: str
+        """
+        return os.path.join(self.directory, 'chunk-{:06d}.{}'.format(number, self.output_format))
+
+    def chunk_files(self):
+        """
+        Names of the chunk files in the output directory in the order of the chunks.
+
+        :return: names of the chunk files
+        :rtype: list
+        """
+        return sorted(glob.glob(os.path.join(self.directory, 'chunk-*.{}'.format(self.output_format))))
+
+    def write(self, progress, data):
+        """
+        Write the next chunk and mark it completed.
+
+        :param progress: progress as returned by start, updated in place
+        :type progress: dict
+        :param data: processed chunk
+        :type data: pandas.DataFrame
+
+        :return: name of the chunk file
+        :rtype: str
+        """
+        filename = self.chunk_file(progress['chunks'])
+
+        if self.output_format == 'feather':
+            import feather
+            # feather stores the columns only, not the index
+            data = data.reset_index(drop=True)
+            # feather-format 0.3 cannot infer the type of objects that are all missing, e.g. of a component that
+            # was not found in any address of the chunk, these are written as floats as they are read from CSV,
+            # and the categoricals get an unused empty category
+            for column in data.columns:
+                if str(data[column].dtype) == 'category' and len(data[column].cat.categories) == 0:
+                    data[column] = data[column].cat.add_categories([''])
+                elif data[column].dtype == object and data[column].isnull().all():
+                    data[column] = data[column].astype(float)
+            feather.write_dataframe(data, filename + '.tmp')
+        else:
+            data.to_csv(filename + '.tmp', index=False)
+        os.replace(filename + '.tmp', filename)
+
+        progress['chunks'] += 1
+        progress['rows'] += len(data.index)
+        self._write_marker(progress)
+
+        return filename
+
+    def read(self):
+        """
+        Read all the completed chunks into a single data frame. For inputs larger than memory, read the
+        files of chunk_files one at a time instead.
+
+        :return: the stored data
+        :rtype: pandas.DataFrame
+        """
+        with open(self.marker_file) as f:
+            filenames = [self.chunk_file(number) for number in range(json.load(f)['chunks'])]
+
+        if self.output_format == 'feather':
+            import feather
+            chunks = [feather.read_dataframe(filename) for filename in filenames]
+        else:
+            chunks = [pd.read_csv(filename) for filename in filenames]
+
+        return pd.concat(chunks, ignore_index=True)
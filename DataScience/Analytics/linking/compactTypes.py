@@ -0,0 +1,196 @@
+"""
+ONS Address Index - Compact Column Types
+========================================
+
+This file contains functions to store parsed address data with compact column types, and to report the
+memory footprint of a data frame.
+
+After parsing, every component is a column of Python string objects, and the missing PAO and SAO numbers are
+padded with a dummy value (-12345) so that they can be stored as 32 bit integers. The compact representation
+stores
+
+    1. low-cardinality fields, e.g. town names, postcodes, and suffixes, as categoricals
+    2. dummy-padded numbers as the smallest nullable integer type that holds them and the dummy, with
+       missing values instead of the dummy, or with pandas older than 0.24 as the smallest numpy integer
+       type that holds them and the dummy, which is kept
+    3. other string columns as Arrow-backed strings if pyarrow is installed, else as they are
+
+The placeholders of the text fields, e.g. N/A for the suffixes, are kept as they cost only a category each and
+the string comparisons of the linkers rely on them. The linkers put the dummy value back to the nullable numbers
+with fill_dummy_numbers before comparing, which keeps the column types.
+
+
+Requirements
+------------
+
+:requires: numpy (tested with 1.11.3)
+:requires: pandas (tested with 0.19.2, >= 0.24 for the nullable integer types)
+:requires: pyarrow (optional, only for the Arrow-backed strings)
+
+
+Version
+-------
+
+:version: 0.3
+:date: 17-Oct-2026
+"""
+import numpy as np
+import pandas as pd
+
+# value that the missing numbers are padded with when stored as integers
+DUMMY_NUMBER = -12345
+
+# nullable integer types from the smallest up, the numpy types have the same names in lower case
+INTEGER_TYPES = ('Int8', 'Int16', 'Int32', 'Int64')
+
+# the nullable integers were added in pandas 0.24
+NULLABLE_INTEGERS = hasattr(pd, INTEGER_TYPES[0] + 'Dtype')
+
+
+def memory_footprint(data):
+    """
+    Memory used by a data frame, including the Python objects held in its columns.
+
+    :param data: data frame
+    :type data: pandas.DataFrame
+
+    :return: memory footprint in bytes
+    :rtype: int
+    """
+    return int(data.memory_usage(index=True, deep=True).sum())
+
+
+def arrow_string_type():
+    """
+    The Arrow-backed string type, if pyarrow is installed.
+
+    :return: the string type or None if pyarrow is not available
+    :rtype: pandas.StringDtype or None
+    """
+    try:
+        import pyarrow  # noqa: F401
+        return pd.StringDtype('pyarrow')
+    except (ImportError, AttributeError, TypeError):
+        # pyarrow is missing or pandas is older than 1.3
+        return None
+
+
+def smallest_integer_type(minimum, maximum, nullable=True):
+    """
+    Find the smallest integer type that can hold the numbers between the given limits.
+
+    :param minimum: smallest number
+    :type minimum: int or float
+    :param maximum: largest number
+    :type maximum: int or float
+    :param nullable: whether to return the nullable integer type or the numpy integer type
+    :type nullable: bool
+
+    :return: name of the integer type
+    :rtype: str
+    """
+    integer_type = INTEGER_TYPES[-1]
+    for candidate in INTEGER_TYPES:
+        limits = np.iinfo(candidate.lower())
+        if limits.min <= minimum and maximum <= limits.max:
+            integer_type = candidate
+            break
+
+    return integer_type if nullable else integer_type.lower()
+
+
+def compact_numbers(numbers, dummy=DUMMY_NUMBER):
+    """
+    Convert numbers padded with a dummy value to the smallest nullable integer type. Strings are converted to
+    numbers, and those that are not numbers or equal to the dummy value become missing. With pandas older than
+    0.24 the numbers are converted to the smallest numpy integer type and the missing numbers are the dummy value.
+
+    :param numbers: numbers or strings
+    :type numbers: pandas.Series
+    :param dummy: value of the missing numbers
+    :type dummy: int
+
+    :return: nullable integers, or numpy integers padded with the dummy value
+    :rtype: pandas.Series
+    """
+    numbers = pd.to_numeric(numbers, errors='coerce')
+    numbers = numbers.mask(numbers == dummy)
+
+    # the fractions are dropped as when converting to 32 bit integers
+    numbers = np.trunc(numbers.astype(np.float64))
+
+    # the type must also hold the dummy value, so that the linkers can put it back
+    limits = [dummy] + ([numbers.min(), numbers.max()] if numbers.count() > 0 else [])
+
+    integer_type = smallest_integer_type(min(limits), max(limits), nullable=NULLABLE_INTEGERS)
+
+    if not NULLABLE_INTEGERS:
+        # numpy integers cannot be missing
+        numbers = numbers.fillna(dummy)
+
+    return numbers.astype(integer_type)
+
+
+def compact_types(data, categorical_columns=(), number_columns=(), string_columns=None, dummy=DUMMY_NUMBER):
+    """
+    Store the columns of a data frame with compact types. The columns that are not present are skipped.
+
+    :param data: data frame, updated in place
+    :type data: pandas.DataFrame
+    :param categorical_columns: names of the low-cardinality columns to store as categoricals
+    :type categorical_columns: iterable
+    :param number_columns: names of the columns of numbers padded with the dummy value
+    :type number_columns: iterable
+    :param string_columns: names of the columns to store as Arrow-backed strings, if None all the other columns
+                           holding only strings
+    :type string_columns: iterable or None
+    :param dummy: value of the missing numbers
+    :type dummy: int
+
+    :return: the data with compact column types
+    :rtype: pandas.DataFrame
+    """
+    categorical_columns = [column for column in categorical_columns if column in data.columns]
+    number_columns = [column for column in number_columns if column in data.columns]
+
+    for column in number_columns:
+        data[column] = compact_numbers(data[column], dummy=dummy)
+
+    for column in categorical_columns:
+        data[column] = data[column].astype('category')
+
+    string_type = arrow_string_type()
+    if string_type is not None:
+        if string_columns is None:
+            string_columns = [column for column in data.columns if column not in categorical_columns and
+                              column not in number_columns and
+                              pd.api.types.infer_dtype(data[column], skipna=True) == 'string']
+
+        for column in string_columns:
+            if column in data.columns:
+                data[column] = data[column].astype(string_type)
+
+    return data
+
+
+def fill_dummy_numbers(data, number_columns, dummy=DUMMY_NUMBER):
+    """
+    Put the dummy value back to the missing numbers of nullable integer columns, so that they are compared like
+    the padded 32 bit integers. The column types are kept, and the numpy integer columns of pandas older than
+    0.24 already hold the dummy value.
+
+    :param data: data frame, updated in place
+    :type data: pandas.DataFrame
+    :param number_columns: names of the columns of numbers padded with the dummy value
+    :type number_columns: iterable
+    :param dummy: value of the missing numbers
+    :type dummy: int
+
+    :return: the data without missing values in the number columns
+    :rtype: pandas.DataFrame
+    """
+    for column in number_columns:
+        if column in data.columns and str(data[column].dtype) in INTEGER_TYPES and data[column].isnull().any():
+            data[column] = data[column].fillna(dummy)
+
+    return data
@@ -0,0 +1,239 @@
+"""
+ONS Address Index - Comparison Cache
+====================================
+
+This file contains a Comparison Cache class, which keeps the comparison vectors of the candidate pairs over the
+blocking modes of a linking run, and a Cached Comparison class, which has the interface of the Compare class of
+recordlinkage and computes only what the cache does not hold.
+
+The blocking cascade runs the modes in turn for the addresses that the earlier modes did not match, each mode
+blocking on looser keys. The pairs of a looser mode, e.g. postcode only, include many of the pairs that a
+tighter mode, e.g. postcode and street name, has already compared. A comparison, i.e. the method, the columns
+and the arguments, gives the same value for a pair in every mode, so the cache stores the value of each pair for
+each comparison, and a later mode computes only the pairs that are new to a comparison. A comparison that a mode
+adds, e.g. that of the full postcode, is computed for all the pairs of that mode.
+
+The cache pays off when the comparisons are computed pair by pair, as in recordlinkage. The Comparison Engine
+computes each distinct string pair only once, which is faster than looking the pairs up in the cache.
+
+The pairs are kept once, in the order they were first seen, as 64 bit integer keys combining the position of
+the AddressBase row with a code of the address to be linked, which are faster to look up than the pairs of
+labels. The values of each comparison are kept in an array aligned to the keys, with a mask of the pairs where
+the value has been computed. The cache refers to the rows of the data it has been filled with, so it must not
+be used after the data change, e.g. for the next run.
+
+
+Requirements
+------------
+
+:requires: numpy (tested with 1.11.3)
+:requires: pandas (tested with 0.19.2)
+
+
+Version
+-------
+
+:version: 0.2
+:date: 17-Oct-2026
+"""
+import numpy as np
+import pandas as pd
+
+
+class ComparisonCache:
+    """
+    Stores the values of the comparisons of the candidate pairs, pair by pair.
+    """
+
+    def __init__(self):
+        """
+        Class constructor.
+        """
+        self.size_a = None
+        self.labels_b = None
+        self.keys = pd.Index([], dtype=np.int64)
+        self.values = {}
+        self.computed = {}
+        self.counts = dict(reused=0, computed=0)
+
+    def _locate(self, pairs, df_a):
+        """
+        Find the positions of the pairs in the cache, adding those that are not in it.
+
+        :param pairs: candidate pairs, the first level refers to the addresses to be linked and the second to df_a
+        :type pairs: pandas.MultiIndex
+        :param df_a: data, usually AddressBase, which must be the same for all the pairs of the cache
+        :type df_a: pandas.DataFrame
+
+        :return: positions of the pairs
+        :rtype: numpy.ndarray
+        """
+        if self.size_a is None:
+            self.size_a = len(df_a.index)
+            self.labels_b = pairs.levels[0][:0]
+        elif self.size_a != len(df_a.index):
+            raise ValueError('The comparison cache has been filled with a different {}'.format(df_a.index.name))
+
+        # the addresses to be linked are coded in the order they were first seen
+        labels_b = pairs.get_level_values(0)
+        codes_b = self.labels_b.get_indexer(labels_b)
+        if (codes_b < 0).any():
+            self.labels_b = self.labels_b.append(labels_b[codes_b < 0].unique())
+            codes_b = self.labels_b.get_indexer(labels_b)
+
+        keys = codes_b.astype(np.int64) * self.size_a + df_a.index.get_indexer(pairs.get_level_values(1))
+        positions = self.keys.get_indexer(keys)
+        new = positions < 0
+
+        if new.any():
+            size = len(self.keys)
+            self.keys = self.keys.append(pd.Index(keys[new]))
+            positions[new] = np.arange(size, len(self.keys))
+
+            added = len(self.keys) - size
+            for signature in self.values:
+                self.values[signature] = np.concatenate([self.values[signature], np.full(added, np.nan)])
+                self.computed[signature] = np.concatenate([self.computed[signature], np.zeros(added, dtype=bool)])
+
+        return positions
+
+    def fill(self, compare_class, pairs, df_a, df_b, comparisons):
+        """
+        Compute the comparisons of the pairs that are not in the cache, and get the comparison vectors of all the
+        pairs from the cache.
+
+        :param compare_class: class computing the comparisons, e.g. recordlinkage.Compare or ComparisonEngine
+        :type compare_class: type
+        :param pairs: candidate pairs, the first level refers to the index of df_b and the second to df_a
+        :type pairs: pandas.MultiIndex
+        :param df_a: data, usually AddressBase, compared by the first column of each comparison
+        :type df_a: pandas.DataFrame
+        :param df_b: data, usually the addresses to be linked, compared by the second column of each comparison
+        :type df_b: pandas.DataFrame
+        :param comparisons: the comparisons as the name of the compare_class method, the columns, the name of the
+                            comparison vector and the arguments of the method
+        :type comparisons: list
+
+        :return: the comparison vectors, and the compare_class instances that computed the missing values
+        :rtype: tuple(pandas.DataFrame, list)
+        """
+        positions = self._locate(pairs, df_a)
+
+        # group the comparisons by the pairs they need to compute, so that each group is compared in one go
+        groups = {}
+        for method, s1, s2, name, kwargs in comparisons:
+            signature = (method, s1, s2, tuple(sorted(kwargs.items())))
+            if signature not in self.values:
+                self.values[signature] = np.full(len(self.keys), np.nan)
+                self.computed[signature] = np.zeros(len(self.keys), dtype=bool)
+
+            needed = ~self.computed[signature][positions]
+            self.counts['reused'] += len(needed) - int(needed.sum())
+            self.counts['computed'] += int(needed.sum())
+
+            if needed.any():
+                group = groups.setdefault(needed.tobytes(), (needed, []))
+                group[1].append((method, s1, s2, signature, kwargs))
+
+        comparers = []
+        for needed, group in groups.values():
+            compare = compare_class(pairs[needed], df_a, df_b, batch=True)
+            for number, (method, s1, s2, signature, kwargs) in enumerate(group):
+                getattr(compare, method)(s1, s2, name='c{}'.format(number), **kwargs)
+            compare.run()
+            comparers.append(compare)
+
+            for number, (method, s1, s2, signature, kwargs) in enumerate(group):
+                self.values[signature][positions[needed]] = \
+                    compare.vectors['c{}'.format(number)].values.astype(np.float64)
+                self.computed[signature][positions[needed]] = True
+
+        vectors = pd.DataFrame({name: self.values[(method, s1, s2, tuple(sorted(kwargs.items())))][positions]
+                                for method, s1, s2, name, kwargs in comparisons}, index=pairs,
+                               columns=[name for method, s1, s2, name, kwargs in comparisons])
+
+        return vectors, comparers
+
+
+class CachedComparison:
+    """
+    Computes the comparison vectors of candidate pairs with the help of a Comparison Cache, see
+    recordlinkage.Compare. The comparisons are added with the string and numeric methods and computed with run.
+    """
+
+    def __init__(self, cache, compare_class, pairs, df_a=None, df_b=None):
+        """
+        Class constructor.
+
+        :param cache: the cache of the comparisons of the earlier blocking modes
+        :type cache: ComparisonCache
+        :param compare_class: class computing the comparisons that are not in the cache
+        :type compare_class: type
+        :param pairs: candidate pairs, the first level refers to the index of df_b and the second to df_a
+        :type pairs: pandas.MultiIndex
+        :param df_a: data, usually AddressBase, compared by the first column of each comparison
+        :type df_a: pandas.DataFrame
+        :param df_b: data, usually the addresses to be linked, compared by the second column of each comparison
+        :type df_b: pandas.DataFrame
+        """
+        self.cache = cache
+        self.compare_class = compare_class
+        self.pairs = pairs
+        self.df_a = df_a
+        self.df_b = df_b
+        self.vectors = pd.DataFrame(index=pairs)
+        self.comparisons = []
+        self.counts = dict(pairs=len(pairs), compared=0, reused=0, computed=0)
+
+    def string(self, s1, s2, name=None, **kwargs):
+        """
+        Add a string comparison, see the string method of the compare class.
+
+        :param s1: name of the column of df_a
+        :type s1: str
+        :param s2: name of the column of df_b
+        :type s2: str
+        :param name: name of the comparison vector, if None the number of the comparison
+        :type name: str or None
+        :param kwargs: arguments of the string method of the compare class
+        :type kwargs: dict
+
+        :return: None
+        """
+        self.comparisons.append(('string', s1, s2, len(self.comparisons) if name is None else name, kwargs))
+
+    def numeric(self, s1, s2, name=None, **kwargs):
+        """
+        Add a numeric comparison, see the numeric method of the compare class.
+
+        :param s1: name of the column of df_a
+        :type s1: str
+        :param s2: name of the column of df_b
+        :type s2: str
+        :param name: name of the comparison vector, if None the number of the comparison
+        :type name: str or None
+        :param kwargs: arguments of the numeric method of the compare class
+        :type kwargs: dict
+
+        :return: None
+        """
+        self.comparisons.append(('numeric', s1, s2, len(self.comparisons) if name is None else name, kwargs))
+
+    def run(self):
+        """
+        Compute the comparisons that are not in the cache and get the comparison vectors of all the pairs.
+
+        :return: the comparison vectors
+        :rtype: pandas.DataFrame
+        """
+        reused, computed = self.cache.counts['reused'], self.cache.counts['computed']
+
+        self.vectors, comparers = self.cache.fill(self.compare_class, self.pairs, self.df_a, self.df_b,
+                                                  self.comparisons)
+        self.comparisons = []
+
+        self.counts['reused'] += self.cache.counts['reused'] - reused
+        self.counts['computed'] += self.cache.counts['computed'] - computed
+        self.counts['compared'] += sum(getattr(compare, 'counts', {}).get('compared', 0) for compare in comparers)
+
+        return self.vectors
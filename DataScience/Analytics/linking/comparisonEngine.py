@@ -0,0 +1,407 @@
+"""
+ONS Address Index - Comparison Engine
+=====================================
+
+This file contains a Comparison Engine class, which computes the comparison vectors of the candidate pairs
+found by blocking. It replaces the Compare class of recordlinkage and has the same interface for the string
+and numeric comparisons that the linkers use.
+
+Many fields, e.g. the town names, localities, suffixes and postcode in and out codes, have only a few distinct
+values, so the same two strings are compared over and over again. The engine factorises both sides of each
+string column to integer codes and computes the Jaro-Winkler similarity only once for each distinct pair of
+codes, in batches with numpy, and broadcasts the similarities back to the pairs. Identical strings are not
+compared at all.
+
+The similarities are those of the C implementation of jellyfish 0.5.6, which recordlinkage uses: digits do not
+count towards the common prefix, and the number of transpositions is rounded down. As in recordlinkage, a pair
+with a missing value gets the missing value of the comparison, and a value that is not a string gets NaN.
+
+The engine is experimental: it matches recordlinkage on the synthetic addresses of the tests, but it has not
+been benchmarked on a real blocking pass against AddressBase, so the linkers do not use it by default.
+
+
+Requirements
+------------
+
+:requires: numpy (tested with 1.11.3)
+:requires: pandas (tested with 0.19.2)
+
+
+Version
+-------
+
+:version: 0.3
+:date: 17-Oct-2026
+"""
+import numpy as np
+import pandas as pd
+
+# number of distinct string pairs compared at a time
+BATCH_SIZE = 4096
+
+STRING_METHODS = ('jarowinkler', 'jaro_winkler', 'jaro')
+NUMERIC_METHODS = ('step', 'linear', 'squared')
+
+
+def jaro_winkler(ying, yang, winklerize=True):
+    """
+    Jaro-Winkler similarity of two strings, one pair at a time as in jellyfish. The reference for
+    jaro_winkler_batch.
+
+    :param ying: first string
+    :type ying: str
+    :param yang: second string
+    :type yang: str
+    :param winklerize: whether to boost the similarity of strings with a common prefix
+    :type winklerize: bool
+
+    :return: similarity between 0 and 1
+    :rtype: float
+    """
+    ying_length = len(ying)
+    yang_length = len(yang)
+    if not ying_length or not yang_length:
+        return 0.
+
+    max_length = max(ying_length, yang_length)
+    search_range = max(max_length // 2 - 1, 0)
+
+    # looking only within the search range, count and flag the matched pairs
+    ying_flags = [False] * ying_length
+    yang_flags = [False] * yang_length
+    common = 0
+    for i in range(ying_length):
+        for j in range(max(i - search_range, 0), min(i + search_range, yang_length - 1) + 1):
+            if not yang_flags[j] and yang[j] == ying[i]:
+                ying_flags[i] = yang_flags[j] = True
+                common += 1
+                break
+
+    if not common:
+        return 0.
+
+    # count the transpositions
+    ying_matched = [character for character, flag in zip(ying, ying_flags) if flag]
+    yang_matched = [character for character, flag in zip(yang, yang_flags) if flag]
+    transpositions = sum(a != b for a, b in zip(ying_matched, yang_matched)) // 2
+
+    weight = (common / ying_length + common / yang_length + (common - transpositions) / common) / 3.
+
+    # boost the weight for up to four common characters at the start, if the strings are similar
+    if winklerize and weight > 0.7 and ying_length > 3 and yang_length > 3:
+        prefix = 0
+        while prefix < 4 and ying[prefix] == yang[prefix] and not '0' <= ying[prefix] <= '9':
+            prefix += 1
+        weight += prefix * 0.1 * (1. - weight)
+
+    return weight
+
+
+def _code_points(strings, length, padding):
+    """
+    The code points of strings as an array, padded to the given length.
+
+    :param strings: strings
+    :type strings: numpy.ndarray
+    :param length: length of the longest string
+    :type length: int
+    :param padding: code of the padding, not a code point
+    :type padding: int
+
+    :return: code points, one string per row
+    :rtype: numpy.ndarray
+    """
+    codes = np.full((len(strings), length), padding, dtype=np.int32)
+    if length > 0:
+        padded = np.array(strings, dtype='U{}'.format(length))
+        codes[:] = padded.view(np.int32).reshape(len(strings), length)
+        codes[codes == 0] = padding
+
+    return codes
+
+
+def _jaro_winkler_batch(ying, yang, winklerize=True):
+    """
+    Jaro-Winkler similarities of a batch of string pairs, computed for all the pairs at once.
+
+    :param ying: first strings
+    :type ying: numpy.ndarray
+    :param yang: second strings
+    :type yang: numpy.ndarray
+    :param winklerize: whether to boost the similarity of strings with a common prefix
+    :type winklerize: bool
+
+    :return: similarities between 0 and 1
+    :rtype: numpy.ndarray
+    """
+    ying_lengths = np.fromiter((len(string) for string in ying), dtype=np.int64, count=len(ying))
+    yang_lengths = np.fromiter((len(string) for string in yang), dtype=np.int64, count=len(yang))
+    ying_codes = _code_points(ying, int(ying_lengths.max()) if len(ying_lengths) else 0, -1)
+    yang_codes = _code_points(yang, int(yang_lengths.max()) if len(yang_lengths) else 0, -2)
+
+    search_range = np.maximum(np.maximum(ying_lengths, yang_lengths) // 2 - 1, 0)
+    positions = np.arange(yang_codes.shape[1])
+
+    # flag the first unflagged match within the search range of each character of the first string in turn
+    ying_flags = np.zeros(ying_codes.shape, dtype=bool)
+    yang_flags = np.zeros(yang_codes.shape, dtype=bool)
+    for i in range(ying_codes.shape[1]):
+        window = (positions >= (i - search_range)[:, None]) & (positions <= (i + search_range)[:, None])
+        candidates = window & ~yang_flags & (yang_codes == ying_codes[:, i:i + 1])
+        rows = np.flatnonzero(candidates.any(axis=1))
+        yang_flags[rows, candidates[rows].argmax(axis=1)] = True
+        ying_flags[rows, i] = True
+
+    common = ying_flags.sum(axis=1)
+
+    # the matched characters in order, compared one by one
+    ying_order = np.argsort(~ying_flags, axis=1, kind='mergesort')
+    yang_order = np.argsort(~yang_flags, axis=1, kind='mergesort')
+    width = int(common.max()) if len(common) else 0
+    rows = np.arange(len(common))[:, None]
+    ying_matched = ying_codes[rows, ying_order[:, :width]]
+    yang_matched = yang_codes[rows, yang_order[:, :width]]
+    counted = np.arange(width) < common[:, None]
+    transpositions = ((ying_matched != yang_matched) & counted).sum(axis=1) // 2
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        weight = (common / ying_lengths + common / yang_lengths + (common - transpositions) / common) / 3.
+    weight[common == 0] = 0.
+
+    if winklerize:
+        boost = (weight > 0.7) & (ying_lengths > 3) & (yang_lengths > 3)
+        start = min(4, ying_codes.shape[1], yang_codes.shape[1])
+        same = (ying_codes[:, :start] == yang_codes[:, :start]) & \
+               ((ying_codes[:, :start] < ord('0')) | (ying_codes[:, :start] > ord('9')))
+        prefix = np.cumprod(same, axis=1).sum(axis=1)
+        weight = np.where(boost, weight + prefix * 0.1 * (1. - weight), weight)
+
+    return weight
+
+
+def jaro_winkler_batch(ying, yang, winklerize=True, batch_size=BATCH_SIZE):
+    """
+    Jaro-Winkler similarities of string pairs. Identical strings are not compared, and the others are compared
+    in batches of similar lengths.
+
+    :param ying: first strings
+    :type ying: numpy.ndarray
+    :param yang: second strings
+    :type yang: numpy.ndarray
+    :param winklerize: whether to boost the similarity of strings with a common prefix
+    :type winklerize: bool
+    :param batch_size: number of pairs compared at a time
+    :type batch_size: int
+
+    :return: similarities between 0 and 1, NaN if either value is not a string
+    :rtype: numpy.ndarray
+    """
+    ying = np.asarray(ying, dtype=object)
+    yang = np.asarray(yang, dtype=object)
+    similarities = np.full(len(ying), np.nan)
+
+    strings = np.fromiter((isinstance(a, str) and isinstance(b, str) for a, b in zip(ying, yang)), dtype=bool,
+                          count=len(ying))
+    identical = strings & (ying == yang)
+    similarities[identical] = [1. if len(string) else 0. for string in ying[identical]]
+
+    # batches of similar lengths, so that the strings are not padded much
+    rows = np.flatnonzero(strings & ~identical)
+    lengths = np.fromiter((max(len(ying[row]), len(yang[row])) for row in rows), dtype=np.int64, count=len(rows))
+    rows = rows[np.argsort(lengths, kind='mergesort')]
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        similarities[batch] = _jaro_winkler_batch(ying[batch], yang[batch], winklerize=winklerize)
+
+    return similarities
+
+
+class ComparisonEngine:
+    """
+    Computes the comparison vectors of candidate pairs, see recordlinkage.Compare. The comparisons are added
+    with the string and numeric methods and computed when they are added, or with run if batch is set.
+    """
+
+    def __init__(self, pairs, df_a=None, df_b=None, batch=False):
+        """
+        Class constructor.
+
+        :param pairs: candidate pairs, the first level refers to the index of df_b and the second to df_a
+        :type pairs: pandas.MultiIndex
+        :param df_a: data, usually AddressBase, compared by the first column of each comparison
+        :type df_a: pandas.DataFrame
+        :param df_b: data, usually the addresses to be linked, compared by the second column of each comparison
+        :type df_b: pandas.DataFrame
+        :param batch: whether to compute the comparisons only when run is called
+        :type batch: bool
+        """
+        self.pairs = pairs
+        self.df_a = df_a
+        self.df_b = df_b
+        self.batch = batch
+        self.vectors = pd.DataFrame(index=pairs)
+        self.comparisons = []
+        self.counts = dict(pairs=len(pairs), compared=0)
+
+        # the distinct rows of each side in the pairs, and the pairs as positions to these rows
+        self._rows_a, self._pairs_a = np.unique(df_a.index.get_indexer(pairs.get_level_values(1)),
+                                                return_inverse=True)
+        self._rows_b, self._pairs_b = np.unique(df_b.index.get_indexer(pairs.get_level_values(0)),
+                                                return_inverse=True)
+
+    def _add(self, function, s1, s2, name, kwargs):
+        """
+        Compute a comparison, or keep it for run if batch is set.
+
+        :param function: the comparison method
+        :type function: callable
+        :param s1: name of the column of df_a
+        :type s1: str
+        :param s2: name of the column of df_b
+        :type s2: str
+        :param name: name of the comparison vector, if None the number of the comparison
+        :type name: str or None
+        :param kwargs: arguments of the comparison method
+        :type kwargs: dict
+
+        :return: None
+        """
+        if name is None:
+            name = len(self.vectors.columns) + len(self.comparisons)
+
+        self.comparisons.append((function, s1, s2, name, kwargs))
+        if not self.batch:
+            self.run()
+
+    def string(self, s1, s2, method='jarowinkler', threshold=None, missing_value=0, name=None):
+        """
+        Compare strings with the Jaro or the Jaro-Winkler similarity.
+
+        :param s1: name of the column of df_a
+        :type s1: str
+        :param s2: name of the column of df_b
+        :type s2: str
+        :param method: jarowinkler or jaro
+        :type method: str
+        :param threshold: if given, the similarity is 1 if at least the threshold and 0 otherwise
+        :type threshold: float or None
+        :param missing_value: the value of the pairs where either value is missing
+        :type missing_value: float
+        :param name: name of the comparison vector
+        :type name: str
+
+        :return: None
+        """
+        if method not in STRING_METHODS:
+            raise ValueError('Unknown string comparison method {}, use one of {}'.format(method, STRING_METHODS))
+
+        self._add(self._compare_strings, s1, s2, name,
+                  dict(winklerize=method != 'jaro', threshold=threshold, missing_value=missing_value))
+
+    def numeric(self, s1, s2, threshold=None, method='step', missing_value=0, name=None):
+        """
+        Compare numbers with the distance of their difference from a threshold, as recordlinkage.
+
+        :param s1: name of the column of df_a
+        :type s1: str
+        :param s2: name of the column of df_b
+        :type s2: str
+        :param threshold: the half width of the difference scoring above 0, or a tuple of the limits
+        :type threshold: float or tuple
+        :param method: step, linear or squared
+        :type method: str
+        :param missing_value: the value of the pairs where either value is missing
+        :type missing_value: float
+        :param name: name of the comparison vector
+        :type name: str
+
+        :return: None
+        """
+        if method not in NUMERIC_METHODS:
+            raise ValueError('Unknown numeric comparison method {}, use one of {}'.format(method, NUMERIC_METHODS))
+
+        self._add(self._compare_numbers, s1, s2, name,
+                  dict(threshold=threshold, method=method, missing_value=missing_value))
+
+    def run(self):
+        """
+        Compute the comparisons that have been added.
+
+        :return: the comparison vectors
+        :rtype: pandas.DataFrame
+        """
+        for function, s1, s2, name, kwargs in self.comparisons:
+            self.vectors[name] = function(self.df_a[s1].iloc[self._rows_a], self.df_b[s2].iloc[self._rows_b],
+                                          **kwargs)
+        self.comparisons = []
+
+        return self.vectors
+
+    def _compare_strings(self, values_a, values_b, winklerize=True, threshold=None, missing_value=0):
+        """
+        Compare the strings of each distinct pair of values once.
+
+        :param values_a: values of the distinct rows of df_a in the pairs
+        :type values_a: pandas.Series
+        :param values_b: values of the distinct rows of df_b in the pairs
+        :type values_b: pandas.Series
+
+        :return: similarities of the pairs
+        :rtype: numpy.ndarray
+        """
+        codes_a, distinct_a = pd.factorize(values_a)
+        codes_b, distinct_b = pd.factorize(values_b)
+        codes_a = codes_a[self._pairs_a]
+        codes_b = codes_b[self._pairs_b]
+
+        # the distinct pairs of codes, where neither value is missing
+        present = (codes_a >= 0) & (codes_b >= 0)
+        combined, distinct_pairs = pd.factorize(codes_a[present].astype(np.int64) * len(distinct_b) + codes_b[present])
+        distinct_pairs_a = distinct_pairs // max(len(distinct_b), 1)
+        distinct_pairs_b = distinct_pairs % max(len(distinct_b), 1)
+
+        distinct_similarities = jaro_winkler_batch(np.asarray(distinct_a, dtype=object)[distinct_pairs_a],
+                                                   np.asarray(distinct_b, dtype=object)[distinct_pairs_b],
+                                                   winklerize=winklerize)
+        self.counts['compared'] += len(distinct_similarities)
+
+        if threshold is not None:
+            distinct_similarities = (distinct_similarities >= threshold).astype(np.float64)
+
+        similarities = np.full(len(present), missing_value, dtype=np.float64)
+        similarities[present] = distinct_similarities[combined]
+
+        return similarities
+
+    def _compare_numbers(self, values_a, values_b, threshold=None, method='step', missing_value=0):
+        """
+        Compare the numbers of each pair.
+
+        :param values_a: values of the distinct rows of df_a in the pairs
+        :type values_a: pandas.Series
+        :param values_b: values of the distinct rows of df_b in the pairs
+        :type values_b: pandas.Series
+
+        :return: similarities of the pairs
+        :rtype: numpy.ndarray
+        """
+        threshold_left, threshold_right = threshold if isinstance(threshold, (list, tuple)) \
+            else (-threshold, threshold)
+        a = threshold_right + threshold_left
+        b = 2. / (threshold_right - threshold_left)
+
+        numbers_a = pd.to_numeric(values_a).fillna(np.nan).values.astype(np.float64)[self._pairs_a]
+        numbers_b = pd.to_numeric(values_b).fillna(np.nan).values.astype(np.float64)[self._pairs_b]
+        distance = (numbers_b - numbers_a) - a
+
+        if method == 'step':
+            # a missing number is not within the threshold, as in recordlinkage
+            similarities = (np.abs(distance * b) <= 1).astype(np.float64)
+        elif method == 'linear':
+            similarities = np.maximum(1 - np.abs(distance * b), 0)
+        else:
+            similarities = np.maximum(1 - distance ** 2 * b ** 2, 0)
+
+        similarities[np.isnan(similarities)] = missing_value
+
+        return similarities
@@ -0,0 +1,136 @@
+"""
+ONS Address Index - London Localities
+=====================================
+
+This file contains a London Localities class that moves London localities, which the probabilistic parser
+has parsed as a part of the street name, from the street name to the locality.
+
+The localities are read once and held in a suffix set. A street name ends with a locality if its last
+characters, as many as there are in the locality, are a locality, hence each street name needs only one
+lookup per distinct locality length instead of a comparison against every locality.
+
+The localities are matched as plain character suffixes and removed in the order of the data file, the last
+locality removed being recorded, as in the original implementation in _fix_reference. The order matters as
+some localities end with another e.g. NEW ELTHAM and ELTHAM.
+
+
+Requirements
+------------
+
+:requires: pandas (tested with 0.19.2, only for reading the data file)
+
+
+Version
+-------
+
+:version: 0.1
+:date: 17-Oct-2026
+"""
+import os
+
+
+class LondonLocalities:
+    """
+    Moves London localities from the end of the street name to the locality.
+    """
+
+    def __init__(self, localities):
+        """
+        Class constructor.
+
+        :param localities: London localities in the order they are removed
+        :type localities: list
+        """
+        self.localities = list(localities)
+
+        # positions of each locality in the list, a locality can only be removed after those before it
+        self._positions = {}
+        for position, locality in enumerate(self.localities):
+            self._positions.setdefault(locality, []).append(position)
+
+        self._lengths = sorted({len(locality) for locality in self.localities if locality})
+
+    @classmethod
+    def from_file(cls, directory, datafile='localities.csv'):
+        """
+        Create the London localities from a data file.
+
+        :param directory: location of the data file
+        :type directory: str
+        :param datafile: name of the data file containing a column locality
+        :type datafile: str
+
+        :return: the London localities
+        :rtype: LondonLocalities
+        """
+        import pandas as pd
+
+        return cls(pd.read_csv(os.path.join(directory, datafile))['locality'])
+
+    def _next_locality(self, street_name, after):
+        """
+        Find the first locality after the given position in the list that the street name ends with.
+
+        :param street_name: stripped street name
+        :type street_name: str
+        :param after: position in the list of localities, only the localities after it are considered
+        :type after: int
+
+        :return: position of the locality or None if the street name does not end with any of them
+        :rtype: int or None
+        """
+        found = None
+        for length in self._lengths:
+            if length > len(street_name):
+                break
+
+            for position in self._positions.get(street_name[-length:], ()):
+                if position > after:
+                    if found is None or position < found:
+                        found = position
+                    break
+
+        return found
+
+    def fix(self, parsed):
+        """
+        If the street name ends with a London locality then move it to the locality and remove it from the
+        street name.
+
+        :param parsed: a dictionary containing the address tokens that have been parsed
+        :type parsed: dict
+
+        :return: a dictionary containing the address tokens with updated information
+        :rtype: dict
+        """
+        street_name = parsed['StreetName'].strip()
+
+        position = self._next_locality(street_name, -1)
+        while position is not None:
+            locality = self.localities[position]
+            parsed['Locality'] = locality
+            # take the last part out, so that e.g. CHINGFORD AVENUE CHINGFORD is correctly processed
+            street_name = street_name[:-len(locality)].strip()
+            parsed['StreetName'] = street_name
+
+            position = self._next_locality(street_name, position)
+
+        return parsed
+
+    def _fix_reference(self, parsed):
+        """
+        The original implementation, which compared the street name against every locality. Used to test and
+        benchmark the suffix set.
+
+        :param parsed: a dictionary containing the address tokens that have been parsed
+        :type parsed: dict
+
+        :return: a dictionary containing the address tokens with updated information
+        :rtype: dict
+        """
+        for LondonLocality in self.localities:
+            if parsed['StreetName'].strip().endswith(LondonLocality):
+                parsed['Locality'] = LondonLocality
+                parsed['StreetName'] = parsed['StreetName'].strip()[:-len(LondonLocality)].strip()
+
+        return parsed
@@ -0,0 +1,526 @@
+#!/usr/bin/env python
+"""
+ONS Address Index - Address Parser Service
+==========================================
+
+A small asyncio HTTP/JSON service around the Address Parser, so that other processes can parse
+single addresses without loading the CRF model and the lookup tables themselves.
+
+Concurrent requests are collected into micro-batches: the first request of a batch waits at most
+the batch window for other requests to arrive, after which the whole batch is normalised, tagged
+and post-processed in one pass. Tagging runs in a single worker thread, so that the event loop keeps
+accepting requests while a batch is being parsed and the next batch is collected at the same time.
+
+The service keeps latency and throughput counters, which are available from the stats end point.
+Latencies are measured from the arrival of a request to the moment its result is ready, hence include
+the time spent waiting for the batch to fill and for the previous batch to finish.
+
+
+End Points
+----------
+
+``POST /parse``
+    Body ``{"address": "..."}`` returns ``{"address": "...", "components": {...}}``, while
+    ``{"addresses": ["...", ...]}`` returns ``{"results": [...]}``. The addresses of a single request
+    can end up in several batches.
+
+``GET /stats``
+    Number of requests, errors and batches, the mean batch size, the throughput in addresses per
+    second, and the p50, p95, and p99 latencies in milliseconds.
+
+
+Running
+-------
+
+After all requirements are satisfied, the service can be started using CPython interpreter::
+
+    python parserService.py --port 8080 --window 5 --max-batch-size 256
+
+and benchmarked with parserServiceLoad.py.
+
+
+Requirements
+------------
+
+:requires: pandas (tested with 0.19.2)
+:requires: ProbabilisticParser (a CRF model specifically build for ONS)
+
+
+Version
+-------
+
+:version: 0.2
+:date: 17-Oct-2026
+"""
+import argparse
+import asyncio
+import collections
+import json
+import logging
+import math
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# components returned for each address, the parsed components followed by those derived in post-processing
+COMPONENTS = ['OrganisationName', 'DepartmentName', 'SubBuildingName', 'BuildingName', 'BuildingNumber',
+              'StreetName', 'Locality', 'TownName', 'Postcode', 'County', 'postcode_in', 'postcode_out',
+              'PAOstartNumber', 'PAOendNumber', 'PAOstartSuffix', 'PAOendSuffix',
+              'SAOStartNumber', 'SAOEndNumber', 'SAOStartSuffix', 'SAOEndSuffix']
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+
+def percentiles(values, quantiles=(50, 95, 99)):
+    """
+    Compute the nearest-rank percentiles of the given values.
+
+    :param values: values e.g. latencies
+    :type values: iterable
+    :param quantiles: percentiles to compute, between 0 and 100
+    :type quantiles: tuple
+
+    :return: the percentiles in the same order as the quantiles, None if there are no values
+    :rtype: list
+    """
+    values = sorted(values)
+    if not values:
+        return [None] * len(quantiles)
+
+    return [values[max(int(math.ceil(quantile / 100. * len(values))) - 1, 0)] for quantile in quantiles]
+
+
+class LatencyStats:
+    """
+    Latency and throughput counters of the service. Percentiles are computed from the latencies of
+    the most recent requests.
+    """
+
+    def __init__(self, window=100000):
+        """
+        Class constructor.
+
+        :param window: number of the most recent latencies kept for the percentiles
+        :type window: int
+        """
+        self.latencies = collections.deque(maxlen=window)
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+        self.started = time.perf_counter()
+
+    def record_batch(self, size, latencies=(), failed=False):
+        """
+        Record a parsed batch.
+
+        :param size: number of addresses in the batch
+        :type size: int
+        :param latencies: latency of each address in seconds
+        :type latencies: iterable
+        :param failed: whether parsing the batch failed
+        :type failed: bool
+
+        :return: None
+        """
+        self.batches += 1
+        self.requests += size
+        if failed:
+            self.errors += size
+        self.latencies.extend(latencies)
+
+    def summary(self):
+        """
+        Summarise the counters.
+
+        :return: number of requests, errors and batches, mean batch size, throughput in addresses per second
+                 since the start, and the p50, p95 and p99 latencies in milliseconds
+        :rtype: dict
+        """
+        elapsed = time.perf_counter() - self.started
+        p50, p95, p99 = [None if value is None else 1000. * value for value in percentiles(self.latencies)]
+
+        return dict(requests=self.requests, errors=self.errors, batches=self.batches,
+                    mean_batch_size=self.requests / self.batches if self.batches else 0.,
+                    throughput=self.requests / elapsed if elapsed > 0 else 0.,
+                    p50=p50, p95=p95, p99=p99)
+
+
+class MicroBatcher:
+    """
+    Collects concurrently submitted addresses into batches and passes each batch to a handler,
+    which is run in a single worker thread.
+    """
+
+    def __init__(self, handler, window=0.005, max_batch_size=256, stats=None):
+        """
+        Class constructor.
+
+        :param handler: function that takes a list of addresses and returns a list of results in the same order
+        :type handler: callable
+        :param window: maximum time in seconds the first address of a batch waits for others
+        :type window: float
+        :param max_batch_size: maximum number of addresses in a batch
+        :type max_batch_size: int
+        :param stats: counters to update, if None new counters are created
+        :type stats: LatencyStats or None
+        """
+        self.handler = handler
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.stats = LatencyStats() if stats is None else stats
+
+        self._queue = None
+        self._task = None
+        self._executor = None
+
+    def start(self):
+        """
+        Start collecting batches, must be called from a running event loop.
+
+        :return: None
+        """
+        self._queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        """
+        Stop collecting batches and shut down the worker thread.
+
+        :return: None
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def submit(self, address):
+        """
+        Submit an address to the next batch and wait for its result.
+
+        :param address: the address to parse
+        :type address: str
+
+        :return: result of the handler for the address
+        """
+        future = asyncio.get_event_loop().create_future()
+        self._queue.put_nowait((address, future, time.perf_counter()))
+
+        return await future
+
+    async def _collect(self):
+        """
+        Wait for the first address, then collect more until the window closes or the batch is full.
+
+        :return: (address, future, arrival time) of each address in the batch
+        :rtype: list
+        """
+        batch = [await self._queue.get()]
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + self.window
+
+        while len(batch) < self.max_batch_size:
+            # take the requests that arrived while the previous batch was being parsed without waiting
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self):
+        """
+        Collect and parse batches until cancelled.
+
+        :return: None
+        """
+        loop = asyncio.get_event_loop()
+        while True:
+            batch = await self._collect()
+            addresses = [address for address, _, _ in batch]
+
+            try:
+                results = await loop.run_in_executor(self._executor, self.handler, addresses)
+            except Exception as error:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(error)
+                self.stats.record_batch(len(batch), failed=True)
+                continue
+
+            finished = time.perf_counter()
+            for (_, future, arrived), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+            self.stats.record_batch(len(batch), [finished - arrived for _, _, arrived in batch])
+
+
+class AddressParserHandler:
+    """
+    Parses a batch of addresses with the Address Parser, i.e. normalisation, probabilistic parsing
+    and post-processing, and returns the components of each address.
+    """
+
+    def __init__(self, address_parser=None, log=None):
+        """
+        Class constructor.
+
+        :param address_parser: the parser, if None an Address Parser parsing in the calling thread is created
+        :type address_parser: AddressParser or None
+        :param log: logger of the parser
+        :type log: logging.Logger or None
+        """
+        import pandas as pd
+        from Analytics.linking.addressParser import AddressParser
+
+        if address_parser is None:
+            address_parser = AddressParser(log=log, parserWorkers=1, progressBar=False)
+
+        self._pd = pd
+        self.address_parser = address_parser
+
+    def __call__(self, addresses):
+        """
+        Parse the given addresses.
+
+        :param addresses: address strings
+        :type addresses: list
+
+        :return: a dictionary of components for each address, missing components are None
+        :rtype: list
+        """
+        data = self.address_parser.parse(self._pd.DataFrame({'ADDRESS': addresses}))
+        columns = [column for column in COMPONENTS if column in data.columns]
+
+        return [{column: None if self._pd.isnull(value) else value for column, value in zip(columns, row)}
+                for row in data[columns].itertuples(index=False, name=None)]
+
+
+class ParserService:
+    """
+    A minimal HTTP/1.1 JSON server, supporting keep-alive connections, that passes the addresses
+    to a micro-batcher.
+    """
+
+    def __init__(self, handler=None, window=0.005, max_batch_size=256, log=None):
+        """
+        Class constructor.
+
+        :param handler: function that parses a list of addresses, if None an AddressParserHandler is used
+        :type handler: callable or None
+        :param window: maximum time in seconds the first address of a batch waits for others
+        :type window: float
+        :param max_batch_size: maximum number of addresses in a batch
+        :type max_batch_size: int
+        :param log: logger
+        :type log: logging.Logger or None
+        """
+        self.log = logging.getLogger(__name__) if log is None else log
+
+        if handler is None:
+            handler = AddressParserHandler(log=self.log.getChild('parser'))
+
+        self.batcher = MicroBatcher(handler, window=window, max_batch_size=max_batch_size)
+        self.server = None
+
+    @property
+    def stats(self):
+        """
+        Latency and throughput counters of the service.
+
+        :rtype: LatencyStats
+        """
+        return self.batcher.stats
+
+    async def start(self, host='127.0.0.1', port=8080):
+        """
+        Start the micro-batcher and listen for connections.
+
+        :param host: address to bind to
+        :type host: str
+        :param port: port to listen, 0 picks a free port
+        :type port: int
+
+        :return: the port the service listens to
+        :rtype: int
+        """
+        self.batcher.start()
+        self.server = await asyncio.start_server(self._handle_connection, host, port)
+        port = self.server.sockets[0].getsockname()[1]
+        self.log.info('Address parser service listening on {}:{}'.format(host, port))
+
+        return port
+
+    async def stop(self):
+        """
+        Stop listening and parsing.
+
+        :return: None
+        """
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+        await self.batcher.stop()
+
+    async def _parse(self, request):
+        """
+        Parse the addresses of a request.
+
+        :param request: decoded JSON body with a key address or addresses
+        :type request: dict
+
+        :return: the response body
+        :rtype: dict
+        """
+        if isinstance(request.get('address'), str):
+            return dict(address=request['address'], components=await self.batcher.submit(request['address']))
+
+        addresses = request.get('addresses')
+        if isinstance(addresses, list) and all(isinstance(address, str) for address in addresses):
+            results = await asyncio.gather(*[self.batcher.submit(address) for address in addresses])
+            return dict(results=[dict(address=address, components=components)
+                                 for address, components in zip(addresses, results)])
+
+        raise ValueError('The body should contain a string "address" or a list of strings "addresses"')
+
+    async def _respond(self, method, path, body):
+        """
+        Route a request.
+
+        :param method: HTTP method
+        :type method: str
+        :param path: requested path
+        :type path: str
+        :param body: request body
+        :type body: bytes
+
+        :return: status code and response body
+        :rtype: tuple
+        """
+        if path == '/stats':
+            return (200, self.stats.summary()) if method == 'GET' else (405, dict(error='Use GET'))
+
+        if path != '/parse':
+            return 404, dict(error='Unknown path {}'.format(path))
+        if method != 'POST':
+            return 405, dict(error='Use POST')
+
+        try:
+            request = json.loads(body.decode('utf-8'))
+            if not isinstance(request, dict):
+                raise ValueError('The body should be a JSON object')
+        except ValueError as error:
+            return 400, dict(error=str(error))
+
+        try:
+            return 200, await self._parse(request)
+        except ValueError as error:
+            return 400, dict(error=str(error))
+        except Exception as error:
+            self.log.exception('Parsing failed')
+            return 500, dict(error=repr(error))
+
+    async def _handle_connection(self, reader, writer):
+        """
+        Serve the requests of a single connection until the client closes it.
+
+        :param reader: stream of the connection
+        :type reader: asyncio.StreamReader
+        :param writer: stream of the connection
+        :type writer: asyncio.StreamWriter
+
+        :return: None
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+
+                method, path, version = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+                status, response = await self._respond(method, path, body)
+
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                payload = json.dumps(response).encode('utf-8')
+                writer.write('HTTP/1.1 {} {}\r\nContent-Type: application/json\r\nContent-Length: {}\r\n'
+                             'Connection: {}\r\n\r\n'.format(status, _REASONS[status], len(payload),
+                                                             'keep-alive' if keep_alive else 'close')
+                             .encode('latin-1') + payload)
+                await writer.drain()
+
+                if not keep_alive:
+                    break
+        except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+            # malformed request or the client went away, nothing to respond to
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host='127.0.0.1', port=8080, window=0.005, max_batch_size=256, log=None):
+    """
+    Run the service until cancelled.
+
+    :param host: address to bind to
+    :type host: str
+    :param port: port to listen
+    :type port: int
+    :param window: maximum time in seconds the first address of a batch waits for others
+    :type window: float
+    :param max_batch_size: maximum number of addresses in a batch
+    :type max_batch_size: int
+    :param log: logger
+    :type log: logging.Logger or None
+
+    :return: None
+    """
+    service = ParserService(window=window, max_batch_size=max_batch_size, log=log)
+    await service.start(host, port)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await service.stop()
+
+
+if __name__ == "__main__":
+    arguments = argparse.ArgumentParser(description='Address parser service')
+    arguments.add_argument('--host', default='127.0.0.1')
+    arguments.add_argument('--port', type=int, default=8080)
+    arguments.add_argument('--window', type=float, default=5., help='batch window in milliseconds')
+    arguments.add_argument('--max-batch-size', type=int, default=256)
+    arguments = arguments.parse_args()
+
+    logging.basicConfig(stream=sys.stdout, level=logging.INFO)
+    # the address parser logs every batch
+    logging.getLogger(__name__).getChild('parser').setLevel(logging.WARNING)
+    loop = asyncio.get_event_loop()
+    try:
+        loop.run_until_complete(serve(arguments.host, arguments.port, arguments.window / 1000.,
+                                      arguments.max_batch_size))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        loop.close()
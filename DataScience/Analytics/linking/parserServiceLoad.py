@@ -0,0 +1,312 @@
+#!/usr/bin/env python
+"""
+ONS Address Index - Address Parser Service Load Generator
+=========================================================
+
+A load generator to benchmark the address parser service on a single machine. A number of concurrent
+clients, each with its own keep-alive connection, send single address requests back to back. Reports
+the client side p50, p95 and p99 latencies and the throughput, together with the counters of the
+service e.g. the mean batch size.
+
+The service can either be started separately, or in a subprocess with the spawn option, in which case
+the batch window and maximum batch size are passed to the service. Note that on a single machine the
+load generator competes with the service for the CPU.
+
+
+Running
+-------
+
+After all requirements are satisfied, the script can be invoked using CPython interpreter::
+
+    python parserServiceLoad.py --spawn --concurrency 32 --requests 20000 --window 5
+
+or against a running service::
+
+    python parserServiceLoad.py --port 8080 --concurrency 32 --addresses addresses.txt
+
+
+Requirements
+------------
+
+:requires: ProbabilisticParser (only for the synthetic addresses)
+
+
+Version
+-------
+
+:version: 0.2
+:date: 17-Oct-2026
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from Analytics.linking.parserService import percentiles
+
+
+class _Client:
+    """
+    A client with a single keep-alive connection to the service.
+    """
+
+    def __init__(self, host, port):
+        """
+        Class constructor.
+
+        :param host: address of the service
+        :type host: str
+        :param port: port of the service
+        :type port: int
+        """
+        self.host = host
+        self.port = port
+        self._reader = None
+        self._writer = None
+
+    async def request(self, method, path, body=None):
+        """
+        Send a request and wait for the response.
+
+        :param method: HTTP method
+        :type method: str
+        :param path: path of the end point
+        :type path: str
+        :param body: request body, encoded as JSON
+        :type body: dict or None
+
+        :return: status code and the decoded response body
+        :rtype: tuple
+        """
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+
+        payload = b'' if body is None else json.dumps(body).encode('utf-8')
+        self._writer.write('{} {} HTTP/1.1\r\nHost: {}\r\nContent-Type: application/json\r\nContent-Length: {}\r\n\r\n'
+                           .format(method, path, self.host, len(payload)).encode('latin-1') + payload)
+        await self._writer.drain()
+
+        status = int((await self._reader.readline()).split()[1])
+        headers = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        response = json.loads((await self._reader.readexactly(int(headers['content-length']))).decode('utf-8'))
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+
+        return status, response
+
+    def close(self):
+        """
+        Close the connection.
+
+        :return: None
+        """
+        if self._writer is not None:
+            self._writer.close()
+            self._reader = self._writer = None
+
+
+async def _worker(client, addresses, position, latencies, errors):
+    """
+    Send requests until all addresses have been sent.
+
+    :param client: client of this worker
+    :type client: _Client
+    :param addresses: addresses to send
+    :type addresses: list
+    :param position: shared iterator over the indices of the addresses
+    :type position: iterator
+    :param latencies: list to append the latencies in seconds
+    :type latencies: list
+    :param errors: list to append the failed responses
+    :type errors: list
+
+    :return: None
+    """
+    for index in position:
+        start = time.perf_counter()
+        status, response = await client.request('POST', '/parse', dict(address=addresses[index]))
+        latencies.append(time.perf_counter() - start)
+        if status != 200:
+            errors.append(response)
+
+
+async def run_load(addresses, host='127.0.0.1', port=8080, concurrency=32):
+    """
+    Send each address as a single request from concurrent clients.
+
+    :param addresses: addresses to send
+    :type addresses: list
+    :param host: address of the service
+    :type host: str
+    :param port: port of the service
+    :type port: int
+    :param concurrency: number of concurrent clients
+    :type concurrency: int
+
+    :return: number of requests and errors, throughput in requests per second, the p50, p95 and p99
+             latencies in milliseconds seen by the clients, and the counters of the service
+    :rtype: dict
+    """
+    clients = [_Client(host, port) for _ in range(concurrency)]
+    latencies = []
+    errors = []
+    position = iter(range(len(addresses)))
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*[_worker(client, addresses, position, latencies, errors) for client in clients])
+        elapsed = time.perf_counter() - start
+        _, service = await clients[0].request('GET', '/stats')
+    finally:
+        for client in clients:
+            client.close()
+
+    p50, p95, p99 = [1000. * value for value in percentiles(latencies)]
+
+    return dict(requests=len(latencies), errors=len(errors), throughput=len(latencies) / elapsed,
+                p50=p50, p95=p95, p99=p99, service=service)
+
+
+def _free_port():
+    """
+    Find a free port on the local machine.
+
+    :return: port number
+    :rtype: int
+    """
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+async def _warm_up(host, port):
+    """
+    Parse a single address, so that the service loads the model and the lookup tables before measuring.
+
+    :param host: address of the service
+    :type host: str
+    :param port: port of the service
+    :type port: int
+
+    :return: status code of the response
+    :rtype: int
+    """
+    client = _Client(host, port)
+    try:
+        status, _ = await client.request('POST', '/parse', dict(address='1 HIGH STREET EX2 6GA'))
+    finally:
+        client.close()
+
+    return status
+
+
+def spawn_service(port, window, max_batch_size, timeout=120.):
+    """
+    Start the service in a subprocess and wait until it responds.
+
+    :param port: port for the service
+    :type port: int
+    :param window: batch window in milliseconds
+    :type window: float
+    :param max_batch_size: maximum number of addresses in a batch
+    :type max_batch_size: int
+    :param timeout: maximum time in seconds to wait for the service to start
+    :type timeout: float
+
+    :return: the service process
+    :rtype: subprocess.Popen
+    """
+    service = subprocess.Popen([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                             'parserService.py'),
+                                '--port', str(port), '--window', str(window), '--max-batch-size', str(max_batch_size)],
+                               stdout=subprocess.DEVNULL)
+
+    try:
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            if service.poll() is not None:
+                raise RuntimeError('The service exited with status {}'.format(service.returncode))
+            try:
+                status = asyncio.get_event_loop().run_until_complete(_warm_up('127.0.0.1', port))
+            except OSError:
+                # not listening yet
+                time.sleep(0.2)
+                continue
+            if status != 200:
+                raise RuntimeError('The service failed to parse, status {}'.format(status))
+            return service
+
+        raise RuntimeError('The service did not start in {} seconds'.format(timeout))
+    except BaseException:
+        service.terminate()
+        service.wait()
+        raise
+
+
+def _read_addresses(filename, n):
+    """
+    Read the addresses to send, one per line, or generate synthetic addresses if no file is given.
+
+    :param filename: name of the file or None
+    :type filename: str or None
+    :param n: number of addresses, the addresses of the file are repeated if needed
+    :type n: int
+
+    :return: addresses
+    :rtype: list
+    """
+    if filename is None:
+        from ProbabilisticParser.benchmarks import corpus
+        return corpus.synthetic_addresses(n)
+
+    with open(filename) as f:
+        addresses = [line.strip() for line in f if line.strip()]
+
+    return [addresses[i % len(addresses)] for i in range(n)]
+
+
+if __name__ == "__main__":
+    arguments = argparse.ArgumentParser(description='Load generator for the address parser service')
+    arguments.add_argument('--host', default='127.0.0.1')
+    arguments.add_argument('--port', type=int, default=8080)
+    arguments.add_argument('--concurrency', type=int, default=32)
+    arguments.add_argument('--requests', type=int, default=10000)
+    arguments.add_argument('--addresses', help='file with one address per line, synthetic addresses if not given')
+    arguments.add_argument('--spawn', action='store_true', help='start the service in a subprocess on a free port')
+    arguments.add_argument('--window', type=float, default=5., help='batch window in milliseconds when spawning')
+    arguments.add_argument('--max-batch-size', type=int, default=256, help='maximum batch size when spawning')
+    arguments = arguments.parse_args()
+
+    addresses = _read_addresses(arguments.addresses, arguments.requests)
+
+    process = None
+    if arguments.spawn:
+        arguments.host, arguments.port = '127.0.0.1', _free_port()
+        process = spawn_service(arguments.port, arguments.window, arguments.max_batch_size)
+
+    try:
+        results = asyncio.get_event_loop().run_until_complete(run_load(addresses, arguments.host, arguments.port,
+                                                                       arguments.concurrency))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    service = results['service']
+    print('{requests} requests from {concurrency} clients, {errors} errors'.format(concurrency=arguments.concurrency,
+                                                                                   **results))
+    print('  throughput: {:.0f} requests per second'.format(results['throughput']))
+    print('  client latency: p50 {p50:.1f} ms, p95 {p95:.1f} ms, p99 {p99:.1f} ms'.format(**results))
+    print('  service latency: p50 {p50:.1f} ms, p95 {p95:.1f} ms, p99 {p99:.1f} ms'.format(**service))
+    print('  service batches: {batches}, mean batch size {mean_batch_size:.1f}'.format(**service))
@@ -0,0 +1,187 @@
+"""
+ONS Address Index - Postcode Extraction
+=======================================
+
+This file contains a Postcode Extractor class that extracts postcodes from address strings with a
+regular expression, and functions to format and split postcodes.
+
+The regular expression is compiled once and applied to a whole column of addresses with the pandas
+string methods. The extracted candidates can be validated against the known outcodes (tokens.OUTCODES)
+and, optionally, against the full postcodes of AddressBase. If the first candidate of an address is not
+valid, the later candidates of the same address are tried.
+
+The in and out code columns follow the naming used for AddressBase: postcode_in is the part before the
+space (e.g. EX2) and postcode_out the part after it (e.g. 6GA).
+
+
+Requirements
+------------
+
+:requires: pandas (tested with 0.19.2)
+:requires: ProbabilisticParser (only for the known outcodes)
+
+
+Version
+-------
+
+:version: 0.1
+:date: 17-Oct-2026
+"""
+import re
+
+import pandas as pd
+
+# a rather loose regular expression, so may get some strings that are not completely valid postcodes, taken from:
+# http://stackoverflow.com/questions/164979/uk-postcode-regex-comprehensive
+POSTCODE_REGEX = r'(?P<special_in>[gG][iI][rR]) {0,}(?P<special_out>0[aA]{2})|' \
+                 r'(?P<postcode_in>(?:[a-pr-uwyzA-PR-UWYZ][a-hk-yA-HK-Y]?[0-9][0-9]?)|' \
+                 r'(?:(?:[a-pr-uwyzA-PR-UWYZ][0-9][a-hjkstuwA-HJKSTUW])|' \
+                 r'(?:[a-pr-uwyzA-PR-UWYZ][a-hk-yA-HK-Y][0-9][abehmnprv-yABEHMNPRV-Y]))) {0,}' \
+                 r'(?P<postcode_out>[0-9][abd-hjlnp-uw-zABD-HJLNP-UW-Z]{2})'
+
+POSTCODE_COLUMNS = ['Postcode', 'postcode_in', 'postcode_out']
+
+
+def format_postcodes(postcodes):
+    """
+    Change the postcodes to capitals and add the space between the in and out codes if missing. The space
+    is only added if the postcode is long enough to contain a complete postcode, as some users have partial
+    postcodes to which one should not add a space.
+
+    :param postcodes: postcodes, missing values are kept
+    :type postcodes: pandas.Series
+
+    :return: formatted postcodes
+    :rtype: pandas.Series
+    """
+    postcodes = postcodes.str.upper()
+
+    msk = ~postcodes.str.contains(' ', regex=False, na=True) & (postcodes.str.len() > 4)
+    postcodes[msk] = postcodes[msk].str[:-3] + ' ' + postcodes[msk].str[-3:]
+
+    return postcodes
+
+
+def split_postcodes(postcodes):
+    """
+    Split the postcodes to the parts before and after the first space.
+
+    :param postcodes: postcodes
+    :type postcodes: pandas.Series
+
+    :return: columns postcode_in and postcode_out, the latter is missing if there is no space
+    :rtype: pandas.DataFrame
+    """
+    return postcodes.str.extract(r'^(?P<postcode_in>[^ ]*)(?: (?P<postcode_out>.*))?$', expand=True)
+
+
+def _extract_postcode_reference(string):
+    """
+    The original implementation, which ran the regular expression for one address at a time. Used to test
+    and benchmark the postcode extractor. Note that the in code is removed from anywhere in the postcode
+    when adding the space.
+
+    :param string: string to be parsed
+    :type string: str
+
+    :return: postcode in lower case
+    :rtype: str
+    """
+    regx = r'(([gG][iI][rR] {0,}0[aA]{2})|((([a-pr-uwyzA-PR-UWYZ][a-hk-yA-HK-Y]?[0-9][0-9]?)|' + \
+           '(([a-pr-uwyzA-PR-UWYZ][0-9][a-hjkstuwA-HJKSTUW])|([a-pr-uwyzA-PR-UWYZ][a-hk-yA-HK-Y][0-9]' + \
+           '[abehmnprv-yABEHMNPRV-Y]))) {0,}[0-9][abd-hjlnp-uw-zABD-HJLNP-UW-Z]{2}))'
+    try:
+        potential_postcode = re.findall(regx, string)[0][0]
+        potential_postcode = potential_postcode.lower().strip()
+    except IndexError:
+        potential_postcode = None
+
+    # above regex gives also those without space between, add if needed
+    if potential_postcode is not None:
+        if ' ' not in potential_postcode:
+            inc = potential_postcode[-3:]
+            out = potential_postcode.replace(inc, '')
+            potential_postcode = out + ' ' + inc
+
+    return potential_postcode
+
+
+class PostcodeExtractor:
+    """
+    Extracts postcodes from address strings.
+    """
+
+    def __init__(self, outcodes=None, postcodes=None):
+        """
+        Class constructor.
+
+        :param outcodes: valid outcodes in capitals e.g. EX2, if None the outcodes are not validated
+        :type outcodes: set or None
+        :param postcodes: valid postcodes in capitals with a single space e.g. EX2 6GA, if None the
+                          complete postcodes are not validated
+        :type postcodes: iterable or None
+        """
+        self.pattern = re.compile(POSTCODE_REGEX)
+        self.outcodes = None if outcodes is None else set(outcodes)
+        self.postcodes = None if postcodes is None else set(postcodes)
+
+    @classmethod
+    def from_lookups(cls, postcodes=None):
+        """
+        Create an extractor that validates the outcodes against the lookup tables of the probabilistic parser.
+
+        :param postcodes: valid postcodes e.g. the postcodes of AddressBase, if None only the outcodes are validated
+        :type postcodes: iterable or None
+
+        :return: the postcode extractor
+        :rtype: PostcodeExtractor
+        """
+        import ProbabilisticParser.common.tokens as tokens
+
+        return cls(outcodes=tokens.OUTCODES, postcodes=postcodes)
+
+    def _candidates(self, matches):
+        """
+        Combine the groups of the regular expression to postcodes and check whether they are valid.
+
+        :param matches: groups of the regular expression as extracted by pandas
+        :type matches: pandas.DataFrame
+
+        :return: the postcode columns and a mask of the valid postcodes
+        :rtype: tuple
+        """
+        candidates = pd.DataFrame(index=matches.index)
+        candidates['postcode_in'] = matches['special_in'].fillna(matches['postcode_in']).str.upper()
+        candidates['postcode_out'] = matches['special_out'].fillna(matches['postcode_out']).str.upper()
+        candidates['Postcode'] = candidates['postcode_in'] + ' ' + candidates['postcode_out']
+
+        valid = candidates['Postcode'].notnull()
+        if self.outcodes is not None:
+            valid &= candidates['postcode_in'].isin(self.outcodes)
+        if self.postcodes is not None:
+            valid &= candidates['Postcode'].isin(self.postcodes)
+
+        return candidates[POSTCODE_COLUMNS], valid
+
+    def extract(self, addresses):
+        """
+        Extract the first valid postcode from each address.
+
+        :param addresses: address strings
+        :type addresses: pandas.Series
+
+        :return: columns Postcode, postcode_in, and postcode_out with the index of the addresses,
+                 missing if no valid postcode was found
+        :rtype: pandas.DataFrame
+        """
+        postcodes, valid = self._candidates(addresses.str.extract(self.pattern, expand=True))
+
+        # the first candidate was not valid, try the others
+        retry = postcodes['Postcode'].notnull() & ~valid
+        postcodes.loc[~valid] = None
+        if retry.any():
+            candidates, valid = self._candidates(addresses[retry].str.extractall(self.pattern))
+            candidates = candidates[valid].groupby(level=0).first()
+            postcodes.loc[candidates.index, POSTCODE_COLUMNS] = candidates[POSTCODE_COLUMNS].values
+
+        return postcodes
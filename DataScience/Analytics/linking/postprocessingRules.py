@@ -0,0 +1,608 @@
+"""
+ONS Address Index - Parser Post-Processing Rules
+================================================
+
+This file contains the rules that derive the PAO and SAO numbers and suffixes from the address components
+found by the probabilistic parser, and a Rule Engine class that applies them.
+
+The rules are listed in a table in the order they are applied. Each rule searches one component with a
+regular expression and, if it matches, updates the fields of the address. Most of the rules store the groups
+of the match in the derived fields that are still empty, hence the first rule that fills a field wins, and
+can require that some field is or is not empty before they are tried. The rest call a function e.g. to add
+FLAT to a sub-building name.
+
+Consecutive rules searching the same component are combined to a single regular expression, so that most
+components, which match none of the rules, are searched only once. The engine applies the rules in turn over
+whole columns like the original implementation in _postprocessing_reference did, but each distinct value of
+a component is searched only once and only the addresses it matches are updated.
+
+
+Requirements
+------------
+
+:requires: numpy (tested with 1.11.3)
+:requires: pandas (tested with 0.19.2)
+
+
+Version
+-------
+
+:version: 0.1
+:date: 17-Oct-2026
+"""
+import re
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# the components used by the rules and the fields derived from them, in the order the fields are added
+INPUT_COLUMNS = ['BuildingNumber', 'BuildingName', 'OrganisationName', 'SubBuildingName', 'StreetName']
+DERIVED_COLUMNS = ['PAOstartNumber', 'PAOendNumber', 'PAOstartSuffix', 'PAOendSuffix',
+                   'SAOStartNumber', 'SAOEndNumber', 'SAOStartSuffix', 'SAOEndSuffix']
+OUTPUT_COLUMNS = DERIVED_COLUMNS + ['BuildingNumber', 'SubBuildingName']
+
+SAO_RANGE = ['SAOStartNumber', 'SAOStartSuffix', 'SAOEndNumber', 'SAOEndSuffix']
+PAO_RANGE = ['PAOstartNumber', 'PAOstartSuffix', 'PAOendNumber', 'PAOendSuffix']
+
+
+def _missing(value):
+    """
+    Check whether a field is empty i.e. None or NaN.
+    """
+    return value is None or value != value
+
+
+def missing(column):
+    """
+    A condition that the given field is empty.
+
+    :param column: name of the field
+    :type column: str
+
+    :return: a function of the row
+    :rtype: callable
+    """
+    return lambda row: _missing(row[column])
+
+
+def present(column):
+    """
+    A condition that the given field is not empty.
+
+    :param column: name of the field
+    :type column: str
+
+    :return: a function of the row
+    :rtype: callable
+    """
+    return lambda row: not _missing(row[column])
+
+
+class ExtractRule(namedtuple('ExtractRule', ['source', 'pattern', 'targets', 'condition'])):
+    """
+    Extract the groups of a regular expression from the source field to the target fields, if the condition
+    holds. The groups are only stored in the target fields that are empty.
+    """
+
+    def __new__(cls, source, pattern, targets, condition=None):
+        """
+        :param source: name of the field to search
+        :type source: str
+        :param pattern: regular expression
+        :type pattern: str
+        :param targets: names of the fields to store the groups to in the order of the groups
+        :type targets: list
+        :param condition: function of the row that must hold before the groups are stored, if None always stored
+        :type condition: callable or None
+        """
+        return super().__new__(cls, source, re.compile(pattern), targets, condition)
+
+    def apply(self, row, groups):
+        """
+        Store the groups of a match to the target fields that are empty, if the condition holds.
+
+        :param row: the fields of an address, updated in place
+        :type row: dict
+        :param groups: groups of the match
+        :type groups: tuple
+
+        :return: None
+        """
+        if self.condition is None or self.condition(row):
+            for target, group in zip(self.targets, groups):
+                if _missing(row[target]):
+                    row[target] = group
+
+
+class FunctionRule(namedtuple('FunctionRule', ['source', 'pattern', 'function'])):
+    """
+    Call a function of the row and the groups of the match, if the source field matches a regular expression.
+    """
+
+    def __new__(cls, source, pattern, function, flags=0):
+        """
+        :param source: name of the field to search
+        :type source: str
+        :param pattern: regular expression
+        :type pattern: str
+        :param function: function of the row, updated in place, and the groups of the match
+        :type function: callable
+        :param flags: flags of the regular expression
+        :type flags: int
+        """
+        return super().__new__(cls, source, re.compile(pattern, flags), function)
+
+    def apply(self, row, groups):
+        """
+        Call the function.
+
+        :param row: the fields of an address, updated in place
+        :type row: dict
+        :param groups: groups of the match
+        :type groups: tuple
+
+        :return: None
+        """
+        self.function(row, groups)
+
+
+class RuleGroup:
+    """
+    Consecutive rules searching the same source field. If there are several, their regular expressions are
+    combined to one that is searched first, and the rules are only tried if it matches.
+    """
+
+    def __init__(self, rules):
+        """
+        Class constructor.
+
+        :param rules: rules of the same source field, if several then none of them may update the source field
+        :type rules: list
+        """
+        self.source = rules[0].source
+        self.rules = rules
+        self.pattern = re.compile('|'.join('(?:{})'.format(rule.pattern.pattern) for rule in rules))
+
+    def matches(self, value):
+        """
+        Find the rules that match the given value of the source field.
+
+        :param value: value of the source field
+        :type value: str
+
+        :return: the matching rules and the groups of their matches in the order of the rules
+        :rtype: list
+        """
+        if len(self.rules) > 1 and self.pattern.search(value) is None:
+            return []
+
+        matches = []
+        for rule in self.rules:
+            match = rule.pattern.search(value)
+            if match is not None:
+                matches.append((rule, match.groups()))
+
+        return matches
+
+
+def group_rules(rules):
+    """
+    Combine consecutive extract rules of the same source field, that do not store to the source field, to
+    rule groups. The order of the rules is kept.
+
+    :param rules: rules in the order they are applied
+    :type rules: list
+
+    :return: rule groups in the order they are applied
+    :rtype: list
+    """
+    groups = []
+    previous = None
+    for rule in rules:
+        combine = isinstance(rule, ExtractRule) and rule.source not in rule.targets
+        if combine and previous is not None and previous.source == rule.source:
+            groups[-1].append(rule)
+        else:
+            groups.append([rule])
+        # the next rule can only be combined with this one if this is an extract rule
+        previous = rule if combine else None
+
+    return [RuleGroup(group) for group in groups]
+
+
+def add_flat(row, groups):
+    """
+    Some addresses have / as the separator for buildings and flats, when matching against NLP, needs "FLAT".
+    """
+    row['SubBuildingName'] = 'FLAT ' + row['SubBuildingName']
+
+
+def split_slash_range(row, groups):
+    """
+    Deal with addresses that are of type 5/7 4 whatever road, the format assumed start/end_sao_numb pao_start_numb.
+    """
+    if _missing(row['SAOStartNumber']) and not _missing(row['BuildingNumber']):
+        row['SubBuildingName'] = groups[0]
+        if _missing(row['SAOEndNumber']):
+            row['SubBuildingName'] = groups[1]
+
+
+def numeric_sub_building(row, groups):
+    """
+    If SubBuildingName contains only numbers, then place also to the sao start number field as likely to be flat.
+    """
+    if row['SubBuildingName'].isnumeric() and _missing(row['SAOStartNumber']):
+        row['SAOStartNumber'] = row['SubBuildingName']
+
+
+def street_number(row, groups):
+    """
+    If street name contains a number and buildingnumber is empty, then place it there and pao_start_number.
+    """
+    if _missing(row['BuildingNumber']):
+        row['BuildingNumber'] = groups[0]
+        row['PAOstartNumber'] = groups[0]
+
+
+def flat_number(row, groups):
+    """
+    Split flat or apartment number as separate for numerical comparison - compare e.g. SAO number.
+    """
+    row['SAOStartNumber'] = row['SubBuildingName'].strip().replace('FLAT', '').replace('APARTMENT', '').\
+        replace('UNIT', '')
+
+
+# the rules in the order they are applied, the first rule that fills a field wins
+RULES = [
+    # in some other cases / is in the BuildingName field - now this separates the building and flat
+    # the first part refers to the building number and the second to the flat
+    ExtractRule('BuildingName', r'(\d+)\/(\d+)', ['PAOstartNumber', 'SAOStartNumber']),
+    # some cases the SAO components end up in the organisation name field, need to be separated
+    ExtractRule('OrganisationName', r'(\d+)([A-Z])-(\d+)([A-Z])', SAO_RANGE),
+    ExtractRule('OrganisationName', r'(\d+)-(\d+)([A-Z])', ['SAOStartNumber', 'SAOEndNumber', 'SAOEndSuffix']),
+    # sometimes both PAO and SAO range is in the BuildingName e.g. "35A-35D 35A-35F"
+    ExtractRule('BuildingName', r'(\d+)([A-Z])-(\d+)([A-Z]).*?(\d+)([A-Z])-(\d+)([A-Z])', SAO_RANGE + PAO_RANGE,
+                condition=missing('BuildingNumber')),
+    # sometimes both PAO and SAO range is in the BuildingName e.g. "28A-28F PICCADILLY COURT 457-463"
+    ExtractRule('BuildingName', r'(\d+)([A-Z])-(\d+)([A-Z]).*?(\d+)-(\d+)',
+                SAO_RANGE + ['PAOstartNumber', 'PAOendNumber'], condition=missing('BuildingNumber')),
+    # sometimes both PAO and SAO range is in the BuildingName e.g. "3-3A CHURCHILL COURT 112-144"
+    ExtractRule('BuildingName', r'(\d+)-(\d+)([A-Z]).*?(\d+)-(\d+)',
+                ['SAOStartNumber', 'SAOEndNumber', 'SAOEndSuffix', 'PAOstartNumber', 'PAOendNumber'],
+                condition=missing('BuildingNumber')),
+    # sometimes both building number and flat range are stored in BuildingName (e.g. 9B-9C 65A), separate these
+    ExtractRule('BuildingName', r'(\d+)([A-Z])-(\d+)([A-Z])\s.*?(\d+)([A-Z])',
+                SAO_RANGE + ['PAOstartNumber', 'PAOstartSuffix'], condition=missing('BuildingNumber')),
+    # if building number is not present, try to extract from building name if appropriate type
+    # deal with cases where buildingName contains a suffix range: 24D-24E
+    ExtractRule('BuildingName', r'(\d+)([A-Z])-(\d+)([A-Z])', PAO_RANGE, condition=missing('PAOstartNumber')),
+    # deal with cases where buildingName contains a suffix range: 24-24E
+    ExtractRule('BuildingName', r'(\d+)-(\d+)([A-Z])', ['PAOstartNumber', 'PAOendNumber', 'PAOendSuffix'],
+                condition=missing('PAOstartNumber')),
+    # deal with cases where buildingName is a range: 120-122
+    ExtractRule('BuildingName', r'(\d+)-(\d+)', ['PAOstartNumber', 'PAOendNumber'],
+                condition=missing('PAOstartNumber')),
+    # deal with cases where buildingName is 54A or 65B but not part of a range e.g. 65A-65B
+    ExtractRule('BuildingName', r'(?<!-|\d)(\d+)([A-Z])(?!-)', ['PAOstartNumber', 'PAOstartSuffix'],
+                condition=missing('PAOstartNumber')),
+    # sometimes subBuildingName contains the flat range e.g. 14E-14E extract the components
+    ExtractRule('SubBuildingName', r'(\d+)([A-Z])-(\d+)([A-Z])', SAO_RANGE),
+    # sometimes subBuildingName contains the flat range e.g. 14-14E extract the components
+    ExtractRule('SubBuildingName', r'(\d+)-(\d+)([A-Z])', ['SAOStartNumber', 'SAOEndNumber', 'SAOEndSuffix']),
+    # sometimes subBuildingName is e.g. C2 where to number refers to the flat number
+    ExtractRule('SubBuildingName', r'([A-Z])(\d+)', ['SAOStartSuffix', 'SAOStartNumber']),
+    # if building start number is present, then the suffix range of buildingName refers to the SAO: 24D-24E
+    ExtractRule('BuildingName', r'(\d+)([A-Z])-(\d+)([A-Z])', SAO_RANGE, condition=present('PAOstartNumber')),
+    # and similarly 24-24E
+    ExtractRule('BuildingName', r'(\d+)-(\d+)([A-Z])', ['SAOStartNumber', 'SAOEndNumber', 'SAOEndSuffix'],
+                condition=present('PAOstartNumber')),
+    FunctionRule('SubBuildingName', r'\d+\/\d+', add_flat),
+    # if SubBuildingName is empty, but BuildingName contains Block [A-Z], place this string to SubBuildingName
+    ExtractRule('BuildingName', r'(BLOCK [A-Z])', ['SubBuildingName']),
+    FunctionRule('SubBuildingName', r'(\d+)\/(\d+)', split_slash_range),
+    # every numeric character is a word character, the function checks that all of them are numeric
+    FunctionRule('SubBuildingName', r'^\w+$', numeric_sub_building),
+    FunctionRule('StreetName', r'(\d+)', street_number),
+    FunctionRule('SubBuildingName', r'flat|apartment|unit', flat_number, flags=re.IGNORECASE),
+]
+
+
+class _Row:
+    """
+    The fields of one address stored in columns, accessed like a dictionary.
+    """
+    __slots__ = ('columns', 'position')
+
+    def __init__(self, columns, position):
+        self.columns = columns
+        self.position = position
+
+    def __getitem__(self, column):
+        return self.columns[column][self.position]
+
+    def __setitem__(self, column, value):
+        self.columns[column][self.position] = value
+
+
+class RuleEngine:
+    """
+    Applies the post-processing rules to the parsed addresses.
+    """
+
+    def __init__(self, rules=None):
+        """
+        Class constructor.
+
+        :param rules: rules in the order they are applied, defaults to RULES
+        :type rules: list or None
+        """
+        self.rules = RULES if rules is None else rules
+        self._groups = group_rules(self.rules)
+
+    def apply_row(self, components):
+        """
+        Apply the rules to the components of a single address.
+
+        :param components: the parsed components, see INPUT_COLUMNS
+        :type components: dict
+
+        :return: the derived fields and the updated building number and sub-building name, see OUTPUT_COLUMNS
+        :rtype: dict
+        """
+        row = dict.fromkeys(DERIVED_COLUMNS)
+        row.update(components)
+
+        # if building number is present, then copy it to start number
+        row['PAOstartNumber'] = row['BuildingNumber']
+
+        for group in self._groups:
+            if isinstance(row[group.source], str):
+                for rule, groups in group.matches(row[group.source]):
+                    rule.apply(row, groups)
+
+        return {column: row[column] for column in OUTPUT_COLUMNS}
+
+    def apply(self, data):
+        """
+        Apply the rules in turn to all the addresses. Each distinct value of the source field of a rule group
+        is searched only once and only the matching addresses are updated.
+
+        :param data: parsed address data containing the columns of INPUT_COLUMNS
+        :type data: pandas.DataFrame
+
+        :return: the columns of OUTPUT_COLUMNS with the index of the data
+        :rtype: pandas.DataFrame
+        """
+        columns = dict()
+        for column in INPUT_COLUMNS:
+            values = data[column].astype(object)
+            columns[column] = values.where(values.notnull(), None).values.copy()
+        for column in DERIVED_COLUMNS:
+            columns[column] = np.full(len(data.index), None, dtype=object)
+
+        # if building number is present, then copy it to start number
+        columns['PAOstartNumber'][:] = columns['BuildingNumber']
+
+        for group in self._groups:
+            codes, values = pd.factorize(columns[group.source])
+            matches = [group.matches(value) if isinstance(value, str) else [] for value in values]
+
+            # the last element is for the missing values, which have code -1
+            matched = np.array([len(match) > 0 for match in matches] + [False])[codes]
+            for position in np.flatnonzero(matched):
+                row = _Row(columns, position)
+                for rule, groups in matches[codes[position]]:
+                    rule.apply(row, groups)
+
+        return pd.DataFrame({column: columns[column] for column in OUTPUT_COLUMNS}, index=data.index,
+                            columns=OUTPUT_COLUMNS)
+
+
+def _postprocessing_reference(data):
+    """
+    The original implementation, which ran each rule in turn over the whole columns with the pandas string
+    methods. Used to test and benchmark the rule engine.
+
+    :param data: parsed address data containing the columns of INPUT_COLUMNS
+    :type data: pandas.DataFrame
+
+    :return: the data with the columns of OUTPUT_COLUMNS added or updated
+    :rtype: pandas.DataFrame
+    """
+    # data containers for those components not parsed, but derived during post-processing
+    data['PAOstartNumber'] = None
+    data['PAOendNumber'] = None
+    data['PAOstartSuffix'] = None
+    data['PAOendSuffix'] = None
+    data['SAOStartNumber'] = None
+    data['SAOEndNumber'] = None
+    data['SAOStartSuffix'] = None
+    data['SAOEndSuffix'] = None
+
+    # if building number is present, then copy it to start number
+    data['PAOstartNumber'] = data['BuildingNumber'].copy()
+
+    # in some other cases / is in the BuildingName field - now this separates the building and flat
+    # the first part refers to the building number and the second to the flat
+    tmp = r'(\d+)\/(\d+)'
+    msk = data['BuildingName'].str.contains(tmp, na=False, case=False)
+    extracted_components = data.loc[msk, 'BuildingName'].str.extract(tmp)
+    data.loc[msk & data['PAOstartNumber'].isnull(), 'PAOstartNumber'] = extracted_components[0]
+    data.loc[msk & data['SAOStartNumber'].isnull(), 'SAOStartNumber'] = extracted_components[1]
+
+    # some cases the SAO components end up in the organisation name field, need to be separated
+    tmp = r'(\d+)([A-Z])-(\d+)([A-Z])'
+    msk = data['OrganisationName'].str.contains(tmp, na=False, case=False)
+    extracted_components = data.loc[msk, 'OrganisationName'].str.extract(tmp)
+    data.loc[msk & data['SAOStartNumber'].isnull(), 'SAOStartNumber'] = extracted_components[0]
+    data.loc[msk & data['SAOStartSuffix'].isnull(), 'SAOStartSuffix'] = extracted_components[1]
+    data.loc[msk & data['SAOEndNumber'].isnull(), 'SAOEndNumber'] = extracted_components[2]
+    data.loc[msk & data['SAOEndSuffix'].isnull(), 'SAOEndSuffix'] = extracted_components[3]
+
+    # some cases the SAO components end up in the organisation name field, need to be separated
+    tmp = r'(\d+)-(\d+)([A-Z])'
+    msk = data['OrganisationName'].str.contains(tmp, na=False, case=False)
+    extracted_components = data.loc[msk, 'OrganisationName'].str.extract(tmp)
+    data.loc[msk & data['SAOStartNumber'].isnull(), 'SAOStartNumber'] = extracted_components[0]
+    data.loc[msk & data['SAOEndNumber'].isnull(), 'SAOEndNumber'] = extracted_components[1]
+    data.loc[msk & data['SAOEndSuffix'].isnull(), 'SAOEndSuffix'] = extracted_components[2]
+
+    # sometimes both PAO and SAO range is in the BuildingName e.g. "35A-35D 35A-35F"
+    tmp = r'(\d+)([A-Z])-(\d+)([A-Z]).*?(\d+)([A-Z])-(\d+)([A-Z])'
+    msk = data['BuildingNumber'].isnull() & data['BuildingName'].str.contains(tmp, na=False, case=False)
+    extracted_components = data.loc[msk, 'BuildingName'].str.extract(tmp)
+    data.loc[msk & data['SAOStartNumber'].isnull(), 'SAOStartNumber'] = extracted_components[0]
+    data.loc[msk & data['SAOStartSuffix'].isnull(), 'SAOStartSuffix'] = extracted_components[1]
+    data.loc[msk & data['SAOEndNumber'].isnull(), 'SAOEndNumber'] = extracted_components[2]
+    data.loc[msk & data['SAOEndSuffix'].isnull(), 'SAOEndSuffix'] = extracted_components[3]
+    data.loc[msk & data['PAOstartNumber'].isnull(), 'PAOstartNumber'] = extracted_components[4]
+    data.loc[msk & data['PAOstartSuffix'].isnull(), 'PAOstartSuffix'] = extracted_components[5]
+    data.loc[msk & data['PAOendNumber'].isnull(), 'PAOendNumber'] = extracted_components[6]
+    data.loc[msk & data['PAOendSuffix'].isnull(), 'PAOendSuffix'] = extracted_components[7]
+
+    # sometimes both PAO and SAO range is in the BuildingName e.g. "28A-28F PICCADILLY COURT 457-463"
+    tmp = r'(\d+)([A-Z])-(\d+)([A-Z]).*?(\d+)-(\d+)'
+    msk = data['BuildingNumber'].isnull() & data['BuildingName'].str.contains(tmp, na=False, case=False)
+    extracted_components = data.loc[msk, 'BuildingName'].str.extract(tmp)
+    data.loc[msk & data['SAOStartNumber'].isnull(), 'SAOStartNumber'] = extracted_components[0]
+    data.loc[msk & data['SAOStartSuffix'].isnull(), 'SAOStartSuffix'] = extracted_components[1]
+    data.loc[msk & data['SAOEndNumber'].isnull(), 'SAOEndNumber'] = extracted_components[2]
+    data.loc[msk & data['SAOEndSuffix'].isnull(), 'SAOEndSuffix'] = extracted_components[3]
+    data.loc[msk & data['PAOstartNumber'].isnull(), 'PAOstartNumber'] = extracted_components[4]
+    data.loc[msk & data['PAOendNumber'].isnull(), 'PAOendNumber'] = extracted_components[5]
+
+    # sometimes both PAO and SAO range is in the BuildingName e.g. "3-3A CHURCHILL COURT 112-144"
+    tmp = r'(\d+)-(\d+)([A-Z]).*?(\d+)-(\d+)'
+    msk = data['BuildingNumber'].isnull() & data['BuildingName'].str.contains(tmp, na=False, case=False)
+    extracted_components = data.loc[msk, 'BuildingName'].str.extract(tmp)
+    data.loc[msk & data['SAOStartNumber'].isnull(), 'SAOStartNumber'] = extracted_components[0]
+    data.loc[msk & data['SAOEndNumber'].isnull(), 'SAOEndNumber'] = extracted_components[1]
+    data.loc[msk & data['SAOEndSuffix'].isnull(), 'SAOEndSuffix'] = extracted_components[2]
+    data.loc[msk & data['PAOstartNumber'].isnull(), 'PAOstartNumber'] = extracted_components[3]
+    data.loc[msk & data['PAOendNumber'].isnull(), 'PAOendNumber'] = extracted_components[4]
+
+    # sometimes both building number and flat range are stored in BuildingName (e.g. 9B-9C 65A), separate these
+    tmp = r'(\d+)([A-Z])-(\d+)([A-Z])\s.*?(\d+)([A-Z])'
+    msk = data['BuildingNumber'].isnull() & data['BuildingName'].str.contains(tmp, na=False, case=False)
+    extracted_components = data.loc[msk, 'BuildingName'].str.extract(tmp)
+    data.loc[msk & data['SAOStartNumber'].isnull(), 'SAOStartNumber'] = extracted_components[0]
+    data.loc[msk & data['SAOStartSuffix'].isnull(), 'SAOStartSuffix'] = extracted_components[1]
+    data.loc[msk & data['SAOEndNumber'].isnull(), 'SAOEndNumber'] = extracted_components[2]
+    data.loc[msk & data['SAOEndSuffix'].isnull(), 'SAOEndSuffix'] = extracted_components[3]
+    data.loc[msk & data['PAOstartNumber'].isnull(), 'PAOstartNumber'] = extracted_components[4]
+    data.loc[msk & data['PAOstartSuffix'].isnull(), 'PAOstartSuffix'] = extracted_components[5]
+
+    # if building number is not present, try to extract from building name if appropriate type
+    # deal with cases where buildingName contains a suffix range: 24D-24E
+    tmp = r'(\d+)([A-Z])-(\d+)([A-Z])'
+    msk = data['PAOstartNumber'].isnull() & data['BuildingName'].str.contains(tmp, na=False, case=False)
+    extracted_components = data.loc[msk, 'BuildingName'].str.extract(tmp)
+    data.loc[msk & data['PAOstartNumber'].isnull(), 'PAOstartNumber'] = extracted_components[0]
+    data.loc[msk & data['PAOstartSuffix'].isnull(), 'PAOstartSuffix'] = extracted_components[1]
+    data.loc[msk & data['PAOendNumber'].isnull(), 'PAOendNumber'] = extracted_components[2]
+    data.loc[msk & data['PAOendSuffix'].isnull(), 'PAOendSuffix'] = extracted_components[3]
+    # deal with cases where buildingName contains a suffix range: 24-24E
+    tmp = r'(\d+)-(\d+)([A-Z])'
+    msk = data['PAOstartNumber'].isnull() & data['BuildingName'].str.contains(tmp, na=False, case=False)
+    extracted_components = data.loc[msk, 'BuildingName'].str.extract(tmp)
+    data.loc[msk & data['PAOstartNumber'].isnull(), 'PAOstartNumber'] = extracted_components[0]
+    data.loc[msk & data['PAOendNumber'].isnull(), 'PAOendNumber'] = extracted_components[1]
+    data.loc[msk & data['PAOendSuffix'].isnull(), 'PAOendSuffix'] = extracted_components[2]
+    # deal with cases where buildingName is a range: 120-122
+    tmp = r'(\d+)-(\d+)'
+    msk = data['PAOstartNumber'].isnull() & data['BuildingName'].str.contains(tmp, na=False, case=False)
+    extracted_components = data.loc[msk, 'BuildingName'].str.extract(tmp)
+    data.loc[msk & data['PAOstartNumber'].isnull(), 'PAOstartNumber'] = extracted_components[0]
+    data.loc[msk & data['PAOendNumber'].isnull(), 'PAOendNumber'] = extracted_components[1]
+    # deal with cases where buildingName is 54A or 65B but not part of a range e.g. 65A-65B
+    tmp = r'(?<!-|\d)(\d+)([A-Z])(?!-)'
+    msk = data['PAOstartNumber'].isnull() & data['BuildingName'].str.contains(tmp, na=False, case=False)
+    extracted_components = data.loc[msk, 'BuildingName'].str.extract(tmp)
+    data.loc[msk & data['PAOstartNumber'].isnull(), 'PAOstartNumber'] = extracted_components[0]
+    data.loc[msk & data['PAOstartSuffix'].isnull(), 'PAOstartSuffix'] = extracted_components[1]
+
+    # if building start number is present, then add to SAO
+    # sometimes subBuildingName contains the flat range e.g. 14E-14E extract the components
+    tmp = r'(\d+)([A-Z])-(\d+)([A-Z])'
+    msk = data['SubBuildingName'].str.contains(tmp, na=False, case=False)
+    extracted_components = data.loc[msk, 'SubBuildingName'].str.extract(tmp)
+    data.loc[msk & data['SAOStartNumber'].isnull(), 'SAOStartNumber'] = extracted_components[0]
+    data.loc[msk & data['SAOStartSuffix'].isnull(), 'SAOStartSuffix'] = extracted_components[1]
+    data.loc[msk & data['SAOEndNumber'].isnull(), 'SAOEndNumber'] = extracted_components[2]
+    data.loc[msk & data['SAOEndSuffix'].isnull(), 'SAOEndSuffix'] = extracted_components[3]
+
+    # sometimes subBuildingName contains the flat range e.g. 14-14E extract the components
+    tmp = r'(\d+)-(\d+)([A-Z])'
+    msk = data['SubBuildingName'].str.contains(tmp, na=False, case=False)
+    extracted_components = data.loc[msk, 'SubBuildingName'].str.extract(tmp)
+    data.loc[msk & data['SAOStartNumber'].isnull(), 'SAOStartNumber'] = extracted_components[0]
+    data.loc[msk & data['SAOEndNumber'].isnull(), 'SAOEndNumber'] = extracted_components[1]
+    data.loc[msk & data['SAOEndSuffix'].isnull(), 'SAOEndSuffix'] = extracted_components[2]
+
+    # sometimes subBuildingName is e.g. C2 where to number refers to the flat number
+    tmp = r'([A-Z])(\d+)'
+    msk = data['SubBuildingName'].str.contains(tmp, na=False, case=False)
+    extracted_components = data.loc[msk, 'SubBuildingName'].str.extract(tmp)
+    data.loc[msk & data['SAOStartNumber'].isnull(), 'SAOStartNumber'] = extracted_components[1]
+    data.loc[msk & data['SAOStartSuffix'].isnull(), 'SAOStartSuffix'] = extracted_components[0]
+
+    # deal with cases where buildingName contains a suffix range: 24D-24E
+    tmp = r'(\d+)([A-Z])-(\d+)([A-Z])'
+    msk = data['PAOstartNumber'].notnull() & data['BuildingName'].str.contains(tmp, na=False, case=False)
+    extracted_components = data.loc[msk, 'BuildingName'].str.extract(tmp)
+    data.loc[msk & data['SAOStartNumber'].isnull(), 'SAOStartNumber'] = extracted_components[0]
+    data.loc[msk & data['SAOStartSuffix'].isnull(), 'SAOStartSuffix'] = extracted_components[1]
+    data.loc[msk & data['SAOEndNumber'].isnull(), 'SAOEndNumber'] = extracted_components[2]
+    data.loc[msk & data['SAOEndSuffix'].isnull(), 'SAOEndSuffix'] = extracted_components[3]
+
+    # deal with cases where buildingName contains a suffix range: 24-24E
+    tmp = r'(\d+)-(\d+)([A-Z])'
+    msk = data['PAOstartNumber'].notnull() & data['BuildingName'].str.contains(tmp, na=False, case=False)
+    extracted_components = data.loc[msk, 'BuildingName'].str.extract(tmp)
+    data.loc[msk & data['SAOStartNumber'].isnull(), 'SAOStartNumber'] = extracted_components[0]
+    data.loc[msk & data['SAOEndNumber'].isnull(), 'SAOEndNumber'] = extracted_components[1]
+    data.loc[msk & data['SAOEndSuffix'].isnull(), 'SAOEndSuffix'] = extracted_components[2]
+
+    # some addresses have / as the separator for buildings and flats, when matching against NLP, needs "FLAT"
+    msk = data['SubBuildingName'].str.contains('\d+\/\d+', na=False, case=False)
+    data.loc[msk, 'SubBuildingName'] = 'FLAT ' + data.loc[msk, 'SubBuildingName']
+
+    # if SubBuildingName is empty, but BuildingName contains Block [A-Z], place this string to SubBuildingName
+    tmp = r'(BLOCK [A-Z])'
+    msk = data['SubBuildingName'].isnull() & data['BuildingName'].str.contains(tmp, na=False, case=False)
+    extracted_components = data.loc[msk, 'BuildingName'].str.extract(tmp)
+    if len(extracted_components.index) > 0:
+        data.loc[msk, 'SubBuildingName'] = extracted_components.values
+
+    # deal with addresses that are of type 5/7 4 whatever road, the format assumed start/end_sao_numb pao_start_numb
+    tmp = r'(\d+)\/(\d+)'
+    msk = data['SubBuildingName'].str.contains(tmp, na=False, case=False) & \
+        data['SAOStartNumber'].isnull() & data['BuildingNumber'].notnull()
+    extracted_components = data.loc[msk, 'SubBuildingName'].str.extract(tmp)
+    data.loc[msk & data['SAOStartNumber'].isnull(), 'SubBuildingName'] = extracted_components[0]
+    data.loc[msk & data['SAOEndNumber'].isnull(), 'SubBuildingName'] = extracted_components[1]
+
+    # if SubBuildingName contains only numbers, then place also to the sao start number field as likely to be flat
+    msk = data['SubBuildingName'].str.isnumeric() & data['SAOStartNumber'].isnull()
+    msk[msk.isnull()] = False
+    data.loc[msk, 'SAOStartNumber'] = data.loc[msk, 'SubBuildingName']
+
+    # if street name contains a number and buildingnumber is empty, then place it there and pao_start_number
+    tmp = r'(\d+)'
+    msk = data['BuildingNumber'].isnull() & data['StreetName'].str.contains(tmp, na=False, case=False)
+    extracted_components = data.loc[msk, 'StreetName'].str.extract(tmp)
+    if len(extracted_components.index) > 0:
+        data.loc[msk, 'BuildingNumber'] = extracted_components.values
+        data.loc[msk, 'PAOstartNumber'] = extracted_components.values
+
+    # split flat or apartment number as separate for numerical comparison - compare e.g. SAO number
+    # todo: rewrite
+    msk = data['SubBuildingName'].str.contains('flat|apartment|unit', na=False, case=False)
+    data.loc[msk, 'SAOStartNumber'] = data.loc[msk, 'SubBuildingName']
+    data.loc[msk, 'SAOStartNumber'] = \
+        data.loc[msk].apply(lambda x: x['SAOStartNumber'].strip().
+                            replace('FLAT', '').replace('APARTMENT', '').replace('UNIT', ''),
+                            axis=1)
+
+    return data
@@ -0,0 +1,164 @@
+"""
+ONS Address Index - Linking Test Helpers
+========================================
+
+Data, functions and a test case shared by the unit tests of the address linking.
+
+
+Requirements
+------------
+
+:requires: pandas (tested with 0.19.2)
+:requires: recordlinkage and matplotlib, for the linker tests
+
+
+Version
+-------
+
+:version: 0.4
+:date: 17-Oct-2026
+"""
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+from Analytics.linking.addressParser import AddressParser
+from ProbabilisticParser.benchmarks import corpus
+
+try:
+    from Analytics.linking.addressLinking import AddressLinker
+except ImportError:
+    # the linker needs recordlinkage and matplotlib
+    AddressLinker = None
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../../data/')
+
+# AddressBase columns and the parsed components they are made of in the linker tests
+ADDRESSBASE_COMPONENTS = {'ORGANISATION_NAME': 'OrganisationName', 'DEPARTMENT_NAME': 'DepartmentName',
+                          'SUB_BUILDING_NAME': 'SubBuildingName', 'BUILDING_NAME': 'BuildingName',
+                          'BUILDING_NUMBER': 'BuildingNumber', 'THROUGHFARE': 'StreetName',
+                          'STREET_DESCRIPTOR': 'StreetName', 'POST_TOWN': 'TownName', 'POSTCODE': 'Postcode',
+                          'LOCALITY': 'Locality', 'PAO_TEXT': 'PAOText', 'SAO_TEXT': 'SAOText',
+                          'PAO_START_NUMBER': 'PAOstartNumber', 'PAO_END_NUMBER': 'PAOendNumber',
+                          'PAO_START_SUFFIX': 'PAOstartSuffix', 'PAO_END_SUFFIX': 'PAOendSuffix',
+                          'SAO_START_NUMBER': 'SAOStartNumber', 'SAO_END_NUMBER': 'SAOEndNumber',
+                          'SAO_START_SUFFIX': 'SAOStartSuffix', 'SAO_END_SUFFIX': 'SAOEndSuffix',
+                          'postcode_in': 'postcode_in', 'postcode_out': 'postcode_out'}
+
+
+def same_values(a, b):
+    """
+    Compare two values, e.g. normalised addresses or parsed components, missing values being equal.
+
+    :param a: first value
+    :type a: object
+    :param b: second value
+    :type b: object
+
+    :return: whether the values are the same
+    :rtype: bool
+    """
+    if pd.isnull(a) or pd.isnull(b):
+        return pd.isnull(a) and pd.isnull(b)
+    return a == b
+
+
+@unittest.skipIf(AddressLinker is None, 'recordlinkage or matplotlib is not installed')
+class LinkerTestCase(unittest.TestCase):
+    """
+    Links synthetic addresses to an AddressBase file made of the same addresses, so that each address should
+    be linked to its own row.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+        address_parser = AddressParser(progressBar=False, parserWorkers=1)
+        parsed = address_parser.parse(pd.DataFrame({'ADDRESS': corpus.synthetic_addresses(40)}))
+        address_base = pd.DataFrame({column: parsed[component] for column, component in
+                                     ADDRESSBASE_COMPONENTS.items()})
+        for column in ('PAO_START_NUMBER', 'PAO_END_NUMBER', 'SAO_START_NUMBER', 'SAO_END_NUMBER'):
+            address_base[column] = [None if pd.isnull(number) else str(int(number))
+                                    for number in pd.to_numeric(address_base[column], errors='coerce')]
+        address_base['UPRN'] = [float(uprn) for uprn in range(100, 100 + len(parsed.index))]
+        # columns that the linker does not use but merges into its output
+        address_base['USRN'] = [uprn // 4 for uprn in range(100, 100 + len(parsed.index))]
+        address_base['LANGUAGE'] = 'ENG'
+        address_base.to_csv(os.path.join(self.directory.name, 'AB.csv'), index=False)
+
+        self.addresses = address_parser.convert_to_numeric_and_add_dummies(parsed)
+        self.addresses.index.name = 'TestData_Index'
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def link(self, blocking_modes=(5, 8), **kwargs):
+        """
+        Link the addresses to the AddressBase file.
+
+        :param blocking_modes: the blocking modes of the cascade
+        :type blocking_modes: tuple
+        :param kwargs: settings of the linker
+        :type kwargs: dict
+
+        :return: the matches
+        :rtype: pandas.DataFrame
+        """
+        linker = self.linker(**kwargs)
+        try:
+            linker.load_addressbase()
+            linker.toLinkAddressData = self.addresses.copy()
+            linker.link_all_addresses(blocking_modes=blocking_modes)
+        finally:
+            self.close(linker)
+
+        return linker.matches
+
+    def load_addressbase(self, **kwargs):
+        """
+        Load the AddressBase file as the linker does.
+
+        :param kwargs: settings of the linker
+        :type kwargs: dict
+
+        :return: the AddressBase of the linker
+        :rtype: pandas.DataFrame
+        """
+        linker = self.linker(**kwargs)
+        try:
+            linker.load_addressbase()
+        finally:
+            self.close(linker)
+
+        return linker.addressBase
+
+    def linker(self, **kwargs):
+        """
+        Set up a linker of the AddressBase file that does not store its results.
+
+        :param kwargs: settings of the linker
+        :type kwargs: dict
+
+        :return: the linker
+        :rtype: AddressLinker
+        """
+        settings = dict(ABpath=self.directory.name + '/', ABfilename='AB.csv', outpath=self.directory.name + '/',
+                        store=False)
+        settings.update(kwargs)
+
+        return AddressLinker(**settings)
+
+    @staticmethod
+    def close(linker):
+        """
+        Close the log handlers of a linker, which would otherwise be added again by the next linker.
+
+        :param linker: the linker
+        :type linker: AddressLinker
+
+        :return: None
+        """
+        for handler in list(linker.log.handlers):
+            linker.log.removeHandler(handler)
+            handler.close()
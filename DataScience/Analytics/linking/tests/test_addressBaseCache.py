@@ -0,0 +1,114 @@
+"""
+ONS Address Index - AddressBase Cache Test
+==========================================
+
+Unit tests to check that the AddressBase cache loads the same processed AddressBase as the CSV file, is rebuilt
+when the file changes, and gives the linker the same matches.
+
+
+Version
+-------
+
+:version: 0.2
+:date: 17-Oct-2026
+"""
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+from Analytics.linking.addressBaseCache import AddressBaseCache, ADDRESSBASE_TYPES, process_addressbase, \
+    read_addressbase
+from Analytics.linking.tests.helpers import LinkerTestCase, same_values
+
+
+class TestAddressBaseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.directory.name, 'AB.csv')
+        self.cache = AddressBaseCache(os.path.join(self.directory.name, 'AB_cache'))
+
+        data = pd.DataFrame({column: [None] * 6 for column in ADDRESSBASE_TYPES})
+        data['UPRN'] = [1., 2., 3., 4., None, 6.]
+        data['POSTCODE'] = ['AB1 2CD', 'AB1 2CD', 'EF3 4GH', None, 'AB1 2CD', 'EF3 4GH']
+        data['SAO_TEXT'] = [None, 'FORMER SHOP', 'FLAT A', None, 'Former Bank', None]
+        data['PAO_START_NUMBER'] = ['12', None, '7', '1', None, '3']
+        data['SAO_START_NUMBER'] = [None, 2., None, 5., None, None]
+        data['PAO_START_SUFFIX'] = ['A', None, None, 'B', None, None]
+        data['THROUGHFARE'] = ['HIGH STREET', None, 'ST ANNE\'S ROAD', 'HIGH STREET', None, 'CAFÉ ROW']
+        # columns without a type, which are read as pandas infers them
+        data['USRN'] = [10, 10, 20, 20, 10, 30]
+        data['LANGUAGE'] = 'ENG'
+        data['TOWN_NAME'] = ['CARDIFF', None, 'EXETER', 'EXETER', None, None]
+        data.to_csv(self.source, index=False)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_same_as_processed(self):
+        processed = process_addressbase(read_addressbase(self.source))
+        assert processed.index.tolist() == [0, 2, 3, 5]
+
+        self.cache.build(self.source, processed)
+        assert self.cache.is_current(self.source)
+
+        loaded = self.cache.load()
+        assert loaded.index.tolist() == processed.index.tolist()
+        assert loaded.index.name == 'AddressBase_Index'
+        assert loaded.columns.tolist() == processed.columns.tolist()
+        assert str(loaded['PAO_START_NUMBER'].dtype) == 'int32'
+        for column in processed.columns:
+            assert all(same_values(a, b) for a, b in zip(loaded[column], processed[column])), column
+
+        # only the selected columns are read, strings optionally as categoricals
+        loaded = self.cache.load(columns=['POSTCODE', 'UPRN', 'NOT_CACHED'], categorical=True)
+        assert loaded.columns.tolist() == ['POSTCODE', 'UPRN']
+        assert str(loaded['POSTCODE'].dtype) == 'category'
+        assert loaded['POSTCODE'].isnull().tolist() == [False, False, True, False]
+
+    def test_rebuild_on_change(self):
+        assert not self.cache.is_current(self.source)
+        self.assertRaises(ValueError, self.cache.load)
+        self.cache.build(self.source, process_addressbase(read_addressbase(self.source)))
+
+        # the same content with a new modification time does not need a rebuild
+        os.utime(self.source, (0, 0))
+        assert self.cache.is_current(self.source)
+
+        columns = pd.read_csv(self.source, nrows=0).columns
+        with open(self.source, 'a') as f:
+            f.write(','.join('7' if column == 'UPRN' else '' for column in columns) + '\n')
+        assert not self.cache.is_current(self.source)
+
+        self.cache.build(self.source, process_addressbase(read_addressbase(self.source)))
+        assert self.cache.is_current(self.source)
+        assert self.cache.load(columns=['UPRN'])['UPRN'].tolist()[-1] == 7.
+
+
+class TestLinkingWithCache(LinkerTestCase):
+
+    def test_addressbase_cache(self):
+        settings = dict(blockingIndex=False, comparisonEngine=False, comparisonCache=False)
+        matches = self.link(ABcache=False, **settings)
+
+        # the cache is built on the first run and loaded on the second
+        for _ in range(2):
+            assert self.link(ABcache=True, **settings).equals(matches)
+        assert os.path.isfile(os.path.join(self.directory.name, 'AB_cache', 'manifest.json'))
+
+    def test_addressbase_columns(self):
+        processed = self.load_addressbase(ABcache=False)
+        assert {'USRN', 'LANGUAGE'} <= set(processed.columns)
+
+        # the cache is built on the first run and loaded on the second, both with all the columns of the file
+        for _ in range(2):
+            loaded = self.load_addressbase()
+            assert loaded.columns.tolist() == processed.columns.tolist()
+            assert loaded.index.tolist() == processed.index.tolist()
+            for column in processed.columns:
+                assert all(same_values(a, b) for a, b in zip(loaded[column], processed[column])), column
+
+
+if __name__ == '__main__':
+    unittest.main()
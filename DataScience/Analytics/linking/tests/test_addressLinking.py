@@ -0,0 +1,32 @@
+"""
+ONS Address Index - Address Linking Test
+========================================
+
+A unit test to check that the linker links synthetic addresses to the rows of AddressBase they were made of.
+The tests of the AddressBase cache, the blocking indexes, the comparison engine and the comparison cache also
+run the linker with and without each of them.
+
+
+Version
+-------
+
+:version: 0.1
+:date: 17-Oct-2026
+"""
+import unittest
+
+from Analytics.linking.tests.helpers import LinkerTestCase
+
+
+class TestAddressLinker(LinkerTestCase):
+
+    def test_link_all_addresses(self):
+        matches = self.link(compactTypes=False, ABcache=False, blockingIndex=False, comparisonEngine=False,
+                            comparisonCache=False)
+        assert matches['TestData_Index'].is_unique
+        assert len(matches.index) == self.addresses['Postcode'].notnull().sum()
+        assert (matches['TestData_Index'] == matches['AddressBase_Index']).all()
+
+
+if __name__ == '__main__':
+    unittest.main()
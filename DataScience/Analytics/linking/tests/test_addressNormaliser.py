@@ -0,0 +1,70 @@
+"""
+ONS Address Index - Address Normaliser Test
+===========================================
+
+Unit tests to check that the compiled normalisation rules and the county removal give the same results as the
+original implementation.
+
+
+Version
+-------
+
+:version: 0.1
+:date: 17-Oct-2026
+"""
+import unittest
+
+import pandas as pd
+from Analytics.linking.addressNormaliser import AddressNormaliser
+from Analytics.linking.addressParser import AddressParser
+from Analytics.linking.tests.helpers import DATA_PATH, same_values
+from ProbabilisticParser.benchmarks import corpus
+
+
+class TestAddressNormaliser(unittest.TestCase):
+
+    addresses = ['FLAT 15 191 - 193 NEWPORT ROAD, CARDIFF CF24 1AJ',
+                 '  7a - 10c Devon Wlk, Exeter, DEVON, EX2 6GA ',
+                 '5/7 4 HIGH ST, MARTON IN CLEVELAND',
+                 '12 TO 14 ST ALBANS RD WATFORD HERTFORDSHIRE WD17 1UN',
+                 '12 to 14 st albans rd watford hertfordshire wd17 1un',
+                 'ESSEX ROAD ISLINGTON N1 2SE',
+                 '1 HIGH STREET, ESSEX, KENT, ESSEX CM1 1AA',
+                 'UNIT 3\\4 THE MALL TYNE & WEAR NE1 1AA',
+                 'ÉCOLE 1 RUE DE LA PAIX DEVON',
+                 '',
+                 None,
+                 12]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.normaliser = AddressNormaliser.from_files(DATA_PATH)
+
+    def test_same_as_reference(self):
+        for address in self.addresses + corpus.synthetic_addresses(2000):
+            for expand_synonyms in (True, False):
+                normalised, county = self.normaliser.normalise(address, expand_synonyms=expand_synonyms)
+                reference, reference_county = self.normaliser._normalise_reference(address, expand_synonyms)
+                assert same_values(normalised, reference), (address, normalised, reference)
+                assert county == reference_county, (address, county, reference_county)
+
+    def test_counties(self):
+        counties = self.normaliser.counties
+        for i, county in enumerate(counties[::10]):
+            for address in ('1 HIGH STREET {} AB1 2CD'.format(county), '{} ROAD'.format(county),
+                            '1 high street {} ab1 2cd'.format(county.lower()),
+                            '1 HIGH STREET {} {}'.format(county, counties[-i - 1])):
+                assert self.normaliser.normalise(address) == self.normaliser._normalise_reference(address), address
+
+    def test_normalize_input_data(self):
+        address_parser = AddressParser(progressBar=False)
+        data = address_parser._normalize_input_data(pd.DataFrame({'ADDRESS': self.addresses}))
+
+        for address, normalised, county in zip(self.addresses, data['ADDRESS_norm'], data['County']):
+            reference, reference_county = self.normaliser._normalise_reference(address)
+            assert same_values(normalised, reference)
+            assert same_values(county, reference_county)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+ONS Address Index - Address Parser Test
+=======================================
+
+Unit tests to check that the address parser parses each unique normalised address once with the same results
+as parsing every row, and that parse_file resumes a streamed job. The tests of the other linking modules are
+in the test module named after each module.
+
+
+Running
+-------
+
+The tests can be run from the DataScience directory using pytest::
+
+    python -m pytest Analytics/linking/tests
+
+
+Version
+-------
+
+:version: 0.2
+:date: 17-Oct-2026
+"""
+import os
+import random
+import tempfile
+import unittest
+
+import pandas as pd
+from Analytics.linking.addressParser import AddressParser
+from Analytics.linking.tests.helpers import same_values
+from ProbabilisticParser import parser
+from ProbabilisticParser.benchmarks import corpus
+
+try:
+    import feather
+except ImportError:
+    feather = None
+
+
+class TestDeduplication(unittest.TestCase):
+
+    def test_same_as_parsing_every_row(self):
+        rng = random.Random(0)
+        addresses = corpus.synthetic_addresses(50)
+        addresses = [rng.choice(addresses) for _ in range(200)] + [None]
+
+        address_parser = AddressParser(progressBar=False, parserWorkers=1)
+        parsed = address_parser.parse(pd.DataFrame({'ADDRESS': addresses}))
+
+        normalised = address_parser._normalize_input_data(pd.DataFrame({'ADDRESS': addresses[:-1]}))
+        reference = address_parser._parse_normalised(normalised)
+
+        assert list(parsed.columns) == list(reference.columns)
+        for column in reference.columns:
+            assert all(same_values(a, b) for a, b in zip(parsed[column][:-1], reference[column])), column
+        assert parsed.drop(['ADDRESS', 'ADDRESS_norm', 'County'], axis=1).iloc[-1].isnull().all()
+
+    def test_parsing_score(self):
+        addresses = corpus.synthetic_addresses(20) * 2 + [None]
+
+        parsed = AddressParser(progressBar=False, parserWorkers=1).parse(pd.DataFrame({'ADDRESS': addresses}))
+        address_parser = AddressParser(progressBar=False, parserWorkers=1, parsingScore=True)
+        scored = address_parser.parse(pd.DataFrame({'ADDRESS': addresses}))
+
+        assert len(address_parser.parsedBatch) == 20
+        assert list(scored.columns) == list(parsed.columns) + ['parsing_score']
+        for column in parsed.columns:
+            assert all(same_values(a, b) for a, b in zip(parsed[column], scored[column])), column
+
+        for address, score in zip(scored['ADDRESS_norm'][:-1], scored['parsing_score'][:-1]):
+            assert abs(score - parser.parse_with_probabilities(address.upper())['sequence_probability']) < 1e-9
+        assert pd.isnull(scored['parsing_score'].iloc[-1])
+
+
+class TestParseFile(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.input_file = os.path.join(self.directory.name, 'input.csv')
+        self.output_directory = os.path.join(self.directory.name, 'parsed')
+
+        self.data = pd.DataFrame({'ID': range(25), 'ADDRESS': corpus.synthetic_addresses(25)})
+        self.data.to_csv(self.input_file, index=False)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_parse_file(self):
+        address_parser = AddressParser(progressBar=False, parserWorkers=1)
+        parsed = address_parser.parse(self.data.copy())
+
+        store = address_parser.parse_file(self.input_file, self.output_directory, chunksize=10, output_format='csv')
+        assert len(store.chunk_files()) == 3
+        assert store.read()['Postcode'].fillna('').tolist() == parsed['Postcode'].fillna('').tolist()
+
+        # remove the last chunk as if the job had failed, only that chunk is parsed again
+        first_chunk = os.path.getmtime(store.chunk_file(0))
+        progress = store.start(self.input_file, 10)
+        progress.update(chunks=2, rows=20)
+        store._write_marker(progress)
+        os.remove(store.chunk_file(2))
+
+        store = address_parser.parse_file(self.input_file, self.output_directory, chunksize=10, output_format='csv')
+        assert os.path.getmtime(store.chunk_file(0)) == first_chunk
+        resumed = store.read()
+        assert resumed['ID'].tolist() == list(range(25))
+        assert resumed['StreetName'].fillna('').tolist() == parsed['StreetName'].fillna('').tolist()
+
+    @unittest.skipIf(feather is None, 'feather-format is not installed')
+    def test_feather(self):
+        address_parser = AddressParser(progressBar=False, parserWorkers=1)
+        parsed = address_parser.parse(self.data.copy())
+
+        # feather is the default output format
+        store = address_parser.parse_file(self.input_file, self.output_directory, chunksize=10)
+        assert store.chunk_files()[0].endswith('.feather')
+        stored = store.read()
+        for column in parsed.columns:
+            assert all(same_values(a, b) for a, b in zip(parsed[column], stored[column])), column
+
+
+if __name__ == '__main__':
+    unittest.main()
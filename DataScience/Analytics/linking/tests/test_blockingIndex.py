@@ -0,0 +1,126 @@
+"""
+ONS Address Index - Blocking Index Test
+=======================================
+
+Unit tests to check that the blocking indexes give the same candidate pairs as the blocking of recordlinkage,
+are rebuilt when AddressBase changes, and give the linker the same matches.
+
+
+Version
+-------
+
+:version: 0.1
+:date: 17-Oct-2026
+"""
+import os
+import random
+import tempfile
+import unittest
+
+import pandas as pd
+from Analytics.linking.blockingIndex import BlockingIndexStore, normalise_keys
+from Analytics.linking.tests.helpers import LinkerTestCase
+
+try:
+    import recordlinkage as rl
+except ImportError:
+    rl = None
+
+
+class TestBlockingIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.directory.name, 'AB.csv')
+        with open(self.source, 'w') as f:
+            f.write('AddressBase\n')
+
+        random.seed(42)
+        postcodes = ['AB1 2CD', 'AB1 3CD', 'EF3 4GH', None]
+        self.address_base = pd.DataFrame({'POSTCODE': [random.choice(postcodes) for _ in range(200)],
+                                          'BUILDING_NUMBER': [random.choice(['1', '2', '3', None])
+                                                              for _ in range(200)],
+                                          'PAO_START_NUMBER': [random.choice([1, 2, 3, -12345]) for _ in range(200)]},
+                                         index=pd.Index(range(1000, 1200), name='AddressBase_Index'))
+        self.addresses = pd.DataFrame({'Postcode': [random.choice(postcodes + ['XY9 9ZZ']) for _ in range(50)],
+                                       'BuildingNumber': [random.choice(['1', '2', '4', None]) for _ in range(50)],
+                                       'PAOstartNumber': [random.choice([1., 2., -12345., None]) for _ in range(50)]},
+                                      index=pd.Index(range(50), name='TestData_Index'))
+        self.modes = ((['Postcode'], ['POSTCODE']),
+                      (['Postcode', 'BuildingNumber'], ['POSTCODE', 'BUILDING_NUMBER']),
+                      (['Postcode', 'PAOstartNumber'], ['POSTCODE', 'PAO_START_NUMBER']))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _merge(self, left_on, right_on):
+        """
+        The pairs of a join of the addresses and AddressBase, the rows with missing keys dropped as in
+        recordlinkage.
+        """
+        left = self.addresses[left_on].dropna().reset_index()
+        right = self.address_base[right_on].dropna().reset_index()
+        merged = pd.merge(left, right, left_on=left_on, right_on=right_on)
+
+        return sorted(zip(merged['TestData_Index'], merged['AddressBase_Index']))
+
+    def test_keys(self):
+        keys = normalise_keys(pd.DataFrame({'a': ['12', 12, 12., 12.5, None, float('nan'), ''], 'b': ['X'] * 7}),
+                              ['a', 'b'])
+        assert keys[0] != keys[1] and keys[1] == keys[2] and keys[2] != keys[3]
+        assert keys[4] is None and keys[5] is None and keys[6] is not None
+
+    def test_same_as_join(self):
+        store = BlockingIndexStore(os.path.join(self.directory.name, 'blocking'), self.source)
+        for left_on, right_on in self.modes:
+            pairs = store.pairs(self.addresses, left_on, self.address_base, right_on)
+            assert pairs.names == ['TestData_Index', 'AddressBase_Index']
+            assert sorted(pairs.tolist()) == self._merge(left_on, right_on)
+
+    @unittest.skipIf(rl is None, 'recordlinkage is not installed')
+    def test_same_as_recordlinkage(self):
+        store = BlockingIndexStore(os.path.join(self.directory.name, 'blocking'), self.source)
+        for left_on, right_on in self.modes:
+            pairs = store.pairs(self.addresses, left_on, self.address_base, right_on)
+            blocked = rl.Pairs(self.addresses, self.address_base).block(left_on=left_on, right_on=right_on)
+            assert len(pairs) > 0 and sorted(pairs.tolist()) == sorted(blocked.tolist())
+
+    def test_rebuild_on_change(self):
+        directory = os.path.join(self.directory.name, 'blocking')
+        pairs = BlockingIndexStore(directory, self.source).pairs(self.addresses, ['Postcode'], self.address_base,
+                                                                 ['POSTCODE'])
+
+        # a new store loads the stored index
+        store = BlockingIndexStore(directory, self.source)
+        assert store.pairs(self.addresses, ['Postcode'], self.address_base, ['POSTCODE']).equals(pairs)
+        assert sorted(os.listdir(directory)) == ['POSTCODE', 'manifest.json']
+
+        # but not for other rows of the same number
+        address_base = self.address_base.sort_values('POSTCODE')
+        store = BlockingIndexStore(directory, self.source)
+        assert sorted(store.pairs(self.addresses, ['Postcode'], address_base, ['POSTCODE']).tolist()) == \
+            sorted(pairs.tolist())
+
+        # but not after the source has changed
+        with open(self.source, 'a') as f:
+            f.write('a new epoch\n')
+        self.address_base['POSTCODE'] = 'AB1 2CD'
+        store = BlockingIndexStore(directory, self.source)
+        pairs = store.pairs(self.addresses, ['Postcode'], self.address_base, ['POSTCODE'])
+        assert len(pairs) == 200 * (self.addresses['Postcode'] == 'AB1 2CD').sum()
+
+
+class TestLinkingWithBlockingIndex(LinkerTestCase):
+
+    def test_blocking_index(self):
+        blocking_modes = tuple(range(1, 12))
+        settings = dict(ABcache=False, comparisonEngine=False, comparisonCache=False)
+        matches = self.link(blocking_modes, blockingIndex=False, **settings)
+
+        # the indexes are built on the first run and loaded on the second
+        for _ in range(2):
+            assert self.link(blocking_modes, blockingIndex=True, **settings).equals(matches)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+"""
+ONS Address Index - Chunk Store Test
+====================================
+
+Unit tests to check that the chunk store of AddressParser.parse_file resumes after the completed chunks.
+
+
+Version
+-------
+
+:version: 0.1
+:date: 17-Oct-2026
+"""
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+from Analytics.linking.chunkStore import ChunkStore
+from ProbabilisticParser.benchmarks import corpus
+
+
+class TestChunkStore(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.input_file = os.path.join(self.directory.name, 'input.csv')
+        self.output_directory = os.path.join(self.directory.name, 'parsed')
+
+        self.data = pd.DataFrame({'ID': range(25), 'ADDRESS': corpus.synthetic_addresses(25)})
+        self.data.to_csv(self.input_file, index=False)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_chunk_store(self):
+        store = ChunkStore(self.output_directory, output_format='csv')
+        progress = store.start(self.input_file, 10)
+        store.write(progress, self.data[:10])
+        store.write(progress, self.data[10:20])
+
+        # a new job continues after the completed chunks
+        progress = ChunkStore(self.output_directory, output_format='csv').start(self.input_file, 10)
+        assert (progress['chunks'], progress['rows']) == (2, 20)
+        store.write(progress, self.data[20:])
+        assert store.read().equals(self.data)
+
+        # but not with a different chunk size, unless starting from the beginning
+        self.assertRaises(ValueError, store.start, self.input_file, 5)
+        progress = store.start(self.input_file, 5, resume=False)
+        assert progress['chunks'] == 0 and store.chunk_files() == []
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+ONS Address Index - Compact Types Test
+======================================
+
+Unit tests to check that the compact column types of the parsed addresses hold the same values in less memory,
+also after a round trip through a feather file, and that the linkers find the same matches with them.
+
+
+Version
+-------
+
+:version: 0.3
+:date: 17-Oct-2026
+"""
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+from Analytics.linking.addressParser import AddressParser, CATEGORICAL_COLUMNS, NUMBER_COLUMNS
+from Analytics.linking.chunkStore import ChunkStore
+from Analytics.linking.compactTypes import compact_numbers, compact_types, fill_dummy_numbers, memory_footprint, \
+    NULLABLE_INTEGERS
+from Analytics.linking.tests.helpers import LinkerTestCase, same_values
+from ProbabilisticParser.benchmarks import corpus
+
+try:
+    import feather
+except ImportError:
+    feather = None
+
+# pandas older than 0.24 stores the numbers as numpy integers padded with the dummy value
+INTEGER_TYPE = 'Int16' if NULLABLE_INTEGERS else 'int16'
+
+
+class TestCompactTypes(unittest.TestCase):
+
+    def test_compact_numbers(self):
+        numbers = compact_numbers(pd.Series(['12', None, '5.7', 'X', -12345]))
+        assert str(numbers.dtype) == INTEGER_TYPE
+        if NULLABLE_INTEGERS:
+            assert numbers.isnull().tolist() == [False, True, False, True, True]
+        else:
+            assert numbers.tolist() == [12, -12345, 5, -12345, -12345]
+        assert numbers[[0, 2]].tolist() == [12, 5]
+        assert str(compact_numbers(pd.Series([40000, None])).dtype) == INTEGER_TYPE.replace('16', '32')
+
+        data = fill_dummy_numbers(pd.DataFrame({'PAOstartNumber': numbers}), ['PAOstartNumber'])
+        assert data['PAOstartNumber'].tolist() == [12, -12345, 5, -12345, -12345]
+        assert str(data['PAOstartNumber'].dtype) == INTEGER_TYPE
+
+    def test_same_values(self):
+        address_parser = AddressParser(progressBar=False, parserWorkers=1)
+        parsed = address_parser.parse(pd.DataFrame({'ADDRESS': corpus.synthetic_addresses(200)}))
+        reference = address_parser.convert_to_numeric_and_add_dummies(parsed.copy())
+
+        address_parser.settings['compactTypes'] = True
+        compact = address_parser.convert_to_numeric_and_add_dummies(parsed.copy())
+        assert memory_footprint(compact) < memory_footprint(reference)
+        assert str(compact['TownName'].dtype) == 'category'
+        assert str(compact['PAOstartNumber'].dtype) == INTEGER_TYPE
+
+        # the linkers compare the numbers with the dummies put back
+        compact = fill_dummy_numbers(compact, NUMBER_COLUMNS)
+        for column in reference.columns:
+            assert all(same_values(a, b) for a, b in zip(compact[column], reference[column])), column
+
+    @unittest.skipIf(feather is None, 'feather-format is not installed')
+    def test_feather(self):
+        data = pd.DataFrame({'ID': range(25), 'ADDRESS': corpus.synthetic_addresses(25)})
+        address_parser = AddressParser(progressBar=False, parserWorkers=1, compactTypes=True)
+        compact = address_parser.convert_to_numeric_and_add_dummies(address_parser.parse(data.copy()))
+
+        # the compact column types survive the round trip
+        with tempfile.TemporaryDirectory() as directory:
+            input_file = os.path.join(directory, 'input.csv')
+            data.to_csv(input_file, index=False)
+            store = ChunkStore(os.path.join(directory, 'compact'))
+            store.write(store.start(input_file, 25), compact)
+            stored = store.read()
+
+        assert str(stored['TownName'].dtype) == 'category'
+        assert str(stored['PAOstartNumber'].dtype) == INTEGER_TYPE
+        compact = fill_dummy_numbers(compact, NUMBER_COLUMNS)
+        stored = fill_dummy_numbers(stored, NUMBER_COLUMNS)
+        for column in compact.columns:
+            assert all(same_values(a, b) for a, b in zip(compact[column], stored[column])), column
+
+
+
+class TestLinkingWithCompactTypes(LinkerTestCase):
+
+    def test_compact_types(self):
+        settings = dict(blockingIndex=False, comparisonEngine=False, comparisonCache=False)
+        matches = self.link(**settings)
+
+        self.addresses = compact_types(self.addresses, categorical_columns=CATEGORICAL_COLUMNS,
+                                       number_columns=NUMBER_COLUMNS)
+        assert str(self.addresses['PAOstartNumber'].dtype) == INTEGER_TYPE
+        assert self.link(compactTypes=True, **settings).equals(matches)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+"""
+ONS Address Index - Comparison Cache Test
+=========================================
+
+Unit tests to check that the comparison cache gives the same comparison vectors as comparing every pair, and
+gives the linker the same matches.
+
+
+Version
+-------
+
+:version: 0.1
+:date: 17-Oct-2026
+"""
+import random
+import unittest
+
+import pandas as pd
+from Analytics.linking.comparisonCache import CachedComparison, ComparisonCache
+from Analytics.linking.comparisonEngine import ComparisonEngine
+from Analytics.linking.tests.helpers import LinkerTestCase
+
+
+class TestComparisonCache(unittest.TestCase):
+
+    def test_same_as_uncached(self):
+        random.seed(42)
+        address_base = pd.DataFrame({'POST_TOWN': [random.choice(['LONDON', 'LEEDS', None]) for _ in range(60)],
+                                     'POSTCODE': [random.choice(['AB1 2CD', 'AB1 2CE']) for _ in range(60)]},
+                                    index=pd.Index(range(100, 160), name='AddressBase_Index'))
+        addresses = pd.DataFrame({'TownName': [random.choice(['LONDON', 'LONDN', None]) for _ in range(20)],
+                                  'Postcode': [random.choice(['AB1 2CD', 'AB1 2DC']) for _ in range(20)]},
+                                 index=pd.Index(range(20), name='TestData_Index'))
+        pairs = pd.MultiIndex.from_tuples([(random.randrange(20), random.randrange(100, 160)) for _ in range(500)],
+                                          names=['TestData_Index', 'AddressBase_Index']).unique()
+
+        # a tighter mode compares the towns of some of the pairs, a looser one adds the postcodes of all the pairs
+        cache = ComparisonCache()
+        for mode_pairs, postcode in ((pairs[:100], False), (pairs, True)):
+            compare = CachedComparison(cache, ComparisonEngine, mode_pairs, address_base, addresses)
+            uncached = ComparisonEngine(mode_pairs, address_base, addresses, batch=True)
+            for comparison in (compare, uncached):
+                comparison.string('POST_TOWN', 'TownName', method='jarowinkler', name='town_dl', missing_value=0.2)
+                if postcode:
+                    comparison.string('POSTCODE', 'Postcode', method='jarowinkler', name='postcode_dl')
+
+            assert compare.run().equals(uncached.run())
+
+        assert compare.counts == dict(pairs=len(pairs), compared=compare.counts['compared'], reused=100,
+                                      computed=2 * len(pairs) - 100)
+        assert cache.counts == dict(reused=100, computed=2 * len(pairs))
+
+
+class TestLinkingWithComparisonCache(LinkerTestCase):
+
+    def test_comparison_cache(self):
+        blocking_modes = tuple(range(1, 12))
+        settings = dict(ABcache=False, blockingIndex=False)
+        matches = self.link(blocking_modes, comparisonCache=False, **settings)
+
+        # the cache is used by default when comparing with recordlinkage
+        for comparison_cache in (None, True):
+            assert self.link(blocking_modes, comparisonCache=comparison_cache, **settings).equals(matches)
+
+        # and with the other default settings, i.e. the AddressBase cache and the blocking indexes
+        assert self.link(blocking_modes).equals(matches)
+
+
+if __name__ == '__main__':
+    unittest.main()
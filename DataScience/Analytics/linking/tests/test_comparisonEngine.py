@@ -0,0 +1,84 @@
+"""
+ONS Address Index - Comparison Engine Test
+==========================================
+
+Unit tests to check that the comparison engine gives the same Jaro-Winkler and numeric similarities as the
+pair by pair comparisons, and gives the linker the same matches as recordlinkage.
+
+
+Version
+-------
+
+:version: 0.1
+:date: 17-Oct-2026
+"""
+import random
+import unittest
+
+import numpy as np
+import pandas as pd
+from Analytics.linking.comparisonEngine import ComparisonEngine, jaro_winkler, jaro_winkler_batch
+from Analytics.linking.tests.helpers import LinkerTestCase
+
+
+class TestComparisonEngine(unittest.TestCase):
+
+    def test_jaro_winkler(self):
+        for ying, yang, similarity in (('DIXON', 'DICKSONX', 0.813), ('MARTHA', 'MARHTA', 0.961),
+                                       ('DWAYNE', 'DUANE', 0.84), ('WILLIAM', 'WILLIAMS', 0.975),
+                                       ('', 'FOO', 0.), ('A', 'A', 1.), ('ABC', 'XYZ', 0.)):
+            self.assertAlmostEqual(jaro_winkler(ying, yang), similarity, places=3)
+
+        # digits do not count towards the common prefix
+        assert jaro_winkler('12 HIGH ST', '12 HIGH RD') == jaro_winkler('12 HIGH ST', '12 HIGH RD', winklerize=False)
+
+        random.seed(42)
+        ying = [''.join(random.choice('ABCD 12') for _ in range(random.randint(0, 10))) for _ in range(2000)]
+        yang = [''.join(random.choice('ABCD 12') for _ in range(random.randint(0, 10))) for _ in range(2000)]
+        for winklerize in (True, False):
+            assert jaro_winkler_batch(ying, yang, winklerize=winklerize, batch_size=100).tolist() == \
+                [jaro_winkler(a, b, winklerize=winklerize) for a, b in zip(ying, yang)]
+
+    def test_same_as_pairwise(self):
+        random.seed(42)
+        address_base = pd.DataFrame({'POST_TOWN': [random.choice(['LONDON', 'LEEDS', None]) for _ in range(60)],
+                                     'PAO_START_NUMBER': [random.choice([1, 2, 12, -12345]) for _ in range(60)]},
+                                    index=pd.Index(range(100, 160), name='AddressBase_Index'))
+        addresses = pd.DataFrame({'TownName': [random.choice(['LONDON', 'LONDN', 'N/A', None]) for _ in range(20)],
+                                  'PAOstartNumber': [random.choice([1, 3, None]) for _ in range(20)]},
+                                 index=pd.Index(range(20), name='TestData_Index'))
+        pairs = pd.MultiIndex.from_tuples([(random.randrange(20), random.randrange(100, 160)) for _ in range(500)],
+                                          names=['TestData_Index', 'AddressBase_Index']).unique()
+
+        compare = ComparisonEngine(pairs, address_base, addresses, batch=True)
+        compare.string('POST_TOWN', 'TownName', method='jarowinkler', name='town_dl', missing_value=0.2)
+        compare.numeric('PAO_START_NUMBER', 'PAOstartNumber', threshold=0.1, method='linear', name='pao_number_dl')
+        vectors = compare.run()
+        assert compare.counts['compared'] <= 6 and compare.counts['pairs'] > 300
+
+        for (test_index, address_base_index), town, number in zip(pairs, vectors['town_dl'],
+                                                                  vectors['pao_number_dl']):
+            ying = address_base.loc[address_base_index, 'POST_TOWN']
+            yang = addresses.loc[test_index, 'TownName']
+            assert town == (0.2 if pd.isnull(ying) or pd.isnull(yang) else jaro_winkler(ying, yang))
+
+            difference = addresses.loc[test_index, 'PAOstartNumber'] - address_base.loc[address_base_index,
+                                                                                       'PAO_START_NUMBER']
+            assert number == (0. if pd.isnull(difference) else max(1 - abs(difference * 10.), 0.))
+
+
+class TestLinkingWithComparisonEngine(LinkerTestCase):
+
+    def test_comparison_engine(self):
+        blocking_modes = tuple(range(1, 12))
+        settings = dict(ABcache=False, blockingIndex=False, comparisonCache=False)
+        matches = self.link(blocking_modes, comparisonEngine=False, **settings)
+        engine_matches = self.link(blocking_modes, comparisonEngine=True, **settings)
+
+        columns = ['TestData_Index', 'AddressBase_Index']
+        assert engine_matches[columns].values.tolist() == matches[columns].values.tolist()
+        assert np.allclose(engine_matches['similarity_sum'], matches['similarity_sum'])
+
+
+if __name__ == '__main__':
+    unittest.main()
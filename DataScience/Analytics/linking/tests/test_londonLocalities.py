@@ -0,0 +1,58 @@
+"""
+ONS Address Index - London Localities Test
+==========================================
+
+Unit tests to check that the suffix set of the London localities moves the same localities from the street
+names as the original implementation.
+
+
+Version
+-------
+
+:version: 0.1
+:date: 17-Oct-2026
+"""
+import random
+import unittest
+
+from Analytics.linking.londonLocalities import LondonLocalities
+from Analytics.linking.tests.helpers import DATA_PATH
+
+
+class TestLondonLocalities(unittest.TestCase):
+
+    street_names = ['HACKNEY ROAD HACKNEY', 'CHINGFORD AVENUE CHINGFORD', ' MARE STREET  HACKNEY ',
+                    'ELTHAM HIGH STREET NEW ELTHAM', 'NORTH END ROAD WEST KENSINGTON', 'HOE STREET WALTHAMSTOW',
+                    'HIGH STREET SOUTH WALTHAMSTOW', 'WESTERN GATEWAY ROYAL VICTORIA DOCK', 'STOKE NEWINGTONHACKNEY',
+                    'HACKNEY ISLINGTON', 'HACKNEY', 'HIGH ROAD', '', '  ']
+
+    @classmethod
+    def setUpClass(cls):
+        cls.localities = LondonLocalities.from_file(DATA_PATH)
+
+    def _street_names(self, n):
+        rng = random.Random(42)
+        words = ['HIGH', 'STREET', 'ROAD', 'MILL', 'LANE', 'NEW', 'WEST', 'SOUTH', 'X', '']
+        for _ in range(n):
+            parts = [rng.choice(words) for _ in range(rng.randint(0, 3))]
+            parts += [rng.choice(self.localities.localities) for _ in range(rng.randint(0, 3))]
+            rng.shuffle(parts)
+            yield rng.choice([' ', '  ', '']).join(parts) + rng.choice(['', ' '])
+
+    def test_same_as_reference(self):
+        for street_name in self.street_names + list(self._street_names(5000)):
+            parsed = self.localities.fix(dict(StreetName=street_name, TownName='LONDON'))
+            reference = self.localities._fix_reference(dict(StreetName=street_name, TownName='LONDON'))
+            assert parsed == reference, (street_name, parsed, reference)
+
+    def test_order(self):
+        localities = LondonLocalities(['ELTHAM', 'HACKNEY', 'NEW ELTHAM', 'HACKNEY'])
+        for street_name in ('ROAD NEW ELTHAM', 'ROAD HACKNEY HACKNEY', 'HACKNEY ELTHAM', 'ELTHAM HACKNEY'):
+            parsed = localities.fix(dict(StreetName=street_name))
+            assert parsed == localities._fix_reference(dict(StreetName=street_name)), street_name
+
+        assert localities.fix(dict(StreetName='ROAD NEW ELTHAM')) == dict(StreetName='ROAD NEW', Locality='ELTHAM')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+ONS Address Index - Parser Service Test
+=======================================
+
+Unit tests to check that the micro-batcher of the parser service batches the requests within a window, routes
+the results and the errors of a batch back to its requests, and keeps the latency statistics.
+
+
+Version
+-------
+
+:version: 0.1
+:date: 17-Oct-2026
+"""
+import asyncio
+import unittest
+
+from Analytics.linking.parserService import LatencyStats, MicroBatcher, percentiles
+
+
+class TestParserService(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.batches = []
+
+    def tearDown(self):
+        asyncio.set_event_loop(None)
+        self.loop.close()
+
+    def _handler(self, addresses):
+        self.batches.append(list(addresses))
+        if 'FAIL' in addresses:
+            raise RuntimeError('cannot parse')
+        return [address.lower() for address in addresses]
+
+    def _run(self, client, **kwargs):
+        batcher = MicroBatcher(self._handler, **kwargs)
+
+        async def run():
+            batcher.start()
+            try:
+                return await client(batcher)
+            finally:
+                await batcher.stop()
+
+        return self.loop.run_until_complete(run()), batcher.stats
+
+    def test_percentiles(self):
+        assert percentiles([]) == [None, None, None]
+        assert percentiles(range(100, 0, -1)) == [50, 95, 99]
+        assert percentiles([3, 1, 2], (0, 50, 100)) == [1, 2, 3]
+
+    def test_latency_stats(self):
+        stats = LatencyStats(window=2)
+        stats.record_batch(2, [0.004, 0.001])
+        stats.record_batch(1, failed=True)
+        stats.record_batch(1, [0.002])
+
+        summary = stats.summary()
+        assert (summary['requests'], summary['errors'], summary['batches']) == (4, 1, 3)
+        assert summary['mean_batch_size'] == 4 / 3
+        # only the most recent latencies are kept
+        assert list(stats.latencies) == [0.001, 0.002]
+        assert (summary['p50'], summary['p99']) == (1., 2.)
+
+    def test_window(self):
+        async def client(batcher):
+            first = await asyncio.gather(*[batcher.submit(address) for address in ['A', 'B', 'C']])
+            # the window of the first batch has closed, so later addresses go to a new batch
+            return first + [await batcher.submit('D')]
+
+        results, stats = self._run(client, window=0.05)
+        assert results == ['a', 'b', 'c', 'd']
+        # gather may start the requests in any order
+        assert [sorted(batch) for batch in self.batches] == [['A', 'B', 'C'], ['D']]
+        assert (stats.requests, stats.batches, len(stats.latencies)) == (4, 2, 4)
+
+    def test_max_batch_size(self):
+        addresses = [str(i) for i in range(10)]
+
+        async def client(batcher):
+            return await asyncio.gather(*[batcher.submit(address) for address in addresses])
+
+        results, stats = self._run(client, window=0.05, max_batch_size=4)
+        assert results == addresses
+        assert [len(batch) for batch in self.batches] == [4, 4, 2]
+        assert sorted(sum(self.batches, [])) == addresses
+
+    def test_error_routing(self):
+        async def client(batcher):
+            failed = await asyncio.gather(batcher.submit('A'), batcher.submit('FAIL'), return_exceptions=True)
+            return failed + [await batcher.submit('B')]
+
+        results, stats = self._run(client, window=0.05)
+        # every address of the failed batch gets the error, the next batch is parsed as usual
+        assert [type(result) for result in results[:2]] == [RuntimeError, RuntimeError]
+        assert results[2] == 'b'
+        assert (stats.requests, stats.errors, stats.batches) == (3, 2, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
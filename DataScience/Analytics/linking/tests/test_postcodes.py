@@ -0,0 +1,61 @@
+"""
+ONS Address Index - Postcodes Test
+==================================
+
+Unit tests to check that the vectorised postcode extraction gives the same postcodes as the original
+implementation, and that the postcodes are validated, formatted and split.
+
+
+Version
+-------
+
+:version: 0.1
+:date: 17-Oct-2026
+"""
+import unittest
+
+import pandas as pd
+from Analytics.linking.postcodes import PostcodeExtractor, format_postcodes, split_postcodes, \
+    _extract_postcode_reference
+from Analytics.linking.tests.helpers import same_values
+from ProbabilisticParser.benchmarks import corpus
+
+
+class TestPostcodes(unittest.TestCase):
+
+    addresses = ['FLAT 15 191-193 NEWPORT ROAD CARDIFF CF24 1AJ', '7 Devon Wlk Exeter ex26ga', 'SW1A1AA',
+                 '1 HIGH STREET GIR 0AA', 'NO POSTCODE', 'QQ1 1AA 1 HIGH STREET LONDON SW1A 1AA', 'EC1A1AA', '']
+
+    def test_same_as_reference(self):
+        addresses = pd.Series(self.addresses + corpus.synthetic_addresses(2000))
+        extracted = PostcodeExtractor().extract(addresses)
+
+        for address, postcode in zip(addresses, extracted['Postcode']):
+            reference = _extract_postcode_reference(address)
+            assert same_values(postcode, None if reference is None else reference.upper()), address
+
+    def test_validation(self):
+        extracted = PostcodeExtractor.from_lookups().extract(pd.Series(self.addresses))
+
+        assert extracted['Postcode'].tolist()[:4] == ['CF24 1AJ', 'EX2 6GA', 'SW1A 1AA', 'GIR 0AA']
+        assert extracted.loc[5].tolist() == ['SW1A 1AA', 'SW1A', '1AA']
+        assert extracted['Postcode'].isnull().tolist() == [False] * 4 + [True, False, False, True]
+
+        extracted = PostcodeExtractor.from_lookups(postcodes=['EX2 6GA']).extract(pd.Series(self.addresses))
+        assert extracted['Postcode'].count() == 1
+        assert extracted.loc[1, 'Postcode'] == 'EX2 6GA'
+
+    def test_format_and_split(self):
+        # the last three characters used to be removed from anywhere in the postcode
+        postcodes = format_postcodes(pd.Series(['ab1ab1', 'ex26ga', 'EX2 6GA', 'EX2', None]))
+        assert postcodes[:4].tolist() == ['AB1 AB1', 'EX2 6GA', 'EX2 6GA', 'EX2']
+        assert pd.isnull(postcodes[4])
+
+        split = split_postcodes(postcodes)
+        assert split['postcode_in'][:4].tolist() == ['AB1', 'EX2', 'EX2', 'EX2']
+        assert split['postcode_out'][:3].tolist() == ['AB1', '6GA', '6GA']
+        assert split['postcode_out'][3:].isnull().all()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+"""
+ONS Address Index - Post-processing Rules Test
+==============================================
+
+Unit tests to check that the rule table of the parser post-processing gives the same components as the
+original implementation, row by row and for a whole frame.
+
+
+Version
+-------
+
+:version: 0.1
+:date: 17-Oct-2026
+"""
+import random
+import unittest
+
+import pandas as pd
+from Analytics.linking.postprocessingRules import INPUT_COLUMNS, OUTPUT_COLUMNS, RuleEngine, \
+    _postprocessing_reference
+from Analytics.linking.tests.helpers import same_values
+
+
+class TestPostprocessingRules(unittest.TestCase):
+
+    building_names = [None, 'ROSE COURT', '24D-24E', '24-24E', '120-122', '54A', '65A-65B', '35A-35D 35A-35F',
+                      '28A-28F PICCADILLY COURT 457-463', '3-3A CHURCHILL COURT 112-144', '9B-9C 65A', '12/3',
+                      'BLOCK C', 'block c', '24d-24e', '9b-9c 65a', 'BLOCK B 4-6']
+    sub_building_names = [None, 'FLAT 3', 'FLAT 2A', '14E-14F', '14-14E', 'C2', 'c2', '5/7', '12', 'APARTMENT 5',
+                          'unit 7', ' FLAT 9 ', 'BASEMENT']
+    organisation_names = [None, 'ACME LTD', '1A-1B', '1-2B', '1a-1b']
+    street_names = [None, 'HIGH STREET', '2ND AVENUE', 'A 4 ROAD']
+    building_numbers = [None, '4', '12']
+
+    def test_same_as_reference(self):
+        rng = random.Random(0)
+        data = pd.DataFrame([[rng.choice(values) for values in (self.building_numbers, self.building_names,
+                                                                 self.organisation_names, self.sub_building_names,
+                                                                 self.street_names)] for _ in range(3000)],
+                            columns=INPUT_COLUMNS, dtype=object)
+
+        processed = RuleEngine().apply(data)
+        reference = _postprocessing_reference(data.copy())
+
+        for column in OUTPUT_COLUMNS:
+            assert all(same_values(a, b) for a, b in zip(processed[column], reference[column])), column
+
+    def test_rules(self):
+        engine = RuleEngine()
+        components = dict.fromkeys(INPUT_COLUMNS)
+
+        processed = engine.apply_row(dict(components, BuildingName='35A-35D 35A-35F'))
+        assert [processed[column] for column in ['SAOStartNumber', 'SAOStartSuffix', 'SAOEndNumber',
+                                                 'SAOEndSuffix']] == ['35', 'A', '35', 'D']
+        assert [processed[column] for column in ['PAOstartNumber', 'PAOstartSuffix', 'PAOendNumber',
+                                                 'PAOendSuffix']] == ['35', 'A', '35', 'F']
+
+        # the first rule that fills a field wins
+        processed = engine.apply_row(dict(components, BuildingName='12/3', SubBuildingName='C2'))
+        assert (processed['PAOstartNumber'], processed['SAOStartNumber']) == ('12', '3')
+        assert processed['SAOStartSuffix'] == 'C'
+
+        processed = engine.apply_row(dict(components, BuildingName='BLOCK C', StreetName='A 4 ROAD'))
+        assert (processed['SubBuildingName'], processed['BuildingNumber'], processed['PAOstartNumber']) == \
+            ('BLOCK C', '4', '4')
+
+    def test_apply_row(self):
+        data = pd.DataFrame([['12', '24D-24E', None, 'FLAT 2A', 'HIGH STREET'],
+                             [None, 'ROSE COURT', '1-2B', '5/7', '2ND AVENUE']], columns=INPUT_COLUMNS)
+
+        engine = RuleEngine()
+        processed = engine.apply(data)
+        for index, components in data.iterrows():
+            row = engine.apply_row(components.to_dict())
+            assert all(same_values(processed.loc[index, column], row[column]) for column in OUTPUT_COLUMNS), index
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""
+ONS Address Index - Benchmark County Removal
+============================================
+
+A simple script to compare the throughput of the precompiled county matcher used by
+tokens.removeCounties against the original regular expression implementation.
+Checks also that both give exactly the same output.
+
+
+Running
+-------
+
+After all requirements are satisfied, the script can be invoked using CPython interpreter::
+
+    python benchmarkCounties.py
+
+
+Requirements
+------------
+
+:requires: ProbabilisticParser
+
+
+Version
+-------
+
+:version: 0.1
+:date: 17-Oct-2026
+"""
+import time
+
+import ProbabilisticParser.common.tokens as tok
+from ProbabilisticParser.benchmarks import corpus
+
+
+def _time_function(function, addresses, repeat=3):
+    """
+    Time the given function over all addresses and return the best of repeated runs.
+
+    :param function: function to call with each address
+    :param addresses: address strings
+    :type addresses: list
+    :param repeat: number of repeats
+    :type repeat: int
+
+    :return: best time in seconds
+    :rtype: float
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for address in addresses:
+            function(address)
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def check_outputs(addresses):
+    """
+    Check that the county matcher and the regular expression give the same output.
+
+    :param addresses: address strings
+    :type addresses: list
+
+    :return: number of addresses from which a county was removed
+    :rtype: int
+    """
+    removed = 0
+    for address in addresses:
+        expected = tok._removeCountiesRegex(address)
+        assert tok.removeCounties(address) == expected, 'Output differs for {}'.format(address)
+        if expected != address:
+            removed += 1
+
+    return removed
+
+
+def run_benchmark(n_synthetic=100000, repeat=3):
+    """
+    Run the benchmark on the tokenizing test corpus and a synthetic corpus.
+
+    :param n_synthetic: number of synthetic addresses
+    :type n_synthetic: int
+    :param repeat: number of repeats, the best time is reported
+    :type repeat: int
+
+    :return: None
+    """
+    corpora = [('test_tokenizing', corpus.tokenizing_test_addresses()),
+               ('synthetic', corpus.synthetic_addresses(n_synthetic))]
+
+    for name, addresses in corpora:
+        # removeCounties is always called with upper case strings by the tokenizer
+        addresses = [address.upper() for address in addresses]
+
+        removed = check_outputs(addresses)
+
+        regex = _time_function(tok._removeCountiesRegex, addresses, repeat=repeat)
+        matcher = _time_function(tok.removeCounties, addresses, repeat=repeat)
+
+        print('Corpus {}: {} addresses, county removed from {}'.format(name, len(addresses), removed))
+        print('  regex:   {:.0f} addresses per second'.format(len(addresses) / regex))
+        print('  matcher: {:.0f} addresses per second'.format(len(addresses) / matcher))
+        print('  speed-up: {:.1f}'.format(regex / matcher))
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+"""
+ONS Address Index - Benchmark NumPy Decoder
+===========================================
+
+A simple script to compare the batched NumPy decoder against tagging one address at a time with
+pycrfsuite. Checks that the decoder reproduces the labels, the sequence probabilities and the
+marginal probabilities of pycrfsuite on a holdout XML file and on a synthetic corpus, and reports
+the throughput of both when the labels and all the probabilities are computed.
+
+If the default model of the parser is used, checks also the values asserted in parser.test.
+
+
+Running
+-------
+
+After all requirements are satisfied, the script can be invoked using CPython interpreter::
+
+    python benchmarkDecoder.py [path to addressCRF.crfsuite] [path to holdout.xml]
+
+
+Requirements
+------------
+
+:requires: numpy (tested with 1.11.3)
+:requires: pycrfsuite (https://python-crfsuite.readthedocs.io/en/latest/)
+:requires: ProbabilisticParser
+
+
+Version
+-------
+
+:version: 0.1
+:date: 17-Oct-2026
+"""
+import os
+import sys
+import time
+
+import pycrfsuite
+
+import ProbabilisticParser.common.tokens as tok
+from ProbabilisticParser.benchmarks import corpus
+from ProbabilisticParser.common.decoder import BatchDecoder, CRFWeights
+
+# the values asserted in parser.test for the default model
+TEST_STRING = 'ONS LIMITED FLAT 1 12 OXFORD STREET STREET ST1 2FW'
+TEST_PROBABILITY = 0.992256
+TEST_MARGINALS = [0.999999, 0.999999, 0.999846, 0.993642, 0.999728, 1., 1., 0.998874, 1., 1.]
+
+
+def _tag_with_pycrfsuite(tagger, sequences):
+    """
+    Tag the token sequences one at a time, computing the sequence and marginal probabilities.
+
+    :param tagger: pycrfsuite tagger with an open model
+    :type tagger: pycrfsuite.Tagger
+    :param sequences: token sequences
+    :type sequences: list
+
+    :return: labels, sequence probability and marginal probabilities of each sequence
+    :rtype: list
+    """
+    results = []
+    for tokens in sequences:
+        tagger.set(tok.tokens2flatFeatures(tokens))
+        tags = tagger.tag()
+        results.append((tags, tagger.probability(tags), [tagger.marginal(tag, i) for i, tag in enumerate(tags)]))
+
+    return results
+
+
+def _tag_with_decoder(decoder, sequences, batch_size):
+    """
+    Tag the token sequences in batches with the NumPy decoder.
+
+    :param decoder: the decoder
+    :type decoder: BatchDecoder
+    :param sequences: token sequences
+    :type sequences: list
+    :param batch_size: number of sequences decoded at once
+    :type batch_size: int
+
+    :return: labels, sequence probability and marginal probabilities of each sequence
+    :rtype: list
+    """
+    results = []
+    for start in range(0, len(sequences), batch_size):
+        for result in decoder.tag_tokens(sequences[start:start + batch_size]):
+            results.append((result['tags'][0], result['probabilities'][0], result['marginals']))
+
+    return results
+
+
+def check_results(expected, results, tolerance=1e-9):
+    """
+    Check that the decoder gives the same labels and probabilities as pycrfsuite.
+
+    :param expected: results of pycrfsuite
+    :type expected: list
+    :param results: results of the decoder
+    :type results: list
+    :param tolerance: maximum absolute difference of the probabilities
+    :type tolerance: float
+
+    :return: maximum absolute difference of the sequence and the marginal probabilities
+    :rtype: tuple
+    """
+    max_probability = max_marginal = 0.
+    for (tags, probability, marginals), (decoded, decoded_probability, decoded_marginals) in zip(expected, results):
+        assert tags == decoded, 'Labels differ: {} and {}'.format(tags, decoded)
+
+        max_probability = max(max_probability, abs(probability - decoded_probability))
+        max_marginal = max([max_marginal] + [abs(a - b) for a, b in zip(marginals, decoded_marginals)])
+
+    assert max_probability < tolerance and max_marginal < tolerance, 'Probabilities differ'
+
+    return max_probability, max_marginal
+
+
+def check_parser_test(decoder):
+    """
+    Check the values asserted in parser.test, only valid for the default model.
+
+    :param decoder: decoder of the default model
+    :type decoder: BatchDecoder
+
+    :return: None
+    """
+    result = decoder.tag_tokens([tok.tokenize(TEST_STRING)])[0]
+
+    assert round(result['probabilities'][0], 6) == TEST_PROBABILITY, 'Sequence probability not correct'
+    assert [round(marginal, 6) for marginal in result['marginals']] == TEST_MARGINALS, 'Marginals not correct'
+
+
+def run_benchmark(model_file=None, holdout_file=None, n_synthetic=20000, batch_size=1000):
+    """
+    Run the benchmark on the holdout data and a synthetic corpus.
+
+    :param model_file: CRF model, defaults to the model of the parser
+    :type model_file: str
+    :param holdout_file: XML file of labelled addresses, defaults to the example training data
+    :type holdout_file: str
+    :param n_synthetic: number of synthetic addresses
+    :type n_synthetic: int
+    :param batch_size: number of sequences decoded at once
+    :type batch_size: int
+
+    :return: None
+    """
+    default_model = tok.MODEL_PATH + tok.MODEL_FILE
+    if model_file is None:
+        model_file = default_model
+    if holdout_file is None:
+        holdout_file = os.path.join(tok.MODEL_PATH, 'example.xml')
+
+    start = time.perf_counter()
+    decoder = BatchDecoder(CRFWeights.from_model(model_file))
+    print('Exported the weights of {} in {:.2f} seconds'.format(model_file, time.perf_counter() - start))
+
+    if os.path.abspath(model_file) == os.path.abspath(default_model):
+        check_parser_test(decoder)
+        print('Reproduced the values asserted in parser.test')
+
+    tagger = pycrfsuite.Tagger()
+    tagger.open(model_file)
+
+    holdout = [[token for token, _ in components] for _, components in tok.readXML(holdout_file)]
+    synthetic = [tokens for tokens in tok.tokenize_many(corpus.synthetic_addresses(n_synthetic)) if tokens]
+
+    for name, sequences in [('holdout', holdout), ('synthetic', synthetic)]:
+        start = time.perf_counter()
+        expected = _tag_with_pycrfsuite(tagger, sequences)
+        reference = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = _tag_with_decoder(decoder, sequences, batch_size)
+        batched = time.perf_counter() - start
+
+        max_probability, max_marginal = check_results(expected, results)
+
+        print('Corpus {}: {} addresses, identical labels, maximum difference of probabilities {:.1e} and '
+              'marginals {:.1e}'.format(name, len(sequences), max_probability, max_marginal))
+        print('  pycrfsuite: {:.0f} addresses per second'.format(len(sequences) / reference))
+        print('  numpy:      {:.0f} addresses per second'.format(len(sequences) / batched))
+        print('  speed-up: {:.1f}'.format(reference / batched))
+
+
+if __name__ == "__main__":
+    run_benchmark(*sys.argv[1:3])
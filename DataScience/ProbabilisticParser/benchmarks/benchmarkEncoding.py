@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+"""
+ONS Address Index - Benchmark Feature Encoding
+==============================================
+
+A simple script to compare the nested feature dictionaries of tokens.tokens2features against
+the flat attribute dictionaries of tokens.tokens2flatFeatures. Reports the encoding time,
+the memory allocated per address, and, if a trained CRF model is available, the throughput
+of tagging with both encodings. Checks also that both encodings give identical tags and
+sequence probabilities.
+
+
+Running
+-------
+
+After all requirements are satisfied, the script can be invoked using CPython interpreter::
+
+    python benchmarkEncoding.py [path to addressCRF.crfsuite]
+
+
+Requirements
+------------
+
+:requires: pycrfsuite (https://python-crfsuite.readthedocs.io/en/latest/)
+:requires: ProbabilisticParser
+
+
+Version
+-------
+
+:version: 0.1
+:date: 17-Oct-2026
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+import pycrfsuite
+
+import ProbabilisticParser.common.tokens as tok
+from ProbabilisticParser.benchmarks import corpus
+
+
+def _time_batch(function, sequences, repeat=3):
+    """
+    Time the given function over all token sequences and return the best of repeated runs.
+
+    :param function: function to call with each token sequence
+    :param sequences: token sequences
+    :type sequences: list
+    :param repeat: number of repeats
+    :type repeat: int
+
+    :return: best time in seconds
+    :rtype: float
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for tokens in sequences:
+            function(tokens)
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def _allocated_per_address(encoder, sequences):
+    """
+    Measure the memory allocated by encoding the given token sequences. The encoded features are
+    kept alive until all sequences have been encoded, as they would be by a batch of taggings.
+
+    :param encoder: feature encoding function
+    :param sequences: token sequences
+    :type sequences: list
+
+    :return: allocated bytes per address
+    :rtype: float
+    """
+    # warm up the feature caches so that only the encoding itself is measured
+    for tokens in sequences:
+        encoder(tokens)
+
+    tracemalloc.start()
+    snapshot = tracemalloc.take_snapshot()
+    encoded = [encoder(tokens) for tokens in sequences]
+    allocated = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(snapshot, 'filename'))
+    tracemalloc.stop()
+
+    del encoded
+
+    return allocated / len(sequences)
+
+
+def check_tags(tagger, sequences):
+    """
+    Check that both encodings give exactly the same tags and sequence probabilities.
+
+    :param tagger: pycrfsuite tagger with an open model
+    :type tagger: pycrfsuite.Tagger
+    :param sequences: token sequences
+    :type sequences: list
+
+    :return: None
+    """
+    for tokens in sequences:
+        nested = tagger.tag(tok.tokens2features(tokens))
+        nested_probability = tagger.probability(nested)
+
+        flat = tagger.tag(tok.tokens2flatFeatures(tokens))
+
+        assert flat == nested, 'Tags differ for {}'.format(tokens)
+        assert tagger.probability(flat) == nested_probability, 'Probability differs for {}'.format(tokens)
+
+
+def run_benchmark(model_file=None, n_synthetic=100000, repeat=3):
+    """
+    Run the benchmark on a synthetic corpus.
+
+    :param model_file: CRF model used to measure the tagging throughput, defaults to the model of the parser
+    :type model_file: str
+    :param n_synthetic: number of synthetic addresses
+    :type n_synthetic: int
+    :param repeat: number of repeats, the best time is reported
+    :type repeat: int
+
+    :return: None
+    """
+    if model_file is None:
+        model_file = tok.MODEL_PATH + tok.MODEL_FILE
+
+    sequences = [tokens for tokens in tok.tokenize_many(corpus.synthetic_addresses(n_synthetic)) if tokens]
+    print('Corpus synthetic: {} addresses'.format(len(sequences)))
+
+    nested = _time_batch(tok.tokens2features, sequences, repeat=repeat)
+    flat = _time_batch(tok.tokens2flatFeatures, sequences, repeat=repeat)
+    print('Encoding:')
+    print('  nested: {:.0f} addresses per second'.format(len(sequences) / nested))
+    print('  flat:   {:.0f} addresses per second'.format(len(sequences) / flat))
+    print('  speed-up: {:.1f}'.format(nested / flat))
+
+    # tracing all allocations is slow, a sample is enough for a per address estimate
+    nested = _allocated_per_address(tok.tokens2features, sequences[:10000])
+    flat = _allocated_per_address(tok.tokens2flatFeatures, sequences[:10000])
+    print('Allocation:')
+    print('  nested: {:.0f} bytes per address'.format(nested))
+    print('  flat:   {:.0f} bytes per address'.format(flat))
+
+    if not os.path.isfile(model_file):
+        print('Cannot find the CRF model file', model_file, '- skipping the tagging benchmark')
+        return
+
+    tagger = pycrfsuite.Tagger()
+    tagger.open(model_file)
+
+    check_tags(tagger, sequences)
+
+    nested = _time_batch(lambda tokens: tagger.tag(tok.tokens2features(tokens)), sequences, repeat=repeat)
+    flat = _time_batch(lambda tokens: tagger.tag(tok.tokens2flatFeatures(tokens)), sequences, repeat=repeat)
+    print('Encoding and tagging:')
+    print('  nested: {:.0f} addresses per second'.format(len(sequences) / nested))
+    print('  flat:   {:.0f} addresses per second'.format(len(sequences) / flat))
+    print('  speed-up: {:.1f}'.format(nested / flat))
+
+
+if __name__ == "__main__":
+    run_benchmark(*sys.argv[1:2])
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""
+ONS Address Index - Benchmark Import Time
+=========================================
+
+A simple script to track the cold start latency of the probabilistic parser. Each measurement is
+run in a fresh interpreter, so that nothing is cached in memory, and the median of repeated runs is
+reported. Measures the time to import the tokens and the parser, and the time until the first address
+has been tokenized and, if a trained model is available, parsed. Checks also which of the heavy
+dependencies get imported as a side effect.
+
+
+Running
+-------
+
+After all requirements are satisfied, the script can be invoked using CPython interpreter::
+
+    python benchmarkImport.py
+
+
+Requirements
+------------
+
+:requires: ProbabilisticParser
+
+
+Version
+-------
+
+:version: 0.1
+:date: 17-Oct-2026
+"""
+import os
+import statistics
+import subprocess
+import sys
+
+import ProbabilisticParser
+
+# the DataScience directory, which needs to be on the path of the fresh interpreters
+ROOT_PATH = os.path.abspath(os.path.join(os.path.dirname(ProbabilisticParser.__file__), '..'))
+
+HEAVY_DEPENDENCIES = ['pandas', 'numpy', 'lxml', 'pycrfsuite']
+
+SCENARIOS = [('import tokens', 'import ProbabilisticParser.common.tokens'),
+             ('import parser', 'from ProbabilisticParser import parser'),
+             ('first tokenize', 'from ProbabilisticParser import parser; parser.tok.tokenize("1 HIGH STREET EX2 6GA")'),
+             ('first parse', 'from ProbabilisticParser import parser; parser.tag("1 HIGH STREET EX2 6GA")')]
+
+_TIMER = """
+import sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(elapsed, ','.join(module for module in {dependencies!r} if module in sys.modules))
+"""
+
+
+def _cold_start(statement):
+    """
+    Run the given statement in a fresh interpreter and time it.
+
+    :param statement: Python statement to time
+    :type statement: str
+
+    :return: time in seconds and the heavy dependencies that were imported
+    :rtype: tuple
+    """
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT_PATH, os.environ.get('PYTHONPATH', '')]))
+    output = subprocess.run([sys.executable, '-c', _TIMER.format(statement=statement, dependencies=HEAVY_DEPENDENCIES)],
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=environment, check=True,
+                            universal_newlines=True).stdout.split()
+
+    return float(output[0]), output[1] if len(output) > 1 else ''
+
+
+def run_benchmark(repeat=11):
+    """
+    Run all the scenarios in fresh interpreters and report the median times.
+
+    :param repeat: number of runs of each scenario
+    :type repeat: int
+
+    :return: median time in seconds of each scenario
+    :rtype: dict
+    """
+    results = {}
+    for name, statement in SCENARIOS:
+        try:
+            runs = [_cold_start(statement) for _ in range(repeat)]
+        except subprocess.CalledProcessError as error:
+            messages = (error.stderr + error.stdout).strip().splitlines()
+            print('{:>15}: failed, {}'.format(name, messages[-1] if messages else 'exit status {}'.format(error.returncode)))
+            continue
+
+        results[name] = statistics.median(elapsed for elapsed, _ in runs)
+        print('{:>15}: {:7.1f} ms, imports {}'.format(name, 1000 * results[name], runs[0][1] or 'none of ' +
+                                                      ', '.join(HEAVY_DEPENDENCIES)))
+
+    return results
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,304 @@
+#!/usr/bin/env python
+"""
+ONS Address Index - Benchmark Parser Stages
+===========================================
+
+A script to time each stage of the probabilistic parser separately, so that it is known where the time
+goes before and after an optimisation. The stages are:
+
+    1. removeCounties - the first county removal of tokenize on the upper case string
+    2. tokenize - the rest of tokenize i.e. ranges, separators, synonyms and splitting to tokens
+    3. tokens2features - the nested feature dictionaries used for training
+    4. tokens2flatFeatures - the flat attributes passed to the tagger
+    5. tag - TAGGER.set and TAGGER.tag
+    6. marginals - the marginal probability of each label and the sequence probability after tagging
+
+The corpus of each size contains the raw strings of training/example.xml followed by reproducible
+synthetic addresses. The corpora are processed in chunks so that the memory use does not grow with the
+corpus size, and the feature caches are cleared before each run so that every run does the same work.
+The best time of the repeated runs is reported.
+
+The results are written as JSON together with the git commit, the Python version, and the checksum of
+the model, and two result files can be compared stage by stage.
+
+
+Running
+-------
+
+After all requirements are satisfied, the script can be invoked using CPython interpreter::
+
+    python benchmarkStages.py --output before.json
+    python benchmarkStages.py --output after.json
+    python benchmarkStages.py --compare before.json after.json
+
+The default sizes are 1000, 100000 and 1000000 addresses, use e.g. ``--sizes 1000 100000`` for a quicker run.
+
+
+Requirements
+------------
+
+:requires: pycrfsuite (https://python-crfsuite.readthedocs.io/en/latest/), only for the tagging stages
+:requires: ProbabilisticParser
+
+
+Version
+-------
+
+:version: 0.1
+:date: 17-Oct-2026
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import time
+
+import ProbabilisticParser.common.tokens as tok
+from ProbabilisticParser.benchmarks import corpus
+from ProbabilisticParser.common.cache import model_checksum
+
+STAGES = ['removeCounties', 'tokenize', 'tokens2features', 'tokens2flatFeatures', 'tag', 'marginals']
+
+
+def build_corpus(size):
+    """
+    Build a corpus of the given size from the raw strings of the example training data and synthetic addresses.
+
+    :param size: number of addresses
+    :type size: int
+
+    :return: address strings
+    :rtype: list
+    """
+    example = [raw_string for raw_string, _ in tok.readXML(os.path.join(tok.MODEL_PATH, 'example.xml'))]
+
+    return (example + corpus.synthetic_addresses(max(size - len(example), 0)))[:size]
+
+
+def _timed(function, items):
+    """
+    Apply the function to each item and time it.
+
+    :param function: function to apply
+    :type function: callable
+    :param items: inputs of the function
+    :type items: list
+
+    :return: time in seconds and the outputs of the function
+    :rtype: tuple
+    """
+    start = time.perf_counter()
+    outputs = [function(item) for item in items]
+
+    return time.perf_counter() - start, outputs
+
+
+def _time_chunk(addresses, tagger, timings):
+    """
+    Time all the stages on a chunk of addresses and add the times to the timings.
+
+    :param addresses: address strings
+    :type addresses: list
+    :param tagger: tagger with an open model, if None the tagging stages are skipped
+    :type tagger: pycrfsuite.Tagger or None
+    :param timings: seconds spent in each stage so far
+    :type timings: dict
+
+    :return: number of tokens in the chunk
+    :rtype: int
+    """
+    tokenizer = tok.getTokenizer()
+
+    strings = [address.upper() for address in addresses]
+    elapsed, strings = _timed(tok.removeCounties, strings)
+    timings['removeCounties'] += elapsed
+
+    elapsed, sequences = _timed(tokenizer.split, strings)
+    timings['tokenize'] += elapsed
+    sequences = [tokens for tokens in sequences if tokens]
+
+    elapsed, _ = _timed(tok.tokens2features, sequences)
+    timings['tokens2features'] += elapsed
+
+    elapsed, features = _timed(tok.tokens2flatFeatures, sequences)
+    timings['tokens2flatFeatures'] += elapsed
+
+    if tagger is not None:
+        def tag(attributes):
+            tagger.set(attributes)
+            return tagger.tag()
+
+        def tag_and_marginals(attributes):
+            tagger.set(attributes)
+            tags = tagger.tag()
+            return tagger.probability(tags), [tagger.marginal(label, i) for i, label in enumerate(tags)]
+
+        # marginals need the state of the tagger, hence timed as the difference to tagging only
+        tagging, _ = _timed(tag, features)
+        with_marginals, _ = _timed(tag_and_marginals, features)
+        timings['tag'] += tagging
+        timings['marginals'] += with_marginals - tagging
+
+    return sum(len(tokens) for tokens in sequences)
+
+
+def time_stages(addresses, tagger=None, chunksize=10000):
+    """
+    Time all the stages on the given addresses once, starting with empty feature caches.
+
+    :param addresses: address strings
+    :type addresses: list
+    :param tagger: tagger with an open model, if None the tagging stages are skipped
+    :type tagger: pycrfsuite.Tagger or None
+    :param chunksize: number of addresses processed at a time
+    :type chunksize: int
+
+    :return: seconds spent in each stage and the number of tokens
+    :rtype: tuple
+    """
+    tok.cachedTokenFeatures.cache_clear()
+    tok._cachedFlatFeatures.cache_clear()
+
+    timings = {stage: 0. for stage in STAGES}
+    n_tokens = 0
+    for start in range(0, len(addresses), chunksize):
+        n_tokens += _time_chunk(addresses[start:start + chunksize], tagger, timings)
+
+    if tagger is None:
+        timings['tag'] = timings['marginals'] = None
+
+    return timings, n_tokens
+
+
+def _git_commit():
+    """
+    The current git commit of the repository, if available.
+
+    :return: commit hash or None
+    :rtype: str or None
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True,
+                              universal_newlines=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(sizes=(1000, 100000, 1000000), repeat=3, model_file=None, output=None):
+    """
+    Time the stages on corpora of the given sizes and write the results as JSON.
+
+    :param sizes: numbers of addresses in the corpora
+    :type sizes: tuple
+    :param repeat: number of runs on each corpus, the best time of each stage is reported
+    :type repeat: int
+    :param model_file: CRF model, defaults to the model of the parser
+    :type model_file: str or None
+    :param output: name of the JSON file, if None the results are only printed
+    :type output: str or None
+
+    :return: the results
+    :rtype: dict
+    """
+    if model_file is None:
+        model_file = tok.MODEL_PATH + tok.MODEL_FILE
+
+    tagger = None
+    if os.path.isfile(model_file):
+        import pycrfsuite
+        tagger = pycrfsuite.Tagger()
+        tagger.open(model_file)
+    else:
+        print('Model {} not found, skipping the tagging stages'.format(model_file))
+
+    results = dict(commit=_git_commit(), date=datetime.datetime.now().isoformat(timespec='seconds'),
+                   python=platform.python_version(), model=model_file,
+                   model_checksum=model_checksum(model_file) if tagger is not None else None,
+                   repeat=repeat, corpora={})
+
+    for size in sizes:
+        addresses = build_corpus(size)
+
+        runs = [time_stages(addresses, tagger) for _ in range(repeat)]
+        n_tokens = runs[0][1]
+        stages = {}
+        for stage in STAGES:
+            times = [timings[stage] for timings, _ in runs]
+            stages[stage] = None if times[0] is None else dict(seconds=min(times),
+                                                               microseconds_per_address=1e6 * min(times) / size)
+
+        results['corpora'][str(size)] = dict(addresses=size, tokens=n_tokens, stages=stages)
+
+        print('Corpus of {} addresses, {} tokens'.format(size, n_tokens))
+        total = sum(stage['seconds'] for stage in stages.values() if stage is not None)
+        for name, stage in stages.items():
+            if stage is not None:
+                print('  {:>20}: {:8.2f} us per address, {:5.1f} %'.format(name, stage['microseconds_per_address'],
+                                                                           100. * stage['seconds'] / total))
+
+    if tagger is not None:
+        tagger.close()
+
+    if output is not None:
+        with open(output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print('Results written to {}'.format(output))
+
+    return results
+
+
+def compare(before_file, after_file):
+    """
+    Compare two result files stage by stage for the corpus sizes found in both.
+
+    :param before_file: JSON results of the baseline
+    :type before_file: str
+    :param after_file: JSON results to compare against the baseline
+    :type after_file: str
+
+    :return: speed-up of each stage for each corpus size, None if the stage is missing from either file
+    :rtype: dict
+    """
+    with open(before_file) as f:
+        before = json.load(f)
+    with open(after_file) as f:
+        after = json.load(f)
+
+    print('Baseline {} ({}), compared {} ({})'.format(before_file, before['commit'], after_file, after['commit']))
+    if before['model_checksum'] != after['model_checksum']:
+        print('Warning: the results were computed with different models')
+
+    speed_ups = {}
+    for size in [size for size in before['corpora'] if size in after['corpora']]:
+        speed_ups[size] = {}
+        print('Corpus of {} addresses'.format(size))
+        for stage in STAGES:
+            old = before['corpora'][size]['stages'].get(stage)
+            new = after['corpora'][size]['stages'].get(stage)
+            if old is None or new is None or new['seconds'] <= 0:
+                speed_ups[size][stage] = None
+                continue
+            speed_ups[size][stage] = old['seconds'] / new['seconds']
+            print('  {:>20}: {:8.2f} -> {:8.2f} us per address, speed-up {:.2f}'
+                  .format(stage, old['microseconds_per_address'], new['microseconds_per_address'],
+                          speed_ups[size][stage]))
+
+    return speed_ups
+
+
+if __name__ == "__main__":
+    arguments = argparse.ArgumentParser(description='Time the stages of the probabilistic parser')
+    arguments.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000, 1000000])
+    arguments.add_argument('--repeat', type=int, default=3)
+    arguments.add_argument('--model', help='CRF model, defaults to the model of the parser')
+    arguments.add_argument('--output', help='JSON file to write the results')
+    arguments.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'), help='compare two result files')
+    arguments = arguments.parse_args()
+
+    if arguments.compare:
+        compare(*arguments.compare)
+    else:
+        run_benchmark(arguments.sizes, arguments.repeat, arguments.model, arguments.output)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+"""
+ONS Address Index - Benchmark Tokenizer
+=======================================
+
+A simple script to compare the throughput of the precompiled Tokenizer against the original
+tokenize implementation. Checks also that both give exactly the same tokens.
+
+
+Running
+-------
+
+After all requirements are satisfied, the script can be invoked using CPython interpreter::
+
+    python benchmarkTokenizer.py
+
+
+Requirements
+------------
+
+:requires: ProbabilisticParser
+
+
+Version
+-------
+
+:version: 0.1
+:date: 17-Oct-2026
+"""
+import time
+
+import ProbabilisticParser.common.tokens as tok
+from ProbabilisticParser.benchmarks import corpus
+
+
+def _time_batch(function, addresses, repeat=3):
+    """
+    Time the given batch function over all addresses and return the best of repeated runs.
+
+    :param function: function that takes the list of addresses and returns an iterable of tokens
+    :param addresses: address strings
+    :type addresses: list
+    :param repeat: number of repeats
+    :type repeat: int
+
+    :return: best time in seconds
+    :rtype: float
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in function(addresses):
+            pass
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def run_benchmark(n_synthetic=100000, repeat=3):
+    """
+    Run the benchmark on the tokenizing test corpus and a synthetic corpus. Reports the time
+    it takes to tokenize a million addresses.
+
+    :param n_synthetic: number of synthetic addresses
+    :type n_synthetic: int
+    :param repeat: number of repeats, the best time is reported
+    :type repeat: int
+
+    :return: None
+    """
+    corpora = [('test_tokenizing', corpus.tokenizing_test_addresses()),
+               ('synthetic', corpus.synthetic_addresses(n_synthetic))]
+
+    for name, addresses in corpora:
+        for address, tokens in zip(addresses, tok.tokenize_many(addresses)):
+            assert tokens == tok._tokenizeReference(address), 'Tokens differ for {}'.format(address)
+
+        reference = _time_batch(lambda batch: map(tok._tokenizeReference, batch), addresses, repeat=repeat)
+        tokenizer = _time_batch(tok.tokenize_many, addresses, repeat=repeat)
+
+        per_million = 1e6 / len(addresses)
+        print('Corpus {}: {} addresses'.format(name, len(addresses)))
+        print('  reference tokenize: {:.1f} seconds per million addresses'.format(reference * per_million))
+        print('  tokenize_many:      {:.1f} seconds per million addresses'.format(tokenizer * per_million))
+        print('  speed-up: {:.1f}'.format(reference / tokenizer))
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,151 @@
+"""
+ONS Address Index - Probabilistic Parser Benchmark Corpora
+==========================================================
+
+Address corpora used to benchmark the probabilistic parser. Contains the addresses used in the unit tests
+and a generator for a synthetic corpus of arbitrary size. The synthetic addresses are built from the same
+lookup tables that the tokenizer uses, so that counties, synonyms, post towns and outcodes appear at a
+realistic rate.
+
+
+Requirements
+------------
+
+None
+
+
+Version
+-------
+
+:version: 0.1
+:date: 17-Oct-2026
+"""
+import ast
+import os
+import random
+
+import ProbabilisticParser.common.tokens as tok
+
+directory = os.path.dirname(__file__)  # for relative path definitions
+TESTS_PATH = os.path.join(directory, '../tests/')
+
+STREET_NAMES = ['HIGH', 'CHURCH', 'STATION', 'MILL', 'LONDON', 'VICTORIA', 'PARK', 'GREEN', 'MANOR', 'QUEENS',
+                'KINGS', 'NEW', 'SCHOOL', 'NORTH', 'ALEXANDRA', 'YORK', 'WINDSOR', 'BEECH', 'OXFORD', 'ESSEX',
+                'DEVON', 'KENT', 'ST ALBANS', 'ST. JAMES', 'TAVISTOCK', 'PERSHORE', 'DENZIL', 'VINCENT']
+BUILDING_NAMES = ['ROSE', 'IVY', 'OAK', 'SHAKESPEARE', 'VICTORIAN', 'WOLVERLEY', 'BECK MILL', 'LIBERTY',
+                  'ORCHARD', 'CHURCHILL', 'PICCADILLY', 'ARAGON']
+ORGANISATIONS = ['ONS LIMITED', 'HILLTOP CARE HOME', 'ROYAL MENCAP SOCIETY', 'WOODCROFT HOSPITAL',
+                 'DURHAM UNIVERSITY', 'THE RED LION BAR', 'ACME LTD']
+PLACES_WITH_COUNTIES = ['BRADFORD ON AVON', 'STRATFORD UPON AVON', 'DINAS POWYS', 'SOUTHEND ON SEA']
+
+
+def _strings_in_file(filename):
+    """
+    Get all the string literals from a Python source file.
+
+    :param filename: name of the Python file
+    :type filename: str
+
+    :return: string literals in the order they appear
+    :rtype: list
+    """
+    with open(filename) as f:
+        tree = ast.parse(f.read())
+
+    strings = [node.value for node in ast.walk(tree) if isinstance(node, ast.Constant) and isinstance(node.value, str)]
+
+    # skip docstrings and other multiline text
+    return [string for string in strings if '\n' not in string]
+
+
+def tokenizing_test_addresses():
+    """
+    The address strings that are used in the tokenizing unit tests.
+
+    :return: address strings
+    :rtype: list
+    """
+    return _strings_in_file(TESTS_PATH + 'test_tokenizing.py')
+
+
+def parser_test_addresses():
+    """
+    The address strings that are used in the parser unit tests.
+
+    :return: address strings
+    :rtype: list
+    """
+    return _strings_in_file(TESTS_PATH + 'test_parser.py')
+
+
+def _synthetic_address(rng, counties, outcodes, posttowns):
+    """
+    Generate a single synthetic address string.
+
+    :param rng: random number generator
+    :type rng: random.Random
+
+    :return: synthetic address
+    :rtype: str
+    """
+    components = []
+
+    if rng.random() < 0.1:
+        components.append(rng.choice(ORGANISATIONS))
+
+    if rng.random() < 0.3:
+        components.append('{} {}'.format(rng.choice(sorted(tok.FLAT)), rng.randint(1, 120)))
+
+    if rng.random() < 0.3:
+        components.append('{} {}'.format(rng.choice(BUILDING_NAMES), rng.choice(sorted(tok.Residential))))
+
+    number = rng.random()
+    if number < 0.6:
+        components.append(str(rng.randint(1, 400)))
+    elif number < 0.7:
+        start = rng.randint(1, 200)
+        components.append('{} {} {}'.format(start, rng.choice(['-', 'TO', '/']), start + rng.randint(1, 10)))
+    elif number < 0.8:
+        components.append('{}{}'.format(rng.randint(1, 200), rng.choice('ABCD')))
+
+    components.append('{} {}'.format(rng.choice(STREET_NAMES), rng.choice(sorted(tok.ROAD))))
+
+    if rng.random() < 0.05:
+        components.append(rng.choice(PLACES_WITH_COUNTIES))
+
+    components.append(rng.choice(posttowns))
+
+    if counties and rng.random() < 0.3:
+        components.append(rng.choice(counties))
+
+    postcode = rng.random()
+    if postcode < 0.8:
+        components.append('{} {}{}{}'.format(rng.choice(outcodes), rng.randint(0, 9),
+                                             rng.choice('ABDEFGHJLNPQRSTUWXYZ'), rng.choice('ABDEFGHJLNPQRSTUWXYZ')))
+    elif postcode < 0.9:
+        components.append(rng.choice(outcodes))
+
+    separator = ', ' if rng.random() < 0.3 else ' '
+
+    return separator.join(components)
+
+
+def synthetic_addresses(n, seed=42):
+    """
+    Generate a reproducible corpus of synthetic address strings.
+
+    :param n: number of addresses to generate
+    :type n: int
+    :param seed: random seed, the same seed always generates the same corpus
+    :type seed: int
+
+    :return: address strings
+    :rtype: list
+    """
+    rng = random.Random(seed)
+
+    counties = [county for county in tok.county if county]
+    outcodes = sorted(tok.OUTCODES)
+    posttowns = sorted(tok.POSTTOWNS)
+
+    return [_synthetic_address(rng, counties, outcodes, posttowns) for _ in range(n)]
@@ -0,0 +1,225 @@
+"""
+ONS Address Index - Probabilistic Parser Cache
+==============================================
+
+This file defines a cache for the results of the probabilistic parser. Address datasets contain
+many repeated strings and the same files are parsed again on every run, hence the results are kept
+in an in-memory least recently used cache, which can be backed by an SQLite database on disk so that
+repeated runs do not need to call the CRF model for previously seen strings.
+
+The results depend only on the tokens of the string and on the model, hence the cache is keyed by
+a hash of the normalised string i.e. the tokens, and the checksum of the model file. A cache file can
+be shared between models, results of a different model are never returned.
+
+The new results are committed to the database in batches, and the results not yet committed are committed when
+the cache is closed or at the latest when the interpreter exits. A cache can be used from several threads, e.g.
+the executor threads of the parse service, the access to the database and the in-memory cache is serialised.
+
+
+Requirements
+------------
+
+None
+
+
+Version
+-------
+
+:version: 0.2
+:date: 17-Oct-2026
+"""
+import atexit
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+
+
+def model_checksum(model_file, block_size=2 ** 20):
+    """
+    Compute the checksum of a model file.
+
+    :param model_file: name of the model file
+    :type model_file: str
+    :param block_size: number of bytes to read at a time
+    :type block_size: int
+
+    :return: SHA-256 checksum as a hexadecimal string
+    :rtype: str
+    """
+    checksum = hashlib.sha256()
+    with open(model_file, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            checksum.update(block)
+
+    return checksum.hexdigest()
+
+
+class ParseCache:
+    """
+    A two level cache of parsed addresses: an in-memory least recently used cache in front of
+    an optional SQLite database. The values are stored as tuples of (label, component) pairs.
+    """
+
+    def __init__(self, model_file, filename=None, maxsize=2 ** 16, commit_every=1000):
+        """
+        Class constructor.
+
+        :param model_file: name of the model file, the cached results are only valid for this model
+        :type model_file: str
+        :param filename: name of the SQLite database, if None the results are only cached in memory
+        :type filename: str or None
+        :param maxsize: maximum number of results kept in memory
+        :type maxsize: int
+        :param commit_every: number of new results after which they are committed to the database
+        :type commit_every: int
+        """
+        self.model_file = model_file
+        self.filename = filename
+        self.maxsize = maxsize
+        self.commit_every = commit_every
+
+        self._namespace = model_checksum(model_file).encode('ascii')
+        self._memory = OrderedDict()
+        self._pending = 0
+        self._lock = threading.RLock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._connection = None
+        if filename is not None:
+            self._connection = sqlite3.connect(filename, check_same_thread=False)
+            self._connection.execute('CREATE TABLE IF NOT EXISTS parses (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+            self._connection.commit()
+            atexit.register(self.close)
+
+    def key(self, tokens):
+        """
+        Compute the key of the given tokens.
+
+        :param tokens: tokens of a single address
+        :type tokens: list
+
+        :return: a hash of the model checksum and the tokens
+        :rtype: str
+        """
+        # tokens never contain whitespace, hence joining with a space is unambiguous
+        return hashlib.sha1(self._namespace + b'\0' + ' '.join(tokens).encode('utf-8')).hexdigest()
+
+    def _remember(self, key, value):
+        """
+        Store the given value to the in-memory cache, evicting the least recently used if full.
+
+        :param key: key of the value
+        :type key: str
+        :param value: (label, component) pairs
+        :type value: tuple
+
+        :return: None
+        """
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def get(self, key):
+        """
+        Get the cached value of the given key.
+
+        :param key: key computed with the key method
+        :type key: str
+
+        :return: (label, component) pairs or None if not cached
+        :rtype: tuple or None
+        """
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return value
+
+            if self._connection is not None:
+                row = self._connection.execute('SELECT value FROM parses WHERE key = ?', (key,)).fetchone()
+                if row is not None:
+                    value = tuple(tuple(pair) for pair in json.loads(row[0]))
+                    self._remember(key, value)
+                    self.disk_hits += 1
+                    return value
+
+            self.misses += 1
+
+        return None
+
+    def put(self, key, value):
+        """
+        Store the value of the given key. The value is written to the database in batches, see flush.
+
+        :param key: key computed with the key method
+        :type key: str
+        :param value: (label, component) pairs
+        :type value: tuple
+
+        :return: None
+        """
+        value = tuple(tuple(pair) for pair in value)
+
+        with self._lock:
+            self._remember(key, value)
+
+            if self._connection is not None:
+                self._connection.execute('INSERT OR REPLACE INTO parses (key, value) VALUES (?, ?)',
+                                         (key, json.dumps(value)))
+                self._pending += 1
+                if self._pending >= self.commit_every:
+                    self.flush()
+
+    def flush(self):
+        """
+        Commit the new values to the database.
+
+        :return: None
+        """
+        with self._lock:
+            if self._connection is not None and self._pending:
+                self._connection.commit()
+            self._pending = 0
+
+    def close(self):
+        """
+        Commit the new values and close the database. The in-memory cache can still be used.
+        Called when the interpreter exits, if not called before.
+
+        :return: None
+        """
+        with self._lock:
+            if self._connection is not None:
+                self.flush()
+                self._connection.close()
+                self._connection = None
+                atexit.unregister(self.close)
+
+    @property
+    def hit_rate(self):
+        """
+        Fraction of the lookups that were found in the cache, either in memory or on disk.
+
+        :return: hit rate, zero if there have not been any lookups
+        :rtype: float
+        """
+        lookups = self.memory_hits + self.disk_hits + self.misses
+
+        return (self.memory_hits + self.disk_hits) / lookups if lookups else 0.
+
+    def stats(self):
+        """
+        Statistics of the cache usage.
+
+        :return: number of memory hits, disk hits, misses, the hit rate, and the number of values in memory
+        :rtype: dict
+        """
+        return dict(memory_hits=self.memory_hits, disk_hits=self.disk_hits, misses=self.misses,
+                    hit_rate=self.hit_rate, size=len(self._memory))
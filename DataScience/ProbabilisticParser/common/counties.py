@@ -0,0 +1,226 @@
+"""
+ONS Address Index - Probabilistic Parser County Matcher
+=======================================================
+
+This file defines a county matcher that removes counties from address strings.
+
+The matcher is a replacement for the large regular expression that used to be built on every
+call of tokens.removeCounties. The county list is compiled once into an Aho-Corasick automaton
+so that all county occurrences are found in a single pass over the string. The exceptions
+(a county following e.g. ON, DINAS, UPON or a number) and the look-ahead rules (a county followed
+by e.g. ROAD or STREET) are then applied only to the found candidates.
+
+The output is identical to the regular expression version: at each position the county listed
+first in the county list wins, and matches do not overlap. Strings that do not contain any county
+are rejected with a single search of a trie shaped regular expression before the automaton is run.
+
+
+Requirements
+------------
+
+None
+
+
+Version
+-------
+
+:version: 0.4
+:date: 17-Oct-2026
+"""
+import re
+from collections import deque
+
+
+def trie_pattern(strings):
+    """
+    Build a regular expression that matches any of the given strings. The alternatives are nested as
+    a trie so that the regular expression engine branches on a single character at a time instead of
+    trying every string at every position.
+
+    :param strings: plain strings to match
+    :type strings: list
+
+    :return: the regular expression
+    :rtype: str
+    """
+    trie = {}
+    for string in strings:
+        node = trie
+        for character in string:
+            node = node.setdefault(character, {})
+        node[''] = {}
+
+    def _to_regex(node):
+        alternatives = [re.escape(character) + _to_regex(child)
+                        for character, child in sorted(node.items()) if character]
+
+        if not alternatives:
+            return ''
+        if len(alternatives) == 1 and '' not in node:
+            return alternatives[0]
+
+        return '(?:{}){}'.format('|'.join(alternatives), '?' if '' in node else '')
+
+    return _to_regex(trie)
+
+
+class CountyMatcher:
+    """
+    Finds and removes counties from a string. Counties are matched as plain strings, as in the
+    original regular expression they are matched anywhere in the string, not only at word boundaries.
+    """
+
+    def __init__(self, counties, exceptions, non_county_words):
+        r"""
+        Class constructor. Compiles the automaton and the look-behind and look-ahead rules.
+
+        :param counties: counties to remove in order of priority
+        :type counties: list
+        :param exceptions: regular expressions, if a county follows one of these it is not removed e.g. r'ON\s'
+        :type exceptions: list
+        :param non_county_words: do not remove a county if it is followed by one of these words e.g. ROAD
+        :type non_county_words: list
+        """
+        self.counties = [county for county in counties if county]
+
+        self._look_behind = re.compile('|'.join(r'(?<=\b{})'.format(exception) for exception in exceptions))
+        self._look_ahead = re.compile(r'\s(?:{})\b'.format('|'.join(non_county_words)))
+
+        self._prefilter = self._build_prefilter(self.counties)
+        self._transitions, self._outputs = self._build_automaton(self.counties)
+
+    @staticmethod
+    def _build_prefilter(counties):
+        """
+        Build a regular expression that finds the first position at which any of the counties starts.
+
+        :param counties: counties to find
+        :type counties: list
+
+        :return: compiled regular expression
+        :rtype: re.Pattern
+        """
+        return re.compile(trie_pattern(counties))
+
+    @staticmethod
+    def _build_automaton(counties):
+        """
+        Build an Aho-Corasick automaton from the given counties. The failure links are resolved into
+        full transition tables, so that each character requires a single dictionary lookup.
+
+        :param counties: counties in order of priority
+        :type counties: list
+
+        :return: transitions per state, (priority, length) of counties ending at each state
+        :rtype: tuple
+        """
+        goto = [{}]
+        outputs = [[]]
+
+        for priority, county in enumerate(counties):
+            state = 0
+            for character in county:
+                if character not in goto[state]:
+                    goto.append({})
+                    outputs.append([])
+                    goto[state][character] = len(goto) - 1
+                state = goto[state][character]
+            outputs[state].append((priority, len(county)))
+
+        # breadth first so that the failure state has always been resolved before it is needed
+        failure = [0] * len(goto)
+        transitions = [None] * len(goto)
+        transitions[0] = dict(goto[0])
+        queue = deque(goto[0].values())
+
+        while queue:
+            state = queue.popleft()
+            transitions[state] = dict(transitions[failure[state]])
+            transitions[state].update(goto[state])
+            outputs[state] = outputs[state] + outputs[failure[state]]
+
+            for character, next_state in goto[state].items():
+                failure[next_state] = transitions[failure[state]].get(character, 0) if state else 0
+                queue.append(next_state)
+
+        return transitions, [tuple(output) for output in outputs]
+
+    def _candidates(self, in_string):
+        """
+        Find all, possibly overlapping, county occurrences.
+
+        :param in_string: string to search
+        :type in_string: str
+
+        :return: a sorted list of (start, priority, end) tuples
+        :rtype: list
+        """
+        first = self._prefilter.search(in_string)
+        if first is None:
+            return []
+
+        transitions = self._transitions
+        outputs = self._outputs
+
+        # no county can start before the first one found by the prefilter
+        candidates = []
+        state = 0
+        for position, character in enumerate(in_string[first.start():], first.start() + 1):
+            state = transitions[state].get(character, 0)
+            for priority, length in outputs[state]:
+                candidates.append((position - length, priority, position))
+
+        candidates.sort()
+
+        return candidates
+
+    def find(self, in_string):
+        """
+        Find the counties that would be removed from the given string.
+
+        :param in_string: string to search
+        :type in_string: str
+
+        :return: a list of (start, end) positions of non-overlapping county matches
+        :rtype: list
+        """
+        matches = []
+        end_of_previous = 0
+        start_of_current = -1
+
+        for start, priority, end in self._candidates(in_string):
+            if start == start_of_current or start < end_of_previous:
+                continue
+
+            if self._look_behind.match(in_string, start) or self._look_ahead.match(in_string, end):
+                continue
+
+            matches.append((start, end))
+            start_of_current = start
+            end_of_previous = end
+
+        return matches
+
+    def sub(self, in_string):
+        """
+        Remove counties from the given string.
+
+        :param in_string: the string from which to remove the counties
+        :type in_string: str
+
+        :return: the input string with the counties removed
+        :rtype: str
+        """
+        matches = self.find(in_string)
+
+        if not matches:
+            return in_string
+
+        pieces = []
+        position = 0
+        for start, end in matches:
+            pieces.append(in_string[position:start])
+            position = end
+        pieces.append(in_string[position:])
+
+        return ''.join(pieces)
@@ -0,0 +1,511 @@
+#!/usr/bin/env python
+"""
+ONS Address Index - Probabilistic Parser NumPy Decoder
+======================================================
+
+This file defines a NumPy implementation of the inference of a trained linear chain CRF model.
+The state and transition weights of a CRFsuite model are exported to dense arrays indexed by
+attribute and label IDs, after which many sequences can be decoded at once: the sequences are
+padded to the same length and Viterbi and forward-backward run over the whole batch. Unlike
+pycrfsuite, the decoder can also return the top-k label sequences.
+
+The computations follow CRFsuite: the state scores are summed in the order of the attributes,
+Viterbi prefers the first label in case of ties, and the forward-backward algorithm uses scaled
+probabilities. Hence the labels are identical to pycrfsuite and the probabilities agree to within
+floating point rounding. When tagging tokens, the state scores of each token, and of each token as
+seen by its neighbours, are computed once and then added together for every address, which is much
+faster than summing the attributes of every address but may differ from CRFsuite in the last bits.
+
+
+Running
+-------
+
+After all requirements are satisfied, the weights of a model can be exported using CPython interpreter::
+
+    python decoder.py addressCRF.crfsuite addressCRF.npz
+
+
+Requirements
+------------
+
+:requires: numpy (tested with 1.11.3)
+:requires: pycrfsuite (https://python-crfsuite.readthedocs.io/en/latest/) (only for exporting the weights)
+
+
+Version
+-------
+
+:version: 0.3
+:date: 17-Oct-2026
+"""
+import struct
+import sys
+
+import numpy as np
+
+import ProbabilisticParser.common.tokens as tok
+
+# CRFsuite model file layout, see crf1d_model.c of CRFsuite
+MODEL_HEADER = struct.Struct('<4sI4s9I')
+MODEL_CHUNK = struct.Struct('<4sII')
+MODEL_FEATURE = struct.Struct('<IIId')
+STATE_FEATURE = 0
+TRANSITION_FEATURE = 1
+
+
+def _take_along_axis(array, indices, axis):
+    """
+    Take the values of an array at the indices along an axis, like numpy.take_along_axis of NumPy 1.15.
+
+    :param array: the values
+    :type array: numpy.ndarray
+    :param indices: indices along the axis, of the same number of dimensions as the array
+    :type indices: numpy.ndarray
+    :param axis: the axis the indices refer to
+    :type axis: int
+
+    :return: the values at the indices
+    :rtype: numpy.ndarray
+    """
+    index = list(np.ix_(*[np.arange(size) for size in indices.shape]))
+    index[axis] = indices
+    return array[tuple(index)]
+
+
+class CRFWeights:
+    """
+    The weights of a trained linear chain CRF model as dense NumPy arrays.
+    """
+
+    def __init__(self, labels, attributes, state, transitions):
+        """
+        Class constructor.
+
+        :param labels: label names in the order of the label IDs
+        :type labels: list
+        :param attributes: attribute names in the order of the attribute IDs
+        :type attributes: list
+        :param state: state weights, an array of shape (number of attributes, number of labels)
+        :type state: numpy.ndarray
+        :param transitions: transition weights, an array of shape (number of labels, number of labels)
+        :type transitions: numpy.ndarray
+        """
+        self.labels = list(labels)
+        self.attributes = list(attributes)
+        self.state = state
+        self.transitions = transitions
+
+        self.attribute_ids = {attribute: i for i, attribute in enumerate(self.attributes)}
+
+    @classmethod
+    def from_model(cls, model_file):
+        """
+        Export the weights of a CRFsuite model. The weights are read from the binary model file
+        at full precision, pycrfsuite is used only to get the names of the labels and the attributes.
+
+        :param model_file: name of the CRFsuite model file
+        :type model_file: str
+
+        :return: the weights of the model
+        :rtype: CRFWeights
+        """
+        import pycrfsuite
+
+        tagger = pycrfsuite.Tagger()
+        tagger.open(model_file)
+        info = tagger.info()
+        tagger.close()
+
+        labels = [label for label, _ in sorted(info.labels.items(), key=lambda item: int(item[1]))]
+        attributes = [attribute for attribute, _ in sorted(info.attributes.items(), key=lambda item: int(item[1]))]
+
+        with open(model_file, 'rb') as f:
+            content = f.read()
+
+        header = MODEL_HEADER.unpack_from(content, 0)
+        if header[0] != b'lCRF' or header[2] != b'FOMC':
+            raise ValueError('{} is not a CRFsuite linear chain model'.format(model_file))
+
+        offset = header[7]
+        chunk, _, n_features = MODEL_CHUNK.unpack_from(content, offset)
+        if chunk != b'FEAT':
+            raise ValueError('Cannot find the features of {}'.format(model_file))
+
+        state = np.zeros((len(attributes), len(labels)), dtype=np.float64)
+        transitions = np.zeros((len(labels), len(labels)), dtype=np.float64)
+        for feature_type, source, destination, weight in MODEL_FEATURE.iter_unpack(
+                content[offset + MODEL_CHUNK.size:offset + MODEL_CHUNK.size + n_features * MODEL_FEATURE.size]):
+            if feature_type == STATE_FEATURE:
+                state[source, destination] = weight
+            elif feature_type == TRANSITION_FEATURE:
+                transitions[source, destination] = weight
+
+        return cls(labels, attributes, state, transitions)
+
+    def save(self, filename):
+        """
+        Store the weights to a NumPy .npz file.
+
+        :param filename: name of the output file
+        :type filename: str
+
+        :return: None
+        """
+        np.savez(filename, labels=np.array(self.labels), attributes=np.array(self.attributes),
+                 state=self.state, transitions=self.transitions)
+
+    @classmethod
+    def load(cls, filename):
+        """
+        Load weights stored with the save method.
+
+        :param filename: name of the .npz file
+        :type filename: str
+
+        :return: the weights of the model
+        :rtype: CRFWeights
+        """
+        with np.load(filename) as data:
+            return cls(data['labels'].tolist(), data['attributes'].tolist(), data['state'], data['transitions'])
+
+
+class BatchDecoder:
+    """
+    Decodes batches of sequences using the exported weights of a CRF model. The sequences are given
+    as lists of attribute dictionaries, see tokens.tokens2flatFeatures, or as lists of tokens.
+    """
+
+    def __init__(self, weights):
+        """
+        Class constructor.
+
+        :param weights: the weights of the model
+        :type weights: CRFWeights
+        """
+        self.weights = weights
+        self.labels = weights.labels
+        self._exp_transitions = np.exp(weights.transitions)
+
+        # state scores of the tokens seen so far: the token itself, as the previous and as the next token
+        self._token_index = {}
+        self._token_scores = [np.zeros((0, len(self.labels))) for _ in range(3)]
+        self._positional = {name: self._attribute_scores({name: 1.0}) for name in
+                            ('singleton', 'rawstring.start', 'rawstring.end', 'previous:rawstring.start',
+                             'next:rawstring.end')}
+
+    def _attribute_scores(self, attributes):
+        """
+        Compute the state scores of a single item. Attributes that the model does not know are ignored.
+
+        :param attributes: attribute names and values
+        :type attributes: dict
+
+        :return: state score of each label
+        :rtype: numpy.ndarray
+        """
+        scores = np.zeros(len(self.labels))
+        for attribute, value in attributes.items():
+            attribute_id = self.weights.attribute_ids.get(attribute)
+            if attribute_id is not None:
+                scores += self.weights.state[attribute_id] * value
+
+        return scores
+
+    def _token_ids(self, tokens):
+        """
+        Get the index of each token to the token state scores, computing the scores of new tokens.
+
+        :param tokens: tokens of all sequences
+        :type tokens: list
+
+        :return: index of each token
+        :rtype: numpy.ndarray
+        """
+        new = [token for token in dict.fromkeys(tokens) if token not in self._token_index]
+        if new:
+            for token in new:
+                self._token_index[token] = len(self._token_index)
+
+            scores = [[self._attribute_scores(attributes) for attributes in tok._cachedFlatFeatures(token)]
+                      for token in new]
+            self._token_scores = [np.vstack([existing, np.array([token_scores[i] for token_scores in scores])])
+                                  for i, existing in enumerate(self._token_scores)]
+
+        return np.fromiter((self._token_index[token] for token in tokens), dtype=np.int64, count=len(tokens))
+
+    def state_scores(self, feature_sequences):
+        """
+        Compute the state scores of a batch of sequences. Attributes that the model does not know are ignored.
+
+        :param feature_sequences: an attribute dictionary for each item of each sequence
+        :type feature_sequences: list
+
+        :return: state scores padded with zeros to shape (sequences, longest sequence, labels) and the lengths
+        :rtype: tuple
+        """
+        attribute_ids = self.weights.attribute_ids
+
+        lengths = np.array([len(sequence) for sequence in feature_sequences], dtype=np.int64)
+        n_items = int(lengths.sum())
+
+        # flatten the attributes of all items, keeping the order of the attributes within each item
+        ids = []
+        values = []
+        items = []
+        item = 0
+        for sequence in feature_sequences:
+            for attributes in sequence:
+                for attribute, value in attributes.items():
+                    attribute_id = attribute_ids.get(attribute)
+                    if attribute_id is not None:
+                        ids.append(attribute_id)
+                        values.append(value)
+                        items.append(item)
+                item += 1
+
+        scores = np.zeros((n_items, len(self.labels)), dtype=np.float64)
+        if ids:
+            contributions = self.weights.state[ids] * np.array(values, dtype=np.float64)[:, None]
+            items = np.array(items, dtype=np.int64)
+            starts = np.flatnonzero(np.r_[True, items[1:] != items[:-1]])
+            scores[items[starts]] = np.add.reduceat(contributions, starts, axis=0)
+
+        width = lengths.max() if len(lengths) else 0
+        padded = np.zeros((len(lengths), width, len(self.labels)), dtype=np.float64)
+        padded[np.arange(padded.shape[1]) < lengths[:, None]] = scores
+
+        return padded, lengths
+
+    def token_state_scores(self, token_sequences):
+        """
+        Compute the state scores of a batch of token sequences with the features of tokens.tokens2flatFeatures.
+
+        :param token_sequences: tokens of each sequence
+        :type token_sequences: list
+
+        :return: state scores padded with zeros to shape (sequences, longest sequence, labels) and the lengths
+        :rtype: tuple
+        """
+        lengths = np.array([len(tokens) for tokens in token_sequences], dtype=np.int64)
+        ids = self._token_ids([token for tokens in token_sequences for token in tokens])
+        own, previous, following = self._token_scores
+
+        # position of each item in its sequence and the length of the sequence
+        sequence_lengths = np.repeat(lengths, lengths)
+        positions = np.arange(len(ids)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        last = sequence_lengths - 1
+
+        # add in the same order as in the attributes of tokens2flatFeatures: own, previous, next, position
+        scores = own[ids]
+
+        has_previous = np.flatnonzero(positions > 0)
+        scores[has_previous] += previous[ids[has_previous - 1]]
+        scores[positions == 1] += self._positional['previous:rawstring.start']
+
+        has_next = np.flatnonzero(positions < last)
+        scores[has_next] += following[ids[has_next + 1]]
+        scores[(positions == last - 1) & (last > 0)] += self._positional['next:rawstring.end']
+
+        scores[(positions == 0) & (last > 0)] += self._positional['rawstring.start']
+        scores[(positions == last) & (last > 0)] += self._positional['rawstring.end']
+        scores[last == 0] += self._positional['singleton']
+
+        width = lengths.max() if len(lengths) else 0
+        padded = np.zeros((len(lengths), width, len(self.labels)), dtype=np.float64)
+        padded[np.arange(padded.shape[1]) < lengths[:, None]] = scores
+
+        return padded, lengths
+
+    def viterbi(self, state, lengths, k=1):
+        """
+        Find the k best label sequences of each sequence in the batch.
+
+        :param state: padded state scores, see state_scores
+        :type state: numpy.ndarray
+        :param lengths: length of each sequence
+        :type lengths: numpy.ndarray
+        :param k: number of label sequences to find
+        :type k: int
+
+        :return: label IDs of shape (sequences, k, longest sequence) padded with -1 and their scores
+                 of shape (sequences, k), missing label sequences have a score of -inf
+        :rtype: tuple
+        """
+        n_sequences, n_steps, n_labels = state.shape
+        transitions = self.weights.transitions
+
+        # best scores of the paths ending at each label, shape (sequences, labels, k)
+        best = np.full((n_sequences, n_labels, k), -np.inf)
+        best[:, :, 0] = state[:, 0, :] if n_steps else 0.
+
+        # the previous label and the rank of the path it continues
+        back_labels = np.zeros((n_sequences, n_steps, n_labels, k), dtype=np.int64)
+        back_ranks = np.zeros((n_sequences, n_steps, n_labels, k), dtype=np.int64)
+        keep_labels = np.broadcast_to(np.arange(n_labels)[None, :, None], (n_sequences, n_labels, k))
+        keep_ranks = np.broadcast_to(np.arange(k)[None, None, :], (n_sequences, n_labels, k))
+
+        for t in range(1, n_steps):
+            # candidates ordered by previous label then rank, a stable sort keeps the first in case of ties
+            candidates = best[:, :, None, :] + transitions[None, :, :, None]
+            candidates = candidates.transpose(0, 2, 1, 3).reshape(n_sequences, n_labels, n_labels * k)
+            if k == 1:
+                order = candidates.argmax(axis=2)[:, :, None]
+            else:
+                order = np.argsort(-candidates, axis=2, kind='mergesort')[:, :, :k]
+            scores = _take_along_axis(candidates, order, axis=2) + state[:, t, :, None]
+
+            active = (t < lengths)[:, None, None]
+            best = np.where(active, scores, best)
+            back_labels[:, t] = np.where(active, order // k, keep_labels)
+            back_ranks[:, t] = np.where(active, order % k, keep_ranks)
+
+        # the k best of all the paths at the end of each sequence
+        final = best.reshape(n_sequences, n_labels * k)
+        order = np.argsort(-final, axis=1, kind='mergesort')[:, :k]
+        scores = _take_along_axis(final, order, axis=1)
+        label = order // k
+        rank = order % k
+
+        paths = np.full((n_sequences, k, n_steps), -1, dtype=np.int64)
+        sequences = np.arange(n_sequences)[:, None]
+        for t in range(n_steps - 1, -1, -1):
+            active = t < lengths[:, None]
+            paths[:, :, t] = np.where(active, label, -1)
+            previous_label = back_labels[sequences, t, label, rank]
+            previous_rank = back_ranks[sequences, t, label, rank]
+            label, rank = previous_label, previous_rank
+
+        return paths, scores
+
+    def forward_backward(self, state, lengths):
+        """
+        Compute the normalisation and the marginal probabilities of each sequence in the batch
+        using scaled forward and backward probabilities as CRFsuite does.
+
+        :param state: padded state scores, see state_scores
+        :type state: numpy.ndarray
+        :param lengths: length of each sequence
+        :type lengths: numpy.ndarray
+
+        :return: logarithm of the normalisation of shape (sequences,) and the marginal probabilities
+                 of shape (sequences, longest sequence, labels)
+        :rtype: tuple
+        """
+        n_sequences, n_steps, n_labels = state.shape
+        exp_state = np.exp(state)
+        exp_transitions = self._exp_transitions
+
+        alpha = np.zeros_like(exp_state)
+        beta = np.zeros_like(exp_state)
+        scale = np.ones((n_sequences, n_steps))
+
+        # the padding is scaled as well to avoid overflows, but it does not contribute to the normalisation
+        for t in range(n_steps):
+            current = exp_state[:, t] if t == 0 else (alpha[:, t - 1] @ exp_transitions) * exp_state[:, t]
+            total = current.sum(axis=1)
+            scale[:, t] = 1. / np.where(total != 0., total, 1.)
+            alpha[:, t] = current * scale[:, t, None]
+
+        for t in range(n_steps - 1, -1, -1):
+            last = (t == lengths - 1)[:, None]
+            if t == n_steps - 1:
+                current = np.zeros((n_sequences, n_labels))
+            else:
+                current = (beta[:, t + 1] * exp_state[:, t + 1]) @ exp_transitions.T
+            beta[:, t] = np.where(last, 1., current) * scale[:, t, None]
+
+        log_norm = -np.where(np.arange(n_steps) < lengths[:, None], np.log(scale), 0.).sum(axis=1)
+        marginals = alpha * beta / scale[:, :, None]
+
+        return log_norm, marginals
+
+    def path_scores(self, state, lengths, paths):
+        """
+        Compute the scores of the given label sequences.
+
+        :param state: padded state scores, see state_scores
+        :type state: numpy.ndarray
+        :param lengths: length of each sequence
+        :type lengths: numpy.ndarray
+        :param paths: label IDs of shape (sequences, longest sequence), padded with -1
+        :type paths: numpy.ndarray
+
+        :return: score of each label sequence
+        :rtype: numpy.ndarray
+        """
+        n_sequences, n_steps, _ = state.shape
+        active = np.arange(n_steps) < lengths[:, None]
+        labels = np.where(active, paths, 0)
+
+        scores = np.where(active, _take_along_axis(state, labels[:, :, None], axis=2)[:, :, 0], 0.).sum(axis=1)
+        if n_steps > 1:
+            transitions = self.weights.transitions[labels[:, :-1], labels[:, 1:]]
+            scores += np.where(active[:, 1:], transitions, 0.).sum(axis=1)
+
+        return scores
+
+    def decode(self, state, lengths, k=1):
+        """
+        Find the best label sequences of a batch of sequences together with their probabilities and
+        the marginal probabilities of the labels of the best sequence.
+
+        :param state: padded state scores, see state_scores
+        :type state: numpy.ndarray
+        :param lengths: length of each sequence
+        :type lengths: numpy.ndarray
+        :param k: number of label sequences to return for each sequence
+        :type k: int
+
+        :return: for each sequence a dictionary holding the k best label sequences, their probabilities,
+                 and the marginal probabilities of the labels of the best sequence
+        :rtype: list
+        """
+        paths, scores = self.viterbi(state, lengths, k=k)
+        log_norm, marginals = self.forward_backward(state, lengths)
+
+        probabilities = np.exp(scores - log_norm[:, None])
+        best = np.maximum(paths[:, 0, :], 0)
+        best_marginals = _take_along_axis(marginals, best[:, :, None], axis=2)[:, :, 0]
+
+        results = []
+        for i, length in enumerate(lengths):
+            found = [rank for rank in range(k) if np.isfinite(scores[i, rank])] if length else []
+            results.append(dict(tags=[[self.labels[label] for label in paths[i, rank, :length]] for rank in found],
+                                probabilities=[float(probabilities[i, rank]) for rank in found],
+                                marginals=best_marginals[i, :length].tolist()))
+
+        return results
+
+    def tag(self, feature_sequences, k=1):
+        """
+        Tag a batch of sequences given as attribute dictionaries, see decode.
+
+        :param feature_sequences: an attribute dictionary for each item of each sequence
+        :type feature_sequences: list
+        :param k: number of label sequences to return for each sequence
+        :type k: int
+
+        :return: for each sequence a dictionary holding the k best label sequences, their probabilities,
+                 and the marginal probabilities of the labels of the best sequence
+        :rtype: list
+        """
+        return self.decode(*self.state_scores(feature_sequences), k=k)
+
+    def tag_tokens(self, token_sequences, k=1):
+        """
+        Tag a batch of token sequences, see decode.
+
+        :param token_sequences: tokens of each sequence
+        :type token_sequences: list
+        :param k: number of label sequences to return for each sequence
+        :type k: int
+
+        :return: for each sequence a dictionary holding the k best label sequences, their probabilities,
+                 and the marginal probabilities of the labels of the best sequence
+        :rtype: list
+        """
+        return self.decode(*self.token_state_scores(token_sequences), k=k)
+
+
+if __name__ == "__main__":
+    CRFWeights.from_model(sys.argv[1]).save(sys.argv[2])
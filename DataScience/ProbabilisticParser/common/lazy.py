@@ -0,0 +1,62 @@
+"""
+ONS Address Index - Probabilistic Parser Lazy Module Attributes
+===============================================================
+
+This file defines a module class whose attributes can be loaded only when first accessed, e.g. the lookup
+tables and the tokenizer of common/tokens.py or the tagger of parser.py, so that importing those modules is
+fast and has no side effects. A module level __getattr__ would need Python 3.7.
+
+
+Requirements
+------------
+
+None
+
+
+Version
+-------
+
+:version: 0.1
+:date: 17-Oct-2026
+"""
+import sys
+import types
+
+
+class LazyModule(types.ModuleType):
+    """
+    Module class that gets the attributes not defined in the module from the functions registered with
+    lazy_attributes.
+    """
+
+    def __getattr__(self, name):
+        """
+        Get an attribute that is not defined in the module.
+
+        :param name: name of the attribute
+        :type name: str
+
+        :return: the value returned by the function registered for the attribute
+        """
+        getters = self.__dict__.get('_LAZY_ATTRIBUTES', {})
+        if name in getters:
+            return getters[name]()
+
+        raise AttributeError('module {!r} has no attribute {!r}'.format(self.__name__, name))
+
+
+def lazy_attributes(module_name, getters):
+    """
+    Make the given attributes of a module lazy. Each attribute is got from its function whenever accessed,
+    the functions are expected to cache the value e.g. with lru_cache.
+
+    :param module_name: name of the module, usually __name__
+    :type module_name: str
+    :param getters: functions without arguments that return the attributes, keyed by the attribute name
+    :type getters: dict
+
+    :return: None
+    """
+    module = sys.modules[module_name]
+    module._LAZY_ATTRIBUTES = getters
+    module.__class__ = LazyModule
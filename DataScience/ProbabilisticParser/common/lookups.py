@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+"""
+ONS Address Index - Probabilistic Parser Lookup Tables
+======================================================
+
+This file defines the lookup tables used by the tokenizer and the features: the counties and the
+synonyms used to pre-process the address strings, and the outcodes and post towns used to identify tokens.
+
+The tables are read from text and CSV files. As reading them used to dominate the start up time of the
+parser, they can be compiled into a precomputed artefact that holds the tables as plain lists, sets, and
+dictionaries. The artefact is a pickle file, hence it loads without pandas or other dependencies. If the
+artefact does not exist, the tables are read from the source files instead.
+
+The artefact records the paths, sizes and modification times of the source files it has been built from.
+It is ignored, and the tables are read from the source files, if they are given at a different location or
+have changed since, e.g. after editing the synonyms or setting ADDRESS_INDEX_LUT_PATH. The artefact is used
+as is if the source files are not available. Rebuild it after the source files change.
+
+
+Running
+-------
+
+After all requirements are satisfied, the artefact can be built using CPython interpreter::
+
+    python lookups.py
+
+
+Requirements
+------------
+
+None
+
+
+Version
+-------
+
+:version: 0.2
+:date: 17-Oct-2026
+"""
+import csv
+import os
+import pickle
+from collections import namedtuple
+
+# hardcoded filenames and paths, the path of the county and synonym files can be changed with an environment variable
+directory = os.path.dirname(__file__)  # for relative path definitions
+LUT_PATH = os.environ.get('ADDRESS_INDEX_LUT_PATH',
+                          '/home/james/Clients/ONS/address-index-api/parsers/src/main/resources/'
+                          'input_pre_post_processing')
+DATA_PATH = os.path.join(directory, '../../data/')
+LOOKUPS_FILE = os.path.join(directory, '../training/lookups.pickle')
+
+# increase when the content of the artefact changes, old artefacts are then ignored
+LOOKUPS_VERSION = 2
+
+Lookups = namedtuple('Lookups', ['county', 'synonyms', 'outcodes', 'posttowns'])
+
+
+def source_files(lut_path=LUT_PATH, data_path=DATA_PATH):
+    """
+    Names of the source files of the lookup tables.
+
+    :param lut_path: location of the county and synonym files
+    :type lut_path: str
+    :param data_path: location of the postcode_district_to_town.csv file
+    :type data_path: str
+
+    :return: absolute names of the county, synonym, and postcode_district_to_town.csv files
+    :rtype: list
+    """
+    return [os.path.abspath(os.path.join(lut_path, 'county')), os.path.abspath(os.path.join(lut_path, 'synonym')),
+            os.path.abspath(os.path.join(data_path, 'postcode_district_to_town.csv'))]
+
+
+def describe_sources(filenames):
+    """
+    Describe the source files by their names, sizes and modification times.
+
+    :param filenames: names of the source files
+    :type filenames: list
+
+    :return: the name, size and modification time of each file, None for the files that do not exist
+    :rtype: list
+    """
+    descriptions = []
+    for filename in filenames:
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            descriptions.append(None)
+        else:
+            descriptions.append([filename, stat.st_size, stat.st_mtime])
+
+    return descriptions
+
+
+def read_lookups(lut_path=LUT_PATH, data_path=DATA_PATH):
+    """
+    Read the lookup tables from the source files.
+
+    :param lut_path: location of the county and synonym files
+    :type lut_path: str
+    :param data_path: location of the postcode_district_to_town.csv file
+    :type data_path: str
+
+    :return: counties in order of priority, a dictionary of synonyms, a set of outcodes, and a set of post towns
+    :rtype: Lookups
+    """
+    with open(os.path.join(lut_path, 'county')) as f:
+        county = f.read().splitlines()
+
+    with open(os.path.join(lut_path, 'synonym')) as f:
+        synonyms = dict(line.split(',') for line in f.read().splitlines())
+
+    with open(os.path.join(data_path, 'postcode_district_to_town.csv'), newline='') as f:
+        rows = list(csv.DictReader(f))
+
+    outcodes = {row['postcode'] for row in rows if row['postcode']}
+    posttowns = {row['town'] for row in rows if row['town']}
+
+    return Lookups(county, synonyms, outcodes, posttowns)
+
+
+def build_lookups(filename=LOOKUPS_FILE, lut_path=LUT_PATH, data_path=DATA_PATH):
+    """
+    Read the lookup tables from the source files and store them as a precomputed artefact.
+
+    :param filename: name of the output file
+    :type filename: str
+    :param lut_path: location of the county and synonym files
+    :type lut_path: str
+    :param data_path: location of the postcode_district_to_town.csv file
+    :type data_path: str
+
+    :return: the lookup tables
+    :rtype: Lookups
+    """
+    lookups = read_lookups(lut_path=lut_path, data_path=data_path)
+
+    artefact = {'version': LOOKUPS_VERSION, 'tables': lookups._asdict(),
+                'sources': describe_sources(source_files(lut_path=lut_path, data_path=data_path))}
+    with open(filename, 'wb') as f:
+        pickle.dump(artefact, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    return lookups
+
+
+def load_lookups(filename=LOOKUPS_FILE, lut_path=LUT_PATH, data_path=DATA_PATH):
+    """
+    Load the lookup tables from the precomputed artefact. Falls back to reading the source files
+    if the artefact does not exist, has been built by an incompatible version, or has been built from
+    source files at another location or with another size or modification time.
+
+    :param filename: name of the precomputed artefact
+    :type filename: str
+    :param lut_path: location of the county and synonym files
+    :type lut_path: str
+    :param data_path: location of the postcode_district_to_town.csv file
+    :type data_path: str
+
+    :return: the lookup tables
+    :rtype: Lookups
+    """
+    if os.path.isfile(filename):
+        with open(filename, 'rb') as f:
+            artefact = pickle.load(f)
+
+        sources = source_files(lut_path=lut_path, data_path=data_path)
+        if artefact.get('version') == LOOKUPS_VERSION and \
+                [source[0] for source in artefact['sources'] if source is not None] == sources:
+            current = describe_sources(sources)
+            if current == artefact['sources'] or all(source is None for source in current):
+                return Lookups(**artefact['tables'])
+
+    try:
+        return read_lookups(lut_path=lut_path, data_path=data_path)
+    except FileNotFoundError as error:
+        raise FileNotFoundError('Cannot find the lookup table artefact {} nor the source file {}, '
+                                'set ADDRESS_INDEX_LUT_PATH to the location of the county and synonym '
+                                'files'.format(filename, error.filename)) from error
+
+
+if __name__ == "__main__":
+    build_lookups()
+    print('Lookup tables written to', os.path.abspath(LOOKUPS_FILE))
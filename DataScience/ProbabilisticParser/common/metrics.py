@@ -19,8 +19,8 @@ Author
 Version
 -------
 
-:version: 0.1
-:date: 25-Oct-2016
+:version: 0.2
+:date: 17-Oct-2026
 """
 
 
@@ -38,3 +38,42 @@ def sequence_accuracy_score(y_true, y_pred):
     matches = sum(1 for yseq_true, yseq_pred in zip(y_true, y_pred) if list(yseq_true) == list(yseq_pred))
 
     return matches / total
+
+
+def flat_f1_score(y_true, y_pred, labels=None):
+    """
+    Return the F1-score of the individual labels, averaged over the labels weighted by their support.
+    The same as sklearn_crfsuite.metrics.flat_f1_score with average='weighted'.
+
+    :param y_true: true labels
+    :param y_pred: predicted labels
+    :param labels: labels to include, if None all the labels that appear in the true labels
+
+    :return: weighted F1-score (1 is perfect, 0 is all incorrect)
+    """
+    true_positives = {}
+    predicted = {}
+    support = {}
+    for yseq_true, yseq_pred in zip(y_true, y_pred):
+        for label_true, label_pred in zip(yseq_true, yseq_pred):
+            support[label_true] = support.get(label_true, 0) + 1
+            predicted[label_pred] = predicted.get(label_pred, 0) + 1
+            if label_true == label_pred:
+                true_positives[label_true] = true_positives.get(label_true, 0) + 1
+
+    if labels is None:
+        labels = sorted(support)
+
+    total = sum(support.get(label, 0) for label in labels)
+    if total == 0:
+        return 0.
+
+    score = 0.
+    for label in labels:
+        hits = true_positives.get(label, 0)
+        if hits:
+            precision = hits / predicted[label]
+            recall = hits / support[label]
+            score += support[label] * 2 * precision * recall / (precision + recall)
+
+    return score / total
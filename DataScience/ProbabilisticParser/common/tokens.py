@@ -5,12 +5,14 @@ ONS Address Index - Probabilistic Parser Common Functions
 This file defines the Conditional Random Field parser settings including output file,
 structure of the XML expected to hold training data, tokens and features.
 
+The lookup tables and the compiled tokenizer are loaded only when first needed, so that
+importing this module is fast and has no side effects, see common/lookups.py.
+
 
 Requirements
 ------------
 
-:requires: pandas
-:requires: lxml
+:requires: lxml (only for reading the training data)
 
 
 Author
@@ -22,22 +24,24 @@ Author
 Version
 -------
 
-:version: 0.2
-:date: 17-Nov-2016
+:version: 0.3
+:date: 17-Oct-2026
 """
-import pandas as pd
-from lxml import etree
 import os
 import sys
 import re
 import string
+from functools import lru_cache
+
+from ProbabilisticParser.common.counties import CountyMatcher
+from ProbabilisticParser.common.lazy import lazy_attributes
+from ProbabilisticParser.common.lookups import LUT_PATH, load_lookups
 
 
 # hardcoded filename and path
 MODEL_FILE = 'addressCRF.crfsuite'
 directory = os.path.dirname(__file__)  # for relative path definitions
 MODEL_PATH = os.path.join(directory, '../training/')
-LUT_PATH = '/home/james/Clients/ONS/address-index-api/parsers/src/main/resources/input_pre_post_processing'
 
 # set labels - token names expected in the training file
 LABELS = ['OrganisationName',
@@ -85,18 +89,54 @@ non_county = {'OFFICE', 'HOSPITAL', 'CARE', 'CLUB', 'BANK', 'BAR', 'SOCIETY', 'P
 noncounty = non_county|COMPANY|FLAT|Residential|ROAD
 nonCountyIdentification = list(noncounty)
 
-# Read in the files required for tokenization pre-processing.
-with open(LUT_PATH + '/county') as f:
-    county = f.read().splitlines()
-with open(LUT_PATH + '/synonym') as f:
-    synonyms = f.read().splitlines()
-# Create a dictionary for the synonyms.
-synonym_LUT = dict(map(lambda x: x.split(','), synonyms))
+# maximum number of tokens for which the features are memoised, address vocabularies repeat heavily
+FEATURE_CACHE_SIZE = 2 ** 17
+
+# Do not remove a county if it follows one of these words (eg. Bradford on Avon, Dinas Powys
+# or Stratford upon Avon) or a number (eg. 5 Somerset)
+COUNTY_EXCEPTIONS = [r"ON\s", r"DINAS\s", r"UPON\s", r"[0-9]\s"]
+
+# lookup tables that are loaded lazily, maps the module attribute to the field of the lookup tables
+_LOOKUP_ATTRIBUTES = {'county': 'county',
+                      'synonym_LUT': 'synonyms',
+                      'OUTCODES': 'outcodes',
+                      'POSTTOWNS': 'posttowns'}
+
+
+@lru_cache(maxsize=None)
+def getLookups():
+    """
+    Load the files required for tokenization pre-processing and the features: the counties, the synonyms,
+    and some extra info - possible outcodes and the linked post towns, used to identify tokens.
+    The tables are loaded on the first call only.
+
+    :return: the lookup tables
+    :rtype: ProbabilisticParser.common.lookups.Lookups
+    """
+    return load_lookups()
+
+
+@lru_cache(maxsize=None)
+def getTokenizer():
+    """
+    Get the tokenizer. The counties and the regular expressions are compiled on the first call only,
+    compiling the counties used to be the most expensive part of tokenizing.
+
+    :return: the compiled tokenizer
+    :rtype: Tokenizer
+    """
+    lookups = getLookups()
+    county_matcher = CountyMatcher(lookups.county, COUNTY_EXCEPTIONS, nonCountyIdentification)
+
+    return Tokenizer(lookups.synonyms, county_matcher)
+
+
+# the lookup tables, the tokenizer, and its county matcher are loaded when first accessed as module attributes
+# e.g. tokens.OUTCODES or tokens.TOKENIZER
+_getters = {name: (lambda field=field: getattr(getLookups(), field)) for name, field in _LOOKUP_ATTRIBUTES.items()}
+_getters.update(TOKENIZER=getTokenizer, COUNTY_MATCHER=lambda: getTokenizer().county_matcher)
+lazy_attributes(__name__, _getters)
 
-# get some extra info - possible incodes and the linked post towns, used to identify tokens
-df = pd.read_csv(os.path.join(directory, '../../data/') + 'postcode_district_to_town.csv')
-OUTCODES = set(df['postcode'].values)
-POSTTOWNS = set(df['town'].values)
 
 def synonym(token):
     """
@@ -110,7 +150,7 @@ def synonym(token):
     """
 
     try:
-        token_out = synonym_LUT[token]
+        token_out = getLookups().synonyms[token]
     except:
         token_out = token
 
@@ -144,6 +184,8 @@ def readXML(xmlFile):
     """
     component_string_list = []
 
+    from lxml import etree
+
     # loop through xml file
     if os.path.isfile(xmlFile):
         with open(xmlFile, 'r+') as f:
@@ -171,6 +213,11 @@ def readXML(xmlFile):
         yield raw_text, sequence_components
 
 
+_DIGITS = set(string.digits)
+_VOWELS = set('AEIOU')
+_ENDS_IN_PERIOD = re.compile(r'.+\.$', flags=re.UNICODE)
+
+
 def digits(token):
     """
     Whether a given string token contains digits or not.
@@ -183,7 +230,7 @@ def digits(token):
     """
     if token.isdigit():
         return 'all_digits'
-    elif set(token) & set(string.digits):
+    elif set(token) & _DIGITS:
         return 'some_digits'
     else:
         return 'no_digits'
@@ -203,15 +250,16 @@ def tokenFeatures(token):
     :rtype: dict
     """
     token_clean = token.upper()
+    lookups = getLookups()
 
     features = {'digits': digits(token_clean),
                 'word': (token_clean if not token_clean.isdigit() else False),
                 'length': (u'd:' + str(len(token_clean)) if token_clean.isdigit() else u'w:' + str(len(token_clean))),
-                'endsinpunc': (token[-1] if bool(re.match('.+\.$', token, flags=re.UNICODE)) else False),
+                'endsinpunc': (token[-1] if bool(_ENDS_IN_PERIOD.match(token)) else False),
                 'directional': token_clean in DIRECTIONS,
-                'outcode': token_clean in OUTCODES,
-                'posttown': token_clean in POSTTOWNS,
-                'has.vowels': bool(set(token_clean) & set('AEIOU')),
+                'outcode': token_clean in lookups.outcodes,
+                'posttown': token_clean in lookups.posttowns,
+                'has.vowels': bool(set(token_clean) & _VOWELS),
                 'flat': token_clean in FLAT,
                 'company': token_clean in COMPANY,
                 'road': token_clean in ROAD,
@@ -225,31 +273,47 @@ def tokenFeatures(token):
     return features
 
 
+@lru_cache(maxsize=FEATURE_CACHE_SIZE)
+def cachedTokenFeatures(token):
+    """
+    Memoised version of tokenFeatures. Uses a bounded least recently used cache, the hits and
+    misses can be inspected with cachedTokenFeatures.cache_info().
+
+    .. Note:: the returned dictionary is shared between all calls with the same token and
+              should not be modified, take a copy instead.
+
+    :param token: input token
+    :type token: str
+
+    :return: dictionary of the computed features
+    :rtype: dict
+    """
+    return tokenFeatures(token)
+
+
 def tokens2features(tokens):
     """
     This should call tokenFeatures to get features for individual tokens,
     as well as define any features that are dependent upon tokens before/after.
 
+    The features of individual tokens are memoised, see cachedTokenFeatures, and only
+    the features that depend on the position of the token are added here.
+
     :param tokens:
     :return:
     """
-    feature_sequence = [tokenFeatures(tokens[0])]
-    previous_features = feature_sequence[-1].copy()
-
-    for token in tokens[1:]:
-        # set features for individual tokens (calling tokenFeatures)
-        token_features = tokenFeatures(token)
-        current_features = token_features.copy()
+    # copies of the cached features, one for the token itself and one shared by its neighbours
+    features = [cachedTokenFeatures(token) for token in tokens]
+    feature_sequence = [token_features.copy() for token_features in features]
+    adjacent_features = [token_features.copy() for token_features in features]
 
-        # features for the features of adjacent tokens
-        feature_sequence[-1]['next'] = current_features
-        token_features['previous'] = previous_features
+    # features for the features of adjacent tokens
+    for i in range(1, len(feature_sequence)):
+        feature_sequence[i - 1]['next'] = adjacent_features[i]
+        feature_sequence[i]['previous'] = adjacent_features[i - 1]
 
-        # DEFINE ANY OTHER FEATURES THAT ARE DEPENDENT UPON TOKENS BEFORE/AFTER
-        # for example, a feature for whether a certain character has appeared previously in the token sequence
-
-        feature_sequence.append(token_features)
-        previous_features = current_features
+    # DEFINE ANY OTHER FEATURES THAT ARE DEPENDENT UPON TOKENS BEFORE/AFTER
+    # for example, a feature for whether a certain character has appeared previously in the token sequence
 
     if len(feature_sequence) > 1:
         # these are features for the tokens at the beginning and end of a string
@@ -264,6 +328,101 @@ def tokens2features(tokens):
 
     return feature_sequence
 
+
+def flattenFeatures(features, prefix=''):
+    """
+    Flatten a nested feature dictionary to attribute names and weights the same way pycrfsuite does.
+    String values become part of the attribute name e.g. {'word': 'OXFORD'} becomes {'word:OXFORD': 1.0},
+    booleans and numbers become weights, and nested dictionaries are prefixed e.g. 'previous:word:OXFORD'.
+
+    Attributes with zero weight are dropped as they do not contribute to the CRF scores.
+    The order of the attributes is kept so that the scores are summed in the same order.
+
+    :param features: features of a single token
+    :type features: dict
+    :param prefix: prefix added to all attribute names
+    :type prefix: str
+
+    :return: attribute names and weights
+    :rtype: dict
+    """
+    attributes = {}
+    for name, value in features.items():
+        if isinstance(value, dict):
+            attributes.update(flattenFeatures(value, prefix + name + ':'))
+        elif isinstance(value, str):
+            attributes[prefix + name + ':' + value] = 1.0
+        elif value:
+            attributes[prefix + name] = float(value)
+
+    return attributes
+
+
+@lru_cache(maxsize=FEATURE_CACHE_SIZE)
+def _cachedFlatFeatures(token):
+    """
+    Memoised flat attributes of a token, both for the token itself and as seen from its neighbours.
+
+    .. Note:: the returned dictionaries are shared between all calls with the same token and
+              should not be modified.
+
+    :param token: input token
+    :type token: str
+
+    :return: own attributes, attributes prefixed with previous, and attributes prefixed with next
+    :rtype: tuple
+    """
+    features = cachedTokenFeatures(token)
+
+    return flattenFeatures(features), flattenFeatures(features, 'previous:'), flattenFeatures(features, 'next:')
+
+
+def tokens2flatFeatures(tokens):
+    """
+    Flat alternative to tokens2features that can be given directly to the pycrfsuite tagger.
+    Returns for each token a single dictionary of attribute names and weights, so that neither nested
+    dictionaries nor copies of the neighbouring token features need to be built. The attribute names
+    are identical to those pycrfsuite generates from tokens2features, hence existing models work as before.
+
+    :param tokens: tokens of a single address
+    :type tokens: list
+
+    :return: a list of attribute dictionaries, one per token
+    :rtype: list
+    """
+    encoded = [_cachedFlatFeatures(token) for token in tokens]
+    last = len(encoded) - 1
+
+    if last == 0:
+        # a singleton feature, for if there is only one token in a string
+        attributes = encoded[0][0].copy()
+        attributes['singleton'] = 1.0
+        return [attributes]
+
+    # keep the same order as flattening the nested features would give: own, previous, next, position
+    sequence = []
+    for i, (own, _, _) in enumerate(encoded):
+        attributes = own.copy()
+
+        if i > 0:
+            attributes.update(encoded[i - 1][1])
+            if i == 1:
+                attributes['previous:rawstring.start'] = 1.0
+
+        if i < last:
+            attributes.update(encoded[i + 1][2])
+            if i == last - 1:
+                attributes['next:rawstring.end'] = 1.0
+
+        if i == 0:
+            attributes['rawstring.start'] = 1.0
+        elif i == last:
+            attributes['rawstring.end'] = 1.0
+
+        sequence.append(attributes)
+
+    return sequence
+
 def replaceSynonyms(tokens):
     """
     This function replaces all of the words in the synonym list with their synonyms.
@@ -283,6 +442,23 @@ def removeCounties(in_string):
     """
     This function will remove any counties which appear in the county list.
 
+    Counties are not removed if they follow ON, DINAS, UPON or a number (eg. Bradford on Avon,
+    Dinas Powys or 5 Somerset) or if they are followed by a non county word such as ROAD or STREET.
+    Uses the precompiled county matcher of the tokenizer, the output is the same as with _removeCountiesRegex.
+
+    :param in_string: the string from which to remove the counties.
+    :type in_string: str
+
+    :return out_string: the input string with the counties removed.
+    :type out_string: str
+    """
+    return getTokenizer().county_matcher.sub(in_string)
+
+def _removeCountiesRegex(in_string):
+    """
+    The original regular expression implementation of removeCounties. Kept as a reference
+    for testing and benchmarking the county matcher, should not be used otherwise.
+
     :param in_string: the string from which to remove the counties.
     :type in_string: str
 
@@ -293,10 +469,10 @@ def removeCounties(in_string):
     # Step 1 - ON, DINAS and UPON or a number - if a county follows one of these
     # words (eg. Bradford on Avon, Dinas Powys or Stratford upon Avon, or a 5 Somerset),
     # do not remove it
-    c_except = [r"ON\s",r"DINAS\s",r"UPON\s",r"[0-9]\s"]
+    c_except = COUNTY_EXCEPTIONS
 
     # Step 2 - Do look behind for ON, DINAS and POWYS
-    look_behind = r"(?<!\b{0})({1})".format(r")(?<!\b".join(c_except), "|".join(county))
+    look_behind = r"(?<!\b{0})({1})".format(r")(?<!\b".join(c_except), "|".join(getLookups().county))
 
     # Step 3 - Do look ahead. nonCountyIdentification is a list of words (eg.
     # ROAD, STREET etc.). We don't want to remove counties if they're followed by
@@ -310,10 +486,141 @@ def removeCounties(in_string):
 
     return out_string
 
+
+class Tokenizer:
+    """
+    Splits address strings to tokens. All the regular expressions, the synonyms, and the counties
+    are compiled once when the tokenizer is created rather than on every call. Gives exactly the same
+    tokens as the original implementation in _tokenizeReference.
+    """
+
+    def __init__(self, synonyms, county_matcher):
+        """
+        Class constructor.
+
+        :param synonyms: a dictionary mapping tokens to their synonyms
+        :type synonyms: dict
+        :param county_matcher: matcher used to remove the counties
+        :type county_matcher: CountyMatcher
+        """
+        self.synonyms = synonyms
+        self.county_matcher = county_matcher
+
+        # the regular expression replacements as per the scala parsing, applied in this order
+        self._hyphen_range = re.compile(r"(\d+[A-Z]?) *- *(\d+[A-Z]?)")
+        self._slash_range = re.compile(r"(\d+)/(\d+)")
+        self._to_range = re.compile(r"(\d+) *TO *(\d+)")
+
+        self._tokens = re.compile(r"\(*\b[^\s,;#&()]+[.,;)\n]* | [#&]", re.VERBOSE | re.UNICODE)
+
+    def _normalise_ranges(self, string):
+        """
+        Replace whitespaces and other separators in numerical ranges with a hyphen e.g. 7 TO 9 becomes 7-9.
+        Each regular expression is only run if the string contains its separator.
+
+        :param string: upper case string
+        :type string: str
+
+        :return: string with normalised ranges
+        :rtype: str
+        """
+        if '-' in string:
+            string = self._hyphen_range.sub(r"\g<1>-\g<2>", string)
+        if '/' in string:
+            string = self._slash_range.sub(r"\g<1>-\g<2>", string)
+        if 'TO' in string:
+            string = self._to_range.sub(r"\g<1>-\g<2>", string)
+
+        return string
+
+    def tokenize(self, raw_string):
+        """
+        The function determines how any given string is split into its tokens.
+        Uses regular expression to split a given string to tokens.
+
+        :param raw_string: an unprocessed string
+        :type raw_string: str or bytes
+
+        :return: a list of tokens
+        :rtype: list
+        """
+        if isinstance(raw_string, bytes):
+            try:
+                raw_string = str(raw_string, encoding='utf-8')
+            except:
+                raw_string = str(raw_string)
+
+        return self.split(self.county_matcher.sub(raw_string.upper()))
+
+    def split(self, string):
+        """
+        The steps of tokenize after the counties have been removed from the upper case string.
+        Normalises the numerical ranges and separators, replaces synonyms, and splits to tokens.
+
+        :param string: upper case string with the counties removed
+        :type string: str
+
+        :return: a list of tokens
+        :rtype: list
+        """
+        string = self._normalise_ranges(string)
+
+        # the non-regular expression replacements, these need to be done in this order
+        string = string.replace(" IN ", " ").replace(" CO ", " ").replace(" - ", " ").replace(",", " ").replace("\\", " ")
+
+        # split by whitespace, replace synonyms, and remove any counties that are now discoverable
+        synonym_of = self.synonyms.get
+        string = self.county_matcher.sub(' '.join([synonym_of(token, token) for token in string.split()]))
+
+        return self._tokens.findall(string)
+
+    def tokenize_many(self, raw_strings):
+        """
+        Tokenize a batch of strings.
+
+        :param raw_strings: unprocessed strings
+        :type raw_strings: iterable
+
+        :return: a generator yielding a list of tokens for each string in the input order
+        :rtype: generator
+        """
+        tokenize = self.tokenize
+        for raw_string in raw_strings:
+            yield tokenize(raw_string)
+
+
+
 def tokenize(raw_string):
     """
     The function determines how any given string is split into its tokens.
-    Uses regular expression to split a given string to tokens.
+    Uses the precompiled tokenizer, see getTokenizer.
+
+    :param raw_string: an unprocessed string
+    :type raw_string: str or bytes
+
+    :return: a list of tokens
+    :rtype: list
+    """
+    return getTokenizer().tokenize(raw_string)
+
+
+def tokenize_many(raw_strings):
+    """
+    Tokenize a batch of strings using the precompiled tokenizer, see getTokenizer.
+
+    :param raw_strings: unprocessed strings
+    :type raw_strings: iterable
+
+    :return: a generator yielding a list of tokens for each string in the input order
+    :rtype: generator
+    """
+    return getTokenizer().tokenize_many(raw_strings)
+
+
+def _tokenizeReference(raw_string):
+    """
+    The original implementation of tokenize. Kept as a reference for testing and benchmarking
+    the Tokenizer, should not be used otherwise.
 
     :param raw_string: an unprocessed string
     :type raw_string: str or bytes
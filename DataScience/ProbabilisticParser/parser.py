@@ -6,11 +6,16 @@ This file defines the calling mechanism for a trained probabilistic parser model
 It also implements a simple test. Note that the results are model dependent, so
 the assertions will fail if a new model is trained.
 
+A trained model is represented by an AddressParserModel, which owns its tagger. The module
+level functions use the default model of the training directory. The model is opened when
+first needed, importing this file does not load it.
+
 
 Requirements
 ------------
 
 :requires: pycrfsuite (https://python-crfsuite.readthedocs.io/en/latest/)
+:requires: numpy (only for parse_arrays)
 
 
 Author
@@ -22,28 +27,623 @@ Author
 Version
 -------
 
-:version: 0.3
-:date: 7-Feb-2017
+:version: 0.4
+:date: 17-Oct-2026
 """
+import multiprocessing
 import os
-import sys
 from collections import OrderedDict
+from functools import lru_cache, partial
 
 import ProbabilisticParser.common.tokens as tok
-import pycrfsuite
+from ProbabilisticParser.common.cache import ParseCache
+from ProbabilisticParser.common.lazy import lazy_attributes
+
+# number of addresses sent to a worker process at a time by the batch functions
+DEFAULT_CHUNKSIZE = 1000
+
+
+class AddressParserModel:
+    """
+    A trained probabilistic parser model. Each model owns its tagger, hence several models, for example
+    different versions, can be used side by side. The tagger is opened when first needed or explicitly
+    using the open method, which allows controlling whether the tagger is opened before or after forking.
+
+    The model can be pickled, for example to send it to worker processes. Only the name of the model
+    file is pickled, each process opens its own tagger.
+
+    Optionally, the results of tag and tag_batch are cached, see enable_cache.
+    """
+
+    def __init__(self, model_file=None, lazy=True, cache=None):
+        """
+        Class constructor.
+
+        :param model_file: name of the CRF model file, defaults to the model in the training directory
+        :type model_file: str
+        :param lazy: whether to open the tagger only when first needed
+        :type lazy: bool
+        :param cache: cache for the results of tag and tag_batch, must have been created for the same model file
+        :type cache: ParseCache or None
+        """
+        if model_file is None:
+            model_file = tok.MODEL_PATH + tok.MODEL_FILE
+
+        self.model_file = model_file
+        self.cache = cache
+        self._tagger = None
+
+        if not lazy:
+            self.open()
+
+    def __repr__(self):
+        return '{}({!r})'.format(self.__class__.__name__, self.model_file)
+
+    def __getstate__(self):
+        return {'model_file': self.model_file}
+
+    def __setstate__(self, state):
+        self.model_file = state['model_file']
+        self.cache = None
+        self._tagger = None
+
+    def enable_cache(self, filename=None, maxsize=2 ** 16):
+        """
+        Cache the results of tag and tag_batch. Strings that have been seen before, also in previous
+        runs if a cache file is given, are not tagged again.
+
+        :param filename: name of the SQLite database holding the cache, if None the results are only cached in memory
+        :type filename: str or None
+        :param maxsize: maximum number of results kept in memory
+        :type maxsize: int
+
+        :return: the cache, which can be used e.g. to get the hit rate
+        :rtype: ParseCache
+        """
+        self.cache = ParseCache(self.model_file, filename=filename, maxsize=maxsize)
+
+        return self.cache
+
+    def open(self):
+        """
+        Open the tagger, if not open already.
+
+        :return: a tagger with the model open
+        :rtype: pycrfsuite.Tagger
+        """
+        if self._tagger is None:
+            import pycrfsuite
+
+            tagger = pycrfsuite.Tagger()
+            try:
+                tagger.open(self.model_file)
+            except IOError as error:
+                raise FileNotFoundError('Cannot find the CRF model file {}'.format(self.model_file)) from error
+
+            self._tagger = tagger
+
+        return self._tagger
+
+    def close(self):
+        """
+        Close the tagger. The tagger will be opened again if the model is used after closing.
+
+        :return: None
+        """
+        if self._tagger is not None:
+            self._tagger.close()
+            self._tagger = None
+
+    @property
+    def tagger(self):
+        """
+        The tagger of the model, opened if needed.
+
+        :return: a tagger with the model open
+        :rtype: pycrfsuite.Tagger
+        """
+        return self.open()
+
+    def _parse(self, raw_string):
+        """
+        Private method to parse strings using the model.
+        Should not be called directly, but rather using parse and other methods.
+
+        :param raw_string: input string to parse
+        :type raw_string: str
+
+        :return: a tuple of tokens and labels
+        :rtype: tuple
+        """
+        tokens = tok.tokenize(raw_string)
+
+        return tokens, self._tag_tokens(tokens)
+
+    def _tag_tokens(self, tokens):
+        """
+        Private method to label the given tokens using the model.
+
+        :param tokens: tokens of a single string
+        :type tokens: list
+
+        :return: a list of labels
+        :rtype: list
+        """
+        if not tokens:
+            return []
+
+        features = tok.tokens2flatFeatures(tokens)
+
+        return self.tagger.tag(features)
+
+    @staticmethod
+    def _combine(tokens, tags):
+        """
+        Join the tokens of each label to a single component.
+
+        :param tokens: tokens of a single string
+        :type tokens: list
+        :param tags: labels of the tokens
+        :type tags: list
+
+        :return: a dictionary of labels and components
+        :rtype: OrderedDict
+        """
+        tagged = OrderedDict()
+
+        for token, label in zip(tokens, tags):
+            tagged.setdefault(label, []).append(token)
+
+        for token in tagged:
+            component = ' '.join(tagged[token])
+            component = component.strip(' ,;')
+            tagged[token] = component
+
+        return tagged
+
+    def parse(self, raw_string):
+        """
+        Parse the given input string using the model. Returns a list of tokens and labels.
 
-try:
-    TAGGER = pycrfsuite.Tagger()
-    TAGGER.open(tok.MODEL_PATH + tok.MODEL_FILE)
-    print('Using model from', tok.MODEL_PATH + tok.MODEL_FILE)
-except IOError:
-    print('ERROR: cannot find the CRF model file', tok.MODEL_FILE, 'from', tok.MODEL_PATH)
-    sys.exit(-9)
+        :param raw_string: input string to parse
+        :type raw_string: str
+
+        :return: a list of tokens and labels
+        :rtype: list
+        """
+        tokens, tags = self._parse(raw_string)
+
+        return list(zip(tokens, tags))
+
+    def parse_with_marginal_probability(self, raw_string):
+        """
+        Parse the given input string using the model.
+        Returns a list of tokens, labels, and marginal probabilities.
+
+        :param raw_string: input string to parse
+        :type raw_string: str
+
+        :return: a list of tokens, labels, and marginal probabilities
+        :rtype: list
+        """
+        tokens, tags = self._parse(raw_string)
+
+        marginals = [self.tagger.marginal(tag, i) for i, tag in enumerate(tags)]
+
+        return list(zip(tokens, tags, marginals))
+
+    def parse_with_probabilities(self, raw_string):
+        """
+        Parse the given input string using the model.
+        Returns a dictionary with the tokens, labels, marginal probabilities, and the sequence probability.
+
+        :param raw_string: input string to parse
+        :type raw_string: str
+
+        :return: a dictionary holding the results
+        :rtype: OrderedDict
+        """
+        tokens, tags, marginals, sequence_probability = self._parse_with_probabilities(raw_string)
+
+        out = OrderedDict(tokens=tokens, tags=tags, marginal_probabilites=marginals,
+                          sequence_probability=sequence_probability)
+
+        return out
+
+    def _parse_with_probabilities(self, raw_string):
+        """
+        Private method to parse strings and compute the probabilities in a single tagging pass:
+        the features are given to the tagger once and the marginals and the sequence probability
+        are computed from the same instance.
+
+        :param raw_string: input string to parse
+        :type raw_string: str
+
+        :return: a tuple of tokens, labels, marginal probabilities, and the sequence probability
+        :rtype: tuple
+        """
+        tokens = tok.tokenize(raw_string)
+
+        if not tokens:
+            return tokens, [], [], 0.
+
+        tagger = self.tagger
+        tagger.set(tok.tokens2flatFeatures(tokens))
+
+        tags = tagger.tag()
+        marginals = [tagger.marginal(tag, i) for i, tag in enumerate(tags)]
+
+        return tokens, tags, marginals, tagger.probability(tags)
+
+    def tag(self, raw_string):
+        """
+        Parse the given input string using the model. Returns an ordered dictionary of tokens and labels.
+        Unlike the parse method returns a complete label i.e. joins multiple labels to a single string and
+        labels the full string given the label.
+
+        :param raw_string: input string to parse and label
+        :type raw_string: str
+
+        :return: a dictionary of tokens and labels
+        :rtype: Ordered Dictionary
+        """
+        if self.cache is None:
+            return self._combine(*self._parse(raw_string))
+
+        tokens = tok.tokenize(raw_string)
+        key = self.cache.key(tokens)
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            return OrderedDict(cached)
+
+        tagged = self._combine(tokens, self._tag_tokens(tokens))
+        self.cache.put(key, tagged.items())
+
+        return tagged
+
+    def parse_many(self, raw_strings):
+        """
+        Parse a batch of strings, see parse.
+
+        :param raw_strings: input strings to parse
+        :type raw_strings: iterable
+
+        :return: a generator yielding a list of tokens and labels for each string in the input order
+        :rtype: generator
+        """
+        for raw_string in raw_strings:
+            yield self.parse(raw_string)
+
+    def parse_with_probabilities_many(self, raw_strings):
+        """
+        Parse a batch of strings, see parse_with_probabilities.
+
+        :param raw_strings: input strings to parse
+        :type raw_strings: iterable
+
+        :return: a generator yielding a dictionary of the results for each string in the input order
+        :rtype: generator
+        """
+        for raw_string in raw_strings:
+            yield self.parse_with_probabilities(raw_string)
+
+    def tag_many(self, raw_strings):
+        """
+        Parse and label a batch of strings, see tag.
+
+        :param raw_strings: input strings to parse and label
+        :type raw_strings: iterable
+
+        :return: a generator yielding a dictionary of tokens and labels for each string in the input order
+        :rtype: generator
+        """
+        for raw_string in raw_strings:
+            yield self.tag(raw_string)
+
+    def _batch(self, method, raw_strings, workers=1, chunksize=DEFAULT_CHUNKSIZE):
+        """
+        Private method to run the given method over a batch of strings using a pool of processes.
+        Should not be called directly, but rather using tag_batch and other batch methods.
+
+        :param method: name of the method to run for each string
+        :type method: str
+        :param raw_strings: input strings
+        :type raw_strings: iterable
+        :param workers: number of worker processes, defaults to 1, if None the number of CPUs
+        :type workers: int or None
+        :param chunksize: number of strings sent to a worker at a time
+        :type chunksize: int
+
+        :return: the results in the input order
+        :rtype: list
+        """
+        raw_strings = list(raw_strings)
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = min(workers, -(-len(raw_strings) // chunksize))
+
+        # not worth starting processes, run in this process instead
+        if workers <= 1:
+            return [getattr(self, method)(raw_string) for raw_string in raw_strings]
+
+        with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(self.model_file,)) as pool:
+            return pool.map(partial(_run_in_worker, method), raw_strings, chunksize=chunksize)
+
+    def parse_batch(self, raw_strings, workers=1, chunksize=DEFAULT_CHUNKSIZE):
+        """
+        Parse a batch of strings in parallel, see parse. Each worker process opens its own tagger once.
+
+        :param raw_strings: input strings to parse
+        :type raw_strings: iterable
+        :param workers: number of worker processes, defaults to 1, if None the number of CPUs
+        :type workers: int or None
+        :param chunksize: number of strings sent to a worker at a time
+        :type chunksize: int
+
+        :return: a list of tokens and labels for each string in the input order
+        :rtype: list
+        """
+        return self._batch('parse', raw_strings, workers=workers, chunksize=chunksize)
+
+    def parse_with_probabilities_batch(self, raw_strings, workers=1, chunksize=DEFAULT_CHUNKSIZE):
+        """
+        Parse a batch of strings in parallel, see parse_with_probabilities. Each worker process opens
+        its own tagger once.
+
+        :param raw_strings: input strings to parse
+        :type raw_strings: iterable
+        :param workers: number of worker processes, defaults to 1, if None the number of CPUs
+        :type workers: int or None
+        :param chunksize: number of strings sent to a worker at a time
+        :type chunksize: int
+
+        :return: a dictionary of the results for each string in the input order
+        :rtype: list
+        """
+        return self._batch('parse_with_probabilities', raw_strings, workers=workers, chunksize=chunksize)
+
+    def parse_arrays(self, raw_strings, workers=1, chunksize=DEFAULT_CHUNKSIZE):
+        """
+        Parse a batch of strings in parallel and return the tokens, labels, marginal probabilities and
+        sequence probabilities together as NumPy arrays. Each string is tagged only once, hence both
+        the components, see ParsedBatch.tag, and the probabilities are available from a single pass.
+
+        :param raw_strings: input strings to parse
+        :type raw_strings: iterable
+        :param workers: number of worker processes, defaults to 1, if None the number of CPUs
+        :type workers: int or None
+        :param chunksize: number of strings sent to a worker at a time
+        :type chunksize: int
+
+        :return: the results of all strings in the input order
+        :rtype: ParsedBatch
+        """
+        import numpy as np
+
+        results = self._batch('_parse_with_probabilities', raw_strings, workers=workers, chunksize=chunksize)
+
+        labels = self.tagger.labels()
+        label_ids = {label: i for i, label in enumerate(labels)}
+
+        lengths = [len(tokens) for tokens, _, _, _ in results]
+        offsets = np.zeros(len(results) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+
+        tokens = np.empty(offsets[-1], dtype=object)
+        tokens[:] = [token for result in results for token in result[0]]
+
+        return ParsedBatch(labels=np.array(labels, dtype=object),
+                           tokens=tokens,
+                           label_ids=np.fromiter((label_ids[tag] for result in results for tag in result[1]),
+                                                 dtype=np.int8, count=offsets[-1]),
+                           marginals=np.fromiter((marginal for result in results for marginal in result[2]),
+                                                 dtype=np.float64, count=offsets[-1]),
+                           sequence_probabilities=np.fromiter((result[3] for result in results),
+                                                              dtype=np.float64, count=len(results)),
+                           offsets=offsets)
+
+    def tag_batch(self, raw_strings, workers=1, chunksize=DEFAULT_CHUNKSIZE):
+        """
+        Parse and label a batch of strings in parallel, see tag. Each worker process opens its own tagger once.
+
+        :param raw_strings: input strings to parse and label
+        :type raw_strings: iterable
+        :param workers: number of worker processes, defaults to 1, if None the number of CPUs
+        :type workers: int or None
+        :param chunksize: number of strings sent to a worker at a time
+        :type chunksize: int
+
+        :return: a dictionary of tokens and labels for each string in the input order
+        :rtype: list
+        """
+        if self.cache is None:
+            return self._batch('tag', raw_strings, workers=workers, chunksize=chunksize)
+
+        # look up all strings first so that only unique strings that have not been seen before are tagged
+        raw_strings = list(raw_strings)
+        keys = [self.cache.key(tokens) for tokens in tok.tokenize_many(raw_strings)]
+
+        results = {}
+        to_tag = OrderedDict()
+        for key, raw_string in zip(keys, raw_strings):
+            if key not in results and key not in to_tag:
+                cached = self.cache.get(key)
+                if cached is None:
+                    to_tag[key] = raw_string
+                else:
+                    results[key] = cached
+
+        tagged = self._batch('tag', to_tag.values(), workers=workers, chunksize=chunksize)
+        for key, components in zip(to_tag, tagged):
+            results[key] = tuple(components.items())
+            self.cache.put(key, results[key])
+        self.cache.flush()
+
+        return [OrderedDict(results[key]) for key in keys]
+
+
+class ParsedBatch:
+    """
+    Results of parsing a batch of strings, see AddressParserModel.parse_arrays. The tokens, label IDs and
+    marginal probabilities of all strings are concatenated, the values of string i are found between
+    offsets[i] and offsets[i + 1]. The label IDs are indices to the labels of the model.
+    """
+
+    def __init__(self, labels, tokens, label_ids, marginals, sequence_probabilities, offsets):
+        """
+        Class constructor.
+
+        :param labels: labels of the model
+        :type labels: numpy.ndarray
+        :param tokens: tokens of all strings
+        :type tokens: numpy.ndarray
+        :param label_ids: label ID of each token
+        :type label_ids: numpy.ndarray
+        :param marginals: marginal probability of the label of each token
+        :type marginals: numpy.ndarray
+        :param sequence_probabilities: probability of the label sequence of each string
+        :type sequence_probabilities: numpy.ndarray
+        :param offsets: start of each string in the token arrays, and the total number of tokens
+        :type offsets: numpy.ndarray
+        """
+        self.labels = labels
+        self.tokens = tokens
+        self.label_ids = label_ids
+        self.marginals = marginals
+        self.sequence_probabilities = sequence_probabilities
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.sequence_probabilities)
+
+    def tokens_of(self, i):
+        """
+        Get the tokens of the given string.
+
+        :param i: index of the string in the batch
+        :type i: int
+
+        :return: tokens
+        :rtype: list
+        """
+        return list(self.tokens[self.offsets[i]:self.offsets[i + 1]])
+
+    def tags_of(self, i):
+        """
+        Get the labels of the given string.
+
+        :param i: index of the string in the batch
+        :type i: int
+
+        :return: labels
+        :rtype: list
+        """
+        return list(self.labels[self.label_ids[self.offsets[i]:self.offsets[i + 1]]])
+
+    def parse_with_probabilities(self, i):
+        """
+        Get the results of the given string in the format of AddressParserModel.parse_with_probabilities.
+
+        :param i: index of the string in the batch
+        :type i: int
+
+        :return: a dictionary holding the results
+        :rtype: OrderedDict
+        """
+        return OrderedDict(tokens=self.tokens_of(i), tags=self.tags_of(i),
+                           marginal_probabilites=self.marginals[self.offsets[i]:self.offsets[i + 1]].tolist(),
+                           sequence_probability=float(self.sequence_probabilities[i]))
+
+    def tag(self, i):
+        """
+        Get the components of the given string in the format of AddressParserModel.tag.
+
+        :param i: index of the string in the batch
+        :type i: int
+
+        :return: a dictionary of tokens and labels
+        :rtype: OrderedDict
+        """
+        return AddressParserModel._combine(self.tokens_of(i), self.tags_of(i))
+
+
+# the model of a worker process of the batch methods
+_WORKER_MODEL = None
+
+
+def _init_worker(model_file):
+    """
+    Initialise a worker process of the batch methods. Each process has its own model, which opens the tagger
+    on the first string, so that failures to open are raised in the calling process rather than in the pool.
+
+    :param model_file: name of the CRF model file
+    :type model_file: str
+
+    :return: None
+    """
+    global _WORKER_MODEL
+    _WORKER_MODEL = AddressParserModel(model_file)
+
+
+def _run_in_worker(method, raw_string):
+    """
+    Run the given method of the model of the worker process.
+
+    :param method: name of the method
+    :type method: str
+    :param raw_string: input string
+    :type raw_string: str
+
+    :return: the result of the method
+    """
+    return getattr(_WORKER_MODEL, method)(raw_string)
+
+
+@lru_cache(maxsize=None)
+def get_model():
+    """
+    Get the default model, used by the module level functions. The tagger is opened when first needed.
+
+    :return: the model in the training directory
+    :rtype: AddressParserModel
+    """
+    return AddressParserModel()
+
+
+def enable_cache(filename=None, maxsize=2 ** 16):
+    """
+    Cache the results of tag and tag_batch of the default model, see AddressParserModel.enable_cache.
+
+    :param filename: name of the SQLite database holding the cache, if None the results are only cached in memory
+    :type filename: str or None
+    :param maxsize: maximum number of results kept in memory
+    :type maxsize: int
+
+    :return: the cache, which can be used e.g. to get the hit rate
+    :rtype: ParseCache
+    """
+    return get_model().enable_cache(filename=filename, maxsize=maxsize)
+
+
+def get_tagger():
+    """
+    Get the tagger of the default model. The model is opened on the first call only.
+
+    :return: a tagger with the model open
+    :rtype: pycrfsuite.Tagger
+    """
+    return get_model().tagger
+
+
+# the tagger of the default model is opened when first accessed as the module attribute TAGGER
+lazy_attributes(__name__, {'TAGGER': get_tagger})
 
 
 def _parse(raw_string):
     """
-    Private function to parse strings using a trained model.
+    Private function to parse strings using the default model.
     Should not be called directly, but rather using parse and other functions.
 
     :param raw_string: input string to parse
@@ -52,21 +652,12 @@ def _parse(raw_string):
     :return: a tuple of tokens and labels
     :rtype: tuple
     """
-    tokens = tok.tokenize(raw_string)
-
-    if not tokens:
-        return []
-
-    features = tok.tokens2features(tokens)
-
-    tags = TAGGER.tag(features)
-
-    return tokens, tags
+    return get_model()._parse(raw_string)
 
 
 def parse(raw_string):
     """
-    Parse the given input string using a trained model. Returns a list of tokens and labels.
+    Parse the given input string using the default model. Returns a list of tokens and labels.
 
     :param raw_string: input string to parse
     :type raw_string: str
@@ -74,14 +665,12 @@ def parse(raw_string):
     :return: a list of tokens and labels
     :rtype: list
     """
-    tokens, tags = _parse(raw_string)
-
-    return list(zip(tokens, tags))
+    return get_model().parse(raw_string)
 
 
 def parse_with_marginal_probability(raw_string):
     """
-    Parse the given input string using a trained model.
+    Parse the given input string using the default model.
     Returns a list of tokens, labels, and marginal probabilities.
 
     :param raw_string: input string to parse
@@ -90,17 +679,13 @@ def parse_with_marginal_probability(raw_string):
     :return: a list of tokens, labels, and marginal probabilities
     :rtype: list
     """
-    tokens, tags = _parse(raw_string)
-
-    marginals = [TAGGER.marginal(tag, i) for i, tag in enumerate(tags)]
-
-    return list(zip(tokens, tags, marginals))
+    return get_model().parse_with_marginal_probability(raw_string)
 
 
 def parse_with_probabilities(raw_string):
     """
-    Parse the given input string using a trained model.
-    Returns a dictionary with
+    Parse the given input string using the default model.
+    Returns a dictionary with the tokens, labels, marginal probabilities, and the sequence probability.
 
     :param raw_string: input string to parse
     :type raw_string: str
@@ -108,20 +693,12 @@ def parse_with_probabilities(raw_string):
     :return: a dictionary holding the results
     :rtype: OrderedDict
     """
-    tokens, tags = _parse(raw_string)
-
-    marginals = [TAGGER.marginal(tag, i) for i, tag in enumerate(tags)]
-    sequence_probability = TAGGER.probability(tags)
-
-    out = OrderedDict(tokens=tokens, tags=tags, marginal_probabilites=marginals,
-                      sequence_probability=sequence_probability)
-
-    return out
+    return get_model().parse_with_probabilities(raw_string)
 
 
 def tag(raw_string):
     """
-    Parse the given input string using a trained model. Returns an ordered dictionary of tokens and labels.
+    Parse the given input string using the default model. Returns an ordered dictionary of tokens and labels.
     Unlike the parse function returns a complete label i.e. joins multiple labels to a single string and
     labels the full string given the label.
 
@@ -131,17 +708,77 @@ def tag(raw_string):
     :return: a dictionary of tokens and labels
     :rtype: Ordered Dictionary
     """
-    tagged = OrderedDict()
+    return get_model().tag(raw_string)
+
+
+def parse_batch(raw_strings, workers=1, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Parse a batch of strings in parallel using the default model, see parse.
 
-    for token, label in parse(raw_string):
-        tagged.setdefault(label, []).append(token)
+    :param raw_strings: input strings to parse
+    :type raw_strings: iterable
+    :param workers: number of worker processes, defaults to 1, if None the number of CPUs
+    :type workers: int or None
+    :param chunksize: number of strings sent to a worker at a time
+    :type chunksize: int
+
+    :return: a list of tokens and labels for each string in the input order
+    :rtype: list
+    """
+    return get_model().parse_batch(raw_strings, workers=workers, chunksize=chunksize)
 
-    for token in tagged:
-        component = ' '.join(tagged[token])
-        component = component.strip(' ,;')
-        tagged[token] = component
 
-    return tagged
+def parse_with_probabilities_batch(raw_strings, workers=1, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Parse a batch of strings in parallel using the default model, see parse_with_probabilities.
+
+    :param raw_strings: input strings to parse
+    :type raw_strings: iterable
+    :param workers: number of worker processes, defaults to 1, if None the number of CPUs
+    :type workers: int or None
+    :param chunksize: number of strings sent to a worker at a time
+    :type chunksize: int
+
+    :return: a dictionary of the results for each string in the input order
+    :rtype: list
+    """
+    return get_model().parse_with_probabilities_batch(raw_strings, workers=workers, chunksize=chunksize)
+
+
+def parse_arrays(raw_strings, workers=1, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Parse a batch of strings in parallel using the default model and return the tokens, labels,
+    marginal probabilities and sequence probabilities together as NumPy arrays, see
+    AddressParserModel.parse_arrays.
+
+    :param raw_strings: input strings to parse
+    :type raw_strings: iterable
+    :param workers: number of worker processes, defaults to 1, if None the number of CPUs
+    :type workers: int or None
+    :param chunksize: number of strings sent to a worker at a time
+    :type chunksize: int
+
+    :return: the results of all strings in the input order
+    :rtype: ParsedBatch
+    """
+    return get_model().parse_arrays(raw_strings, workers=workers, chunksize=chunksize)
+
+
+def tag_batch(raw_strings, workers=1, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Parse and label a batch of strings in parallel using the default model, see tag.
+
+    :param raw_strings: input strings to parse and label
+    :type raw_strings: iterable
+    :param workers: number of worker processes, defaults to 1, if None the number of CPUs
+    :type workers: int or None
+    :param chunksize: number of strings sent to a worker at a time
+    :type chunksize: int
+
+    :return: a dictionary of tokens and labels for each string in the input order
+    :rtype: list
+    """
+    return get_model().tag_batch(raw_strings, workers=workers, chunksize=chunksize)
 
 
 def test(raw_string='ONS LIMITED FLAT 1 12 OXFORD STREET STREET ST1 2FW', verbose=False):
@@ -157,6 +794,10 @@ def test(raw_string='ONS LIMITED FLAT 1 12 OXFORD STREET STREET ST1 2FW', verbos
 
     :return: None
     """
+    import pycrfsuite
+
+    tagger = get_tagger()
+
     print('Input string:', raw_string)
     print('Python Results:', tag(raw_string))
 
@@ -166,22 +807,22 @@ def test(raw_string='ONS LIMITED FLAT 1 12 OXFORD STREET STREET ST1 2FW', verbos
     if verbose:
         print('features:', features)
 
-    tags = TAGGER.tag(features)
+    tags = tagger.tag(features)
     print('Inferred tags:', tags)
 
-    print('Probability of the sequence:', round(TAGGER.probability(tags), 6))
-    assert round(TAGGER.probability(tags), 6) == 0.992256, 'Sequence probability not correct'
+    print('Probability of the sequence:', round(tagger.probability(tags), 6))
+    assert round(tagger.probability(tags), 6) == 0.992256, 'Sequence probability not correct'
 
     results = [0.999999, 0.999999, 0.999846, 0.993642, 0.999728, 1., 1., 0.998874, 1., 1.]
     for i, tg in enumerate(tags):
-        prob = round(TAGGER.marginal(tg, i), 6)
+        prob = round(tagger.marginal(tg, i), 6)
         print('Marginal probability of', tg, 'in position', i, 'is', prob)
         assert prob == results[i], 'Marginal Probability of a Label not correct'
 
     if verbose:
-        print(TAGGER.info().transitions)
-        print(TAGGER.info().state_features)
-        print(TAGGER.info().attributes)
+        print(tagger.info().transitions)
+        print(tagger.info().state_features)
+        print(tagger.info().attributes)
 
     # store the ItemSequence temporarily
     tmp = pycrfsuite.ItemSequence(features)
@@ -0,0 +1,36 @@
+"""
+ONS Address Index - Probabilistic Parser Test Helpers
+=====================================================
+
+Functions shared by the unit tests of the probabilistic parser.
+
+
+Requirements
+------------
+
+:requires: pycrfsuite (https://python-crfsuite.readthedocs.io/en/latest/)
+
+
+Version
+-------
+
+:version: 0.1
+:date: 17-Oct-2026
+"""
+import os
+
+from ProbabilisticParser.common import tokens as tok
+
+
+def train_example_model(model_file, c1=0.1):
+    """
+    Train a small model on the example training data.
+    """
+    import pycrfsuite
+
+    X, y = tok.readData(os.path.join(tok.MODEL_PATH, 'example.xml'))
+    trainer = pycrfsuite.Trainer(verbose=False)
+    for features, labels in zip(X, y):
+        trainer.append(features, labels)
+    trainer.set_params({'c1': c1, 'c2': 0.01, 'max_iterations': 100, 'feature.possible_transitions': True})
+    trainer.train(model_file)
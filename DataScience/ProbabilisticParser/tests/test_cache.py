@@ -0,0 +1,115 @@
+"""
+ONS Address Index - Parse Cache Test
+====================================
+
+Unit tests to check that the parse cache returns the stored results of the model they were parsed with, in
+memory and on disk.
+
+
+Version
+-------
+
+:version: 0.1
+:date: 17-Oct-2026
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from ProbabilisticParser import parser
+from ProbabilisticParser.common.cache import ParseCache
+
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.model_file = os.path.join(self.directory.name, 'model.crfsuite')
+        self.other_model_file = os.path.join(self.directory.name, 'other.crfsuite')
+        self.cache_file = os.path.join(self.directory.name, 'cache.sqlite')
+
+        with open(self.model_file, 'wb') as f:
+            f.write(b'model')
+        with open(self.other_model_file, 'wb') as f:
+            f.write(b'other model')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_memory(self):
+        cache = ParseCache(self.model_file, maxsize=2)
+        value = (('BuildingNumber', '1'), ('StreetName', 'HIGH STREET'))
+
+        assert cache.key(['1', 'HIGH', 'STREET']) != cache.key(['1', 'HIGHSTREET'])
+        assert cache.key(['1', 'HIGH']) != ParseCache(self.other_model_file).key(['1', 'HIGH'])
+
+        assert cache.get(cache.key(['1', 'HIGH', 'STREET'])) is None
+        cache.put(cache.key(['1', 'HIGH', 'STREET']), value)
+        assert cache.get(cache.key(['1', 'HIGH', 'STREET'])) == value
+
+        # least recently used is evicted
+        cache.put(cache.key(['2']), (('BuildingNumber', '2'),))
+        cache.put(cache.key(['3']), (('BuildingNumber', '3'),))
+        assert cache.get(cache.key(['1', 'HIGH', 'STREET'])) is None
+
+        assert cache.stats() == dict(memory_hits=1, disk_hits=0, misses=2, hit_rate=1 / 3, size=2)
+
+    def test_persistent(self):
+        cache = ParseCache(self.model_file, filename=self.cache_file)
+        cache.put(cache.key(['FLAT', '5']), [('SubBuildingName', 'FLAT 5')])
+        cache.close()
+
+        cache = ParseCache(self.model_file, filename=self.cache_file)
+        assert cache.get(cache.key(['FLAT', '5'])) == (('SubBuildingName', 'FLAT 5'),)
+        assert cache.disk_hits == 1
+
+        # results of another model are not returned
+        other = ParseCache(self.other_model_file, filename=self.cache_file)
+        assert other.get(other.key(['FLAT', '5'])) is None
+
+    def test_committed_at_exit(self):
+        # a single result, fewer than commit_every, is committed when the interpreter exits
+        check = "from ProbabilisticParser.common.cache import ParseCache; " \
+                "cache = ParseCache({!r}, filename={!r}); " \
+                "cache.put(cache.key(['FLAT', '5']), [('SubBuildingName', 'FLAT 5')])".format(self.model_file,
+                                                                                          self.cache_file)
+        environment = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        subprocess.check_call([sys.executable, '-c', check], env=environment)
+
+        cache = ParseCache(self.model_file, filename=self.cache_file)
+        assert cache.get(cache.key(['FLAT', '5'])) == (('SubBuildingName', 'FLAT 5'),)
+        cache.close()
+
+    def test_threads(self):
+        cache = ParseCache(self.model_file, filename=self.cache_file, commit_every=10)
+
+        def put(number):
+            cache.put(cache.key([str(number)]), [('BuildingNumber', str(number))])
+            return cache.get(cache.key([str(number)]))
+
+        with ThreadPoolExecutor(4) as executor:
+            values = list(executor.map(put, range(100)))
+        cache.close()
+
+        assert values == [(('BuildingNumber', str(number)),) for number in range(100)]
+        cache = ParseCache(self.model_file, filename=self.cache_file)
+        assert cache.get(cache.key(['99'])) == (('BuildingNumber', '99'),)
+        cache.close()
+
+    def test_model_cache(self):
+        model = parser.AddressParserModel(self.model_file)
+        cache = model.enable_cache()
+        cache.put(cache.key(['FLAT', '5']), [('SubBuildingName', 'FLAT 5')])
+
+        # cached strings are not tagged, the model file is not a valid model
+        tagged = model.tag('Flat 5')
+        assert tagged == OrderedDict([('SubBuildingName', 'FLAT 5')])
+        tagged['Postcode'] = 'PO21 5RD'
+        assert model.tag_batch(['flat  5', 'FLAT 5']) == [OrderedDict([('SubBuildingName', 'FLAT 5')])] * 2
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+ONS Address Index - Batch Decoder Test
+======================================
+
+Unit tests to check that the NumPy CRF decoder gives the same tags, probabilities and marginals as pycrfsuite.
+
+
+Version
+-------
+
+:version: 0.1
+:date: 17-Oct-2026
+"""
+import os
+import tempfile
+import unittest
+
+from ProbabilisticParser.common import tokens as tok
+from ProbabilisticParser.common.decoder import BatchDecoder, CRFWeights
+from ProbabilisticParser.tests.helpers import train_example_model
+
+
+class TestBatchDecoder(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import pycrfsuite
+
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.model_file = os.path.join(cls.directory.name, 'addressCRF.crfsuite')
+        train_example_model(cls.model_file)
+
+        cls.tagger = pycrfsuite.Tagger()
+        cls.tagger.open(cls.model_file)
+        cls.decoder = BatchDecoder(CRFWeights.from_model(cls.model_file))
+        cls.sequences = [tok.tokenize(string) for string in
+                         ['FLAT 1 12 OXFORD STREET ST1 2FW', 'ONS LIMITED 1 HIGH STREET EX2 6GA', 'LONDON', '5 B']]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tagger.close()
+        cls.directory.cleanup()
+
+    def test_same_as_pycrfsuite(self):
+        for tokens, result in zip(self.sequences, self.decoder.tag_tokens(self.sequences)):
+            self.tagger.set(tok.tokens2flatFeatures(tokens))
+            tags = self.tagger.tag()
+            assert result['tags'][0] == tags
+            assert abs(result['probabilities'][0] - self.tagger.probability(tags)) < 1e-9
+            assert all(abs(marginal - self.tagger.marginal(tag, i)) < 1e-9
+                       for i, (tag, marginal) in enumerate(zip(tags, result['marginals'])))
+
+        features = [tok.tokens2flatFeatures(tokens) for tokens in self.sequences]
+        assert [result['tags'] for result in self.decoder.tag(features)] == \
+            [result['tags'] for result in self.decoder.tag_tokens(self.sequences)]
+
+    def test_top_k(self):
+        best = self.decoder.tag_tokens(self.sequences)
+        for result, first in zip(self.decoder.tag_tokens(self.sequences, k=3), best):
+            assert result['tags'][0] == first['tags'][0]
+            assert result['probabilities'] == sorted(result['probabilities'], reverse=True)
+            assert len(set(tuple(tags) for tags in result['tags'])) == len(result['tags'])
+
+    def test_save_and_load(self):
+        filename = os.path.join(self.directory.name, 'weights.npz')
+        self.decoder.weights.save(filename)
+        decoder = BatchDecoder(CRFWeights.load(filename))
+
+        assert decoder.tag_tokens(self.sequences) == self.decoder.tag_tokens(self.sequences)
+
+    def test_empty(self):
+        assert self.decoder.tag_tokens([]) == []
+        assert self.decoder.tag_tokens([[]]) == [dict(tags=[], probabilities=[], marginals=[])]
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -14,9 +14,10 @@ Author
 Version
 -------
 
-:version: 0.1
-:date: 7-Feb-2017
+:version: 0.2
+:date: 17-Oct-2026
 """
+import pickle
 import unittest
 from collections import OrderedDict
 
@@ -170,5 +171,52 @@ class TestParser(unittest.TestCase):
                             ('Postcode', 'PO21 5RD')])
 
 
+class TestAddressParserModel(unittest.TestCase):
+    def test_lazy_and_picklable(self):
+        model = parser.AddressParserModel('missing.crfsuite')
+        assert model.model_file == 'missing.crfsuite'
+
+        copy = pickle.loads(pickle.dumps(model))
+        assert copy.model_file == model.model_file
+
+        with self.assertRaises(FileNotFoundError):
+            copy.open()
+
+    def test_default_model(self):
+        assert parser.get_model() is parser.get_model()
+        assert parser.get_model().model_file == parser.tok.MODEL_PATH + parser.tok.MODEL_FILE
+
+    def test_empty_string(self):
+        model = parser.AddressParserModel('missing.crfsuite')
+
+        assert model.parse('') == []
+        assert model.tag(' , ') == OrderedDict()
+        assert list(model.tag_many(['', ''])) == [OrderedDict(), OrderedDict()]
+        assert model.parse_with_probabilities('')['sequence_probability'] == 0.
+
+    def test_batch_missing_model(self):
+        model = parser.AddressParserModel('missing.crfsuite')
+
+        with self.assertRaises(FileNotFoundError):
+            model.tag_batch(['1 HIGH STREET', '2 HIGH STREET', '3 HIGH STREET'], workers=2, chunksize=1)
+
+    def test_batch_order(self):
+        addresses = ['Flat 5', '1', 'Oxford Road', '', 'Victorian House', 'Unit A', 'PO21 5RD']
+
+        assert parser.tag_batch(addresses, workers=3, chunksize=2) == [parser.tag(address) for address in addresses]
+        assert parser.parse_batch(addresses, workers=1) == [parser.parse(address) for address in addresses]
+
+    def test_parse_arrays(self):
+        addresses = ['Flat 5', '', 'ONS LIMITED FLAT 1 12 OXFORD STREET STREET ST1 2FW']
+        batch = parser.parse_arrays(addresses, workers=1)
+
+        assert len(batch) == 3
+        assert batch.offsets.tolist() == [0, 2, 2, 12]
+        assert batch.tokens_of(1) == [] and batch.sequence_probabilities[1] == 0.
+        for i, address in enumerate(addresses):
+            assert batch.tag(i) == parser.tag(address)
+            assert batch.parse_with_probabilities(i) == parser.parse_with_probabilities(address)
+
+
 if __name__ == '__main__':
     unittest.main(verbosity=3)
@@ -35,8 +35,8 @@ Author
 Version
 -------
 
-:version: 0.7
-:date: 6-Feb-2017
+:version: 0.8
+:date: 17-Oct-2026
 """
 from collections import Counter
 
@@ -365,15 +365,17 @@ def _manual(output_file='/Users/saminiemi/Projects/ONS/AddressIndex/data/incorre
     store = []
 
     print('Predicting holdout data...')
-    for raw_string, components in tkns.readXML('holdout.xml'):
+    holdout = list(tkns.readXML('holdout.xml'))
+    predictions = parser.parse_batch([raw_string.upper() for raw_string, _ in holdout])
+
+    for (raw_string, components), parsed in zip(holdout, predictions):
         all += 1
 
         # get the true labels
         _, true_labels = list(zip(*components))
         true_labels = list(true_labels)
 
-        # parse the raw string
-        parsed = predict(raw_string)
+        # labels of the parsed raw string
         predicted = [x[1] for x in parsed]
 
         # test whether the full prediction was correct, if not store for inspection
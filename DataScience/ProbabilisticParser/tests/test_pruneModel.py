@@ -0,0 +1,74 @@
+"""
+ONS Address Index - CRF Model Pruning Test
+==========================================
+
+Unit tests to check that the pruning tool rewrites the CRF model file exactly, and that a pruned model keeps
+the strongest state features.
+
+
+Version
+-------
+
+:version: 0.1
+:date: 17-Oct-2026
+"""
+import os
+import tempfile
+import unittest
+
+from ProbabilisticParser.common import metrics
+from ProbabilisticParser.common import tokens as tok
+from ProbabilisticParser.tests.helpers import train_example_model
+from ProbabilisticParser.training import pruneModel
+
+
+class TestPruneModel(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.model_file = os.path.join(cls.directory.name, 'addressCRF.crfsuite')
+        train_example_model(cls.model_file, c1=0.)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def test_rewrite(self):
+        output_file = os.path.join(self.directory.name, 'rewritten.crfsuite')
+        model = pruneModel.read_model(self.model_file)
+        pruneModel.write_model(model, model['features'], output_file)
+
+        with open(self.model_file, 'rb') as original, open(output_file, 'rb') as rewritten:
+            assert original.read() == rewritten.read()
+
+    def test_prune(self):
+        import pycrfsuite
+
+        features = pruneModel.read_model(self.model_file)['features']
+        kept = pruneModel.prune_features(features, threshold=0.2)
+        assert all(abs(weight) >= 0.2 for feature_type, _, _, weight in kept if feature_type == 0)
+        assert [feature for feature in features if feature[0] == 1] == [feature for feature in kept if feature[0] == 1]
+
+        kept = pruneModel.prune_features(features, top_n=3)
+        labels = [label for feature_type, _, label, _ in kept if feature_type == 0]
+        assert max(labels.count(label) for label in set(labels)) == 3
+
+        output_file = os.path.join(self.directory.name, 'pruned.crfsuite')
+        n_state, size = pruneModel.prune_model(self.model_file, output_file, threshold=0.2)
+        assert size == os.path.getsize(output_file) < os.path.getsize(self.model_file)
+
+        tagger = pycrfsuite.Tagger()
+        tagger.open(output_file)
+        assert len(tagger.info().state_features) == n_state
+        assert tagger.tag(tok.tokens2flatFeatures(['1', 'HIGH', 'STREET']))
+        tagger.close()
+
+    def test_flat_f1_score(self):
+        y_true = [['A', 'B', 'B'], ['A']]
+        assert metrics.flat_f1_score(y_true, y_true) == 1.
+        # A: precision 1, recall 1/2, B: precision 2/3, recall 1
+        assert abs(metrics.flat_f1_score(y_true, [['A', 'B', 'B'], ['B']]) - (2 * 2 / 3 + 2 * 0.8) / 4) < 1e-12
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -15,11 +15,18 @@ Author
 Version
 -------
 
-:version: 0.2
-:date: 3-Nov-2016
+:version: 0.3
+:date: 17-Oct-2026
 """
 import ProbabilisticParser.common.tokens as tokens
 import ProbabilisticParser.common.metrics as metrics
+import ProbabilisticParser.common.lookups as lookups
+from ProbabilisticParser.common.counties import CountyMatcher
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
 import unittest
 
 
@@ -42,6 +49,102 @@ class TestTokenizing(unittest.TestCase):
         assert tokens.tokenize(' foo bar') == ['foo', 'bar']
 
 
+class TestTokenizer(unittest.TestCase):
+
+    addresses = ['FLAT 15 191 - 193 NEWPORT ROAD CARDIFF CF24 1AJ',
+                 '7a to 10c Devon Wlk, Exeter, Devon, EX2 6GA, ENGLAND',
+                 '5/7 4 HIGH ST, MARTON IN CLEVELAND',
+                 b'12 ST ALBANS RD WATFORD HERTS WD17 1UN',
+                 '',
+                 'ROAD MARTON CO DURHAM\\ 1 - 2']
+
+    def test_same_as_reference(self):
+        for address in self.addresses:
+            assert tokens.tokenize(address) == tokens._tokenizeReference(address)
+
+    def test_tokenize_many(self):
+        assert list(tokens.tokenize_many(self.addresses)) == [tokens.tokenize(address) for address in self.addresses]
+        assert list(tokens.tokenize_many([])) == []
+
+
+class TestRemoveCounties(unittest.TestCase):
+
+    def setUp(self):
+        self.matcher = CountyMatcher(['WEST SUSSEX', 'SUSSEX', 'AVON', 'POWYS', 'ESSEX', 'ESSEX COUNTY'],
+                                     tokens.COUNTY_EXCEPTIONS, ['ROAD', 'STREET'])
+
+    def test_remove(self):
+        assert self.matcher.sub('CRAWLEY WEST SUSSEX RH10 1AA') == 'CRAWLEY  RH10 1AA'
+        assert self.matcher.sub('LEWES SUSSEX') == 'LEWES '
+        assert self.matcher.sub('NO COUNTIES HERE') == 'NO COUNTIES HERE'
+
+    def test_exceptions(self):
+        assert self.matcher.sub('BRADFORD ON AVON') == 'BRADFORD ON AVON'
+        assert self.matcher.sub('STRATFORD UPON AVON') == 'STRATFORD UPON AVON'
+        assert self.matcher.sub('DINAS POWYS') == 'DINAS POWYS'
+        assert self.matcher.sub('5 AVON') == '5 AVON'
+
+    def test_look_ahead(self):
+        assert self.matcher.sub('12 ESSEX ROAD') == '12 ESSEX ROAD'
+        assert self.matcher.sub('12 ESSEX ROADS') == '12  ROADS'
+
+    def test_priority(self):
+        # as in the regular expression, the county listed first wins, not the longest
+        assert self.matcher.sub('ESSEX COUNTY') == ' COUNTY'
+
+    def test_same_as_regex(self):
+        addresses = ['7A TO 10C DEVON WLK EXETER DEVON EX2 6GA ENGLAND',
+                     'FLAT 1 7 DENZIL AVENUE SOUTHAMPTON HAMPSHIRE SO14 0AB',
+                     '1 ESSEX ROAD DINAS POWYS CF64 4AA WALES',
+                     'THE COTTAGE BRADFORD ON AVON WILTSHIRE BA15 1AA',
+                     'CHERRY TREE HOUSING ASSOCIATION 5 TAVISTOCK AVENUE ST ALBANS AL1 2NQ']
+        for address in addresses:
+            assert tokens.removeCounties(address) == tokens._removeCountiesRegex(address)
+
+
+class TestFeatures(unittest.TestCase):
+
+    def test_tokens2features(self):
+        address = ['FLAT', '1', 'OXFORD', 'STREET']
+        features = tokens.tokens2features(address)
+
+        assert features[0]['rawstring.start'] and features[-1]['rawstring.end']
+        assert features[1]['previous'] == dict(tokens.tokenFeatures('FLAT'), **{'rawstring.start': True})
+        assert features[-2]['next'] == dict(tokens.tokenFeatures('STREET'), **{'rawstring.end': True})
+        assert features[1]['next'] == tokens.tokenFeatures('OXFORD')
+        for token, token_features in zip(address[1:-1], features[1:-1]):
+            assert {key: value for key, value in token_features.items() if key not in ('previous', 'next')} == \
+                tokens.tokenFeatures(token)
+
+        assert tokens.tokens2features(['SW1A']) == [dict(tokens.tokenFeatures('SW1A'), singleton=True)]
+
+    def test_feature_cache(self):
+        tokens.cachedTokenFeatures.cache_clear()
+        tokens.tokens2features(['1', 'HIGH', 'STREET'])
+        tokens.tokens2features(['2', 'HIGH', 'STREET'])
+        info = tokens.cachedTokenFeatures.cache_info()
+
+        assert info.hits == 2
+        assert info.misses == 4
+        # positional features must not leak to the cached features
+        assert tokens.cachedTokenFeatures('HIGH') == tokens.tokenFeatures('HIGH')
+
+    def test_flatten_features(self):
+        flat = tokens.flattenFeatures({'word': 'FLAT', 'length': 'w:4', 'digits': 'no_digits', 'flat': True,
+                                       'has.vowels': False, 'next': {'word': 'OXFORD', 'road': True}})
+
+        assert list(flat.items()) == [('word:FLAT', 1.0), ('length:w:4', 1.0), ('digits:no_digits', 1.0),
+                                      ('flat', 1.0), ('next:word:OXFORD', 1.0), ('next:road', 1.0)]
+
+    def test_tokens2flatFeatures(self):
+        for address in (['FLAT', '1', 'OXFORD', 'STREET'], ['12', 'HIGH', 'STREET'], ['SW1A', 'ST1'], ['SW1A']):
+            nested = [tokens.flattenFeatures(features) for features in tokens.tokens2features(address)]
+            flat = tokens.tokens2flatFeatures(address)
+
+            # same attributes in the same order so that the CRF scores are identical
+            assert [list(features.items()) for features in flat] == [list(features.items()) for features in nested]
+
+
 class TestDigits(unittest.TestCase):
 
     def test_digits(self):
@@ -59,5 +162,40 @@ class TestMetrics(unittest.TestCase):
         assert metrics.sequence_accuracy_score(['a', 'b', 'c', 'd'], ['a', 'b', 'c', 'd'][::-1]) == 0.
 
 
+class TestLookups(unittest.TestCase):
+
+    def test_lookups_artefact(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, 'lookups.pickle')
+            lookups.build_lookups(filename)
+
+            assert lookups.load_lookups(filename) == lookups.read_lookups()
+
+        assert tokens.OUTCODES == tokens.getLookups().outcodes
+        assert tokens.TOKENIZER is tokens.getTokenizer()
+
+    def test_stale_artefact(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for name in ('county', 'synonym'):
+                shutil.copy(os.path.join(lookups.LUT_PATH, name), tmp)
+            filename = os.path.join(tmp, 'lookups.pickle')
+            built = lookups.build_lookups(filename, lut_path=tmp)
+            assert lookups.load_lookups(filename, lut_path=tmp) == built
+
+            # the artefact is not used for the source files at another location, nor after they change
+            assert lookups.load_lookups(filename) == lookups.read_lookups()
+            with open(os.path.join(tmp, 'synonym'), 'a') as f:
+                f.write('FOO,BAR\n')
+            assert lookups.load_lookups(filename, lut_path=tmp).synonyms['FOO'] == 'BAR'
+
+    def test_import_has_no_side_effects(self):
+        check = "import sys; from ProbabilisticParser import parser; " \
+                "print([module for module in ('pandas', 'lxml', 'pycrfsuite') if module in sys.modules])"
+        environment = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        output = subprocess.check_output([sys.executable, '-c', check], env=environment, universal_newlines=True)
+
+        assert output.strip() == '[]'
+
+
 if __name__ == '__main__':
     unittest.main(verbosity=2)
@@ -0,0 +1,341 @@
+#!/usr/bin/env python
+"""
+ONS Address Index - Prune the Probabilistic Parser
+==================================================
+
+A script to prune a trained CRF model and to report the trade-off between speed and accuracy.
+
+The tagger looks up every state feature of every attribute of every token, hence the tagging time
+grows with the number of state features. A model is pruned by dropping the state features whose absolute
+weight is below a threshold, or by keeping only the top N state features of each label. The transition
+features are always kept. The pruned model is written as a standard CRFsuite model: the label and the
+attribute dictionaries are copied from the original and the features and the references of the labels and
+the attributes are rewritten, so the pruned model can be used with pycrfsuite, the parser and the decoder.
+Attributes without any features are kept in the dictionary, they no longer contribute to the scores.
+
+For each threshold the report gives the size of the model, the number of state features, the tagging
+throughput, and the flat F1-score and the sequence accuracy on the holdout data.
+
+
+Running
+-------
+
+After all requirements are satisfied and the holdout XML file has been created, the script can be invoked
+using CPython interpreter::
+
+    python pruneModel.py addressCRF.crfsuite holdout.xml --thresholds 0.01 0.05 0.1 0.5 --top-n 1000 5000
+
+The pruned models are written to the directory given with --output, the current directory by default.
+
+
+Requirements
+------------
+
+:requires: pycrfsuite (https://python-crfsuite.readthedocs.io/en/latest/)
+
+
+Version
+-------
+
+:version: 0.1
+:date: 17-Oct-2026
+"""
+import argparse
+import os
+import struct
+import time
+
+import ProbabilisticParser.common.metrics as metric
+import ProbabilisticParser.common.tokens as tkns
+from ProbabilisticParser.common.decoder import MODEL_CHUNK, MODEL_FEATURE, MODEL_HEADER, STATE_FEATURE, \
+    TRANSITION_FEATURE
+
+# the number of references and the references themselves
+_UINT32 = struct.Struct('<I')
+
+
+def read_model(model_file):
+    """
+    Read the header, the features, and the raw chunks of a CRFsuite model file.
+
+    :param model_file: name of the CRFsuite model file
+    :type model_file: str
+
+    :return: the model as a dictionary with keys header, features, labels, attributes, n_label_refs,
+             and n_attribute_refs, the features being (type, source, destination, weight) tuples in the
+             order of the model
+    :rtype: dict
+    """
+    with open(model_file, 'rb') as f:
+        content = f.read()
+
+    header = MODEL_HEADER.unpack_from(content, 0)
+    if header[0] != b'lCRF' or header[2] != b'FOMC':
+        raise ValueError('{} is not a CRFsuite linear chain model'.format(model_file))
+    off_features, off_labels, off_attributes, off_label_refs, off_attribute_refs = header[7:12]
+
+    chunks = {}
+    for name, offset in [(b'FEAT', off_features), (b'CQDB', off_labels), (b'CQDB', off_attributes),
+                         (b'LFRF', off_label_refs), (b'AFRF', off_attribute_refs)]:
+        chunk, size, count = MODEL_CHUNK.unpack_from(content, offset)
+        if chunk != name:
+            raise ValueError('Unexpected chunk {} at {} of {}'.format(chunk, offset, model_file))
+        chunks[offset] = (size, count)
+
+    n_features = chunks[off_features][1]
+    start = off_features + MODEL_CHUNK.size
+    features = list(MODEL_FEATURE.iter_unpack(content[start:start + n_features * MODEL_FEATURE.size]))
+
+    return dict(header=header, features=features,
+                labels=content[off_labels:off_labels + chunks[off_labels][0]],
+                attributes=content[off_attributes:off_attributes + chunks[off_attributes][0]],
+                n_label_refs=chunks[off_label_refs][1], n_attribute_refs=chunks[off_attribute_refs][1])
+
+
+def _references(name, n_items, n_written, features, feature_type, offset):
+    """
+    Build a chunk of feature references, i.e. the features of each label or attribute.
+
+    :param name: name of the chunk, LFRF for labels and AFRF for attributes
+    :type name: bytes
+    :param n_items: number of references in the chunk, CRFsuite reserves two more for the labels
+    :type n_items: int
+    :param n_written: number of labels or attributes, the reserved references are left empty as in CRFsuite
+    :type n_written: int
+    :param features: features of the model
+    :type features: list
+    :param feature_type: type of the features referenced by their source
+    :type feature_type: int
+    :param offset: position of the chunk in the file, the references use absolute offsets
+    :type offset: int
+
+    :return: the chunk
+    :rtype: bytes
+    """
+    references = [[] for _ in range(n_written)]
+    for feature_id, (current_type, source, _, _) in enumerate(features):
+        if current_type == feature_type:
+            references[source].append(feature_id)
+
+    position = offset + MODEL_CHUNK.size + _UINT32.size * n_items
+    offsets = [0] * n_items
+    lists = []
+    for i, feature_ids in enumerate(references):
+        offsets[i] = position
+        lists.append(_UINT32.pack(len(feature_ids)) + b''.join(_UINT32.pack(feature_id) for feature_id in feature_ids))
+        position += len(lists[-1])
+
+    body = b''.join(_UINT32.pack(value) for value in offsets) + b''.join(lists)
+
+    return MODEL_CHUNK.pack(name, MODEL_CHUNK.size + len(body), n_items) + body
+
+
+def _aligned(offset):
+    """
+    Round the offset up to a multiple of four bytes, CRFsuite aligns the chunks of references.
+
+    :param offset: position in the file
+    :type offset: int
+
+    :return: aligned position
+    :rtype: int
+    """
+    return (offset + 3) // 4 * 4
+
+
+def write_model(model, features, model_file):
+    """
+    Write a CRFsuite model with the given features, copying the labels and attributes from the original model.
+
+    :param model: the original model, see read_model
+    :type model: dict
+    :param features: features to write, (type, source, destination, weight) tuples
+    :type features: list
+    :param model_file: name of the new model file
+    :type model_file: str
+
+    :return: size of the new model in bytes
+    :rtype: int
+    """
+    header = list(model['header'])
+
+    feature_chunk = MODEL_CHUNK.pack(b'FEAT', MODEL_CHUNK.size + len(features) * MODEL_FEATURE.size, len(features)) + \
+        b''.join(MODEL_FEATURE.pack(*feature) for feature in features)
+
+    off_features = MODEL_HEADER.size
+    off_labels = off_features + len(feature_chunk)
+    off_attributes = off_labels + len(model['labels'])
+    off_label_refs = _aligned(off_attributes + len(model['attributes']))
+    label_refs = _references(b'LFRF', model['n_label_refs'], header[5], features, TRANSITION_FEATURE, off_label_refs)
+    off_attribute_refs = _aligned(off_label_refs + len(label_refs))
+    attribute_refs = _references(b'AFRF', model['n_attribute_refs'], header[6], features, STATE_FEATURE,
+                                 off_attribute_refs)
+    size = off_attribute_refs + len(attribute_refs)
+
+    header[1] = size
+    header[7:12] = [off_features, off_labels, off_attributes, off_label_refs, off_attribute_refs]
+
+    with open(model_file, 'wb') as f:
+        f.write(MODEL_HEADER.pack(*header))
+        f.write(feature_chunk)
+        f.write(model['labels'])
+        f.write(model['attributes'])
+        f.write(b'\0' * (off_label_refs - f.tell()))
+        f.write(label_refs)
+        f.write(b'\0' * (off_attribute_refs - f.tell()))
+        f.write(attribute_refs)
+
+    return size
+
+
+def prune_features(features, threshold=None, top_n=None):
+    """
+    Select the features to keep. Transition features are always kept, state features are dropped if their
+    absolute weight is below the threshold or if they are not among the top N of their label.
+
+    :param features: features of the model, (type, source, destination, weight) tuples
+    :type features: list
+    :param threshold: minimum absolute weight of the state features, if None not applied
+    :type threshold: float or None
+    :param top_n: number of state features kept for each label, ranked by absolute weight, if None not applied
+    :type top_n: int or None
+
+    :return: the features to keep in the original order
+    :rtype: list
+    """
+    keep = [feature[0] != STATE_FEATURE or (threshold is None or abs(feature[3]) >= threshold)
+            for feature in features]
+
+    if top_n is not None:
+        by_label = {}
+        for feature_id, (feature_type, _, label, weight) in enumerate(features):
+            if feature_type == STATE_FEATURE and keep[feature_id]:
+                by_label.setdefault(label, []).append((-abs(weight), feature_id))
+        for ranked in by_label.values():
+            for _, feature_id in sorted(ranked)[top_n:]:
+                keep[feature_id] = False
+
+    return [feature for feature, kept in zip(features, keep) if kept]
+
+
+def prune_model(model_file, output_file, threshold=None, top_n=None):
+    """
+    Prune a CRFsuite model and write the pruned model.
+
+    :param model_file: name of the CRFsuite model file
+    :type model_file: str
+    :param output_file: name of the pruned model file
+    :type output_file: str
+    :param threshold: minimum absolute weight of the state features, if None not applied
+    :type threshold: float or None
+    :param top_n: number of state features kept for each label, if None not applied
+    :type top_n: int or None
+
+    :return: number of state features kept and the size of the pruned model in bytes
+    :rtype: tuple
+    """
+    model = read_model(model_file)
+    features = prune_features(model['features'], threshold=threshold, top_n=top_n)
+    size = write_model(model, features, output_file)
+
+    return sum(1 for feature in features if feature[0] == STATE_FEATURE), size
+
+
+def evaluate(model_file, X_test, y_test, min_sequences=20000):
+    """
+    Tag the holdout data and compute the tagging throughput and the accuracy.
+
+    :param model_file: name of the CRFsuite model file
+    :type model_file: str
+    :param X_test: attributes of each token of each holdout sequence
+    :type X_test: list
+    :param y_test: true labels of each holdout sequence
+    :type y_test: list
+    :param min_sequences: the holdout data are tagged repeatedly until at least this many sequences have been tagged
+    :type min_sequences: int
+
+    :return: throughput in sequences per second, flat F1-score and sequence accuracy
+    :rtype: tuple
+    """
+    import pycrfsuite
+
+    tagger = pycrfsuite.Tagger()
+    tagger.open(model_file)
+
+    y_pred = [tagger.tag(features) for features in X_test]
+
+    passes = max(1, -(-min_sequences // len(X_test)))
+    start = time.perf_counter()
+    for _ in range(passes):
+        for features in X_test:
+            tagger.tag(features)
+    elapsed = time.perf_counter() - start
+    tagger.close()
+
+    return passes * len(X_test) / elapsed, metric.flat_f1_score(y_test, y_pred), \
+        metric.sequence_accuracy_score(y_test, y_pred)
+
+
+def run_report(model_file, holdout_file, thresholds=(0.01, 0.05, 0.1, 0.2, 0.5, 1.), top_ns=(), output_directory='.'):
+    """
+    Prune the model with each threshold and each top N, and report the size, throughput and accuracy
+    of every pruned model against the original.
+
+    :param model_file: name of the CRFsuite model file
+    :type model_file: str
+    :param holdout_file: XML file of labelled holdout addresses
+    :type holdout_file: str
+    :param thresholds: minimum absolute weights of the state features
+    :type thresholds: iterable
+    :param top_ns: numbers of state features to keep for each label
+    :type top_ns: iterable
+    :param output_directory: directory to write the pruned models
+    :type output_directory: str
+
+    :return: a dictionary for each model with keys model, file, state_features, size, throughput, f1, and
+             sequence_accuracy
+    :rtype: list
+    """
+    sequences = [components for _, components in tkns.readXML(holdout_file)]
+    X_test = [tkns.tokens2flatFeatures([token for token, _ in components]) for components in sequences]
+    y_test = [[label for _, label in components] for components in sequences]
+
+    model = read_model(model_file)
+    candidates = [('original', model_file, sum(1 for feature in model['features'] if feature[0] == STATE_FEATURE),
+                   os.path.getsize(model_file))]
+
+    name = os.path.splitext(os.path.basename(model_file))[0]
+    settings = [('threshold {}'.format(threshold), '{}_threshold{}.crfsuite'.format(name, threshold),
+                 dict(threshold=threshold)) for threshold in thresholds]
+    settings += [('top {}'.format(top_n), '{}_top{}.crfsuite'.format(name, top_n), dict(top_n=top_n))
+                 for top_n in top_ns]
+    for description, filename, parameters in settings:
+        output_file = os.path.join(output_directory, filename)
+        features = prune_features(model['features'], **parameters)
+        size = write_model(model, features, output_file)
+        candidates.append((description, output_file, sum(1 for feature in features if feature[0] == STATE_FEATURE),
+                           size))
+
+    print('{:>16} {:>14} {:>12} {:>14} {:>8} {:>10}'.format('model', 'state features', 'size (kB)', 'sequences/s',
+                                                            'F1', 'sequence'))
+    results = []
+    for description, filename, n_state, size in candidates:
+        throughput, f1, sequence_accuracy = evaluate(filename, X_test, y_test)
+        results.append(dict(model=description, file=filename, state_features=n_state, size=size,
+                            throughput=throughput, f1=f1, sequence_accuracy=sequence_accuracy))
+        print('{:>16} {:>14} {:>12.1f} {:>14.0f} {:>8.4f} {:>10.4f}'.format(description, n_state, size / 1024.,
+                                                                            throughput, f1, sequence_accuracy))
+
+    return results
+
+
+if __name__ == '__main__':
+    arguments = argparse.ArgumentParser(description='Prune a CRF model and report the speed and accuracy')
+    arguments.add_argument('model', help='CRFsuite model file')
+    arguments.add_argument('holdout', help='XML file of labelled holdout addresses')
+    arguments.add_argument('--thresholds', type=float, nargs='*', default=[0.01, 0.05, 0.1, 0.2, 0.5, 1.])
+    arguments.add_argument('--top-n', type=int, nargs='*', default=[])
+    arguments.add_argument('--output', default='.', help='directory to write the pruned models')
+    arguments = arguments.parse_args()
+
+    run_report(arguments.model, arguments.holdout, arguments.thresholds, arguments.top_n, arguments.output)